@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Per-Token vs Coalesced Streaming
+===========================================
+Replays a synthetic extended-thinking turn (many tiny thinking/text
+deltas plus a few tool calls) through SessionManager.stream_with_reasoning
+in the default per-token mode and in coalesced mode, and reports time per
+delta and the number of messages a client would receive.
+
+No model or network is used; the graph is a stand-in that yields
+pre-built ``astream_events`` dicts as fast as possible, so the numbers
+measure stream handling overhead only.
+
+Run: python benchmark_stream_coalescing.py [--deltas 20000] [--repeat 3]
+
+Author: SDTM Pipeline
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+
+class ReplayGraph:
+    """Minimal graph whose astream_events replays a fixed event list."""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def astream_events(self, input_message, config=None, version="v2"):
+        for event in self.events:
+            yield event
+
+
+def build_events(deltas: int):
+    """Thinking deltas, then text deltas, with a tool round-trip every 5000."""
+    events = []
+    for i in range(deltas):
+        if i and i % 5000 == 0:
+            events.append({"event": "on_tool_start", "name": "get_sdtm_guidance",
+                           "data": {"input": {"domain": "AE"}}})
+            events.append({"event": "on_tool_end", "data": {"output": "guidance " * 200}})
+        block = {"type": "thinking", "thinking": "reason "} if i < deltas * 3 // 4 \
+            else {"type": "text", "text": "word "}
+        events.append({"event": "on_chat_model_stream",
+                       "data": {"chunk": SimpleNamespace(content=[block])}})
+    return events
+
+
+async def run_once(events, coalesce: bool):
+    from sdtm_pipeline.deepagents.session_manager import SessionManager
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sm = SessionManager(storage_dir=Path(tmp))
+        sm.create_session("bench")
+        graph = ReplayGraph(events)
+
+        started = time.perf_counter()
+        messages = 0
+        async for chunk in sm.stream_with_reasoning(graph, "bench", {}, coalesce=coalesce):
+            # What a server would send to the client
+            chunk.json if coalesce else chunk.to_dict()
+            messages += 1
+        elapsed = time.perf_counter() - started
+        sm._stream_log("bench").close()
+    return elapsed, messages
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--deltas", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    events = build_events(args.deltas)
+    print(f"{args.deltas} token deltas, {len(events)} events, best of {args.repeat}\n")
+    print(f"{'mode':<12}{'total ms':>10}{'us/delta':>10}{'messages':>10}")
+
+    for label, coalesce in (("per-token", False), ("coalesced", True)):
+        runs = [await run_once(events, coalesce) for _ in range(args.repeat)]
+        elapsed, messages = min(runs)
+        print(f"{label:<12}{elapsed * 1000:>10.1f}{elapsed / args.deltas * 1e6:>10.2f}{messages:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,572 @@
+"""
+Streaming ClinicalTrials.gov Extractor
+======================================
+Resumable extraction of ClinicalTrials.gov API v2 study pages into
+categorized trial records, written incrementally instead of held in memory.
+
+Pipeline:
+    1. Fetch thread walks the page tokens on one keep-alive HTTP session
+       and hands raw page bodies to a bounded queue
+    2. Parse thread decodes each page, extracts the trial fields and
+       assigns therapeutic area and start month, queueing one batch per page
+    3. The caller's thread appends each batch to the output, updates the
+       monthly summary and checkpoints the next page token
+
+Page tokens are cursors (the next token is only known from the previous
+response), so pages are fetched one after another, but page N+1 is
+downloading while page N is parsed and written. Queues hold at most
+``queue_size`` pages, so memory stays flat however many trials match.
+
+The checkpoint is written after a page's records are on disk and holds
+the token of the next page, the output size and the summary counters. A
+rerun resumes from it; JSONL output is truncated back to the checkpointed
+size first, so a page interrupted mid-write is not duplicated.
+
+Storage Architecture:
+    <output_dir>/
+        trials.jsonl                 - One trial per line (format="jsonl")
+        parts/page-NNNNNN.parquet    - One file per page (format="parquet")
+        checkpoint.json              - {"next_page_token", "pages", "records",
+                                        "total_count", "bytes", "summary", "done"}
+
+Usage:
+    extractor = TrialExtractor(
+        "clinical_trials_2025",
+        {"filter.advanced": "AREA[StartDate]RANGE[2025-01-01,2025-12-31]"},
+    )
+    result = extractor.run()
+    print(result.records, result.summary_by_month)
+"""
+
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+
+API_BASE = "https://clinicaltrials.gov/api/v2/studies"
+
+MONTH_ORDER = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+
+# Therapeutic area keywords (order matters - first matching area wins)
+THERAPEUTIC_AREAS: Dict[str, List[str]] = {
+    "Oncology": ["cancer", "carcinoma", "tumor", "tumour", "malignancy", "neoplasm", "lymphoma",
+                 "leukemia", "leukaemia", "melanoma", "sarcoma", "oncology", "metastatic", "myeloma"],
+    "Cardiovascular": ["cardiovascular", "cardiac", "heart", "hypertension", "myocardial",
+                       "coronary", "atherosclerosis", "stroke", "arrhythmia", "vascular", "angina"],
+    "Neurological": ["neurological", "alzheimer", "parkinson", "epilepsy", "multiple sclerosis",
+                     "dementia", "neuropathy", "seizure", "brain", "cerebral", "neural", "migraine"],
+    "Diabetes/Metabolic": ["diabetes", "diabetic", "metabolic", "obesity", "glucose", "insulin",
+                           "hyperglycemia", "hypoglycemia", "metabolic syndrome"],
+    "Infectious Disease": ["infectious", "infection", "covid", "coronavirus", "hiv", "aids",
+                           "hepatitis", "tuberculosis", "malaria", "viral", "bacterial", "sepsis"],
+    "Respiratory": ["respiratory", "asthma", "copd", "pulmonary", "pneumonia", "lung",
+                    "bronchial", "breathing"],
+    "Immunology/Rheumatology": ["immunology", "autoimmune", "immune", "rheumatoid", "lupus", "psoriasis",
+                                "inflammatory", "arthritis", "crohn"],
+    "Ophthalmology": ["ophthalmology", "eye", "ocular", "vision", "retina", "glaucoma",
+                      "macular", "cataract"],
+    "Dermatology": ["dermatology", "skin", "dermatitis", "eczema", "acne", "rash"],
+    "Gastroenterology": ["gastroenterology", "gastrointestinal", "liver", "hepatic", "bowel",
+                         "colitis", "gastric", "intestinal", "digestive"],
+    "Nephrology": ["nephrology", "kidney", "renal", "dialysis"],
+    "Endocrinology": ["endocrine", "thyroid", "hormone", "pituitary", "adrenal"],
+    "Psychiatry/Mental Health": ["psychiatry", "psychiatric", "depression", "anxiety", "schizophrenia",
+                                 "bipolar", "mental health", "psychological"],
+    "Pain Management": ["pain", "chronic pain", "neuropathic pain", "analgesia"],
+    "Women's Health": ["pregnancy", "pregnant", "maternal", "obstetric", "gynecologic",
+                       "menopause", "endometriosis"],
+    "Pediatrics": ["pediatric", "child", "infant", "neonatal", "adolescent"],
+    "Hematology": ["hematology", "blood", "anemia", "hemophilia", "thrombosis", "coagulation"],
+    "Rare Diseases": ["rare disease", "orphan"],
+    "Surgery": ["surgery", "surgical", "operative", "postoperative"],
+    "Emergency Medicine": ["emergency", "trauma", "critical care", "intensive care"],
+    "Orthopedics": ["orthopedic", "bone", "fracture", "joint", "musculoskeletal"],
+    "Dental": ["dental", "tooth", "oral", "periodontal"],
+}
+
+
+# =============================================================================
+# THERAPEUTIC AREA MATCHING
+# =============================================================================
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Regex alternation factored by common prefixes, preferring the longest word."""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Greedy optional suffix: a longer keyword wins over its prefix
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+class TherapeuticAreaMatcher:
+    """
+    All therapeutic area keywords compiled into one regex.
+
+    One scan finds the keyword occurrences at every position of the text
+    (a zero-width lookahead, so overlapping keywords are all seen) and the
+    highest-priority area among them wins, the same result as checking each
+    area's keywords in order with ``in``.
+    """
+
+    def __init__(self, areas: Optional[Dict[str, List[str]]] = None):
+        self.areas = list((areas or THERAPEUTIC_AREAS).items())
+        priority: Dict[str, int] = {}
+        for rank, (_, keywords) in enumerate(self.areas):
+            for keyword in keywords:
+                priority.setdefault(keyword, rank)
+
+        # The regex reports the longest keyword at a position; every keyword
+        # that is a prefix of it matches there too, so fold in their priority
+        self._rank: Dict[str, int] = {
+            keyword: min(r for k, r in priority.items() if keyword.startswith(k))
+            for keyword in priority
+        }
+        self._pattern = re.compile("(?=(" + _trie_regex(priority) + "))")
+
+    def match(self, text: str) -> Optional[str]:
+        """Highest-priority area with a keyword in ``text`` (lowercase), or None."""
+        best = len(self.areas)
+        for found in self._pattern.finditer(text):
+            rank = self._rank[found.group(1)]
+            if rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return self.areas[best][0] if best < len(self.areas) else None
+
+    def categorize(self, conditions: Optional[List[str]]) -> str:
+        """Therapeutic area of a trial's conditions ("Unknown" without any)."""
+        if not conditions:
+            return "Unknown"
+        text = " ".join(c.lower() if c else "" for c in conditions)
+        return self.match(text) or "Other"
+
+
+_default_matcher: Optional[TherapeuticAreaMatcher] = None
+
+
+def get_therapeutic_area_matcher() -> TherapeuticAreaMatcher:
+    """Get or create the matcher for THERAPEUTIC_AREAS."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = TherapeuticAreaMatcher()
+    return _default_matcher
+
+
+def categorize_therapeutic_area(conditions: Optional[List[str]]) -> str:
+    """Categorize a trial by therapeutic area based on its conditions."""
+    return get_therapeutic_area_matcher().categorize(conditions)
+
+
+def extract_month(start_date_str: Optional[str]) -> str:
+    """Month name of a ``YYYY-MM[-DD]`` start date, "Unknown" otherwise."""
+    if not start_date_str or len(start_date_str) < 7:
+        return "Unknown"
+    try:
+        return datetime.strptime(start_date_str[:7], "%Y-%m").strftime("%B")
+    except ValueError:
+        return "Unknown"
+
+
+def parse_study(study: Dict[str, Any], matcher: Optional[TherapeuticAreaMatcher] = None) -> Dict[str, Any]:
+    """Flatten one API v2 study into an extraction record."""
+    protocol_section = study.get("protocolSection", {})
+    nct_id = protocol_section.get("identificationModule", {}).get("nctId", "")
+    conditions = protocol_section.get("conditionsModule", {}).get("conditions", [])
+    start_date = protocol_section.get("statusModule", {}).get("startDateStruct", {}).get("date", "")
+    return {
+        "nct_id": nct_id,
+        "conditions": conditions,
+        "start_date": start_date,
+        "therapeutic_area": (matcher or get_therapeutic_area_matcher()).categorize(conditions),
+        "month": extract_month(start_date),
+    }
+
+
+# =============================================================================
+# OUTPUT WRITERS
+# =============================================================================
+
+class JsonlTrialWriter:
+    """Appends records to ``trials.jsonl``; ``position`` is the byte size to checkpoint."""
+
+    def __init__(self, output_dir: Path, truncate_to: Optional[int] = None):
+        self.path = Path(output_dir) / "trials.jsonl"
+        if truncate_to is None:
+            self.path.write_bytes(b"")
+        self._file = open(self.path, "ab")
+        if truncate_to is not None:
+            self._file.truncate(min(truncate_to, self._file.seek(0, os.SEEK_END)))
+            self._file.seek(0, os.SEEK_END)
+
+    def write_page(self, page: int, records: List[Dict[str, Any]]) -> None:
+        self._file.write("".join(json.dumps(r) + "\n" for r in records).encode("utf-8"))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @property
+    def position(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetTrialWriter:
+    """Writes each page to ``parts/page-NNNNNN.parquet`` (read the directory as one dataset)."""
+
+    def __init__(self, output_dir: Path, truncate_to: Optional[int] = None):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.path = Path(output_dir) / "parts"
+        self.path.mkdir(parents=True, exist_ok=True)
+        if truncate_to is None:
+            for part in self.path.glob("page-*.parquet"):
+                part.unlink()
+        self._schema = pa.schema([
+            ("nct_id", pa.string()),
+            ("conditions", pa.list_(pa.string())),
+            ("start_date", pa.string()),
+            ("therapeutic_area", pa.string()),
+            ("month", pa.string()),
+        ])
+        self.position = 0
+
+    def write_page(self, page: int, records: List[Dict[str, Any]]) -> None:
+        import pyarrow.parquet as pq
+
+        table = self._pa.Table.from_pylist(records, schema=self._schema)
+        final = self.path / f"page-{page:06d}.parquet"
+        tmp = final.with_suffix(".tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, final)
+
+    def close(self) -> None:
+        pass
+
+
+WRITERS = {"jsonl": JsonlTrialWriter, "parquet": ParquetTrialWriter}
+
+
+# =============================================================================
+# EXTRACTOR
+# =============================================================================
+
+@dataclass
+class ExtractionResult:
+    """Counts, timing and summary of one extraction run (including resumed pages)."""
+    output_dir: str
+    pages: int = 0
+    records: int = 0
+    total_count: int = 0
+    resumed_from_page: int = 0
+    complete: bool = False
+    seconds: float = 0.0
+    summary_by_month: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    therapeutic_areas: List[str] = field(default_factory=list)
+
+
+class TrialExtractor:
+    """
+    Fetch -> parse/categorize -> write pipeline over ClinicalTrials.gov pages.
+
+    Args:
+        output_dir: Directory for records and the checkpoint
+        query_params: API v2 query parameters (filters, fields)
+        fmt: "jsonl" or "parquet"
+        page_size: Studies per page (API max 1000)
+        queue_size: Pages buffered between stages
+        request_interval: Minimum seconds between page requests
+        api_base: Studies endpoint (a fixture server in tests)
+        timeout: Per-request timeout in seconds
+        max_retries: Retries of a failed page request (with backoff)
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        output_dir: Path,
+        query_params: Optional[Dict[str, Any]] = None,
+        fmt: str = "jsonl",
+        page_size: int = 1000,
+        queue_size: int = 4,
+        request_interval: float = 0.5,
+        api_base: str = API_BASE,
+        timeout: float = 30,
+        max_retries: int = 3,
+    ):
+        if fmt not in WRITERS:
+            raise ValueError(f"Unknown output format '{fmt}' (expected one of {sorted(WRITERS)})")
+        self.output_dir = Path(output_dir)
+        self.query_params = dict(query_params or {})
+        self.fmt = fmt
+        self.page_size = page_size
+        self.queue_size = queue_size
+        self.request_interval = request_interval
+        self.api_base = api_base
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.checkpoint_file = self.output_dir / "checkpoint.json"
+        self.matcher = get_therapeutic_area_matcher()
+        self._stop = threading.Event()
+
+    # =========================================================================
+    # RUN
+    # =========================================================================
+
+    def run(self, resume: bool = True, max_pages: Optional[int] = None) -> ExtractionResult:
+        """
+        Extract all pages (or ``max_pages`` more), resuming from the checkpoint.
+
+        Raises the first fetch or parse error after the pages before it are
+        written and checkpointed, so a rerun continues from there.
+        """
+        start = time.perf_counter()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+
+        state = self._load_checkpoint() if resume else None
+        if state and state.get("done"):
+            return self._result(state, start)
+        if state is None:
+            state = {"next_page_token": None, "pages": 0, "records": 0, "total_count": 0,
+                     "bytes": None, "summary": {}, "done": False}
+        resumed_from = state["pages"]
+        summary: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for month, areas in state["summary"].items():
+            summary[month].update(areas)
+
+        writer = WRITERS[self.fmt](self.output_dir, truncate_to=state["bytes"] if resumed_from else None)
+        raw_pages: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        parsed_pages: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        errors: List[BaseException] = []
+
+        fetcher = threading.Thread(
+            target=self._fetch_stage, args=(state["next_page_token"], max_pages, raw_pages, errors),
+            name="trials-fetch", daemon=True,
+        )
+        parser = threading.Thread(
+            target=self._parse_stage, args=(raw_pages, parsed_pages, errors),
+            name="trials-parse", daemon=True,
+        )
+        fetcher.start()
+        parser.start()
+
+        try:
+            while True:
+                item = parsed_pages.get()
+                if item is self._DONE:
+                    break
+                records, next_token, total_count = item
+                page = state["pages"] + 1
+                writer.write_page(page, records)
+                for record in records:
+                    if record["month"] != "Unknown":
+                        summary[record["month"]][record["therapeutic_area"]] += 1
+
+                state.update(
+                    next_page_token=next_token,
+                    pages=page,
+                    records=state["records"] + len(records),
+                    total_count=total_count or state["total_count"],
+                    bytes=writer.position,
+                    summary=summary,
+                    done=not next_token,
+                )
+                self._save_checkpoint(state)
+                print(f"  Page {page}: {len(records)} trials "
+                      f"({state['records']}/{state['total_count']} processed)")
+        finally:
+            self._stop.set()
+            writer.close()
+            _drain(raw_pages)
+            _drain(parsed_pages)
+            fetcher.join()
+            parser.join()
+
+        if errors:
+            raise errors[0]
+        result = self._result(state, start)
+        result.resumed_from_page = resumed_from
+        return result
+
+    # =========================================================================
+    # STAGES
+    # =========================================================================
+
+    def _fetch_stage(self, page_token: Optional[str], max_pages: Optional[int],
+                     out: "queue.Queue[Any]", errors: List[BaseException]) -> None:
+        """Walk page tokens, queueing (raw body, token) pairs."""
+        try:
+            with requests.Session() as session:
+                fetched = 0
+                next_request = 0.0
+                while not self._stop.is_set() and (max_pages is None or fetched < max_pages):
+                    delay = next_request - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_request = time.monotonic() + self.request_interval
+                    body = self._fetch_page(session, page_token)
+                    fetched += 1
+                    # The token is needed now to request the next page; parse the rest later
+                    page_token = _next_page_token(body)
+                    _put(out, (body, page_token), self._stop)
+                    if not page_token:
+                        break
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            _put(out, self._DONE, self._stop, force=True)
+
+    def _parse_stage(self, pages: "queue.Queue[Any]", out: "queue.Queue[Any]",
+                     errors: List[BaseException]) -> None:
+        """Decode pages and categorize their studies."""
+        try:
+            while True:
+                item = pages.get()
+                if item is self._DONE:
+                    break
+                body, next_token = item
+                data = json.loads(body)
+                if data.get("nextPageToken") != next_token:
+                    raise ValueError(f"Page token mismatch: read {next_token!r}, "
+                                     f"page has {data.get('nextPageToken')!r}")
+                records = [parse_study(study, self.matcher) for study in data.get("studies", [])]
+                if not _put(out, (records, next_token, data.get("totalCount", 0)), self._stop):
+                    break
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            _put(out, self._DONE, self._stop, force=True)
+
+    def _fetch_page(self, session: requests.Session, page_token: Optional[str]) -> bytes:
+        """One page body, retrying connection errors, 429s and 5xx with backoff."""
+        params = {"format": "json", "pageSize": self.page_size, "countTotal": "true",
+                  **self.query_params}
+        if page_token:
+            params["pageToken"] = page_token
+        attempt = 0
+        while True:
+            try:
+                response = session.get(self.api_base, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                return response.content
+            except requests.RequestException as e:
+                status = getattr(e.response, "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                backoff = 2 ** attempt
+                attempt += 1
+                print(f"[TrialExtractor] Page request failed ({e}), retrying in {backoff}s")
+                if self._stop.wait(backoff):
+                    raise
+
+    # =========================================================================
+    # CHECKPOINT
+    # =========================================================================
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not self.checkpoint_file.exists():
+            return None
+        try:
+            with open(self.checkpoint_file, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[TrialExtractor] Ignoring unreadable checkpoint: {e}")
+            return None
+        if (state.get("format") != self.fmt or state.get("query") != self.query_params
+                or state.get("page_size") != self.page_size):
+            print("[TrialExtractor] Checkpoint is for a different query or format, starting over")
+            return None
+        return state
+
+    def _save_checkpoint(self, state: Dict[str, Any]) -> None:
+        payload = dict(state, format=self.fmt, query=self.query_params, page_size=self.page_size)
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.checkpoint_file)
+
+    def _result(self, state: Dict[str, Any], start: float) -> ExtractionResult:
+        summary = state["summary"]
+        ordered = {m: dict(summary[m]) for m in MONTH_ORDER + ["Unknown"] if m in summary}
+        return ExtractionResult(
+            output_dir=str(self.output_dir),
+            pages=state["pages"],
+            records=state["records"],
+            total_count=state["total_count"],
+            complete=bool(state["done"]),
+            seconds=time.perf_counter() - start,
+            summary_by_month=ordered,
+            therapeutic_areas=sorted({a for areas in summary.values() for a in areas}),
+        )
+
+
+_NEXT_TOKEN_RE = re.compile(rb'"nextPageToken"\s*:\s*"([^"]*)"')
+
+
+def _next_page_token(body: bytes) -> Optional[str]:
+    """
+    Read ``nextPageToken`` from a raw page without decoding it.
+
+    A quote inside a JSON string is escaped, so the unescaped key can only
+    be the top-level one; the parse stage checks it against the decoded page.
+    """
+    position = body.rfind(b'"nextPageToken"')
+    if position < 0:
+        return None
+    found = _NEXT_TOKEN_RE.match(body, position)
+    return found.group(1).decode("utf-8") if found else None
+
+
+def _put(q: "queue.Queue[Any]", item: Any, stop: threading.Event, force: bool = False) -> bool:
+    """
+    Put onto a bounded queue, giving up (False) once ``stop`` is set.
+
+    With ``force`` (end-of-stream markers) a stopped queue is drained to make room.
+    """
+    while True:
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                if not force:
+                    return False
+                _drain(q)
+
+
+def _drain(q: "queue.Queue[Any]") -> None:
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            return
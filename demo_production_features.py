@@ -83,7 +83,7 @@ async def demo_reasoning_stream():
     # Simulate some thinking chunks for demo
     from sdtm_pipeline.deepagents.session_manager import StreamChunk
 
-    pg._session_manager._stream_buffers[session.thread_id] = [
+    pg._session_manager._stream_log(session.thread_id).extend([
         StreamChunk(
             content_type=StreamContentType.THINKING,
             content="I need to analyze the AE domain requirements from SDTM-IG 3.4...",
@@ -104,7 +104,7 @@ async def demo_reasoning_stream():
             content="The AE domain captures adverse event data...",
             metadata={"position": 3}
         ),
-    ]
+    ])
 
     thinking = pg.get_thinking_summary(session.thread_id)
     if thinking:
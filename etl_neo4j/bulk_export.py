@@ -0,0 +1,372 @@
+"""
+Neo4j Bulk Import Exporter
+==========================
+
+Writes SDTM DataFrames as ``neo4j-admin database import`` CSV files, for
+initial loads of whole studies where transactional MERGE through
+``Neo4jLoader`` is far too slow.
+
+The graph matches the one built by the transactional loader
+(``load_sdtm_to_neo4j``):
+
+    (Study)-[:HAS_DOMAIN]->(Domain)
+    (Subject)-[:HAS_<DOMAIN>]->(<DOMAIN> record)-[:BELONGS_TO]->(Domain)
+    (record)-[:RELREC {reltype, relid}]->(record)      - from the RELREC dataset
+
+Storage Architecture:
+    <output_dir>/
+        manifest.json               - files, row counts, import command
+        nodes/
+            Study.csv               - study_id:ID(Study),:LABEL
+            Domain.csv              - :ID(Domain),name,study_id,record_count:long,:LABEL
+            Subject.csv             - usubjid:ID(Subject),study_id,:LABEL
+            <DOMAIN>.csv            - record_id:ID(Record),<columns>,study_id,:LABEL
+        relationships/
+            HAS_DOMAIN.csv          - :START_ID(Study),:END_ID(Domain),:TYPE
+            HAS_<DOMAIN>.csv        - :START_ID(Subject),:END_ID(Record),:TYPE
+            BELONGS_TO.csv          - :START_ID(Record),:END_ID(Domain),:TYPE
+            RELREC.csv              - :START_ID(Record),:END_ID(Record),:TYPE,reltype,relid
+
+Domain frames are streamed to disk in chunks, so memory use is bounded by
+``chunk_size`` rows rather than by the study size.
+
+Usage:
+    from etl_neo4j.bulk_export import Neo4jBulkExporter
+
+    exporter = Neo4jBulkExporter("./neo4j_import", study_id="MAXIS-08")
+    manifest = exporter.export(sdtm_frames)
+    print(manifest["import_command"])
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+import csv
+import json
+import os
+import tempfile
+
+import pandas as pd
+import structlog
+
+logger = structlog.get_logger()
+
+
+MANIFEST_VERSION = 1
+DEFAULT_CHUNK_SIZE = 50000
+
+_RELREC_COLUMNS = {"RDOMAIN", "USUBJID", "IDVAR", "IDVARVAL", "RELID"}
+
+
+# =============================================================================
+# SHARED KEYS
+# =============================================================================
+
+def subject_and_record_ids(
+    df: pd.DataFrame,
+    domain: str,
+    study_id: str
+) -> tuple[pd.Series, pd.Series]:
+    """
+    Subject and record keys for every row of a domain.
+
+    Rows without a USUBJID fall back to ``<study_id>-<index>``; record ids are
+    ``<DOMAIN>_<USUBJID>_<index>``. Both load modes use these keys so a graph
+    built by bulk import can later be refreshed transactionally.
+    """
+    fallback = pd.Series(
+        [f"{study_id}-{idx}" for idx in df.index], index=df.index, dtype=object
+    )
+    if "USUBJID" in df.columns:
+        usubjids = df["USUBJID"].astype(object).where(df["USUBJID"].notna(), fallback)
+    else:
+        usubjids = fallback
+    usubjids = usubjids.astype(str)
+    record_ids = f"{domain}_" + usubjids + "_" + df.index.astype(str)
+    return usubjids, record_ids
+
+
+def _neo4j_type(dtype) -> str:
+    """neo4j-admin header type suffix for a pandas dtype."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return ":boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return ":long"
+    if pd.api.types.is_float_dtype(dtype):
+        return ":double"
+    return ""
+
+
+# =============================================================================
+# EXPORTER
+# =============================================================================
+
+class Neo4jBulkExporter:
+    """
+    Streams SDTM domains into neo4j-admin import CSVs plus a manifest.
+
+    Args:
+        output_dir: Directory receiving ``nodes/``, ``relationships/`` and ``manifest.json``
+        study_id: Study identifier stored on every node
+        chunk_size: Rows written per chunk
+    """
+
+    def __init__(self, output_dir: str, study_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.output_dir = Path(output_dir)
+        self.study_id = study_id
+        self.chunk_size = chunk_size
+        self.nodes_dir = self.output_dir / "nodes"
+        self.relationships_dir = self.output_dir / "relationships"
+        self._files: list[dict[str, Any]] = []
+
+    def export(
+        self,
+        domains: dict[str, pd.DataFrame],
+        database: str = "neo4j"
+    ) -> dict[str, Any]:
+        """
+        Write all domains and return the manifest (also saved as manifest.json).
+
+        Args:
+            domains: Domain code -> SDTM DataFrame (RELREC, if present, also
+                produces record-to-record links)
+            database: Target database name used in the import command
+        """
+        self.nodes_dir.mkdir(parents=True, exist_ok=True)
+        self.relationships_dir.mkdir(parents=True, exist_ok=True)
+        self._files = []
+
+        domains = {name.upper(): df for name, df in domains.items()}
+
+        self._write_rows(
+            self.nodes_dir / "Study.csv", "nodes", "Study",
+            ["study_id:ID(Study)", ":LABEL"],
+            [[self.study_id, "Study"]],
+        )
+        self._write_rows(
+            self.nodes_dir / "Domain.csv", "nodes", "Domain",
+            [":ID(Domain)", "name", "study_id", "record_count:long", ":LABEL"],
+            [[name, name, self.study_id, len(df), "Domain"] for name, df in domains.items()],
+        )
+        self._write_rows(
+            self.relationships_dir / "HAS_DOMAIN.csv", "relationships", "HAS_DOMAIN",
+            [":START_ID(Study)", ":END_ID(Domain)", ":TYPE"],
+            [[self.study_id, name, "HAS_DOMAIN"] for name in domains],
+        )
+
+        subjects: dict[str, None] = {}
+        belongs_to = self._open_csv(
+            self.relationships_dir / "BELONGS_TO.csv",
+            [":START_ID(Record)", ":END_ID(Domain)", ":TYPE"],
+        )
+        belongs_to_rows = 0
+        record_index: dict[tuple[str, str, str, str], str] = {}
+        try:
+            for name, df in domains.items():
+                rows = self._export_domain(name, df, subjects, belongs_to, record_index,
+                                           domains.get("RELREC"))
+                belongs_to_rows += rows
+        finally:
+            belongs_to.close()
+        self._register(self.relationships_dir / "BELONGS_TO.csv", "relationships",
+                       "BELONGS_TO", belongs_to_rows)
+
+        self._write_rows(
+            self.nodes_dir / "Subject.csv", "nodes", "Subject",
+            ["usubjid:ID(Subject)", "study_id", ":LABEL"],
+            [[usubjid, self.study_id, "Subject"] for usubjid in subjects],
+        )
+
+        relrec = domains.get("RELREC")
+        unresolved = 0
+        if relrec is not None and _RELREC_COLUMNS.issubset(relrec.columns):
+            unresolved = self._export_relrec(relrec, record_index)
+
+        manifest = {
+            "manifest_version": MANIFEST_VERSION,
+            "study_id": self.study_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "database": database,
+            "files": self._files,
+            "totals": {
+                "nodes": sum(f["rows"] for f in self._files if f["kind"] == "nodes"),
+                "relationships": sum(f["rows"] for f in self._files if f["kind"] == "relationships"),
+            },
+            "relrec_unresolved": unresolved,
+            "import_command": self.import_command(database),
+        }
+        self._write_manifest(manifest)
+
+        logger.info("Bulk import files written",
+                    output_dir=str(self.output_dir),
+                    nodes=manifest["totals"]["nodes"],
+                    relationships=manifest["totals"]["relationships"])
+        return manifest
+
+    def import_command(self, database: str = "neo4j") -> str:
+        """The ``neo4j-admin`` command that imports the exported files."""
+        parts = ["neo4j-admin database import full", "--multiline-fields=true"]
+        for entry in self._files:
+            flag = "--nodes" if entry["kind"] == "nodes" else "--relationships"
+            parts.append(f"{flag}={self.output_dir / entry['path']}")
+        parts.append(database)
+        return " \\\n    ".join(parts)
+
+    # =========================================================================
+    # DOMAIN RECORDS
+    # =========================================================================
+
+    def _export_domain(
+        self,
+        name: str,
+        df: pd.DataFrame,
+        subjects: dict[str, None],
+        belongs_to,
+        record_index: dict[tuple[str, str, str, str], str],
+        relrec: Optional[pd.DataFrame]
+    ) -> int:
+        """Stream one domain's record nodes and relationships. Returns the row count."""
+        columns = [c for c in df.columns if c and c != "record_id"]
+        header = ["record_id:ID(Record)"] + [f"{c}{_neo4j_type(df[c].dtype)}" for c in columns] + \
+                 ["study_id", ":LABEL"]
+
+        # IDVARs that RELREC uses for this domain, to resolve its links later
+        link_vars: list[str] = []
+        if relrec is not None and _RELREC_COLUMNS.issubset(relrec.columns):
+            link_vars = sorted(
+                set(relrec.loc[relrec["RDOMAIN"].astype(str).str.upper() == name, "IDVAR"]
+                    .dropna().astype(str))
+                & set(df.columns)
+            )
+
+        node_path = self.nodes_dir / f"{name}.csv"
+        rel_path = self.relationships_dir / f"HAS_{name}.csv"
+        with open(node_path, "w", newline="", encoding="utf-8") as nodes_file, \
+                open(rel_path, "w", newline="", encoding="utf-8") as rels_file:
+            csv.writer(nodes_file).writerow(header)
+            csv.writer(rels_file).writerow([":START_ID(Subject)", ":END_ID(Record)", ":TYPE"])
+
+            for start in range(0, len(df), self.chunk_size):
+                chunk = df.iloc[start:start + self.chunk_size]
+                usubjids, record_ids = subject_and_record_ids(chunk, name, self.study_id)
+
+                out = chunk[columns].copy()
+                out.insert(0, "record_id", record_ids.values)
+                out["study_id"] = self.study_id
+                out[":LABEL"] = name
+                out.to_csv(nodes_file, header=False, index=False)
+
+                pd.DataFrame({
+                    "start": usubjids.values,
+                    "end": record_ids.values,
+                    "type": f"HAS_{name}",
+                }).to_csv(rels_file, header=False, index=False)
+
+                pd.DataFrame({
+                    "start": record_ids.values,
+                    "end": name,
+                    "type": "BELONGS_TO",
+                }).to_csv(belongs_to, header=False, index=False)
+
+                subjects.update(dict.fromkeys(usubjids))
+                for var in link_vars:
+                    values = chunk[var]
+                    for usubjid, value, record_id in zip(usubjids, values, record_ids):
+                        if pd.notna(value):
+                            record_index[(name, usubjid, var, _idvarval(value))] = record_id
+
+        self._register(node_path, "nodes", name, len(df))
+        self._register(rel_path, "relationships", f"HAS_{name}", len(df))
+        return len(df)
+
+    # =========================================================================
+    # RELREC LINKS
+    # =========================================================================
+
+    def _export_relrec(
+        self,
+        relrec: pd.DataFrame,
+        record_index: dict[tuple[str, str, str, str], str]
+    ) -> int:
+        """
+        Link records that share a RELID for the same subject.
+
+        Each group is chained from its first resolved record to the others.
+        Returns the number of RELREC rows whose record could not be found.
+        """
+        rows = []
+        unresolved = 0
+        rel = relrec[relrec["USUBJID"].notna() & relrec["IDVARVAL"].notna()]
+        reltype = rel["RELTYPE"] if "RELTYPE" in rel.columns else pd.Series("", index=rel.index)
+
+        groups: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for rdomain, usubjid, idvar, idvarval, relid, rtype in zip(
+            rel["RDOMAIN"], rel["USUBJID"], rel["IDVAR"], rel["IDVARVAL"], rel["RELID"], reltype
+        ):
+            record_id = record_index.get(
+                (str(rdomain).upper(), str(usubjid), str(idvar), _idvarval(idvarval))
+            )
+            if record_id is None:
+                unresolved += 1
+                continue
+            groups.setdefault((str(usubjid), str(relid)), []).append(
+                (record_id, "" if pd.isna(rtype) else str(rtype))
+            )
+
+        for (_, relid), members in groups.items():
+            anchor = members[0][0]
+            for record_id, rtype in members[1:]:
+                rows.append([anchor, record_id, "RELREC", rtype, relid])
+
+        self._write_rows(
+            self.relationships_dir / "RELREC.csv", "relationships", "RELREC",
+            [":START_ID(Record)", ":END_ID(Record)", ":TYPE", "reltype", "relid"],
+            rows,
+        )
+        if unresolved:
+            logger.warning("RELREC rows without a matching record", count=unresolved)
+        return unresolved
+
+    # =========================================================================
+    # FILE HELPERS
+    # =========================================================================
+
+    @staticmethod
+    def _open_csv(path: Path, header: list[str]):
+        f = open(path, "w", newline="", encoding="utf-8")
+        csv.writer(f).writerow(header)
+        return f
+
+    def _write_rows(self, path: Path, kind: str, name: str, header: list[str], rows: list[list]) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        self._register(path, kind, name, len(rows))
+
+    def _register(self, path: Path, kind: str, name: str, rows: int) -> None:
+        self._files.append({
+            "kind": kind,
+            "name": name,
+            "path": str(path.relative_to(self.output_dir)),
+            "rows": rows,
+        })
+
+    def _write_manifest(self, manifest: dict[str, Any]) -> None:
+        path = self.output_dir / "manifest.json"
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def _idvarval(value: Any) -> str:
+    """Normalize IDVAR values so RELREC's text "3" matches a numeric AESEQ of 3.0."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return str(int(number)) if number.is_integer() else text
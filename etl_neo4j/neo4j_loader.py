@@ -10,6 +10,10 @@ as part of the ETL pipeline. It handles:
 3. Schema management (constraints, indexes)
 4. Error handling and retry logic
 5. Performance optimization
+6. Parallel batch writing: key-range partitions written concurrently on
+   pooled sessions with latency-adaptive batch sizes
+7. Relationship pre-pass: duplicate rows dropped, rows ordered by source
+   node, endpoint key constraints/indexes ensured before writing
 
 Neo4j Version: 5.x compatible
 Driver Version: neo4j 5.27.0
@@ -18,10 +22,14 @@ Author: ETL Orchestration Guide
 Version: 1.0.0
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Optional, Generator
+from typing import Any, Callable, Optional, Generator, Union
 from contextlib import contextmanager
+import json
 import logging
+import os
+import threading
 import time
 
 from neo4j import GraphDatabase, Session, Transaction, Result
@@ -59,12 +67,16 @@ class LoadResult(BaseModel):
     success: bool
     nodes_created: int = 0
     nodes_updated: int = 0
+    nodes_deleted: int = 0
     relationships_created: int = 0
     relationships_updated: int = 0
+    relationships_deduplicated: int = 0
+    missing_endpoints: int = 0
     constraints_created: int = 0
     indexes_created: int = 0
     errors: list[str] = Field(default_factory=list)
     duration_seconds: float = 0.0
+    batch_timings: list[dict] = Field(default_factory=list)
     loaded_at: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
 
 
@@ -76,6 +88,87 @@ class BatchResult(BaseModel):
     errors: list[str] = Field(default_factory=list)
 
 
+# =============================================================================
+# ADAPTIVE BATCH SIZING
+# =============================================================================
+
+DEFAULT_WRITE_WORKERS = int(os.getenv("NEO4J_WRITE_WORKERS", "0")) or min(8, os.cpu_count() or 4)
+
+
+class AdaptiveBatchSizer:
+    """
+    Batch size controller shared by parallel writers.
+
+    Grows the batch while commits finish well under ``target_seconds`` and
+    halves it when a batch is slow or hits a transient error. The size is
+    also capped so one batch's parameter payload stays under
+    ``max_batch_bytes`` (estimated from a sample of the records).
+    """
+
+    def __init__(
+        self,
+        initial_size: int = 1000,
+        min_size: int = 100,
+        max_size: int = 50000,
+        target_seconds: float = 1.0,
+        max_batch_bytes: int = 16 * 1024 * 1024
+    ):
+        self.size = initial_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.max_batch_bytes = max_batch_bytes
+        self._lock = threading.Lock()
+
+    def fit_to_records(self, records: list[dict], sample: int = 100) -> None:
+        """Cap the batch size by the estimated serialized size of a record."""
+        if not records:
+            return
+        step = max(1, len(records) // sample)
+        sampled = records[::step][:sample]
+        avg_bytes = sum(len(json.dumps(r, default=str)) for r in sampled) / len(sampled)
+        cap = max(self.min_size, int(self.max_batch_bytes / max(avg_bytes, 1.0)))
+        with self._lock:
+            self.max_size = min(self.max_size, cap)
+            self.size = min(self.size, self.max_size)
+
+    def next_size(self) -> int:
+        with self._lock:
+            return self.size
+
+    def record(self, records: int, seconds: float) -> None:
+        """Adjust the size after a committed batch of ``records`` took ``seconds``."""
+        with self._lock:
+            if records < self.size:
+                return  # Tail batch, not representative
+            if seconds > self.target_seconds:
+                self.size = max(self.min_size, self.size // 2)
+            elif seconds < self.target_seconds / 2:
+                self.size = min(self.max_size, int(self.size * 1.5))
+
+    def on_transient_error(self) -> None:
+        with self._lock:
+            self.size = max(self.min_size, self.size // 2)
+
+
+def _run_batch(tx: Transaction, query: str, batch: list[dict]):
+    """
+    Transaction function for ``session.execute_write``.
+
+    Returns the summary and the query's ``count`` column (None for queries
+    that return nothing).
+    """
+    result = tx.run(query, {"batch": batch})
+    record = result.single()
+    count = record["count"] if record is not None and "count" in record.keys() else None
+    return result.consume(), count
+
+
+def _row_key(value: Any) -> str:
+    """Hashable, order-stable form of a node key (scalar or property map)."""
+    return json.dumps(value, sort_keys=True, default=str)
+
+
 # =============================================================================
 # NEO4J LOADER CLASS
 # =============================================================================
@@ -101,6 +194,7 @@ class Neo4jLoader:
         """
         self.config = config
         self._driver = None
+        self._ensured_keys: set[tuple[str, tuple[str, ...]]] = set()
 
     @property
     def driver(self):
@@ -310,18 +404,114 @@ class Neo4jLoader:
             for index_def in index_props:
                 if isinstance(index_def, str):
                     # Simple single-property index
-                    if self.create_index(label, [index_def]):
-                        results["indexes_created"] += 1
+                    props, idx_type = [index_def], "range"
                 elif isinstance(index_def, dict):
                     # Complex index definition
                     props = index_def.get("properties", [])
                     idx_type = index_def.get("type", "range")
-                    if props and self.create_index(label, props, idx_type):
-                        results["indexes_created"] += 1
+                else:
+                    continue
+                if not props:
+                    continue
+                if self.create_index(label, props, idx_type):
+                    results["indexes_created"] += 1
+                else:
+                    results["errors"].append(
+                        f"Failed to create {idx_type} index on {label}({', '.join(props)})"
+                    )
 
         logger.info("Schema setup complete", **results)
         return results
 
+    def ensure_key_schema(self, label: str, id_property: Union[str, list[str]]) -> bool:
+        """
+        Make sure nodes can be looked up by key before relationships are
+        matched against them.
+
+        Checks ``SHOW INDEXES`` (uniqueness constraints are backed by an
+        index, so they show up there too) for an index on the label whose
+        leading properties are the key. If none exists, one is created via
+        ``setup_schema``: a uniqueness constraint for a single property, a
+        composite range index for a list of properties. A key is only
+        remembered once it is indexed, so a failed check or creation is
+        retried on the next call.
+
+        Returns:
+            True if the key is indexed (or was just indexed)
+        """
+        props = (id_property,) if isinstance(id_property, str) else tuple(id_property)
+        if (label, props) in self._ensured_keys:
+            return True
+
+        ok, rows = self.execute_cypher("""
+            SHOW INDEXES YIELD labelsOrTypes, properties, entityType, state
+            WHERE entityType = 'NODE'
+            RETURN labelsOrTypes, properties, state
+        """)
+        if not ok:
+            return False
+
+        covered = any(
+            row["labelsOrTypes"] == [label]
+            and tuple(row["properties"] or [])[:len(props)] == props
+            and row.get("state") != "FAILED"
+            for row in rows
+        )
+        if not covered:
+            node_def = {"label": label}
+            if len(props) == 1:
+                node_def["unique_constraint"] = props[0]
+            else:
+                node_def["indexes"] = [{"properties": list(props)}]
+            logger.info("Creating missing key schema", label=label, properties=list(props))
+            schema = self.setup_schema([node_def])
+            if schema["errors"]:
+                return False
+
+        self._ensured_keys.add((label, props))
+        return True
+
+    def _prepare_relationships(
+        self,
+        relationships: list[dict],
+        from_label: str,
+        to_label: str,
+        from_id_property: Union[str, list[str]],
+        to_id_property: Union[str, list[str]],
+        result: LoadResult,
+        ensure_schema: bool = True
+    ) -> list[dict]:
+        """
+        Pre-pass shared by the relationship writers.
+
+        Drops duplicate (from_id, to_id) pairs, keeping the last row's
+        properties as repeated ``SET r += ...`` would, and sorts rows by
+        source node so consecutive rows hit the same store pages. When
+        ``ensure_schema`` is set, both endpoint keys are indexed first.
+        """
+        if ensure_schema:
+            for label, id_property in ((from_label, from_id_property), (to_label, to_id_property)):
+                if not self.ensure_key_schema(label, id_property):
+                    logger.warning("Could not verify key schema, lookups may scan",
+                                   label=label, id_property=id_property)
+
+        unique: dict[tuple[str, str], dict] = {}
+        for rel in relationships:
+            from_id = rel.get("from_id")
+            to_id = rel.get("to_id")
+            unique[(_row_key(from_id), _row_key(to_id))] = {
+                "from_id": from_id,
+                "to_id": to_id,
+                "properties": rel.get("properties", {})
+            }
+
+        result.relationships_deduplicated = len(relationships) - len(unique)
+        if result.relationships_deduplicated:
+            logger.debug("Duplicate relationships dropped",
+                         duplicates=result.relationships_deduplicated)
+
+        return [unique[key] for key in sorted(unique)]
+
     # =========================================================================
     # DATA LOADING
     # =========================================================================
@@ -369,12 +559,60 @@ class Neo4jLoader:
         logger.error("Max retries exceeded")
         return None
 
+    @staticmethod
+    def _key_map(id_property: Union[str, list[str]], source: str) -> str:
+        """
+        Cypher map matching a node by its key property (or properties).
+
+        A single property matches against ``source`` itself; a list of
+        properties matches each against ``source.<property>``.
+        """
+        if isinstance(id_property, str):
+            return f"{{{id_property}: {source}}}"
+        return "{" + ", ".join(f"{p}: {source}.{p}" for p in id_property) + "}"
+
+    def _merge_nodes_query(
+        self,
+        label: str,
+        id_property: Union[str, list[str]],
+        timestamp_property: Optional[str] = None
+    ) -> str:
+        key_props = [id_property] if isinstance(id_property, str) else id_property
+        key_map = self._key_map(key_props, "row")
+        stamp = f", n.{timestamp_property} = datetime()" if timestamp_property else ""
+        return f"""
+            UNWIND $batch AS row
+            MERGE (n:{label} {key_map})
+            SET n += row{stamp}
+            RETURN count(n) AS count
+        """
+
+    def _relationships_query(
+        self,
+        relationship_type: str,
+        from_label: str,
+        to_label: str,
+        from_id_property: Union[str, list[str]],
+        to_id_property: Union[str, list[str]]
+    ) -> str:
+        from_key = self._key_map(from_id_property, "row.from_id")
+        to_key = self._key_map(to_id_property, "row.to_id")
+        return f"""
+            UNWIND $batch AS row
+            MATCH (a:{from_label} {from_key})
+            MATCH (b:{to_label} {to_key})
+            MERGE (a)-[r:{relationship_type}]->(b)
+            SET r += row.properties
+            RETURN count(r) AS count
+        """
+
     def merge_nodes(
         self,
         label: str,
         records: list[dict],
-        id_property: str = "id",
-        batch_size: int = 1000
+        id_property: Union[str, list[str]] = "id",
+        batch_size: int = 1000,
+        timestamp_property: Optional[str] = None
     ) -> LoadResult:
         """
         Merge (upsert) nodes into the database.
@@ -384,8 +622,9 @@ class Neo4jLoader:
         Args:
             label: Node label
             records: List of record dictionaries
-            id_property: Property to use for matching
+            id_property: Property (or list of properties) to use for matching
             batch_size: Records per transaction
+            timestamp_property: If set, stamped with ``datetime()`` on every merge
 
         Returns:
             LoadResult with operation statistics
@@ -398,12 +637,7 @@ class Neo4jLoader:
             return result
 
         # Batch MERGE query using UNWIND
-        query = f"""
-            UNWIND $batch AS row
-            MERGE (n:{label} {{{id_property}: row.{id_property}}})
-            SET n += row
-            RETURN count(n) AS count
-        """
+        query = self._merge_nodes_query(label, id_property, timestamp_property)
 
         total_processed = 0
         with self.session() as session:
@@ -454,21 +688,28 @@ class Neo4jLoader:
         relationships: list[dict],
         from_label: str,
         to_label: str,
-        from_id_property: str = "id",
-        to_id_property: str = "id",
-        batch_size: int = 1000
+        from_id_property: Union[str, list[str]] = "id",
+        to_id_property: Union[str, list[str]] = "id",
+        batch_size: int = 1000,
+        ensure_schema: bool = True
     ) -> LoadResult:
         """
         Create relationships between nodes.
 
+        Duplicate rows are dropped and the rest written in source-node
+        order. Rows whose endpoints do not exist are skipped by the MATCH
+        and counted in ``missing_endpoints``.
+
         Args:
             relationship_type: Relationship type (e.g., "KNOWS", "WORKS_FOR")
             relationships: List of relationship dicts with from_id, to_id, and properties
             from_label: Source node label
             to_label: Target node label
-            from_id_property: Property to match source nodes
-            to_id_property: Property to match target nodes
+            from_id_property: Property to match source nodes (for a list of
+                properties, ``from_id`` is a dict keyed by those properties)
+            to_id_property: Property to match target nodes (same convention)
             batch_size: Relationships per transaction
+            ensure_schema: Create missing key constraints/indexes on both labels
 
         Returns:
             LoadResult with operation statistics
@@ -480,38 +721,32 @@ class Neo4jLoader:
             logger.warning("No relationships to create")
             return result
 
+        rows = self._prepare_relationships(
+            relationships, from_label, to_label, from_id_property, to_id_property,
+            result, ensure_schema
+        )
+
         # Batch relationship creation query
-        query = f"""
-            UNWIND $batch AS row
-            MATCH (a:{from_label} {{{from_id_property}: row.from_id}})
-            MATCH (b:{to_label} {{{to_id_property}: row.to_id}})
-            MERGE (a)-[r:{relationship_type}]->(b)
-            SET r += row.properties
-            RETURN count(r) AS count
-        """
+        query = self._relationships_query(
+            relationship_type, from_label, to_label, from_id_property, to_id_property
+        )
 
         with self.session() as session:
-            for i in range(0, len(relationships), batch_size):
-                batch = relationships[i:i + batch_size]
-
-                # Ensure each relationship has a properties dict
-                processed_batch = []
-                for rel in batch:
-                    processed_batch.append({
-                        "from_id": rel.get("from_id"),
-                        "to_id": rel.get("to_id"),
-                        "properties": rel.get("properties", {})
-                    })
+            for i in range(0, len(rows), batch_size):
+                batch = rows[i:i + batch_size]
 
                 try:
                     query_result = self._execute_with_retry(
-                        session, query, {"batch": processed_batch}
+                        session, query, {"batch": batch}
                     )
 
                     if query_result:
+                        record = query_result.single()
                         summary = query_result.consume()
                         created = summary.counters.relationships_created
                         result.relationships_created += created
+                        if record is not None:
+                            result.missing_endpoints += len(batch) - record["count"]
 
                         logger.debug("Relationship batch processed",
                                      batch_num=i // batch_size,
@@ -529,6 +764,8 @@ class Neo4jLoader:
         logger.info("Relationship creation complete",
                     type=relationship_type,
                     created=result.relationships_created,
+                    duplicates=result.relationships_deduplicated,
+                    missing_endpoints=result.missing_endpoints,
                     duration=result.duration_seconds)
 
         return result
@@ -613,6 +850,245 @@ class Neo4jLoader:
 
         return result
 
+    # =========================================================================
+    # PARALLEL BATCH WRITING
+    # =========================================================================
+
+    @staticmethod
+    def _partition_by_key(
+        rows: list[dict],
+        key_fn: Callable[[dict], Any],
+        partitions: int
+    ) -> list[list[dict]]:
+        """
+        Split rows into contiguous key ranges.
+
+        Rows are sorted by key so every row touching a given node lands in
+        the same partition; concurrent partitions then never wait on each
+        other's node locks.
+        """
+        ordered = sorted(rows, key=lambda r: str(key_fn(r)))
+        partitions = max(1, min(partitions, len(ordered)))
+        bounds = [len(ordered) * i // partitions for i in range(partitions + 1)]
+
+        # Move each boundary forward so equal keys are never split
+        for i in range(1, partitions):
+            bounds[i] = max(bounds[i], bounds[i - 1])
+            while 0 < bounds[i] < len(ordered) and \
+                    str(key_fn(ordered[bounds[i]])) == str(key_fn(ordered[bounds[i] - 1])):
+                bounds[i] += 1
+
+        return [ordered[bounds[i]:bounds[i + 1]] for i in range(partitions) if bounds[i] < bounds[i + 1]]
+
+    def _write_partition(
+        self,
+        query: str,
+        rows: list[dict],
+        partition: int,
+        sizer: AdaptiveBatchSizer,
+        result: LoadResult,
+        lock: threading.Lock
+    ) -> None:
+        """Write one partition on its own pooled session, batch by batch."""
+        with self.session() as session:
+            offset = 0
+            batch_no = 0
+            while offset < len(rows):
+                batch = rows[offset:offset + sizer.next_size()]
+                started = time.perf_counter()
+                try:
+                    # execute_write retries transient errors (deadlocks, leader
+                    # switches) with the driver's own jittered backoff
+                    summary, count = session.execute_write(_run_batch, query, batch)
+                except TransientError as e:
+                    if len(batch) > sizer.min_size:
+                        sizer.on_transient_error()
+                        logger.warning("Transient error, retrying with smaller batch",
+                                       partition=partition, size=sizer.next_size(), error=str(e))
+                        continue
+                    with lock:
+                        result.errors.append(f"Partition {partition} batch {batch_no}: {e}")
+                        result.success = False
+                    summary = None
+                except Exception as e:
+                    with lock:
+                        result.errors.append(f"Partition {partition} batch {batch_no}: {e}")
+                        result.success = False
+                    summary = None
+
+                seconds = time.perf_counter() - started
+                if summary is not None:
+                    sizer.record(len(batch), seconds)
+                    counters = summary.counters
+                    with lock:
+                        result.nodes_created += counters.nodes_created
+                        result.relationships_created += counters.relationships_created
+                        result.nodes_deleted += counters.nodes_deleted
+                        result.batch_timings.append({
+                            "partition": partition,
+                            "batch": batch_no,
+                            "records": len(batch),
+                            "matched": count,
+                            "seconds": round(seconds, 4),
+                        })
+
+                offset += len(batch)
+                batch_no += 1
+
+    def parallel_write(
+        self,
+        query: str,
+        rows: list[dict],
+        key_fn: Callable[[dict], Any],
+        workers: Optional[int] = None,
+        sizer: Optional[AdaptiveBatchSizer] = None
+    ) -> LoadResult:
+        """
+        Run an ``UNWIND $batch`` query over rows on several sessions at once.
+
+        Args:
+            query: Cypher query reading its rows from ``$batch``
+            rows: Parameter maps, one per UNWIND row
+            key_fn: Partition key of a row (the node it locks)
+            workers: Concurrent sessions (default NEO4J_WRITE_WORKERS or CPU count)
+            sizer: Batch size controller (a fresh one is created if omitted)
+
+        Returns:
+            LoadResult including per-batch timings
+        """
+        start_time = time.time()
+        result = LoadResult(success=True)
+        if not rows:
+            return result
+
+        workers = min(workers or DEFAULT_WRITE_WORKERS, self.config.max_connection_pool_size)
+        sizer = sizer or AdaptiveBatchSizer()
+        sizer.fit_to_records(rows)
+        partitions = self._partition_by_key(rows, key_fn, workers)
+        lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix="neo4j-writer") as pool:
+            futures = [
+                pool.submit(self._write_partition, query, part, n, sizer, result, lock)
+                for n, part in enumerate(partitions)
+            ]
+            for future in futures:
+                future.result()
+
+        result.duration_seconds = round(time.time() - start_time, 2)
+        logger.info("Parallel write complete",
+                    rows=len(rows),
+                    partitions=len(partitions),
+                    batches=len(result.batch_timings),
+                    final_batch_size=sizer.next_size(),
+                    duration=result.duration_seconds)
+        return result
+
+    def parallel_merge_nodes(
+        self,
+        label: str,
+        records: list[dict],
+        id_property: Union[str, list[str]] = "id",
+        timestamp_property: Optional[str] = None,
+        workers: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> LoadResult:
+        """
+        Parallel version of ``merge_nodes``: records are partitioned by key
+        range and merged concurrently; ``batch_size`` is only the starting
+        size, which then adapts to commit latency.
+        """
+        key_props = [id_property] if isinstance(id_property, str) else id_property
+        result = self.parallel_write(
+            self._merge_nodes_query(label, id_property, timestamp_property),
+            records,
+            key_fn=lambda r: tuple(r.get(p) for p in key_props),
+            workers=workers,
+            sizer=AdaptiveBatchSizer(initial_size=batch_size),
+        )
+        written = sum(t["records"] for t in result.batch_timings)
+        result.nodes_updated = written - result.nodes_created
+        logger.info("Node merge complete",
+                    label=label,
+                    total_records=len(records),
+                    created=result.nodes_created,
+                    updated=result.nodes_updated,
+                    duration=result.duration_seconds)
+        return result
+
+    def parallel_create_relationships(
+        self,
+        relationship_type: str,
+        relationships: list[dict],
+        from_label: str,
+        to_label: str,
+        from_id_property: Union[str, list[str]] = "id",
+        to_id_property: Union[str, list[str]] = "id",
+        workers: Optional[int] = None,
+        batch_size: int = 1000,
+        ensure_schema: bool = True
+    ) -> LoadResult:
+        """
+        Parallel version of ``create_relationships``, partitioned by source
+        node. Relationships that all point at one hub node (e.g. a Domain)
+        contend on that node's lock, so pass ``workers=1`` for those.
+        """
+        prepass = LoadResult(success=True)
+        rows = self._prepare_relationships(
+            relationships, from_label, to_label, from_id_property, to_id_property,
+            prepass, ensure_schema
+        )
+        result = self.parallel_write(
+            self._relationships_query(
+                relationship_type, from_label, to_label, from_id_property, to_id_property
+            ),
+            rows,
+            key_fn=lambda r: _row_key(r["from_id"]),
+            workers=workers,
+            sizer=AdaptiveBatchSizer(initial_size=batch_size),
+        )
+        result.relationships_deduplicated = prepass.relationships_deduplicated
+        result.missing_endpoints = sum(
+            t["records"] - t["matched"] for t in result.batch_timings if t["matched"] is not None
+        )
+        logger.info("Relationship creation complete",
+                    type=relationship_type,
+                    created=result.relationships_created,
+                    duplicates=result.relationships_deduplicated,
+                    missing_endpoints=result.missing_endpoints,
+                    duration=result.duration_seconds)
+        return result
+
+    def delete_nodes(
+        self,
+        label: str,
+        ids: list[Any],
+        id_property: str = "id",
+        workers: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> LoadResult:
+        """
+        Batched ``DETACH DELETE`` of nodes by key, run through ``parallel_write``.
+        """
+        query = f"""
+            UNWIND $batch AS row
+            MATCH (n:{label} {{{id_property}: row.id}})
+            DETACH DELETE n
+        """
+        result = self.parallel_write(
+            query,
+            [{"id": node_id} for node_id in ids],
+            key_fn=lambda r: r["id"],
+            workers=workers,
+            sizer=AdaptiveBatchSizer(initial_size=batch_size),
+        )
+        logger.info("Node delete complete",
+                    label=label,
+                    requested=len(ids),
+                    deleted=result.nodes_deleted,
+                    duration=result.duration_seconds)
+        return result
+
     # =========================================================================
     # PIPELINE INTEGRATION
     # =========================================================================
@@ -0,0 +1,261 @@
+"""
+SDTM Graph Sync
+===============
+
+Writes SDTM domain frames into Neo4j through ``Neo4jLoader``, either as a
+full MERGE of every record or as an incremental sync that only sends what
+changed since the last load.
+
+Graph model (shared with ``bulk_export``):
+
+    (Study)-[:HAS_DOMAIN]->(Domain)
+    (Subject)-[:HAS_<DOMAIN>]->(<DOMAIN> record)-[:BELONGS_TO]->(Domain)
+
+Incremental sync:
+    1. Hash every record row (vectorized, ``pd.util.hash_pandas_object``)
+       and store the hash on the node as ``content_hash``
+    2. Diff the hashes against the manifest saved by the previous load
+    3. MERGE only inserted and changed records (links only for inserted
+       ones) and ``DETACH DELETE`` removed records in batches
+    4. Save the new manifest only if every batch succeeded
+
+If the number of the study's nodes in the database (records carry
+``study_id``, as in bulk imports) does not match the manifest (e.g. the
+database was rebuilt), the manifest is distrusted and a full load runs.
+
+Storage Architecture:
+    <NEO4J_SYNC_DIR>/                       (default ./.neo4j_sync)
+        <uri+database digest>/
+            <study_id>/
+                <DOMAIN>.hashes.json        - {record_id: content_hash}
+"""
+
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+import pandas as pd
+from pydantic import BaseModel, Field
+import structlog
+
+from .bulk_export import subject_and_record_ids
+from .neo4j_loader import LoadResult, Neo4jLoader
+
+logger = structlog.get_logger()
+
+
+DEFAULT_SYNC_DIR = os.getenv("NEO4J_SYNC_DIR", "./.neo4j_sync")
+
+
+class SyncResult(BaseModel):
+    """Outcome of loading one domain."""
+    domain: str
+    incremental: bool = False
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    relationships_created: int = 0
+    missing_endpoints: int = 0
+    batches: int = 0
+    errors: list[str] = Field(default_factory=list)
+    duration_seconds: float = 0.0
+
+
+def row_hashes(records_df: pd.DataFrame) -> pd.Series:
+    """Stable per-row content hash (hex) of every column, in name order."""
+    ordered = records_df[sorted(records_df.columns, key=str)]
+    return pd.util.hash_pandas_object(ordered, index=False).map("{:016x}".format)
+
+
+class HashManifest:
+    """record_id -> content hash from the last successful load of a domain."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hashes: dict[str, str] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.hashes = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable sync manifest", path=str(self.path), error=str(e))
+
+    def save(self, hashes: dict[str, str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(hashes, f)
+        os.replace(tmp_path, self.path)
+        self.hashes = hashes
+
+
+class SDTMGraphSync:
+    """
+    Loads SDTM domains into Neo4j, fully or incrementally.
+
+    Args:
+        loader: Connected Neo4jLoader
+        study_id: Study identifier
+        manifest_dir: Root directory for hash manifests (default NEO4J_SYNC_DIR)
+        batch_size: Initial UNWIND batch size (adapts to commit latency)
+    """
+
+    def __init__(
+        self,
+        loader: Neo4jLoader,
+        study_id: str,
+        manifest_dir: Optional[str] = None,
+        batch_size: int = 5000
+    ):
+        self.loader = loader
+        self.study_id = study_id
+        self.batch_size = batch_size
+        target = f"{loader.config.uri}|{loader.config.database}"
+        safe_study = re.sub(r"[^A-Za-z0-9_.-]", "_", study_id)
+        self.manifest_dir = Path(manifest_dir or DEFAULT_SYNC_DIR) / \
+            hashlib.sha1(target.encode("utf-8")).hexdigest()[:12] / safe_study
+
+    def prepare(self) -> None:
+        """Create the Subject index and the Study node (once per load)."""
+        # MERGE on Subject is only fast with an index on its key
+        self.loader.create_index("Subject", ["usubjid", "study_id"])
+        self.loader.execute_cypher("""
+            MERGE (s:Study {study_id: $study_id})
+            SET s.updated_at = datetime()
+        """, {"study_id": self.study_id})
+
+    def sync_domain(self, domain: str, df: pd.DataFrame, incremental: bool = False) -> SyncResult:
+        """
+        Load one domain.
+
+        Args:
+            domain: Domain code (node label)
+            df: SDTM frame
+            incremental: Send only rows that changed since the last load
+        """
+        start = time.time()
+        result = SyncResult(domain=domain, incremental=incremental)
+
+        self.loader.create_constraint(domain, "record_id")
+        self.loader.execute_cypher("""
+            MERGE (d:Domain {name: $domain, study_id: $study_id})
+            SET d.record_count = $count, d.updated_at = datetime()
+            WITH d
+            MATCH (s:Study {study_id: $study_id})
+            MERGE (s)-[:HAS_DOMAIN]->(d)
+        """, {"domain": domain, "study_id": self.study_id, "count": len(df)})
+
+        # Clean NaN values for the whole frame at once
+        records_df = df.loc[:, [c for c in df.columns if c]].astype(object)
+        records_df = records_df.where(records_df.notna(), None)
+        usubjids, record_ids = subject_and_record_ids(df, domain, self.study_id)
+        hashes = pd.Series(row_hashes(records_df).values, index=record_ids.values)
+
+        manifest = HashManifest(self.manifest_dir / f"{domain}.hashes.json")
+        previous = manifest.hashes if incremental else {}
+        if previous and self._node_count(domain) != len(previous):
+            logger.warning("Sync manifest out of step with database, running full load",
+                           domain=domain, manifest_records=len(previous))
+            previous = {}
+
+        old = pd.Series(previous, dtype=object).reindex(hashes.index)
+        is_new = old.isna().to_numpy()
+        is_changed = ~is_new & (old.to_numpy() != hashes.to_numpy())
+        upsert = is_new | is_changed
+        deleted = sorted(set(previous) - set(hashes.index)) if previous else []
+
+        result.inserted = int(is_new.sum())
+        result.updated = int(is_changed.sum())
+        result.unchanged = len(df) - result.inserted - result.updated
+
+        records = records_df[upsert].to_dict("records")
+        for record, record_id, digest in zip(
+            records, record_ids[upsert], hashes.to_numpy()[upsert]
+        ):
+            record["record_id"] = record_id
+            record["study_id"] = self.study_id
+            record["content_hash"] = digest
+
+        # Subjects and links only need writing for records new to the graph
+        new_usubjids = usubjids[is_new]
+        new_record_ids = record_ids[is_new]
+        loads: list[LoadResult] = []
+
+        if len(new_usubjids):
+            loads.append(self.loader.merge_nodes(
+                "Subject",
+                [{"usubjid": u, "study_id": self.study_id} for u in new_usubjids.unique()],
+                id_property=["usubjid", "study_id"],
+                batch_size=self.batch_size, timestamp_property="updated_at",
+            ))
+        if records:
+            # Records and their subject links are written on several
+            # sessions at once, partitioned by key range
+            loads.append(self.loader.parallel_merge_nodes(
+                domain, records, id_property="record_id", timestamp_property="updated_at",
+                batch_size=self.batch_size,
+            ))
+        if len(new_record_ids):
+            loads.append(self.loader.parallel_create_relationships(
+                f"HAS_{domain}",
+                [
+                    {"from_id": {"usubjid": u, "study_id": self.study_id}, "to_id": r}
+                    for u, r in zip(new_usubjids, new_record_ids)
+                ],
+                from_label="Subject", to_label=domain,
+                from_id_property=["usubjid", "study_id"], to_id_property="record_id",
+                batch_size=self.batch_size,
+            ))
+            # Every record links to the same Domain node, so one writer
+            # avoids lock contention on it
+            loads.append(self.loader.parallel_create_relationships(
+                "BELONGS_TO",
+                [
+                    {"from_id": r, "to_id": {"name": domain, "study_id": self.study_id}}
+                    for r in new_record_ids
+                ],
+                from_label=domain, to_label="Domain",
+                from_id_property="record_id", to_id_property=["name", "study_id"],
+                workers=1, batch_size=self.batch_size,
+            ))
+        if deleted:
+            loads.append(self.loader.delete_nodes(
+                domain, deleted, id_property="record_id", batch_size=self.batch_size
+            ))
+
+        for load in loads:
+            result.errors.extend(load.errors)
+            result.relationships_created += load.relationships_created
+            result.missing_endpoints += load.missing_endpoints
+            result.deleted += load.nodes_deleted
+            result.batches += len(load.batch_timings)
+
+        if not result.errors:
+            manifest.save(hashes.to_dict())
+
+        result.duration_seconds = round(time.time() - start, 2)
+        logger.info("Domain synced",
+                    domain=domain,
+                    incremental=incremental,
+                    inserted=result.inserted,
+                    updated=result.updated,
+                    deleted=result.deleted,
+                    unchanged=result.unchanged,
+                    duration=result.duration_seconds)
+        return result
+
+    def _node_count(self, label: str) -> Optional[int]:
+        """Records of this study under ``label`` (the manifest is per study)."""
+        ok, rows = self.loader.execute_cypher(
+            f"MATCH (n:{label}) WHERE n.study_id = $study_id RETURN count(n) AS count",
+            {"study_id": self.study_id},
+        )
+        if not ok or not rows:
+            return None
+        return rows[0]["count"]
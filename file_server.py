@@ -17,12 +17,14 @@ The server:
 - Downloads files at GET /download/{filename}
 - Skills CRUD: GET/POST /skills, GET/PUT/DELETE /skills/{dirName}
 - Connectors sync: GET/PUT /connectors, GET /connectors/tools
+- LangGraph API proxy: ANY /api/langgraph/{path} (streamed, pooled)
 """
 
 import os
 import re
 import sys
 import json
+import asyncio
 import shutil
 import mimetypes
 from pathlib import Path
@@ -51,6 +53,12 @@ HOST = os.getenv("FILE_SERVER_HOST", "0.0.0.0")
 # or leave default for local docker-compose usage.
 LANGGRAPH_API_URL = os.getenv("LANGGRAPH_API_URL", "http://localhost:2024")
 
+# Proxy tuning: stream bodies through as they arrive (set "false" to buffer
+# whole responses as before), and the size of the shared upstream pool
+PROXY_STREAMING = os.getenv("LANGGRAPH_PROXY_STREAMING", "true").lower() in ("1", "true", "yes")
+PROXY_POOL_SIZE = int(os.getenv("LANGGRAPH_PROXY_POOL_SIZE", "100"))
+PROXY_READ_TIMEOUT = float(os.getenv("LANGGRAPH_PROXY_READ_TIMEOUT", "300"))
+
 DOCS_DIR = os.getenv(
     "GENERATED_DOCS_DIR",
     os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated_documents"),
@@ -632,7 +640,31 @@ async def handle_proxy_config(request: web.Request) -> web.Response:
     }, headers=_cors_headers())
 
 
-async def handle_langgraph_proxy(request: web.Request) -> web.Response:
+# Headers copied from the client request / upstream response
+_PROXY_REQUEST_HEADERS = ("Authorization", "x-api-key", "Content-Type", "Content-Length", "Accept", "X-Request-Id")
+_PROXY_RESPONSE_HEADERS = (
+    "Content-Type", "Content-Encoding", "Content-Location", "Cache-Control", "Location", "X-Request-Id",
+)
+
+PROXY_SESSION_KEY = web.AppKey("langgraph_proxy_session", aiohttp.ClientSession)
+
+
+async def _start_proxy_session(app: web.Application) -> None:
+    """Open the shared upstream session (keep-alive pool) for the app's lifetime."""
+    connector = aiohttp.TCPConnector(limit=PROXY_POOL_SIZE, keepalive_timeout=60)
+    # No total timeout: agent streams can run for minutes; a silent upstream
+    # still fails after PROXY_READ_TIMEOUT seconds without data
+    timeout = aiohttp.ClientTimeout(total=None, connect=30, sock_read=PROXY_READ_TIMEOUT)
+    app[PROXY_SESSION_KEY] = aiohttp.ClientSession(
+        connector=connector, timeout=timeout, auto_decompress=False,
+    )
+
+
+async def _close_proxy_session(app: web.Application) -> None:
+    await app[PROXY_SESSION_KEY].close()
+
+
+async def handle_langgraph_proxy(request: web.Request) -> web.StreamResponse:
     """Proxy requests to the LangGraph API (HTTP or HTTPS).
 
     Routes:
@@ -640,8 +672,11 @@ async def handle_langgraph_proxy(request: web.Request) -> web.Response:
 
     The proxy:
     - Forwards all headers (including x-api-key for cloud auth)
-    - Forwards the request body
-    - Returns the upstream response with CORS headers
+    - Streams the request body upstream without buffering it
+    - Streams the upstream response back chunk by chunk (SSE agent
+      streams reach the client as they are produced), or buffers it
+      when LANGGRAPH_PROXY_STREAMING=false
+    - Reuses one pooled keep-alive ClientSession for all requests
     - Works identically for http://localhost:2024 and https://*.langgraph.app
     """
     # Build the upstream URL
@@ -653,38 +688,55 @@ async def handle_langgraph_proxy(request: web.Request) -> web.Response:
 
     # Forward relevant headers
     forward_headers = {}
-    for hdr in ("Authorization", "x-api-key", "Content-Type", "Accept", "X-Request-Id"):
+    for hdr in _PROXY_REQUEST_HEADERS:
         val = request.headers.get(hdr)
         if val:
             forward_headers[hdr] = val
+    # Response bodies are passed through undecoded, so only ask upstream for
+    # encodings the client itself accepts
+    forward_headers["Accept-Encoding"] = request.headers.get("Accept-Encoding", "identity")
 
-    # Read request body (if any)
-    body = await request.read() if request.can_read_body else None
-
+    session = request.app[PROXY_SESSION_KEY]
+    response = None
     try:
-        timeout = aiohttp.ClientTimeout(total=300)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.request(
-                method=request.method,
-                url=upstream_url,
-                headers=forward_headers,
-                data=body,
-                ssl=None,  # Use default SSL for HTTPS
-            ) as upstream_resp:
-                resp_body = await upstream_resp.read()
-                resp_headers = {**_cors_headers()}
-
-                # Preserve content-type from upstream
-                ct = upstream_resp.headers.get("Content-Type")
-                if ct:
-                    resp_headers["Content-Type"] = ct
-
+        async with session.request(
+            method=request.method,
+            url=upstream_url,
+            headers=forward_headers,
+            data=request.content if request.body_exists else None,
+            ssl=None,  # Use default SSL for HTTPS
+        ) as upstream_resp:
+            resp_headers = {**_cors_headers()}
+            for hdr in _PROXY_RESPONSE_HEADERS:
+                val = upstream_resp.headers.get(hdr)
+                if val:
+                    resp_headers[hdr] = val
+
+            if not PROXY_STREAMING:
                 return web.Response(
                     status=upstream_resp.status,
-                    body=resp_body,
+                    body=await upstream_resp.read(),
                     headers=resp_headers,
                 )
-    except aiohttp.ClientError as e:
+
+            response = web.StreamResponse(status=upstream_resp.status, headers=resp_headers)
+            if upstream_resp.content_length is not None:
+                response.content_length = upstream_resp.content_length
+            await response.prepare(request)
+            # iter_any yields whatever has arrived, so each SSE event is
+            # written as soon as the upstream flushes it
+            async for chunk in upstream_resp.content.iter_any():
+                await response.write(chunk)
+            await response.write_eof()
+            return response
+    except ConnectionResetError:
+        # Client went away mid-stream; leaving the context closes the upstream
+        return response
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        if response is not None and response.prepared:
+            # Headers are already sent; all we can do is end the stream
+            print(f"[File Server] Proxy stream from {upstream_url} interrupted: {e}")
+            return response
         return web.json_response(
             {"error": f"Proxy connection failed: {e}", "upstream_url": LANGGRAPH_API_URL},
             status=502,
@@ -695,6 +747,8 @@ async def handle_langgraph_proxy(request: web.Request) -> web.Response:
 def create_app() -> web.Application:
     """Create the aiohttp application."""
     app = web.Application()
+    app.on_startup.append(_start_proxy_session)
+    app.on_cleanup.append(_close_proxy_session)
 
     # CORS preflight for all routes
     app.router.add_route("OPTIONS", "/{path:.*}", handle_options)
@@ -70,6 +70,7 @@ from .session_manager import (
     Session,
     SessionStatus,
     StreamChunk,
+    StreamFrame,
     StreamContentType,
     Checkpoint,
     ThinkingBlock,
@@ -81,6 +82,7 @@ from .session_manager import (
     create_branch,
     switch_branch,
 )
+from .session_store import SessionStore, create_session_store
 
 # Production graph
 from .production_graph import (
@@ -121,6 +123,7 @@ __all__ = [
     "Session",
     "SessionStatus",
     "StreamChunk",
+    "StreamFrame",
     "StreamContentType",
     "Checkpoint",
     "ThinkingBlock",
@@ -131,6 +134,8 @@ __all__ = [
     "time_travel",
     "create_branch",
     "switch_branch",
+    "SessionStore",
+    "create_session_store",
     # Production graph
     "ProductionGraph",
     "get_production_graph",
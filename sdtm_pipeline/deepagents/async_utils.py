@@ -8,7 +8,7 @@ This module wraps:
 - Pandas read/write operations (via asyncio.to_thread)
 - File system operations (via aiofiles)
 - S3 operations (via aioboto3)
-- Neo4j operations (via async driver)
+- Neo4j operations (via a shared async driver per URI/user)
 
 Usage:
     from .async_utils import (
@@ -22,9 +22,11 @@ Usage:
 
 import os
 import json
+import time
 import asyncio
+import weakref
 import zipfile
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from functools import wraps
 
 import pandas as pd
@@ -240,6 +242,87 @@ async def async_s3_upload(local_path: str, bucket: str, key: str) -> Dict[str, A
     }
 
 
+# =============================================================================
+# NEO4J ASYNC DRIVER REGISTRY
+# =============================================================================
+# Async drivers are bound to the event loop that created them, so drivers
+# are cached per loop and keyed by (uri, user) within it. A driver keeps
+# its loop alive, so entries are only dropped by close_async_neo4j_drivers:
+# run_sync calls it before its temporary loop ends, and the LangGraph
+# server calls it on shutdown (see server_lifespan.py).
+
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_HEALTH_CHECK_INTERVAL = float(os.getenv("NEO4J_HEALTH_CHECK_INTERVAL", "60"))
+
+_neo4j_drivers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], Dict[str, Any]]]" = \
+    weakref.WeakKeyDictionary()
+
+
+async def get_async_neo4j_driver(uri: str, user: str, password: str):
+    """
+    Get the shared async Neo4j driver for (uri, user), creating it lazily.
+
+    The driver is re-verified at most every NEO4J_HEALTH_CHECK_INTERVAL
+    seconds and recreated if the check fails or the password changed.
+
+    Args:
+        uri: Neo4j connection URI
+        user: Database username
+        password: Database password
+
+    Returns:
+        neo4j.AsyncDriver shared by all callers on the current event loop
+    """
+    from neo4j import AsyncGraphDatabase
+
+    loop = asyncio.get_running_loop()
+    drivers = _neo4j_drivers.setdefault(loop, {})
+    key = (uri, user)
+    entry = drivers.get(key)
+
+    if entry is not None and entry["password"] != password:
+        drivers.pop(key, None)
+        await entry["driver"].close()
+        entry = None
+
+    if entry is None:
+        entry = {
+            "driver": AsyncGraphDatabase.driver(
+                uri,
+                auth=(user, password),
+                max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+            ),
+            "password": password,
+            "checked_at": 0.0,
+        }
+        drivers[key] = entry
+
+    if time.monotonic() - entry["checked_at"] >= NEO4J_HEALTH_CHECK_INTERVAL:
+        try:
+            await entry["driver"].verify_connectivity()
+        except Exception:
+            # Drop the broken driver so the next call starts fresh
+            if drivers.get(key) is entry:
+                drivers.pop(key, None)
+            await entry["driver"].close()
+            raise
+        entry["checked_at"] = time.monotonic()
+
+    return entry["driver"]
+
+
+async def close_async_neo4j_drivers() -> int:
+    """
+    Close every shared driver created on the current event loop.
+
+    Call on application shutdown. Returns the number of drivers closed.
+    """
+    drivers = _neo4j_drivers.pop(asyncio.get_running_loop(), {})
+    for entry in drivers.values():
+        await entry["driver"].close()
+    return len(drivers)
+
+
 # =============================================================================
 # NEO4J ASYNC WRAPPERS
 # =============================================================================
@@ -254,7 +337,7 @@ async def async_neo4j_execute(
     """
     Async Neo4j query execution.
 
-    Uses the async Neo4j driver for non-blocking database operations.
+    Uses the shared async Neo4j driver for non-blocking database operations.
 
     Args:
         uri: Neo4j connection URI
@@ -266,17 +349,12 @@ async def async_neo4j_execute(
     Returns:
         List of result records as dictionaries
     """
-    from neo4j import AsyncGraphDatabase
-
-    driver = AsyncGraphDatabase.driver(uri, auth=(user, password))
+    driver = await get_async_neo4j_driver(uri, user, password)
 
-    try:
-        async with driver.session() as session:
-            result = await session.run(query, parameters or {})
-            records = await result.data()
-            return records
-    finally:
-        await driver.close()
+    async with driver.session() as session:
+        result = await session.run(query, parameters or {})
+        records = await result.data()
+        return records
 
 
 async def async_neo4j_load_dataframe(
@@ -301,13 +379,11 @@ async def async_neo4j_load_dataframe(
     Returns:
         Load result with node count
     """
-    from neo4j import AsyncGraphDatabase
-
-    driver = AsyncGraphDatabase.driver(uri, auth=(user, password))
     records = df.to_dict(orient='records')
     total_created = 0
 
     try:
+        driver = await get_async_neo4j_driver(uri, user, password)
         async with driver.session() as session:
             # Process in batches
             for i in range(0, len(records), batch_size):
@@ -341,8 +417,6 @@ async def async_neo4j_load_dataframe(
             "success": False,
             "error": str(e),
         }
-    finally:
-        await driver.close()
 
 
 # =============================================================================
@@ -353,7 +427,9 @@ def run_sync(coro):
     """
     Run an async coroutine synchronously.
 
-    Useful for testing or when async context is not available.
+    Useful for testing or when async context is not available. The
+    coroutine runs on a temporary event loop; shared Neo4j drivers created
+    on that loop are closed before it ends, since no later call can use them.
 
     Args:
         coro: Coroutine to run
@@ -361,13 +437,19 @@ def run_sync(coro):
     Returns:
         Result of the coroutine
     """
+    async def run_and_close():
+        try:
+            return await coro
+        finally:
+            await close_async_neo4j_drivers()
+
     try:
-        loop = asyncio.get_running_loop()
-        # If we're in an async context, we need to use to_thread
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            future = pool.submit(asyncio.run, coro)
-            return future.result()
+        asyncio.get_running_loop()
     except RuntimeError:
         # No running loop, safe to use asyncio.run
-        return asyncio.run(coro)
+        return asyncio.run(run_and_close())
+
+    # In an async context: run on a fresh loop in a worker thread
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, run_and_close()).result()
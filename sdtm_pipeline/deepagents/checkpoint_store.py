@@ -0,0 +1,303 @@
+"""
+Checkpoint Store for SessionManager
+===================================
+Content-addressed, delta-encoded checkpoint storage.
+
+Each message is stored once, keyed by the SHA-256 of its canonical JSON.
+A checkpoint record holds only its metadata, a pointer to its base
+(parent) checkpoint and a delta against the base's message list:
+
+    keep    - number of leading base messages kept
+    append  - hashes of the messages that follow
+
+so a new turn or a branch costs O(new messages) on disk instead of a full
+copy of the conversation. Message-hash lists are rebuilt by walking the
+base chain (and cached); message bodies are only read when a checkpoint's
+``state`` is actually used.
+
+Records written before this format (a full ``state`` inline) are still
+read as-is.
+
+Storage Architecture:
+    .sessions/checkpoints/
+        <checkpoint_id>.json          - Checkpoint record (metadata + delta)
+        objects/<hh>/<sha256>.json    - Message bodies, one file per hash
+
+Usage:
+    store = CheckpointStore(Path(".sessions/checkpoints"), Checkpoint.lazy)
+    store.save(checkpoint)
+    checkpoint = store.load(checkpoint_id)     # state rebuilt on access
+    diff = store.diff(checkpoint_id_1, checkpoint_id_2)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+CHECKPOINT_FORMAT_VERSION = 2
+MESSAGE_CACHE_SIZE = int(os.getenv("CHECKPOINT_MESSAGE_CACHE_SIZE", "4096"))
+HASH_LIST_CACHE_SIZE = 256
+
+_META_FIELDS = (
+    "checkpoint_id", "parent_checkpoint_id", "thread_id", "timestamp",
+    "message_count", "description", "branch_name",
+)
+
+
+def message_hash(message: Any) -> str:
+    """SHA-256 of a message's canonical JSON form."""
+    canonical = json.dumps(message, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _atomic_write_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"), default=str)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _common_prefix(a: Tuple[str, ...], b: Tuple[str, ...]) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class _LRU(OrderedDict):
+    """Tiny bounded mapping; least recently used entries are evicted."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get_item(self, key):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return None
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class CheckpointStore:
+    """
+    Stores checkpoints as message-hash deltas over their parent.
+
+    Args:
+        checkpoint_dir: Directory for checkpoint records and message objects
+        checkpoint_factory: Builds a checkpoint from
+            ``(state_loader, **metadata)``; ``state_loader`` is called the
+            first time the state is needed
+    """
+
+    def __init__(self, checkpoint_dir: Path, checkpoint_factory: Callable[..., Any]):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.objects_dir = self.checkpoint_dir / "objects"
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self._factory = checkpoint_factory
+        self._records = _LRU(HASH_LIST_CACHE_SIZE)
+        self._hash_lists = _LRU(HASH_LIST_CACHE_SIZE)
+        self._messages = _LRU(MESSAGE_CACHE_SIZE)
+        self._lock = threading.RLock()
+
+    # =========================================================================
+    # WRITING
+    # =========================================================================
+
+    def put_message(self, message: Any) -> str:
+        """Store a message body once and return its hash."""
+        digest = message_hash(message)
+        with self._lock:
+            known = self._messages.get_item(digest) is not None
+        if not known:
+            path = self._object_path(digest)
+            if not path.exists():
+                _atomic_write_json(path, message)
+            with self._lock:
+                self._messages.put(digest, message)
+        return digest
+
+    def save(self, checkpoint: Any) -> Dict[str, Any]:
+        """Write a checkpoint as a delta against its parent; returns the record."""
+        state = checkpoint.state or {}
+        hashes = tuple(self.put_message(m) for m in state.get("messages", []))
+
+        base = checkpoint.parent_checkpoint_id
+        base_hashes = self.message_hashes(base) if base else None
+        if base_hashes is None:
+            base, keep = None, 0
+        else:
+            keep = _common_prefix(base_hashes, hashes)
+
+        record = {field: getattr(checkpoint, field) for field in _META_FIELDS}
+        record.update({
+            "format": CHECKPOINT_FORMAT_VERSION,
+            "base": base,
+            "keep": keep,
+            "append": list(hashes[keep:]),
+            "state_extra": {k: v for k, v in state.items() if k != "messages"},
+        })
+        _atomic_write_json(self._record_path(checkpoint.checkpoint_id), record)
+
+        with self._lock:
+            self._records.put(checkpoint.checkpoint_id, record)
+            self._hash_lists.put(checkpoint.checkpoint_id, hashes)
+        return record
+
+    def delete(self, checkpoint_id: str) -> None:
+        """Remove a checkpoint record (message objects are left to ``collect_garbage``)."""
+        with self._lock:
+            self._records.pop(checkpoint_id, None)
+            self._hash_lists.pop(checkpoint_id, None)
+        path = self._record_path(checkpoint_id)
+        if path.exists():
+            path.unlink()
+
+    def collect_garbage(self) -> int:
+        """Delete message objects no remaining checkpoint refers to."""
+        live = set()
+        for record_path in self.checkpoint_dir.glob("*.json"):
+            hashes = self.message_hashes(record_path.stem)
+            if hashes:
+                live.update(hashes)
+
+        removed = 0
+        for object_path in self.objects_dir.glob("*/*.json"):
+            if object_path.stem not in live:
+                object_path.unlink()
+                with self._lock:
+                    self._messages.pop(object_path.stem, None)
+                removed += 1
+        return removed
+
+    # =========================================================================
+    # READING
+    # =========================================================================
+
+    def load_record(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get_item(checkpoint_id)
+        if record is not None:
+            return record
+
+        path = self._record_path(checkpoint_id)
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            record = json.load(f)
+        with self._lock:
+            self._records.put(checkpoint_id, record)
+        return record
+
+    def message_hashes(self, checkpoint_id: str) -> Optional[Tuple[str, ...]]:
+        """
+        Message-hash list of a checkpoint, rebuilt from the delta chain.
+
+        Walks up the base pointers until a cached list (or the root), then
+        applies the deltas back down, so long chains need no recursion.
+        """
+        chain: List[Dict[str, Any]] = []
+        current: Optional[str] = checkpoint_id
+        hashes: Tuple[str, ...] = ()
+
+        while current:
+            with self._lock:
+                cached = self._hash_lists.get_item(current)
+            if cached is not None:
+                hashes = cached
+                break
+            record = self.load_record(current)
+            if record is None:
+                if not chain:
+                    return None
+                break  # Missing base: treat as empty
+            if "state" in record:
+                # Legacy record with the full state inline
+                hashes = tuple(message_hash(m) for m in record["state"].get("messages", []))
+                with self._lock:
+                    self._hash_lists.put(current, hashes)
+                break
+            chain.append(record)
+            current = record.get("base")
+
+        for record in reversed(chain):
+            hashes = hashes[:record["keep"]] + tuple(record["append"])
+            with self._lock:
+                self._hash_lists.put(record["checkpoint_id"], hashes)
+        return hashes
+
+    def get_message(self, digest: str) -> Any:
+        with self._lock:
+            message = self._messages.get_item(digest)
+        if message is None:
+            with open(self._object_path(digest), "r") as f:
+                message = json.load(f)
+            with self._lock:
+                self._messages.put(digest, message)
+        return message
+
+    def build_state(self, checkpoint_id: str) -> Dict[str, Any]:
+        """Materialize the full state of a checkpoint."""
+        record = self.load_record(checkpoint_id)
+        if record is None:
+            return {}
+        if "state" in record:
+            return record["state"]
+        state = dict(record.get("state_extra", {}))
+        state["messages"] = [self.get_message(h) for h in self.message_hashes(checkpoint_id) or ()]
+        return state
+
+    def load(self, checkpoint_id: str) -> Optional[Any]:
+        """Checkpoint with metadata loaded and state rebuilt lazily."""
+        record = self.load_record(checkpoint_id)
+        if record is None:
+            return None
+        metadata = {field: record.get(field) for field in _META_FIELDS}
+        metadata["description"] = metadata["description"] or ""
+        return self._factory(lambda: self.build_state(checkpoint_id), **metadata)
+
+    def diff(self, checkpoint_id_1: str, checkpoint_id_2: str) -> Optional[Dict[str, int]]:
+        """
+        Structural diff of two checkpoints' message lists, on hashes only.
+
+        Returns the shared prefix length and how many messages the second
+        checkpoint adds/drops relative to the first.
+        """
+        h1 = self.message_hashes(checkpoint_id_1)
+        h2 = self.message_hashes(checkpoint_id_2)
+        if h1 is None or h2 is None:
+            return None
+        common = _common_prefix(h1, h2)
+        return {
+            "common_prefix": common,
+            "added": len(h2) - common,
+            "removed": len(h1) - common,
+        }
+
+    # =========================================================================
+    # PATHS
+    # =========================================================================
+
+    def _record_path(self, checkpoint_id: str) -> Path:
+        return self.checkpoint_dir / f"{checkpoint_id}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.json"
@@ -0,0 +1,260 @@
+"""
+Indexed Feedback Event Log
+==========================
+Append-only JSONL event log split into one segment per day, built so
+reads cost O(events returned) rather than O(log size).
+
+- Newest-first reads walk segments from the latest day backwards and read
+  each file backwards in fixed-size blocks, so "last N events" never loads
+  the whole log
+- Each segment has a sparse sidecar index of (timestamp, byte offset)
+  every INDEX_INTERVAL events; forward ``since`` reads skip older day
+  segments and seek inside the first one
+- Per-segment event counts and sizes are kept in ``meta.json``. If a
+  segment has grown beyond the recorded size (another process appended,
+  or the process died before saving), only the new tail is counted
+
+Storage Architecture:
+    .sessions/feedback/
+        events.jsonl                 - Legacy single log (read as the oldest segment;
+                                       skipped by ``since`` reads newer than its end)
+        events/
+            YYYY-MM-DD.jsonl         - Events of one UTC day, chronological
+            YYYY-MM-DD.idx           - Sparse index: JSON [timestamp, offset] lines
+            meta.json                - {segment: {"count", "bytes"}}
+
+Usage:
+    log = EventLog(Path(".sessions/feedback/events"), legacy_file=Path(".sessions/feedback/events.jsonl"))
+    log.append(event.to_dict(), event.timestamp)
+    for record in log.iter_reverse():   # newest first
+        ...
+    for record in log.iter_since("2026-01-01T00:00:00"):
+        ...
+    log.count()
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+INDEX_INTERVAL = 128        # Events between sparse index entries
+READ_BLOCK_SIZE = 64 * 1024  # Bytes per backward read
+META_SAVE_INTERVAL = 100    # Appends between meta.json saves
+
+
+def read_lines_reverse(path: Path, block_size: int = READ_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file from last to first, reading blocks from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size) + remainder
+            lines = block.split(b"\n")
+            remainder = lines[0]  # May continue in the previous block
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+
+
+class EventLog:
+    """
+    Day-segmented, indexed JSONL log.
+
+    Args:
+        directory: Segment directory
+        legacy_file: Pre-segmentation single log, read as the oldest segment
+    """
+
+    def __init__(self, directory: Path, legacy_file: Optional[Path] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self.meta_file = self.directory / "meta.json"
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Dict[str, int]] = self._load_meta()
+        self._unsaved = 0
+        self._refresh_all()
+
+    # =========================================================================
+    # WRITING
+    # =========================================================================
+
+    def append(self, record: Dict[str, Any], timestamp: str) -> None:
+        """Append one record to the segment of its timestamp's day."""
+        day = timestamp[:10]
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        segment = self._segment_path(day)
+
+        with self._lock:
+            entry = self._meta.setdefault(segment.name, {"count": 0, "bytes": 0})
+            with open(segment, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                if offset != entry["bytes"]:
+                    self._catch_up(segment, entry)
+                f.write(line)
+
+            if entry["count"] % INDEX_INTERVAL == 0:
+                with open(segment.with_suffix(".idx"), "a") as idx:
+                    idx.write(json.dumps([timestamp, offset]) + "\n")
+
+            entry["count"] += 1
+            entry["bytes"] = offset + len(line)
+            self._unsaved += 1
+            if self._unsaved >= META_SAVE_INTERVAL:
+                self._save_meta()
+
+    def flush(self) -> None:
+        """Persist segment counts now."""
+        with self._lock:
+            if self._unsaved:
+                self._save_meta()
+
+    # =========================================================================
+    # READING
+    # =========================================================================
+
+    def count(self) -> int:
+        """Total events across all segments (tails appended elsewhere are counted)."""
+        with self._lock:
+            for path in self._segments()[-1:]:
+                entry = self._meta.setdefault(self._meta_key(path), {"count": 0, "bytes": 0})
+                if path.stat().st_size != entry["bytes"]:
+                    self._catch_up(path, entry)
+            return sum(entry["count"] for entry in self._meta.values())
+
+    def iter_reverse(self, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Records newest first.
+
+        With ``since``, day segments older than its day are not opened; the
+        caller still stops at the first record older than ``since``.
+        """
+        since_day = since[:10] if since else None
+        for path in reversed(self._segments()):
+            if since_day and path != self.legacy_file and path.stem < since_day:
+                break
+            for line in read_lines_reverse(path):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def iter_since(self, since: str) -> Iterator[Dict[str, Any]]:
+        """Records with ``timestamp >= since``, oldest first, using the sparse index."""
+        since_day = since[:10]
+        for path in self._segments():
+            if path == self.legacy_file:
+                # Chronological and no longer appended to: skip it entirely
+                # once its newest record is older than ``since``
+                if self._last_timestamp(path) < since:
+                    continue
+                offset = 0
+            elif path.stem < since_day:
+                continue
+            else:
+                offset = self._index_offset(path, since)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("timestamp", "") >= since:
+                        yield record
+
+    # =========================================================================
+    # SEGMENTS, INDEX AND META
+    # =========================================================================
+
+    def _segment_path(self, day: str) -> Path:
+        return self.directory / f"{day}.jsonl"
+
+    def _segments(self) -> List[Path]:
+        """All segments, oldest first (legacy log before the day segments)."""
+        segments = sorted(self.directory.glob("*.jsonl"))
+        if self.legacy_file and self.legacy_file.exists():
+            segments.insert(0, self.legacy_file)
+        return segments
+
+    def _last_timestamp(self, path: Path) -> str:
+        """Timestamp of the newest record in a segment ("" if it has none)."""
+        for line in read_lines_reverse(path):
+            try:
+                return json.loads(line).get("timestamp", "")
+            except ValueError:
+                continue
+        return ""
+
+    def _index_offset(self, segment: Path, since: str) -> int:
+        """Offset of the last indexed record older than ``since`` (0 if none)."""
+        idx_path = segment.with_suffix(".idx")
+        offset = 0
+        if not idx_path.exists():
+            return offset
+        with open(idx_path, "r") as idx:
+            for line in idx:
+                try:
+                    timestamp, entry_offset = json.loads(line)
+                except ValueError:
+                    continue
+                if timestamp >= since:
+                    break
+                offset = entry_offset
+        return offset
+
+    def _meta_key(self, path: Path) -> str:
+        return path.name if path != self.legacy_file else f"legacy:{path.name}"
+
+    def _refresh_all(self) -> None:
+        """Count any segment bytes not covered by meta.json (first run, crashes)."""
+        with self._lock:
+            changed = False
+            for path in self._segments():
+                key = self._meta_key(path)
+                entry = self._meta.setdefault(key, {"count": 0, "bytes": 0})
+                if path.stat().st_size != entry["bytes"]:
+                    self._catch_up(path, entry)
+                    changed = True
+            if changed:
+                self._save_meta()
+
+    def _catch_up(self, path: Path, entry: Dict[str, int]) -> None:
+        """Count lines between the recorded size and the end of the segment."""
+        size = path.stat().st_size
+        start = entry["bytes"] if entry["bytes"] <= size else 0
+        if start == 0:
+            entry["count"] = 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            entry["count"] += sum(1 for line in f if line.strip())
+        entry["bytes"] = size
+        self._unsaved += 1
+
+    def _load_meta(self) -> Dict[str, Dict[str, int]]:
+        if not self.meta_file.exists():
+            return {}
+        try:
+            with open(self.meta_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, self.meta_file)
+        self._unsaved = 0
@@ -263,12 +263,8 @@ class FeedbackCollector:
         if user_query:
             self._last_queries[thread_id] = user_query
 
-        # Trigger pattern extraction every 50 events
-        if self._event_count % 50 == 0:
-            try:
-                self.store.extract_patterns()
-            except Exception as e:
-                print(f"[FeedbackCollector] Pattern extraction failed: {e}")
+        # Pattern extraction runs in the background: the store schedules it
+        # every PATTERN_REFRESH_INTERVAL recorded events
 
         return event
 
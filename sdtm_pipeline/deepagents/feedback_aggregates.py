@@ -0,0 +1,405 @@
+"""
+Materialized Feedback Aggregates
+================================
+Running counters over the feedback event log, updated as each event is
+recorded, so dashboards read O(days) buckets instead of re-scanning
+thousands of events per request.
+
+Each UTC day has one bucket of plain counters:
+
+    events, interactions           - Event count, new unique interactions
+    signals, sentiments            - {value: count}
+    dwell, validation              - [sum, count]
+    domains                        - {domain: {events, positive,
+                                      validation_sum, validation_count,
+                                      pipeline_ok, pipeline_fail}}
+    tools                          - {tool: [success, fail]}
+
+Unique interactions (thread + query prefix) are counted on the day they
+are first seen; their short digests are stored with the counters so the set
+survives restarts.
+
+Every AGGREGATE_SAVE_INTERVAL events the counts added since the last save
+are merged into the stored day buckets, together with the new interaction
+digests and the number of events applied, in one write-locked SQLite
+transaction. Saves are additive, so several processes recording into the
+same directory add to each other's counts instead of overwriting them; a
+save costs O(changed days) and the counters and ``applied`` never disagree
+on disk. On startup any events the log holds
+beyond ``applied`` (e.g. lost to a crash before a save) are read from the
+tail of the log and applied. ``rebuild`` replays the whole log for
+backfills or after editing the log by hand.
+
+Storage Architecture:
+    .sessions/feedback/
+        aggregates.db         - day_buckets(day, data JSON),
+                                interactions(key), state(key, value)
+
+Usage:
+    aggregates = FeedbackAggregates(storage_dir)
+    aggregates.apply(event)
+    metrics = summarize(aggregates.totals())
+    trend = aggregates.daily(days=30)
+
+    # Same counters straight from raw events (verification, backfills)
+    metrics = summarize(merge_days(aggregate_events(events)))
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .feedback import FeedbackEvent, FeedbackSentiment, FeedbackSignal
+
+
+AGGREGATE_SAVE_INTERVAL = int(os.getenv("FEEDBACK_AGGREGATE_SAVE_INTERVAL", "20"))
+
+
+def interaction_key(event: FeedbackEvent) -> Optional[str]:
+    """Digest of an event's interaction (thread + query prefix), None without a query."""
+    if not event.user_query:
+        return None
+    raw = f"{event.thread_id}:{event.user_query[:50]}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def new_bucket() -> Dict[str, Any]:
+    return {
+        "events": 0,
+        "interactions": 0,
+        "signals": {},
+        "sentiments": {},
+        "dwell": [0.0, 0],
+        "validation": [0.0, 0],
+        "domains": {},
+        "tools": {},
+    }
+
+
+def merge_bucket(into: Dict[str, Any], bucket: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the counters of ``bucket`` to ``into`` (in place) and return it."""
+    into["events"] += bucket["events"]
+    into["interactions"] += bucket["interactions"]
+    for key in ("signals", "sentiments"):
+        for value, count in bucket[key].items():
+            into[key][value] = into[key].get(value, 0) + count
+    for key in ("dwell", "validation"):
+        into[key][0] += bucket[key][0]
+        into[key][1] += bucket[key][1]
+    for domain, counters in bucket["domains"].items():
+        target = into["domains"].setdefault(domain, dict.fromkeys(counters, 0))
+        for name, count in counters.items():
+            target[name] = target.get(name, 0) + count
+    for tool, (success, fail) in bucket["tools"].items():
+        target = into["tools"].setdefault(tool, [0, 0])
+        target[0] += success
+        target[1] += fail
+    return into
+
+
+def count_event(bucket: Dict[str, Any], event: FeedbackEvent, new_interaction: bool) -> None:
+    """Add one event to ``bucket`` (in place)."""
+    bucket["events"] += 1
+    signals, sentiments = bucket["signals"], bucket["sentiments"]
+    signals[event.signal.value] = signals.get(event.signal.value, 0) + 1
+    sentiments[event.sentiment.value] = sentiments.get(event.sentiment.value, 0) + 1
+    positive = event.sentiment == FeedbackSentiment.POSITIVE
+
+    if new_interaction:
+        bucket["interactions"] += 1
+
+    if event.signal == FeedbackSignal.DWELL_TIME and "dwell_time_seconds" in event.metadata:
+        bucket["dwell"][0] += event.metadata["dwell_time_seconds"]
+        bucket["dwell"][1] += 1
+    if event.validation_score is not None:
+        bucket["validation"][0] += event.validation_score
+        bucket["validation"][1] += 1
+
+    if event.domain:
+        domain = bucket["domains"].setdefault(event.domain, {
+            "events": 0, "positive": 0, "validation_sum": 0.0,
+            "validation_count": 0, "pipeline_ok": 0, "pipeline_fail": 0,
+        })
+        domain["events"] += 1
+        domain["positive"] += positive
+        if event.validation_score is not None:
+            domain["validation_sum"] += event.validation_score
+            domain["validation_count"] += 1
+        domain["pipeline_ok"] += event.signal == FeedbackSignal.PIPELINE_COMPLETED
+        domain["pipeline_fail"] += event.signal == FeedbackSignal.PIPELINE_FAILED
+
+    for tool_name in event.tool_chain or ():
+        outcome = bucket["tools"].setdefault(tool_name, [0, 0])
+        outcome[0 if positive else 1] += 1
+
+
+def aggregate_events(events: Iterable[FeedbackEvent]) -> Dict[str, Dict[str, Any]]:
+    """Day buckets computed directly from ``events`` (oldest first), without storage."""
+    days: Dict[str, Dict[str, Any]] = {}
+    seen: set = set()
+    for event in events:
+        key = interaction_key(event)
+        new_interaction = key is not None and key not in seen
+        if new_interaction:
+            seen.add(key)
+        count_event(days.setdefault(event.timestamp[:10], new_bucket()), event, new_interaction)
+    return days
+
+
+def merge_days(days: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """All day buckets merged into one."""
+    total = new_bucket()
+    for bucket in days.values():
+        merge_bucket(total, bucket)
+    return total
+
+
+def daily_buckets(days: Dict[str, Dict[str, Any]], last: Optional[int] = None) -> List[Dict[str, Any]]:
+    """``[{"date": day, **bucket}]`` oldest first, optionally only the last ``last`` days."""
+    dates = sorted(days)
+    if last is not None:
+        cutoff = (datetime.utcnow() - timedelta(days=last)).strftime("%Y-%m-%d")
+        dates = [d for d in dates if d >= cutoff]
+    return [dict(days[d], date=d) for d in dates]
+
+
+def summarize(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Feedback rates from a merged bucket.
+
+    The single definition of the metrics behind both
+    ``LearningStore.compute_metrics`` and ``feedback_analytics.compute_analytics``.
+    """
+    total = totals["events"]
+    signal_counts = totals["signals"]
+    sentiment_counts = totals["sentiments"]
+    total_interactions = max(totals["interactions"], 1) if total else 0
+
+    def rate(part: int, whole: int) -> float:
+        return part / whole if whole > 0 else 0.0
+
+    pipeline_success = signal_counts.get(FeedbackSignal.PIPELINE_COMPLETED.value, 0)
+    pipeline_fail = signal_counts.get(FeedbackSignal.PIPELINE_FAILED.value, 0)
+    hitl_approved = signal_counts.get(FeedbackSignal.HITL_APPROVED.value, 0)
+    hitl_rejected = signal_counts.get(FeedbackSignal.HITL_REJECTED.value, 0)
+    dwell_sum, dwell_count = totals["dwell"]
+    val_sum, val_count = totals["validation"]
+
+    domain_metrics = {
+        domain: {
+            "event_count": d["events"],
+            "positive_rate": rate(d["positive"], d["events"]),
+            "avg_validation_score": (
+                d["validation_sum"] / d["validation_count"] if d["validation_count"] else 0.0
+            ),
+            "pipeline_success_rate": rate(d["pipeline_ok"], d["pipeline_ok"] + d["pipeline_fail"]),
+        }
+        for domain, d in totals["domains"].items()
+    }
+    tool_rates = {
+        tool_name: success / (success + fail)
+        for tool_name, (success, fail) in totals["tools"].items()
+        if success + fail > 0
+    }
+
+    return {
+        "total_interactions": total_interactions,
+        "total_feedback_events": total,
+        "positive_rate": rate(sentiment_counts.get(FeedbackSentiment.POSITIVE.value, 0), total),
+        "negative_rate": rate(sentiment_counts.get(FeedbackSentiment.NEGATIVE.value, 0), total),
+        "copy_rate": rate(signal_counts.get(FeedbackSignal.RESPONSE_COPIED.value, 0), total_interactions),
+        "regeneration_rate": rate(
+            signal_counts.get(FeedbackSignal.RESPONSE_REGENERATED.value, 0), total_interactions
+        ),
+        "avg_dwell_time_seconds": dwell_sum / dwell_count if dwell_count else 0.0,
+        "pipeline_success_rate": rate(pipeline_success, pipeline_success + pipeline_fail),
+        "avg_validation_score": val_sum / val_count if val_count else 0.0,
+        "hitl_approval_rate": rate(hitl_approved, hitl_approved + hitl_rejected),
+        "domain_metrics": domain_metrics,
+        "tool_success_rates": dict(sorted(tool_rates.items(), key=lambda x: x[1], reverse=True)),
+        "signal_counts": dict(signal_counts),
+    }
+
+
+class FeedbackAggregates:
+    """
+    Per-day feedback counters persisted next to the event log.
+
+    Args:
+        storage_dir: Feedback storage directory (same as the LearningStore)
+    """
+
+    def __init__(self, storage_dir: Path):
+        self.storage_dir = Path(storage_dir)
+        self.db_path = self.storage_dir / "aggregates.db"
+        self._lock = threading.RLock()
+        self._unsaved = 0
+        self.applied = 0
+        self._days: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}  # Counts added since the last save
+        self._interactions: set = set()
+        self._new_interactions: List[tuple] = []  # (key, day) seen since the last save
+        self._conn = self._connect()
+        self._load()
+
+    # =========================================================================
+    # UPDATES
+    # =========================================================================
+
+    def apply(self, event: FeedbackEvent, save: bool = True) -> None:
+        """Add one event to the counters of its day."""
+        with self._lock:
+            day = event.timestamp[:10]
+            key = interaction_key(event)
+            new_interaction = key is not None and key not in self._interactions
+            if new_interaction:
+                self._interactions.add(key)
+                self._new_interactions.append((key, day))
+
+            count_event(self._days.setdefault(day, new_bucket()), event, new_interaction)
+            count_event(self._pending.setdefault(day, new_bucket()), event, new_interaction)
+
+            self.applied += 1
+            self._unsaved += 1
+            if save and self._unsaved >= AGGREGATE_SAVE_INTERVAL:
+                self.save()
+
+    def catch_up(self, total_events: int, tail: Iterable[FeedbackEvent]) -> int:
+        """
+        Apply events recorded but not yet counted.
+
+        Args:
+            total_events: Events currently in the log
+            tail: The log's events, newest first (only the missing ones are read)
+
+        Returns:
+            Number of events applied
+        """
+        with self._lock:
+            missing = total_events - self.applied
+            if missing <= 0:
+                return 0
+            pending: List[FeedbackEvent] = []
+            for event in tail:
+                pending.append(event)
+                if len(pending) >= missing:
+                    break
+            for event in reversed(pending):
+                self.apply(event, save=False)
+            self.save()
+            return len(pending)
+
+    def rebuild(self, events: Iterable[FeedbackEvent]) -> int:
+        """Discard all counters and recompute them from ``events`` (oldest first)."""
+        with self._lock:
+            self._days = {}
+            self._pending = {}
+            self._interactions = set()
+            self._new_interactions = []
+            self.applied = 0
+            self._unsaved = 0
+            with self._conn:
+                for table in ("day_buckets", "interactions", "state"):
+                    self._conn.execute(f"DELETE FROM {table}")
+            for event in events:
+                self.apply(event, save=False)
+            self.save()
+            return self.applied
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def totals(self) -> Dict[str, Any]:
+        """All days merged into one bucket."""
+        with self._lock:
+            return merge_days(self._days)
+
+    def daily(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """``[{"date": day, **bucket}]`` oldest first, optionally only the last ``days`` days."""
+        # Deep copy under the lock: recording threads keep growing the nested
+        # signal/domain/tool dicts while callers summarize the result.
+        with self._lock:
+            return json.loads(json.dumps(daily_buckets(self._days, days)))
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def save(self) -> None:
+        """
+        Add the counts since the last save to the stored buckets, atomically.
+
+        The stored rows are read and rewritten under SQLite's write lock, so
+        counts saved meanwhile by another process are kept, and interactions
+        it already counted are not counted twice. The in-memory view of the
+        changed days is refreshed from the merged rows.
+        """
+        with self._lock:
+            if not self._pending and not self._unsaved:
+                return
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, day in self._new_interactions:
+                    inserted = conn.execute(
+                        "INSERT OR IGNORE INTO interactions (key) VALUES (?)", (key,)
+                    ).rowcount
+                    if not inserted:
+                        self._pending[day]["interactions"] -= 1
+
+                merged = {}
+                for day, delta in self._pending.items():
+                    row = conn.execute("SELECT data FROM day_buckets WHERE day = ?", (day,)).fetchone()
+                    merged[day] = merge_bucket(json.loads(row[0]) if row else new_bucket(), delta)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO day_buckets (day, data) VALUES (?, ?)",
+                    [(day, json.dumps(bucket, separators=(",", ":"))) for day, bucket in merged.items()],
+                )
+                conn.execute(
+                    "INSERT INTO state (key, value) VALUES ('applied', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                    (self._unsaved,),
+                )
+                applied = conn.execute("SELECT value FROM state WHERE key = 'applied'").fetchone()[0]
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            self._days.update(merged)
+            self.applied = applied
+            self._pending = {}
+            self._new_interactions = []
+            self._unsaved = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._unsaved:
+                self.save()
+            self._conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS day_buckets (day TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS interactions (key TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER)")
+        conn.commit()
+        return conn
+
+    def _load(self) -> None:
+        with self._lock:
+            self._days = {
+                day: json.loads(data)
+                for day, data in self._conn.execute("SELECT day, data FROM day_buckets")
+            }
+            self._interactions = {key for (key,) in self._conn.execute("SELECT key FROM interactions")}
+            row = self._conn.execute("SELECT value FROM state WHERE key = 'applied'").fetchone()
+            self.applied = row[0] if row else 0
@@ -4,6 +4,13 @@ Feedback Analytics for SDTM Agent
 Computes aggregated metrics and time-series trends from feedback events.
 Used by the learning dashboard tool and the file server API endpoints.
 
+Metrics are read from the per-day counters the LearningStore maintains as
+events are recorded (see feedback_aggregates), so a request costs O(days)
+rather than a scan of the event log. ``recompute_analytics`` derives the
+same counters from the full raw log and reports them through the same code,
+and ``--rebuild`` re-materializes the stored counters (backfills,
+hand-edited logs).
+
 Metrics computed:
 - Overall: positive/negative rates, copy rate, regeneration rate
 - Pipeline: success rate, avg validation score, HITL approval rate
@@ -18,14 +25,16 @@ Usage:
     analytics = compute_analytics()
     print(f"Positive rate: {analytics.positive_rate:.0%}")
     print(f"Pipeline success: {analytics.pipeline_success_rate:.0%}")
+
+    python -m sdtm_pipeline.deepagents.feedback_analytics --rebuild
 """
 
-from collections import defaultdict
-from dataclasses import dataclass, field, asdict
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from dataclasses import dataclass, field, asdict, fields
+from datetime import datetime
+from typing import Dict, List, Any
 
-from .feedback import FeedbackEvent, FeedbackSignal, FeedbackSentiment
+from .feedback import FeedbackSentiment
+from .feedback_aggregates import aggregate_events, daily_buckets, merge_days, summarize
 from .learning_store import get_learning_store
 
 
@@ -78,197 +87,108 @@ class FeedbackMetrics:
 # ANALYTICS FUNCTIONS
 # =============================================================================
 
-def compute_analytics(days: int = 30) -> FeedbackMetrics:
+def compute_analytics(days: int = 30, recompute: bool = False) -> FeedbackMetrics:
     """
-    Compute comprehensive feedback analytics.
+    Compute comprehensive feedback analytics over the whole event log.
 
     Args:
         days: Number of days to include in time-series data
+        recompute: Count the raw events instead of reading the materialized
+            aggregates (slow; for verification)
 
     Returns:
         FeedbackMetrics with all computed values
     """
     store = get_learning_store()
-
-    # Get all events
-    events = store.read_events(limit=10000)
-    if not events:
-        return FeedbackMetrics(computed_at=datetime.utcnow().isoformat())
-
-    metrics = FeedbackMetrics()
-    metrics.total_feedback_events = len(events)
+    if recompute:
+        buckets = aggregate_events(store._iter_events())
+    else:
+        buckets = {bucket.pop("date"): bucket for bucket in store.aggregates.daily()}
+
+    summary = summarize(merge_days(buckets))
+    metrics = FeedbackMetrics(**{
+        f.name: summary[f.name] for f in fields(FeedbackMetrics) if f.name in summary
+    })
     metrics.computed_at = datetime.utcnow().isoformat()
+    if not metrics.total_feedback_events:
+        return metrics
 
-    # Count unique interactions
-    interactions = set()
-    for e in events:
-        if e.user_query:
-            interactions.add(f"{e.thread_id}:{e.user_query[:50]}")
-    metrics.total_interactions = max(len(interactions), 1)
-
-    # Signal counts
-    signal_counts: Dict[FeedbackSignal, int] = defaultdict(int)
-    sentiment_counts: Dict[FeedbackSentiment, int] = defaultdict(int)
-    for e in events:
-        signal_counts[e.signal] += 1
-        sentiment_counts[e.sentiment] += 1
-
-    total = len(events)
-    metrics.positive_rate = sentiment_counts.get(FeedbackSentiment.POSITIVE, 0) / total
-    metrics.negative_rate = sentiment_counts.get(FeedbackSentiment.NEGATIVE, 0) / total
+    # Learning metrics
+    metrics.patterns_extracted = len(store._load_all_patterns())
 
-    # Response quality
-    metrics.copy_rate = (
-        signal_counts.get(FeedbackSignal.RESPONSE_COPIED, 0) / metrics.total_interactions
-    )
-    metrics.regeneration_rate = (
-        signal_counts.get(FeedbackSignal.RESPONSE_REGENERATED, 0) / metrics.total_interactions
-    )
-
-    # Dwell time
-    dwell_events = [
-        e for e in events
-        if e.signal == FeedbackSignal.DWELL_TIME
-        and "dwell_time_seconds" in e.metadata
+    # Daily trend
+    metrics.daily_metrics = [
+        _trend_point(bucket["date"], bucket) for bucket in daily_buckets(buckets, days)
     ]
-    if dwell_events:
-        metrics.avg_dwell_time_seconds = sum(
-            e.metadata["dwell_time_seconds"] for e in dwell_events
-        ) / len(dwell_events)
-
-    # Pipeline quality
-    pipeline_success = signal_counts.get(FeedbackSignal.PIPELINE_COMPLETED, 0)
-    pipeline_fail = signal_counts.get(FeedbackSignal.PIPELINE_FAILED, 0)
-    pipeline_total = pipeline_success + pipeline_fail
-    metrics.pipeline_success_rate = pipeline_success / pipeline_total if pipeline_total > 0 else 0.0
-
-    # Validation scores
-    val_scores = [e.validation_score for e in events if e.validation_score is not None]
-    metrics.avg_validation_score = sum(val_scores) / len(val_scores) if val_scores else 0.0
 
-    # HITL
-    hitl_approved = signal_counts.get(FeedbackSignal.HITL_APPROVED, 0)
-    hitl_rejected = signal_counts.get(FeedbackSignal.HITL_REJECTED, 0)
-    hitl_total = hitl_approved + hitl_rejected
-    metrics.hitl_approval_rate = hitl_approved / hitl_total if hitl_total > 0 else 0.0
+    # Learning improvement (compare first half vs second half positive rates)
+    metrics.learning_improvement = _improvement_from_daily(daily_buckets(buckets))
 
-    # Per-domain metrics
-    metrics.domain_metrics = _compute_domain_metrics(events)
+    return metrics
 
-    # Tool effectiveness
-    metrics.tool_success_rates = _compute_tool_success_rates(events)
 
-    # Learning metrics
-    all_patterns = store._load_all_patterns()
-    metrics.patterns_extracted = len(all_patterns)
+def recompute_analytics(days: int = 30) -> FeedbackMetrics:
+    """
+    ``compute_analytics`` from the raw event log instead of the aggregates.
 
-    # Daily trend
-    metrics.daily_metrics = _compute_daily_trend(events, days)
+    Covers the same events and shares the same code, so any difference
+    means the materialized counters have drifted (see ``--rebuild``).
+    """
+    return compute_analytics(days, recompute=True)
 
-    # Learning improvement (compare first half vs second half positive rates)
-    metrics.learning_improvement = _compute_improvement(events)
 
-    return metrics
+def _trend_point(day: str, bucket: Dict[str, Any]) -> Dict[str, Any]:
+    """One daily trend entry from a day's aggregate bucket."""
+    d_total = bucket["events"]
+    d_positive = bucket["sentiments"].get(FeedbackSentiment.POSITIVE.value, 0)
+    d_negative = bucket["sentiments"].get(FeedbackSentiment.NEGATIVE.value, 0)
+    return {
+        "date": day,
+        "total_events": d_total,
+        "positive": d_positive,
+        "negative": d_negative,
+        "positive_rate": d_positive / d_total if d_total > 0 else 0.0,
+    }
 
 
-def _compute_domain_metrics(events: List[FeedbackEvent]) -> Dict[str, Dict[str, float]]:
-    """Compute per-domain metrics."""
-    domain_events: Dict[str, List[FeedbackEvent]] = defaultdict(list)
-    for e in events:
-        if e.domain:
-            domain_events[e.domain].append(e)
-
-    result = {}
-    for domain, d_events in domain_events.items():
-        d_total = len(d_events)
-        d_positive = sum(1 for e in d_events if e.sentiment == FeedbackSentiment.POSITIVE)
-        d_val_scores = [e.validation_score for e in d_events if e.validation_score is not None]
-        d_pipeline_ok = sum(1 for e in d_events if e.signal == FeedbackSignal.PIPELINE_COMPLETED)
-        d_pipeline_fail = sum(1 for e in d_events if e.signal == FeedbackSignal.PIPELINE_FAILED)
-        d_pipeline_total = d_pipeline_ok + d_pipeline_fail
-
-        result[domain] = {
-            "event_count": d_total,
-            "positive_rate": d_positive / d_total if d_total > 0 else 0.0,
-            "avg_validation_score": sum(d_val_scores) / len(d_val_scores) if d_val_scores else 0.0,
-            "pipeline_success_rate": d_pipeline_ok / d_pipeline_total if d_pipeline_total > 0 else 0.0,
-        }
-
-    return result
-
-
-def _compute_tool_success_rates(events: List[FeedbackEvent]) -> Dict[str, float]:
-    """Compute success rates per tool."""
-    tool_outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: {"success": 0, "fail": 0})
-
-    for e in events:
-        if not e.tool_chain:
-            continue
-        is_success = e.sentiment == FeedbackSentiment.POSITIVE
-        for tool_name in e.tool_chain:
-            if is_success:
-                tool_outcomes[tool_name]["success"] += 1
-            else:
-                tool_outcomes[tool_name]["fail"] += 1
-
-    rates = {}
-    for tool_name, outcomes in tool_outcomes.items():
-        total = outcomes["success"] + outcomes["fail"]
-        if total > 0:
-            rates[tool_name] = outcomes["success"] / total
-
-    return dict(sorted(rates.items(), key=lambda x: x[1], reverse=True))
-
-
-def _compute_daily_trend(
-    events: List[FeedbackEvent], days: int = 30
-) -> List[Dict[str, Any]]:
-    """Compute daily metrics for trend charts."""
-    cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-
-    # Group events by day
-    daily: Dict[str, List[FeedbackEvent]] = defaultdict(list)
-    for e in events:
-        if e.timestamp >= cutoff:
-            day = e.timestamp[:10]  # YYYY-MM-DD
-            daily[day].append(e)
-
-    trend = []
-    for day in sorted(daily.keys()):
-        day_events = daily[day]
-        d_total = len(day_events)
-        d_positive = sum(1 for e in day_events if e.sentiment == FeedbackSentiment.POSITIVE)
-        d_negative = sum(1 for e in day_events if e.sentiment == FeedbackSentiment.NEGATIVE)
-
-        trend.append({
-            "date": day,
-            "total_events": d_total,
-            "positive": d_positive,
-            "negative": d_negative,
-            "positive_rate": d_positive / d_total if d_total > 0 else 0.0,
-        })
-
-    return trend
-
-
-def _compute_improvement(events: List[FeedbackEvent]) -> float:
+def _improvement_from_daily(buckets: List[Dict[str, Any]]) -> float:
     """
-    Compute learning improvement by comparing positive rates
-    between the first half and second half of events.
-
-    Returns delta (positive = improving, negative = regressing).
+    Positive rate of the second half of events minus that of the first
+    half. The day holding the midpoint event is split pro rata.
     """
-    if len(events) < 20:
+    total = sum(b["events"] for b in buckets)
+    if total < 20:
         return 0.0
 
-    mid = len(events) // 2
-    first_half = events[:mid]
-    second_half = events[mid:]
+    mid = total // 2
+    seen = 0
+    first_positive = 0.0
+    total_positive = 0
+    for bucket in buckets:
+        events = bucket["events"]
+        positive = bucket["sentiments"].get(FeedbackSentiment.POSITIVE.value, 0)
+        total_positive += positive
+        if seen < mid and events:
+            first_positive += positive * min(events, mid - seen) / events
+        seen += events
+
+    first_rate = first_positive / mid
+    second_rate = (total_positive - first_positive) / (total - mid)
+    return second_rate - first_rate
 
-    first_positive = sum(1 for e in first_half if e.sentiment == FeedbackSentiment.POSITIVE)
-    second_positive = sum(1 for e in second_half if e.sentiment == FeedbackSentiment.POSITIVE)
 
-    first_rate = first_positive / len(first_half)
-    second_rate = second_positive / len(second_half)
+if __name__ == "__main__":
+    import argparse
 
-    return second_rate - first_rate
+    parser = argparse.ArgumentParser(description="Feedback analytics")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recompute the materialized aggregates from the full event log")
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.rebuild:
+        get_learning_store().rebuild_aggregates()
+    metrics = compute_analytics(days=args.days)
+    print(f"Events: {metrics.total_feedback_events}, interactions: {metrics.total_interactions}")
+    print(f"Positive rate: {metrics.positive_rate:.0%}, negative rate: {metrics.negative_rate:.0%}")
+    print(f"Pipeline success: {metrics.pipeline_success_rate:.0%}")
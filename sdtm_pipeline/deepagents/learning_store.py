@@ -6,17 +6,23 @@ that are used to enhance future agent responses.
 
 Storage Architecture:
     .sessions/feedback/
-        events.jsonl          - Append-only raw event log
+        events/               - Raw event log, one JSONL segment per day
+                                with a sparse timestamp index (see event_log)
+        events.jsonl          - Legacy single log, read as the oldest segment
         patterns.json         - Extracted successful patterns (local cache)
+        extraction_state.json - Extraction watermark and bundle -> pattern keys
+        aggregates.db         - Per-day counters updated on every event
+                                (see feedback_aggregates)
         metrics.json          - Aggregated metrics for dashboard
         domain_insights.json  - Per-domain learning insights
 
-Pattern Extraction:
-    1. Read recent events from JSONL
-    2. Group by (thread_id, message_index) into interaction bundles
-    3. Score each bundle using weighted signal composition
+Pattern Extraction (incremental, on a background thread every
+PATTERN_REFRESH_INTERVAL recorded events):
+    1. Read events recorded after the extraction watermark
+    2. Add them to their (thread_id, query) interaction bundles
+    3. Re-score only the bundles that received events
     4. Extract tool chains and context from high-scoring bundles
-    5. Deduplicate similar patterns
+    5. Deduplicate similar patterns by dedup key
     6. Save to local cache (and optionally to Pinecone)
 
 Usage:
@@ -30,11 +36,15 @@ Usage:
 import json
 import os
 import hashlib
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 
+from .event_log import EventLog
+from .pattern_index import EmbedFn, PatternIndex
+from .feedback_aggregates import FeedbackAggregates, summarize
 from .feedback import (
     FeedbackEvent,
     FeedbackSignal,
@@ -51,7 +61,9 @@ from .feedback import (
 
 FEEDBACK_STORAGE_DIR = Path(os.getenv("FEEDBACK_STORAGE_DIR", "./.sessions/feedback"))
 MIN_PATTERN_SCORE = 0.6  # Minimum score to extract as a pattern
-MAX_EVENTS_FOR_EXTRACTION = 500  # Last N events to consider
+MAX_EVENTS_FOR_EXTRACTION = 500  # Last N events to consider on the first run
+MAX_EXTRACTION_BUNDLES = 1000  # Recent interaction bundles kept for re-scoring
+MAX_PATTERNS = int(os.getenv("LEARNING_MAX_PATTERNS", "100"))  # Patterns kept after each merge
 PATTERN_REFRESH_INTERVAL = 50  # Re-extract patterns every N events
 
 
@@ -114,9 +126,9 @@ class LearningStore:
     Manages persistence of feedback events and extraction of learning patterns.
 
     Data flow:
-        FeedbackEvent -> events.jsonl -> extract_patterns() -> patterns.json
-                                                             -> domain_insights.json
-                                                             -> metrics.json
+        FeedbackEvent -> events/ -> extract_patterns() -> patterns.json
+                                                       -> domain_insights.json
+                                                       -> metrics.json
     """
 
     def __init__(self, storage_dir: Optional[Path] = None):
@@ -125,14 +137,31 @@ class LearningStore:
         self.patterns_file = self.storage_dir / "patterns.json"
         self.metrics_file = self.storage_dir / "metrics.json"
         self.domain_insights_file = self.storage_dir / "domain_insights.json"
+        self.extraction_state_file = self.storage_dir / "extraction_state.json"
 
         # Ensure directory exists
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.event_log = EventLog(self.storage_dir / "events", legacy_file=self.events_file)
+        self.aggregates = FeedbackAggregates(self.storage_dir)
+        self._sync_aggregates()
 
         # In-memory caches
         self._patterns_cache: Dict[str, List[InteractionPattern]] = {}
+        self._patterns_by_key: Optional[Dict[str, InteractionPattern]] = None
+        self._pattern_index: Optional[PatternIndex] = None  # Rebuilt when patterns change
+        self.query_embedder: Optional[EmbedFn] = None
         self._events_since_extraction = 0
 
+        # Incremental extraction state
+        self._bundles: "OrderedDict[str, List[FeedbackEvent]]" = OrderedDict()
+        self._bundles_seeded = False
+        self._bundle_patterns: Dict[str, str] = {}  # bundle key -> pattern dedup key
+        self._watermark: Optional[str] = None
+        self._watermark_ids: List[str] = []
+        self._extraction_lock = threading.Lock()
+        self._extraction_thread: Optional[threading.Thread] = None
+        self._load_extraction_state()
+
         # Load existing patterns into cache
         self._load_patterns_cache()
 
@@ -141,13 +170,17 @@ class LearningStore:
     # =========================================================================
 
     def record_event(self, event: FeedbackEvent) -> None:
-        """Append a feedback event to the JSONL log."""
+        """Append a feedback event to the segment of its day."""
         try:
-            with open(self.events_file, "a") as f:
-                f.write(json.dumps(event.to_dict()) + "\n")
+            self.event_log.append(event.to_dict(), event.timestamp)
+            self.aggregates.apply(event)
             self._events_since_extraction += 1
         except Exception as e:
             print(f"[LearningStore] Error recording event: {e}")
+            return
+
+        if self._events_since_extraction >= PATTERN_REFRESH_INTERVAL:
+            self.schedule_extraction()
 
     def read_events(
         self,
@@ -156,41 +189,29 @@ class LearningStore:
         signal: Optional[FeedbackSignal] = None,
         since: Optional[str] = None,
     ) -> List[FeedbackEvent]:
-        """Read events from the JSONL log with optional filters."""
-        events = []
+        """
+        Read events with optional filters, in chronological order.
 
-        if not self.events_file.exists():
-            return events
+        The log is read backwards from the newest segment and stops after
+        ``limit`` matches or the first event older than ``since``, so the
+        cost depends on the events returned, not on the size of the log.
+        """
+        events = []
 
         try:
-            with open(self.events_file, "r") as f:
-                lines = f.readlines()
-
-            # Read from the end for most recent events
-            for line in reversed(lines):
+            for event in self._iter_events_reverse(since=since):
                 if len(events) >= limit:
                     break
-
-                line = line.strip()
-                if not line:
+                if since and event.timestamp < since:
+                    break  # Events are chronological, can stop early
+                # Apply filters
+                if thread_id and event.thread_id != thread_id:
                     continue
-
-                try:
-                    data = json.loads(line)
-                    event = FeedbackEvent.from_dict(data)
-
-                    # Apply filters
-                    if thread_id and event.thread_id != thread_id:
-                        continue
-                    if signal and event.signal != signal:
-                        continue
-                    if since and event.timestamp < since:
-                        break  # Events are chronological, can stop early
-
-                    events.append(event)
-                except (json.JSONDecodeError, KeyError, TypeError):
+                if signal and event.signal != signal:
                     continue
 
+                events.append(event)
+
         except Exception as e:
             print(f"[LearningStore] Error reading events: {e}")
 
@@ -198,81 +219,172 @@ class LearningStore:
         return events
 
     def get_event_count(self) -> int:
-        """Count total events in the log."""
-        if not self.events_file.exists():
-            return 0
+        """Count total events in the log (from persisted per-segment counts)."""
         try:
-            with open(self.events_file, "r") as f:
-                return sum(1 for line in f if line.strip())
+            return self.event_log.count()
         except Exception:
             return 0
 
+    def _iter_events_reverse(self, since: Optional[str] = None) -> Iterator[FeedbackEvent]:
+        """Parsed events, newest first (unparseable records are skipped)."""
+        for data in self.event_log.iter_reverse(since=since):
+            try:
+                yield FeedbackEvent.from_dict(data)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def _iter_events(self, since: str = "") -> Iterator[FeedbackEvent]:
+        """Parsed events with ``timestamp >= since``, oldest first, streamed from the log."""
+        for data in self.event_log.iter_since(since):
+            try:
+                yield FeedbackEvent.from_dict(data)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    # =========================================================================
+    # AGGREGATES
+    # =========================================================================
+
+    def _sync_aggregates(self) -> None:
+        """Count events the aggregates missed (crash, first run); rebuild if the log shrank."""
+        try:
+            total = self.event_log.count()
+            if total < self.aggregates.applied:
+                self.rebuild_aggregates()
+            else:
+                self.aggregates.catch_up(total, self._iter_events_reverse())
+        except Exception as e:
+            print(f"[LearningStore] Error syncing aggregates: {e}")
+
+    def rebuild_aggregates(self) -> int:
+        """Recompute all aggregates from the full event log (backfill). Returns events applied."""
+        applied = self.aggregates.rebuild(self._iter_events())
+        print(f"[LearningStore] Rebuilt aggregates from {applied} events")
+        return applied
+
     # =========================================================================
     # PATTERN EXTRACTION
     # =========================================================================
 
     def extract_patterns(self, min_score: float = MIN_PATTERN_SCORE) -> List[InteractionPattern]:
         """
-        Extract successful interaction patterns from recent feedback events.
+        Extract successful interaction patterns from newly recorded events.
 
         Algorithm:
-        1. Read last N events
-        2. Group by (thread_id, message_index) into interaction bundles
-        3. Score each bundle using weighted signal composition
-        4. Extract patterns from bundles scoring above min_score
-        5. Merge with existing patterns (reinforce duplicates)
-        6. Save to local cache
+        1. Read events after the watermark (last N events on the first run)
+        2. Add them to their interaction bundles (thread + query)
+        3. Re-score only the bundles that received events
+        4. Extract patterns from those bundles scoring above min_score
+        5. Merge into existing patterns by dedup key (reinforce duplicates)
+        6. Save to local cache and advance the watermark
         """
-        events = self.read_events(limit=MAX_EVENTS_FOR_EXTRACTION)
-        if not events:
-            return []
-
-        # Group events into interaction bundles
-        bundles = self._group_into_bundles(events)
-
-        # Score each bundle
-        scored_bundles = []
-        for bundle_key, bundle_events in bundles.items():
-            score = self._score_bundle(bundle_events)
-            if score >= min_score:
-                scored_bundles.append((bundle_key, bundle_events, score))
-
-        # Extract patterns from high-scoring bundles
-        new_patterns = []
-        for bundle_key, bundle_events, score in scored_bundles:
-            pattern = self._extract_pattern(bundle_key, bundle_events, score)
-            if pattern:
-                new_patterns.append(pattern)
-
-        # Merge with existing patterns
-        merged = self._merge_patterns(new_patterns)
-
-        # Save to cache and disk
-        self._patterns_cache = self._organize_by_domain(merged)
-        self._save_patterns_cache()
-        self._events_since_extraction = 0
+        with self._extraction_lock:
+            self._events_since_extraction = 0
+            new_events = self._read_new_events()
+            if not new_events:
+                return self._load_all_patterns()
+
+            affected = self._add_to_bundles(new_events)
+            patterns = self._pattern_map()
+
+            new_count = 0
+            for bundle_key in affected:
+                bundle_events = self._bundles[bundle_key]
+                score = self._score_bundle(bundle_events)
+                if score < min_score:
+                    continue
+                pattern = self._extract_pattern(bundle_key, bundle_events, score)
+                if pattern and self._merge_pattern(patterns, bundle_key, pattern):
+                    new_count += 1
+
+            merged = self._trim_patterns(patterns)
+
+            # Save to cache and disk
+            self._patterns_cache = self._organize_by_domain(merged)
+            self._pattern_index = None
+            self._save_patterns_cache()
+            self._advance_watermark(new_events)
+            self._save_extraction_state()
 
-        # Update domain insights
-        self._update_domain_insights(merged)
+            # Update domain insights
+            self._update_domain_insights(merged)
 
-        print(f"[LearningStore] Extracted {len(new_patterns)} patterns, "
-              f"{len(merged)} total after merge")
+            print(f"[LearningStore] Extracted patterns from {len(new_events)} new events "
+                  f"({len(affected)} bundles, {new_count} new patterns), "
+                  f"{len(merged)} total after merge")
 
-        return merged
+            return merged
+
+    def schedule_extraction(self) -> bool:
+        """
+        Run ``extract_patterns`` on a daemon thread so callers of
+        ``record_event`` never wait for it. Returns False if a run is
+        already in progress (its watermark picks up the new events next time).
+        """
+        if self._extraction_thread is not None and self._extraction_thread.is_alive():
+            return False
+        self._extraction_thread = threading.Thread(
+            target=self._run_extraction, name="pattern-extraction", daemon=True
+        )
+        self._extraction_thread.start()
+        return True
 
-    def _group_into_bundles(
-        self, events: List[FeedbackEvent]
-    ) -> Dict[str, List[FeedbackEvent]]:
-        """Group events by interaction context (thread + query)."""
-        bundles: Dict[str, List[FeedbackEvent]] = defaultdict(list)
+    def wait_for_extraction(self, timeout: Optional[float] = None) -> None:
+        """Block until a scheduled extraction (if any) finishes."""
+        thread = self._extraction_thread
+        if thread is not None:
+            thread.join(timeout)
 
+    def _run_extraction(self) -> None:
+        try:
+            self.extract_patterns()
+        except Exception as e:
+            print(f"[LearningStore] Background pattern extraction failed: {e}")
+
+    def _read_new_events(self) -> List[FeedbackEvent]:
+        """Events after the watermark, oldest first; seeds bundles after a restart."""
+        if self._watermark is None:
+            self._bundles_seeded = True
+            return self.read_events(limit=MAX_EVENTS_FOR_EXTRACTION)
+
+        seen = set(self._watermark_ids)
+        new_events = [e for e in self._iter_events(self._watermark) if e.event_id not in seen]
+
+        if not self._bundles_seeded:
+            # Earlier events of bundles that receive new ones are needed to re-score them
+            new_ids = {e.event_id for e in new_events}
+            history = [
+                e for e in self.read_events(limit=MAX_EVENTS_FOR_EXTRACTION + len(new_events))
+                if e.event_id not in new_ids
+            ]
+            self._add_to_bundles(history)
+            self._bundles_seeded = True
+
+        return new_events
+
+    def _bundle_key(self, event: FeedbackEvent) -> str:
+        """Bundle key: thread_id + user_query hash."""
+        query_hash = hashlib.md5(event.user_query.lower().strip().encode()).hexdigest()[:8]
+        return f"{event.thread_id}:{query_hash}"
+
+    def _add_to_bundles(self, events: List[FeedbackEvent]) -> List[str]:
+        """Append events to their bundles; returns the affected bundle keys in order."""
+        affected: Dict[str, None] = {}
         for event in events:
-            # Use thread_id + user_query hash as the bundle key
-            query_hash = hashlib.md5(event.user_query.lower().strip().encode()).hexdigest()[:8]
-            bundle_key = f"{event.thread_id}:{query_hash}"
-            bundles[bundle_key].append(event)
+            bundle_key = self._bundle_key(event)
+            bundle = self._bundles.get(bundle_key)
+            if bundle is None:
+                bundle = self._bundles[bundle_key] = []
+            else:
+                self._bundles.move_to_end(bundle_key)
+            bundle.append(event)
+            affected[bundle_key] = None
 
-        return dict(bundles)
+        while len(self._bundles) > MAX_EXTRACTION_BUNDLES:
+            evicted, _ = self._bundles.popitem(last=False)
+            self._bundle_patterns.pop(evicted, None)
+            affected.pop(evicted, None)
+        return list(affected)
 
     def _score_bundle(self, events: List[FeedbackEvent]) -> float:
         """
@@ -423,46 +535,57 @@ class LearningStore:
 
         return ". ".join(parts) + "." if parts else ""
 
-    def _merge_patterns(
-        self, new_patterns: List[InteractionPattern]
-    ) -> List[InteractionPattern]:
-        """Merge new patterns with existing ones, reinforcing duplicates."""
-        # Load existing patterns
-        existing = self._load_all_patterns()
-
-        # Build lookup by (query_type, domain, tool_chain_hash)
-        existing_lookup: Dict[str, InteractionPattern] = {}
-        for p in existing:
-            key = self._pattern_dedup_key(p)
-            existing_lookup[key] = p
-
-        # Merge
-        for new_p in new_patterns:
-            key = self._pattern_dedup_key(new_p)
-            if key in existing_lookup:
-                # Reinforce existing pattern
-                existing_p = existing_lookup[key]
-                existing_p.times_reinforced += 1
-                existing_p.last_reinforced = new_p.last_reinforced
-                # Moving average of score
-                existing_p.feedback_score = (
-                    existing_p.feedback_score * 0.7 + new_p.feedback_score * 0.3
-                )
-                # Update insight if new one is richer
-                if len(new_p.effective_prompt_context) > len(existing_p.effective_prompt_context):
-                    existing_p.effective_prompt_context = new_p.effective_prompt_context
-            else:
-                existing_lookup[key] = new_p
+    def _pattern_map(self) -> Dict[str, InteractionPattern]:
+        """Existing patterns by dedup key (built once, then kept up to date)."""
+        if self._patterns_by_key is None:
+            self._patterns_by_key = {
+                self._pattern_dedup_key(p): p for p in self._load_all_patterns()
+            }
+        return self._patterns_by_key
 
-        # Return all patterns sorted by score * reinforcement
-        all_patterns = list(existing_lookup.values())
-        all_patterns.sort(
-            key=lambda p: p.feedback_score * min(p.times_reinforced, 10),
-            reverse=True,
-        )
+    def _merge_pattern(
+        self,
+        patterns: Dict[str, InteractionPattern],
+        bundle_key: str,
+        new_p: InteractionPattern,
+    ) -> bool:
+        """
+        Merge one bundle's pattern into ``patterns``, reinforcing a duplicate.
 
-        # Keep top 100 patterns
-        return all_patterns[:100]
+        A bundle that already contributed to the same pattern only updates
+        its score; it is not counted as another reinforcement. Returns True
+        if the pattern is new.
+        """
+        key = self._pattern_dedup_key(new_p)
+        repeat = self._bundle_patterns.get(bundle_key) == key
+        self._bundle_patterns[bundle_key] = key
+
+        existing_p = patterns.get(key)
+        if existing_p is None:
+            patterns[key] = new_p
+            return True
+
+        if not repeat:
+            existing_p.times_reinforced += 1
+            existing_p.last_reinforced = new_p.last_reinforced
+        # Moving average of score
+        existing_p.feedback_score = (
+            existing_p.feedback_score * 0.7 + new_p.feedback_score * 0.3
+        )
+        # Update insight if new one is richer
+        if len(new_p.effective_prompt_context) > len(existing_p.effective_prompt_context):
+            existing_p.effective_prompt_context = new_p.effective_prompt_context
+        return False
+
+    def _trim_patterns(self, patterns: Dict[str, InteractionPattern]) -> List[InteractionPattern]:
+        """All patterns sorted by score * reinforcement, keeping the top MAX_PATTERNS."""
+        ranked = sorted(
+            patterns.items(),
+            key=lambda item: item[1].feedback_score * min(item[1].times_reinforced, 10),
+            reverse=True,
+        )[:MAX_PATTERNS]
+        self._patterns_by_key = dict(ranked)
+        return [p for _, p in ranked]
 
     def _pattern_dedup_key(self, pattern: InteractionPattern) -> str:
         """Generate a deduplication key for a pattern."""
@@ -486,39 +609,40 @@ class LearningStore:
 
         Strategy (local-cache-first for low latency):
         1. Check in-memory cache
-        2. Filter by domain if provided
-        3. Score relevance by query type match
+        2. Restrict to domain + general patterns (all if none match)
+        3. Score the memoized (domain, query type) shortlist plus patterns
+           sharing keywords/tools with the query (see pattern_index)
         4. Return top_k patterns
         """
         if not self._patterns_cache:
             self._load_patterns_cache()
 
-        candidates = []
-
-        # Get domain-specific patterns
-        if domain and domain in self._patterns_cache:
-            candidates.extend(self._patterns_cache[domain])
-
-        # Get general patterns
-        if "_general" in self._patterns_cache:
-            candidates.extend(self._patterns_cache["_general"])
+        index = self._pattern_index
+        if index is None:
+            index = self._build_pattern_index()
 
-        if not candidates:
-            # Fallback: get all patterns
-            for patterns in self._patterns_cache.values():
-                candidates.extend(patterns)
+        return index.search(query, detect_query_type(query), domain, top_k)
 
-        # Score relevance
-        query_type = detect_query_type(query)
-        scored = []
-        for pattern in candidates:
-            relevance = self._compute_relevance(pattern, query_type, domain)
-            scored.append((pattern, relevance))
-
-        # Sort by relevance * feedback_score
-        scored.sort(key=lambda x: x[1] * x[0].feedback_score, reverse=True)
+    def set_query_embedder(self, embed_fn: Optional[EmbedFn]) -> None:
+        """
+        Enable (or disable with None) the vector index over pattern queries.
 
-        return [p for p, _ in scored[:top_k]]
+        ``embed_fn`` maps a list of texts to a list of vectors; it is called
+        once per pattern-set change and once per lookup, so it should be a
+        local model for prompt-building latency to stay low.
+        """
+        self.query_embedder = embed_fn
+        self._pattern_index = None
+
+    def _build_pattern_index(self) -> PatternIndex:
+        patterns = []
+        for domain_key, domain_patterns in self._patterns_cache.items():
+            if domain_key != "_general":
+                patterns.extend(domain_patterns)
+        patterns.extend(self._patterns_cache.get("_general", []))
+        index = PatternIndex(patterns, self._compute_relevance, embed_fn=self.query_embedder)
+        self._pattern_index = index
+        return index
 
     def _compute_relevance(
         self,
@@ -561,111 +685,10 @@ class LearningStore:
     # =========================================================================
 
     def compute_metrics(self) -> Dict[str, Any]:
-        """Compute aggregated feedback metrics."""
-        events = self.read_events(limit=5000)
-        if not events:
-            return {
-                "total_interactions": 0,
-                "total_feedback_events": 0,
-                "positive_rate": 0.0,
-                "negative_rate": 0.0,
-                "copy_rate": 0.0,
-                "regeneration_rate": 0.0,
-                "pipeline_success_rate": 0.0,
-                "avg_validation_score": 0.0,
-                "hitl_approval_rate": 0.0,
-                "domain_metrics": {},
-                "tool_success_rates": {},
-                "patterns_extracted": len(self._load_all_patterns()),
-                "signal_counts": {},
-                "computed_at": datetime.utcnow().isoformat() + "Z",
-            }
-
-        total = len(events)
-
-        # Count by signal
-        signal_counts: Dict[str, int] = defaultdict(int)
-        for e in events:
-            signal_counts[e.signal.value] += 1
-
-        # Count by sentiment
-        sentiment_counts: Dict[str, int] = defaultdict(int)
-        for e in events:
-            sentiment_counts[e.sentiment.value] += 1
-
-        # Unique interactions (by thread + query)
-        unique_interactions = set()
-        for e in events:
-            if e.user_query:
-                unique_interactions.add(f"{e.thread_id}:{e.user_query[:50]}")
-        total_interactions = max(len(unique_interactions), 1)
-
-        # Rates
-        positive_count = sentiment_counts.get("positive", 0)
-        negative_count = sentiment_counts.get("negative", 0)
-
-        copy_count = signal_counts.get(FeedbackSignal.RESPONSE_COPIED.value, 0)
-        regen_count = signal_counts.get(FeedbackSignal.RESPONSE_REGENERATED.value, 0)
-
-        pipeline_success = signal_counts.get(FeedbackSignal.PIPELINE_COMPLETED.value, 0)
-        pipeline_fail = signal_counts.get(FeedbackSignal.PIPELINE_FAILED.value, 0)
-        pipeline_total = pipeline_success + pipeline_fail
-
-        hitl_approved = signal_counts.get(FeedbackSignal.HITL_APPROVED.value, 0)
-        hitl_rejected = signal_counts.get(FeedbackSignal.HITL_REJECTED.value, 0)
-        hitl_total = hitl_approved + hitl_rejected
-
-        # Validation scores
-        val_scores = [e.validation_score for e in events if e.validation_score is not None]
-        avg_val = sum(val_scores) / len(val_scores) if val_scores else 0.0
-
-        # Per-domain metrics
-        domain_events: Dict[str, List[FeedbackEvent]] = defaultdict(list)
-        for e in events:
-            if e.domain:
-                domain_events[e.domain].append(e)
-
-        domain_metrics = {}
-        for domain, d_events in domain_events.items():
-            d_positive = sum(1 for e in d_events if e.sentiment == FeedbackSentiment.POSITIVE)
-            d_total = len(d_events)
-            d_val_scores = [e.validation_score for e in d_events if e.validation_score is not None]
-            domain_metrics[domain] = {
-                "event_count": d_total,
-                "positive_rate": d_positive / d_total if d_total > 0 else 0.0,
-                "avg_validation_score": sum(d_val_scores) / len(d_val_scores) if d_val_scores else 0.0,
-            }
-
-        # Tool success rates
-        tool_outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: {"success": 0, "fail": 0})
-        for e in events:
-            if e.tool_chain:
-                outcome = "success" if e.sentiment == FeedbackSentiment.POSITIVE else "fail"
-                for tool_name in e.tool_chain:
-                    tool_outcomes[tool_name][outcome] += 1
-
-        tool_success_rates = {}
-        for tool_name, outcomes in tool_outcomes.items():
-            total_uses = outcomes["success"] + outcomes["fail"]
-            if total_uses > 0:
-                tool_success_rates[tool_name] = outcomes["success"] / total_uses
-
-        metrics = {
-            "total_interactions": total_interactions,
-            "total_feedback_events": total,
-            "positive_rate": positive_count / total if total > 0 else 0.0,
-            "negative_rate": negative_count / total if total > 0 else 0.0,
-            "copy_rate": copy_count / total_interactions,
-            "regeneration_rate": regen_count / total_interactions,
-            "pipeline_success_rate": pipeline_success / pipeline_total if pipeline_total > 0 else 0.0,
-            "avg_validation_score": avg_val,
-            "hitl_approval_rate": hitl_approved / hitl_total if hitl_total > 0 else 0.0,
-            "domain_metrics": domain_metrics,
-            "tool_success_rates": tool_success_rates,
-            "patterns_extracted": len(self._load_all_patterns()),
-            "signal_counts": dict(signal_counts),
-            "computed_at": datetime.utcnow().isoformat() + "Z",
-        }
+        """Compute aggregated feedback metrics from the materialized counters."""
+        metrics = summarize(self.aggregates.totals())
+        metrics["patterns_extracted"] = len(self._load_all_patterns())
+        metrics["computed_at"] = datetime.utcnow().isoformat() + "Z"
 
         # Save metrics to disk
         self._save_metrics(metrics)
@@ -687,6 +710,8 @@ class LearningStore:
                 data = json.load(f)
 
             self._patterns_cache = {}
+            self._patterns_by_key = None
+            self._pattern_index = None
             for domain_key, pattern_dicts in data.items():
                 self._patterns_cache[domain_key] = [
                     InteractionPattern.from_dict(p) for p in pattern_dicts
@@ -764,6 +789,41 @@ class LearningStore:
         except Exception as e:
             print(f"[LearningStore] Error saving domain insights: {e}")
 
+    def _advance_watermark(self, events: List[FeedbackEvent]) -> None:
+        """Move the watermark to the newest processed event (ids kept for ties)."""
+        newest = max(e.timestamp for e in events)
+        if self._watermark is None or newest > self._watermark:
+            self._watermark = newest
+            self._watermark_ids = []
+        self._watermark_ids.extend(e.event_id for e in events if e.timestamp == newest)
+
+    def _load_extraction_state(self) -> None:
+        if not self.extraction_state_file.exists():
+            return
+        try:
+            with open(self.extraction_state_file, "r") as f:
+                state = json.load(f)
+            self._watermark = state.get("watermark")
+            self._watermark_ids = state.get("watermark_ids", [])
+            self._bundle_patterns = state.get("bundle_patterns", {})
+        except Exception as e:
+            print(f"[LearningStore] Error loading extraction state: {e}")
+
+    def _save_extraction_state(self) -> None:
+        state = {
+            "watermark": self._watermark,
+            "watermark_ids": self._watermark_ids,
+            # Only bundles still held in memory can be re-scored
+            "bundle_patterns": {
+                k: v for k, v in self._bundle_patterns.items() if k in self._bundles
+            },
+        }
+        try:
+            with open(self.extraction_state_file, "w") as f:
+                json.dump(state, f)
+        except Exception as e:
+            print(f"[LearningStore] Error saving extraction state: {e}")
+
     def _save_metrics(self, metrics: Dict[str, Any]) -> None:
         """Save computed metrics to disk."""
         try:
@@ -15,38 +15,323 @@ Data Sources:
 All tools are async to prevent blocking the ASGI event loop.
 No authentication required for any of these public APIs.
 
+Requests share one keep-alive connection pool, opened and closed with the
+LangGraph server (server_lifespan.py); calls on any other event loop use a
+short-lived session. Successful
+JSON responses are cached (TTL + LRU, optionally on disk) keyed by URL,
+params and headers, and concurrent identical requests - parallel subagents
+looking up the same NCT ID or ICD-10 code - share one in-flight request.
+
+Configuration:
+    HEALTHCARE_HTTP_POOL_SIZE      - Max open connections (default 100)
+    HEALTHCARE_HTTP_POOL_PER_HOST  - Max connections per API host (default 10)
+    HEALTHCARE_HTTP_CACHE_TTL      - Seconds before a cached response expires (default 3600)
+    HEALTHCARE_HTTP_CACHE_SIZE     - Max in-memory cached responses (default 1024)
+    HEALTHCARE_HTTP_CACHE_DIR      - Enables the on-disk cache tier when set
+
 Usage:
     from .mcp_tools import HEALTHCARE_TOOLS
 """
 
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any, List, Optional
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 import aiohttp
 from langchain_core.tools import tool
 
 
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+HTTP_POOL_SIZE = int(os.getenv("HEALTHCARE_HTTP_POOL_SIZE", "100"))
+HTTP_POOL_PER_HOST = int(os.getenv("HEALTHCARE_HTTP_POOL_PER_HOST", "10"))
+HTTP_CACHE_TTL = float(os.getenv("HEALTHCARE_HTTP_CACHE_TTL", "3600"))
+HTTP_CACHE_SIZE = int(os.getenv("HEALTHCARE_HTTP_CACHE_SIZE", "1024"))
+HTTP_CACHE_DIR = os.getenv("HEALTHCARE_HTTP_CACHE_DIR") or None
+
+_MISSING = object()
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+
+class HTTPResponseCache:
+    """
+    TTL + LRU cache of decoded JSON responses, keyed by URL, params and headers.
+
+    The memory tier is per process; with ``disk_dir`` set, entries are also
+    written to ``<disk_dir>/<sha256(key)>.json`` ({"expires_at", "value"})
+    so workers on one host and restarted agents share lookups. Cached values
+    are returned as-is and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = HTTP_CACHE_TTL,
+        max_entries: int = HTTP_CACHE_SIZE,
+        disk_dir: Optional[Path] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> str:
+        payload = json.dumps(
+            [url, sorted((params or {}).items()), sorted((headers or {}).items())],
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_memory(self, key: str) -> Any:
+        """Return the in-memory value, or ``_MISSING``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+        return _MISSING
+
+    def get_disk(self, key: str) -> Any:
+        """Return the on-disk value (promoted to memory), or ``_MISSING``."""
+        value = _MISSING
+        now = time.time()
+        if self.disk_dir:
+            path = self.disk_dir / f"{key}.json"
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if entry.get("expires_at", 0) > now:
+                    value = entry.get("value")
+            except (OSError, ValueError):
+                pass
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return value
+            self.hits += 1
+            self.disk_hits += 1
+        self._memory_set(key, value, now + self.ttl_seconds)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_set(key, value, expires_at)
+        if not self.disk_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f)
+            os.replace(tmp_path, self.disk_dir / f"{key}.json")
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[HTTPResponseCache] Disk write failed: {e}")
+
+    def _memory_set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "coalesced": self.coalesced,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "disk_tier": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+_response_cache: Optional[HTTPResponseCache] = None
+
+
+def get_http_response_cache() -> HTTPResponseCache:
+    """Get or create the process-wide healthcare API response cache."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = HTTPResponseCache(disk_dir=HTTP_CACHE_DIR)
+    return _response_cache
+
+
+# =============================================================================
+# HTTP CLIENT POOL
+# =============================================================================
+# One pooled keep-alive session per application lifetime: opened by the
+# server lifespan on startup (see server_lifespan.py) and closed on
+# shutdown. aiohttp sessions are bound to the loop that created them, so
+# calls made on any other loop (scripts, run_sync, tests) use a short-lived
+# session that is closed when the call ends.
+
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_in_flight: Dict[str, asyncio.Task] = {}
+
+
+async def open_http_session() -> aiohttp.ClientSession:
+    """Open the shared session on the running loop (application startup)."""
+    global _http_session, _http_session_loop
+    loop = asyncio.get_running_loop()
+    if _http_session is not None and not _http_session.closed and _http_session_loop is loop:
+        return _http_session
+    await close_http_session()
+    _http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_PER_HOST,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    ))
+    _http_session_loop = loop
+    return _http_session
+
+
+def get_http_session() -> Optional[aiohttp.ClientSession]:
+    """The shared session if it is open on the running loop, else None."""
+    if (_http_session is None or _http_session.closed
+            or _http_session_loop is not asyncio.get_running_loop()):
+        return None
+    return _http_session
+
+
+async def close_http_session() -> bool:
+    """
+    Close the shared session (application shutdown).
+
+    Returns True if a session was closed.
+    """
+    global _http_session, _http_session_loop
+    session, loop = _http_session, _http_session_loop
+    _http_session = _http_session_loop = None
+    if session is None or session.closed:
+        return False
+    if loop is not asyncio.get_running_loop():
+        print("[mcp_tools] Shared HTTP session belongs to another event loop, dropping it")
+        return False
+    await session.close()
+    return True
+
+
 # =============================================================================
 # HTTP HELPER
 # =============================================================================
 
+async def _fetch_json(url: str, params: Optional[Dict[str, Any]],
+                      headers: Optional[Dict[str, str]], timeout: int) -> Dict[str, Any]:
+    """One GET on the shared session (or a short-lived one off the app loop), decoded as JSON."""
+    session = get_http_session()
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await _get_json(session, url, params, headers, timeout)
+    return await _get_json(session, url, params, headers, timeout)
+
+
+async def _get_json(session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]],
+                    headers: Optional[Dict[str, str]], timeout: int) -> Dict[str, Any]:
+    async with session.get(url, params=params, headers=headers,
+                           timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+        if resp.status != 200:
+            text = await resp.text()
+            return {"error": f"HTTP {resp.status}: {text[:500]}"}
+        try:
+            return await resp.json()
+        except aiohttp.ContentTypeError:
+            # Some APIs return JSON with wrong content-type
+            text = await resp.text()
+            return json.loads(text)
+
+
 async def _http_get(url: str, params: Optional[Dict[str, Any]] = None,
                     headers: Optional[Dict[str, str]] = None,
-                    timeout: int = 30) -> Dict[str, Any]:
-    """Make an async HTTP GET request and return JSON response."""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params, headers=headers,
-                               timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
-            if resp.status != 200:
-                text = await resp.text()
-                return {"error": f"HTTP {resp.status}: {text[:500]}"}
-            try:
-                return await resp.json()
-            except aiohttp.ContentTypeError:
-                # Some APIs return JSON with wrong content-type
-                text = await resp.text()
-                return json.loads(text)
+                    timeout: int = 30, cache: bool = True) -> Dict[str, Any]:
+    """
+    Make an async HTTP GET request and return the JSON response.
+
+    Successful responses are cached for HEALTHCARE_HTTP_CACHE_TTL seconds.
+    Concurrent calls for the same request (e.g. parallel subagents looking
+    up one NCT ID) await a single upstream request. Error responses are
+    returned to every waiter but never cached.
+    """
+    if not cache:
+        return await _fetch_json(url, params, headers, timeout)
+
+    response_cache = get_http_response_cache()
+    key = response_cache.make_key(url, params, headers)
+    value = response_cache.get_memory(key)
+    if value is not _MISSING:
+        return value
+
+    task = _in_flight.get(key)
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        response_cache.coalesced += 1
+    else:
+        task = asyncio.ensure_future(_cached_fetch(response_cache, key, url, params, headers, timeout))
+        _in_flight[key] = task
+        task.add_done_callback(lambda done: _in_flight.pop(key, None) if _in_flight.get(key) is done else None)
+    # Shielded so one cancelled caller does not cancel the others' request
+    return await asyncio.shield(task)
+
+
+async def _cached_fetch(response_cache: HTTPResponseCache, key: str, url: str,
+                        params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]],
+                        timeout: int) -> Dict[str, Any]:
+    """Disk tier lookup, then upstream fetch; stores successful responses."""
+    if response_cache.disk_dir:
+        value = await asyncio.to_thread(response_cache.get_disk, key)
+    else:
+        value = response_cache.get_disk(key)
+    if value is not _MISSING:
+        return value
+
+    data = await _fetch_json(url, params, headers, timeout)
+    if not (isinstance(data, dict) and "error" in data):
+        if response_cache.disk_dir:
+            await asyncio.to_thread(response_cache.set, key, data)
+        else:
+            response_cache.set(key, data)
+    return data
 
 
 # =============================================================================
@@ -0,0 +1,231 @@
+"""
+Pattern Relevance Index
+=======================
+Inverted index over learned interaction patterns, so
+``LearningStore.get_relevant_patterns`` scores a handful of candidates
+per agent turn instead of every cached pattern.
+
+Postings:
+    domain      - Pattern domain (None for general patterns)
+    keyword     - Words of the example query and of the tool names
+    tool        - Full tool names of the effective tool chain
+
+Ranking is the LearningStore relevance (query type, domain, reinforcement)
+plus a bonus for keywords/tools shared with the query, times the pattern's
+feedback score. Terms shared by more than COMMON_TERM_LIMIT patterns
+carry no bonus (like stopwords), so no lookup walks a long posting list.
+The first part depends only on (domain, query type), so its best
+SHORTLIST_SIZE patterns are memoized per pair. A query scores
+that shortlist plus the patterns its keywords/tools (or, with an embedder,
+its nearest embeddings) point to: a pattern outside both has no bonus and
+cannot outrank the shortlist, so results match a full scan.
+
+The index is immutable; LearningStore drops it whenever the pattern set
+changes (extraction, reload) and builds a new one on the next lookup.
+
+Usage:
+    index = PatternIndex(patterns, relevance_fn=store._compute_relevance)
+    top = index.search(query, query_type="domain_conversion", domain="DM", top_k=3)
+"""
+
+import re
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .feedback import InteractionPattern
+
+
+SHORTLIST_SIZE = 32      # Memoized base-ranked patterns per (domain, query type)
+KEYWORD_WEIGHT = 0.2     # Relevance bonus for full keyword/tool overlap with the query
+VECTOR_WEIGHT = 0.2      # Relevance bonus at cosine similarity 1.0 (embedder only)
+VECTOR_CANDIDATES = 16   # Nearest patterns added as candidates (embedder only)
+COMMON_TERM_LIMIT = 64   # Terms in more patterns than this give no bonus
+
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+_STOPWORDS = {
+    "the", "and", "for", "with", "from", "this", "that", "into", "please",
+    "can", "you", "all", "how", "what", "are", "its", "our", "use", "using",
+}
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+def extract_terms(text: str) -> Tuple[Set[str], Set[str]]:
+    """
+    Split text into (keywords, identifiers).
+
+    Identifiers are underscore-joined tokens as written (possible tool
+    names); keywords are their parts and plain words of 3+ characters.
+    """
+    keywords: Set[str] = set()
+    identifiers: Set[str] = set()
+    for token in _WORD_RE.findall(text.lower()):
+        if "_" in token:
+            identifiers.add(token)
+        for part in token.split("_"):
+            if len(part) >= 3 and part not in _STOPWORDS:
+                keywords.add(part)
+    return keywords, identifiers
+
+
+class PatternIndex:
+    """
+    Read-only candidate index over one snapshot of the learned patterns.
+
+    Args:
+        patterns: Patterns in cache order (domain patterns, then general)
+        relevance_fn: ``(pattern, query_type, domain) -> float`` base relevance
+        embed_fn: Optional batch text embedder; enables the vector index
+        keyword_weight: Bonus for full keyword/tool overlap (0 disables it)
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[InteractionPattern],
+        relevance_fn: Callable[[InteractionPattern, str, Optional[str]], float],
+        embed_fn: Optional[EmbedFn] = None,
+        keyword_weight: float = KEYWORD_WEIGHT,
+    ):
+        self.patterns = list(patterns)
+        self._relevance = relevance_fn
+        self._embed = embed_fn
+        self.keyword_weight = keyword_weight
+        self._lock = threading.Lock()
+        self._shortlists: Dict[Tuple[Optional[str], str], List[Tuple[float, int]]] = {}
+        self._eligible_sets: Dict[Optional[str], Optional[Set[int]]] = {}
+
+        self.by_domain: Dict[Optional[str], List[int]] = defaultdict(list)
+        self.by_keyword: Dict[str, Set[int]] = defaultdict(set)
+        self.by_tool: Dict[str, Set[int]] = defaultdict(set)
+
+        for i, pattern in enumerate(self.patterns):
+            self.by_domain[pattern.domain].append(i)
+            keywords, _ = extract_terms(pattern.user_query_example or "")
+            for tool in pattern.effective_tool_chain:
+                tool = tool.lower()
+                self.by_tool[tool].add(i)
+                keywords.update(extract_terms(tool)[0])
+            for keyword in keywords:
+                self.by_keyword[keyword].add(i)
+
+        self._vectors = None
+        if embed_fn is not None and self.patterns:
+            self._build_vector_index()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    # =========================================================================
+    # SEARCH
+    # =========================================================================
+
+    def search(
+        self,
+        query: str,
+        query_type: str,
+        domain: Optional[str] = None,
+        top_k: int = 3,
+    ) -> List[InteractionPattern]:
+        """Top ``top_k`` patterns for a query, ranked as described in the module docstring."""
+        if not self.patterns or top_k <= 0:
+            return []
+
+        eligible = self._eligible(domain)
+        shortlist = self._shortlist(domain, query_type, eligible, max(SHORTLIST_SIZE, top_k))
+
+        keywords, identifiers = extract_terms(query) if self.keyword_weight else (set(), set())
+        query_terms = keywords | identifiers
+        bonus: Dict[int, float] = defaultdict(float)
+
+        if query_terms:
+            hits: Dict[int, int] = defaultdict(int)
+            postings = [self.by_keyword.get(k, ()) for k in keywords]
+            postings += [self.by_tool.get(t, ()) for t in identifiers]
+            for posting in postings:
+                if len(posting) > COMMON_TERM_LIMIT:
+                    continue
+                for i in posting:
+                    hits[i] += 1
+            for i, count in hits.items():
+                bonus[i] += self.keyword_weight * min(1.0, count / len(query_terms))
+
+        if self._vectors is not None:
+            try:
+                matches = self._vectors.query(self._embed([query])[0], top_k=VECTOR_CANDIDATES,
+                                              include_metadata=False)
+            except Exception as e:
+                print(f"[PatternIndex] Query embedding failed: {e}")
+                matches = []
+            for match in matches:
+                bonus[int(match["id"])] += VECTOR_WEIGHT * max(0.0, match["score"])
+
+        # Shortlist entries carry their base score; only bonus hits are scored here
+        scores = dict((i, base) for base, i in shortlist)
+        for i, extra in bonus.items():
+            if eligible is not None and i not in eligible:
+                continue
+            pattern = self.patterns[i]
+            base = scores.get(i)
+            if base is None:
+                base = self._relevance(pattern, query_type, domain) * pattern.feedback_score
+            scores[i] = base + extra * pattern.feedback_score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self._order(item[0], domain)))
+        return [self.patterns[i] for i, _ in ranked[:top_k]]
+
+    def _eligible(self, domain: Optional[str]) -> Optional[Set[int]]:
+        """Domain patterns plus general ones; None means every pattern (fallback)."""
+        if domain in self._eligible_sets:
+            return self._eligible_sets[domain]
+        eligible = set(self.by_domain.get(None, ()))
+        if domain:
+            eligible.update(self.by_domain.get(domain, ()))
+        with self._lock:
+            self._eligible_sets[domain] = eligible or None
+        return eligible or None
+
+    def _order(self, i: int, domain: Optional[str]) -> Tuple[int, int]:
+        """Tie-break: domain patterns before general ones, then cache order."""
+        return (0 if domain and self.patterns[i].domain == domain else 1, i)
+
+    def _shortlist(
+        self,
+        domain: Optional[str],
+        query_type: str,
+        eligible: Optional[Set[int]],
+        size: int,
+    ) -> List[Tuple[float, int]]:
+        """Memoized best ``size`` eligible ``(base score, index)`` pairs, base = relevance * feedback score."""
+        key = (domain, query_type)
+        with self._lock:
+            cached = self._shortlists.get(key)
+        if cached is not None and (len(cached) >= size or len(cached) == len(eligible or self.patterns)):
+            return cached[:size]
+
+        pool = eligible if eligible is not None else range(len(self.patterns))
+        scored = [
+            (self._relevance(self.patterns[i], query_type, domain) * self.patterns[i].feedback_score, i)
+            for i in pool
+        ]
+        ranked = sorted(scored, key=lambda item: (-item[0], self._order(item[1], domain)))[:size]
+        with self._lock:
+            self._shortlists[key] = ranked
+        return ranked
+
+    # =========================================================================
+    # VECTOR INDEX
+    # =========================================================================
+
+    def _build_vector_index(self) -> None:
+        """Embed each pattern's example query into a LocalVectorIndex."""
+        from ..knowledge_base.local_index import LocalVectorIndex
+
+        try:
+            vectors = self._embed([p.user_query_example or p.query_type for p in self.patterns])
+        except Exception as e:
+            print(f"[PatternIndex] Embedding patterns failed, vector index disabled: {e}")
+            return
+        index = LocalVectorIndex("learned_patterns")
+        index.upsert([{"id": str(i), "values": v} for i, v in enumerate(vectors)])
+        self._vectors = index
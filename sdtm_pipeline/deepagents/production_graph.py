@@ -170,7 +170,8 @@ class ProductionGraph:
         self,
         thread_id: str,
         input_message: Union[str, Dict[str, Any]],
-        create_checkpoint: bool = True
+        create_checkpoint: bool = True,
+        coalesce: Optional[bool] = None
     ) -> AsyncGenerator[StreamChunk, None]:
         """
         Stream agent response with thinking/reasoning separated from output.
@@ -186,6 +187,7 @@ class ProductionGraph:
             thread_id: Session thread ID
             input_message: User message (string or dict with 'messages' key)
             create_checkpoint: Whether to create a checkpoint after the interaction
+            coalesce: Merge token deltas into frames (default STREAM_COALESCE)
 
         Yields:
             StreamChunk objects with typed content
@@ -226,7 +228,8 @@ class ProductionGraph:
         async for chunk in self._session_manager.stream_with_reasoning(
             self._graph,
             thread_id,
-            input_data
+            input_data,
+            coalesce=coalesce
         ):
             collected_content.append(chunk)
             yield chunk
@@ -569,11 +572,12 @@ def get_production_graph() -> ProductionGraph:
 async def stream_with_reasoning(
     thread_id: str,
     message: Union[str, Dict],
-    create_checkpoint: bool = True
+    create_checkpoint: bool = True,
+    coalesce: Optional[bool] = None
 ) -> AsyncGenerator[StreamChunk, None]:
     """Stream with reasoning separation."""
     pg = get_production_graph()
-    async for chunk in pg.stream_with_reasoning(thread_id, message, create_checkpoint):
+    async for chunk in pg.stream_with_reasoning(thread_id, message, create_checkpoint, coalesce):
         yield chunk
 
 
@@ -0,0 +1,53 @@
+"""
+LangGraph Server Lifespan
+=========================
+Startup/shutdown hooks for clients shared across agent runs on the
+server's event loop, so they are closed with the server instead of
+leaking sockets until the process exits.
+
+Shared clients:
+    Neo4j async drivers  - async_utils.get_async_neo4j_driver (per loop)
+    Healthcare API pool  - mcp_tools shared aiohttp session (opened on startup)
+
+Configuration:
+    langgraph.json:
+        "http": {"app": "sdtm_pipeline.deepagents.server_lifespan:app"}
+
+Usage:
+    async with shared_clients_lifespan():
+        ...  # serve requests
+"""
+
+from contextlib import asynccontextmanager
+
+from .async_utils import close_async_neo4j_drivers
+from .mcp_tools import close_http_session, open_http_session
+
+try:
+    from starlette.applications import Starlette
+    STARLETTE_AVAILABLE = True
+except ImportError:
+    STARLETTE_AVAILABLE = False
+
+
+async def close_shared_clients() -> None:
+    """Close every shared client bound to the current event loop."""
+    await close_http_session()
+    closed = await close_async_neo4j_drivers()
+    if closed:
+        print(f"[ServerLifespan] Closed {closed} Neo4j driver(s)")
+
+
+@asynccontextmanager
+async def shared_clients_lifespan(app=None):
+    """Lifespan context: opens the shared HTTP pool, closes every shared client on exit."""
+    await open_http_session()
+    try:
+        yield
+    finally:
+        await close_shared_clients()
+
+
+# Custom app mounted by the LangGraph server (langgraph.json "http.app");
+# it adds no routes, only the lifespan
+app = Starlette(lifespan=shared_clients_lifespan) if STARLETTE_AVAILABLE else None
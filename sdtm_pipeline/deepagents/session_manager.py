@@ -14,13 +14,19 @@ import json
 import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, AsyncGenerator, Literal
+from typing import Dict, List, Any, Callable, Optional, Tuple, AsyncGenerator, Literal
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 import pickle
 import hashlib
+import time
+from urllib.parse import quote
 from dotenv import load_dotenv
 
+from .checkpoint_store import CheckpointStore
+from .session_store import SessionStore, create_session_store
+from .stream_log import STREAM_LOG_CAPACITY, STREAM_LOG_SPILL, StreamLog
+
 load_dotenv()
 
 
@@ -37,13 +43,26 @@ RECURSION_LIMIT = int(os.getenv("LANGGRAPH_RECURSION_LIMIT", "250"))
 
 SESSION_STORAGE_DIR = Path(os.getenv("SESSION_STORAGE_DIR", "./.sessions"))
 CHECKPOINT_DIR = SESSION_STORAGE_DIR / "checkpoints"
-SESSION_METADATA_FILE = SESSION_STORAGE_DIR / "sessions.json"
+SESSION_METADATA_FILE = SESSION_STORAGE_DIR / "sessions.json"  # json backend only
 
 # Ensure directories exist
 SESSION_STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
 
 
+# =============================================================================
+# STREAM COALESCING CONFIGURATION
+# =============================================================================
+# Coalesced mode merges consecutive same-type token deltas into frames,
+# emitted when the frame reaches STREAM_COALESCE_CHARS or has been open
+# for STREAM_COALESCE_MS (checked as each event arrives)
+STREAM_COALESCE = os.getenv("STREAM_COALESCE", "false").lower() in ("1", "true", "yes")
+STREAM_COALESCE_MS = float(os.getenv("STREAM_COALESCE_MS", "20"))
+STREAM_COALESCE_CHARS = int(os.getenv("STREAM_COALESCE_CHARS", "1024"))
+STREAM_COALESCE_QUEUE = int(os.getenv("STREAM_COALESCE_QUEUE", "256"))  # Events read ahead of the coalescer
+TOOL_RESULT_PREVIEW_CHARS = 500
+
+
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
@@ -82,6 +101,102 @@ class StreamChunk:
             "timestamp": self.timestamp
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamChunk":
+        return cls(
+            content_type=StreamContentType(data["content_type"]),
+            content=data["content"],
+            metadata=data.get("metadata", {}),
+            timestamp=data.get("timestamp", ""),
+        )
+
+
+class StreamFrame:
+    """
+    Coalesced stream chunk used by the coalesced streaming mode.
+
+    Same interface as StreamChunk, but slotted (no per-instance dict) and
+    serialized to JSON at most once, so the frame can be logged and sent
+    to clients without re-encoding.
+    """
+    __slots__ = ("content_type", "content", "metadata", "timestamp", "_json")
+
+    def __init__(
+        self,
+        content_type: StreamContentType,
+        content: str,
+        metadata: Dict[str, Any],
+        timestamp: Optional[str] = None
+    ):
+        self.content_type = content_type
+        self.content = content
+        self.metadata = metadata
+        self.timestamp = timestamp or datetime.utcnow().isoformat()
+        self._json: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "content_type": self.content_type.value,
+            "content": self.content,
+            "metadata": self.metadata,
+            "timestamp": self.timestamp
+        }
+
+    @property
+    def json(self) -> str:
+        """JSON form of ``to_dict()``, computed once."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), default=str)
+        return self._json
+
+
+def _iter_stream_deltas(event: Dict[str, Any]):
+    """(content_type, text) pairs carried by an ``on_chat_model_stream`` event."""
+    content = getattr(event.get("data", {}).get("chunk"), "content", None)
+    if isinstance(content, str):
+        if content:
+            yield StreamContentType.TEXT, content
+        return
+    if not isinstance(content, list):
+        return
+    for block in content:
+        if isinstance(block, dict):
+            block_type = block.get("type")
+            text = block.get("thinking" if block_type == "thinking" else "text")
+        else:
+            block_type = getattr(block, "type", None)
+            text = getattr(block, "thinking" if block_type == "thinking" else "text", None)
+        if not text:
+            continue
+        if block_type == "thinking":
+            yield StreamContentType.THINKING, text
+        elif block_type == "text":
+            yield StreamContentType.TEXT, text
+
+
+class _StreamControl:
+    """Non-event item on the coalescer's queue."""
+    __slots__ = ()
+
+
+class _WindowEnd(_StreamControl):
+    """The coalescing window of frame ``frame_no`` has ended."""
+    __slots__ = ("frame_no",)
+
+    def __init__(self, frame_no: int):
+        self.frame_no = frame_no
+
+
+class _StreamError(_StreamControl):
+    """The event stream raised ``error``."""
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+_STREAM_END = _StreamControl()
+
 
 @dataclass
 class Checkpoint:
@@ -102,6 +217,22 @@ class Checkpoint:
     def from_dict(cls, data: Dict[str, Any]) -> "Checkpoint":
         return cls(**data)
 
+    @classmethod
+    def lazy(cls, state_loader: Callable[[], Dict[str, Any]], **metadata) -> "Checkpoint":
+        """Checkpoint whose ``state`` is only rebuilt when first accessed."""
+        checkpoint = cls.__new__(cls)
+        checkpoint.__dict__.update(metadata)
+        checkpoint.__dict__["_state_loader"] = state_loader
+        return checkpoint
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached while a lazy checkpoint's state is still unset
+        loader = self.__dict__.get("_state_loader")
+        if name == "state" and loader is not None:
+            self.state = loader()
+            return self.state
+        raise AttributeError(name)
+
 
 @dataclass
 class Session:
@@ -174,19 +305,24 @@ class SessionManager:
     3. **Time Travel**: Supports branching and checkpoint navigation
     """
 
-    def __init__(self, storage_dir: Optional[Path] = None):
+    def __init__(self, storage_dir: Optional[Path] = None, store_backend: Optional[str] = None):
         self.storage_dir = storage_dir or SESSION_STORAGE_DIR
         self.checkpoint_dir = self.storage_dir / "checkpoints"
-        self.sessions_file = self.storage_dir / "sessions.json"
 
         # Ensure directories exist
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
+        # Session persistence (sqlite / files / json, see session_store)
+        self._store: SessionStore = create_session_store(self.storage_dir, store_backend)
+
+        # Delta-encoded, content-addressed checkpoint files
+        self._checkpoint_store = CheckpointStore(self.checkpoint_dir, Checkpoint.lazy)
+
         # In-memory cache
         self._sessions: Dict[str, Session] = {}
         self._checkpoints: Dict[str, Checkpoint] = {}
-        self._stream_buffers: Dict[str, List[StreamChunk]] = {}
+        self._stream_buffers: Dict[str, StreamLog] = {}  # Bounded replay log per thread
 
         # Load existing sessions
         self._load_sessions()
@@ -229,7 +365,7 @@ class SessionManager:
         session.branches["main"] = initial_checkpoint.checkpoint_id
 
         self._sessions[thread_id] = session
-        self._save_sessions()
+        self._save_session(thread_id)
 
         print(f"[SessionManager] Created session: {thread_id}")
         return session
@@ -264,7 +400,7 @@ class SessionManager:
         if session:
             session.status = status
             session.updated_at = datetime.utcnow().isoformat()
-            self._save_sessions()
+            self._save_session(thread_id)
         return session
 
     # =========================================================================
@@ -276,7 +412,8 @@ class SessionManager:
         graph,
         thread_id: str,
         input_message: Dict[str, Any],
-        config: Optional[Dict] = None
+        config: Optional[Dict] = None,
+        coalesce: Optional[bool] = None
     ) -> AsyncGenerator[StreamChunk, None]:
         """
         Stream agent response with thinking/reasoning separated from final output.
@@ -284,6 +421,10 @@ class SessionManager:
         This generator yields StreamChunk objects with content_type indicating
         whether the content is THINKING (internal reasoning) or TEXT (final response).
 
+        With ``coalesce`` (default STREAM_COALESCE), consecutive THINKING or
+        TEXT deltas are merged into StreamFrame objects instead of one chunk
+        per token; see ``_coalesce_events``.
+
         Usage:
             async for chunk in session_manager.stream_with_reasoning(graph, thread_id, input):
                 if chunk.content_type == StreamContentType.THINKING:
@@ -299,9 +440,8 @@ class SessionManager:
         session.status = SessionStatus.ACTIVE
         session.updated_at = datetime.utcnow().isoformat()
 
-        # Initialize stream buffer for reconnection
-        if thread_id not in self._stream_buffers:
-            self._stream_buffers[thread_id] = []
+        # Replay log for reconnection; positions continue across turns
+        stream_log = self._stream_log(thread_id)
 
         stream_config = config or {}
         stream_config["configurable"] = stream_config.get("configurable", {})
@@ -309,16 +449,24 @@ class SessionManager:
         # Apply recursion limit for complex SDTM workflows
         stream_config["recursion_limit"] = stream_config.get("recursion_limit", RECURSION_LIMIT)
 
-        position = 0
+        position = stream_log.next_position
         current_thinking = []
         thinking_complete = False
+        if coalesce is None:
+            coalesce = STREAM_COALESCE
 
         try:
-            async for event in graph.astream_events(
+            events = graph.astream_events(
                 input_message,
                 config=stream_config,
                 version="v2"
-            ):
+            )
+            if coalesce:
+                async for frame in self._coalesce_events(events, session, stream_log):
+                    yield frame
+                return
+
+            async for event in events:
                 kind = event.get("event", "")
 
                 # Handle extended thinking blocks (Claude's internal reasoning)
@@ -343,7 +491,7 @@ class SessionManager:
                                             content=thinking_text,
                                             metadata={"position": position, "block_type": "thinking"}
                                         )
-                                        self._stream_buffers[thread_id].append(chunk)
+                                        stream_log.append(chunk)
                                         session.last_stream_position = position
                                         position += 1
                                         yield chunk
@@ -357,7 +505,7 @@ class SessionManager:
                                             content=text,
                                             metadata={"position": position, "block_type": "text"}
                                         )
-                                        self._stream_buffers[thread_id].append(chunk)
+                                        stream_log.append(chunk)
                                         session.last_stream_position = position
                                         position += 1
                                         yield chunk
@@ -369,7 +517,7 @@ class SessionManager:
                                 content=content,
                                 metadata={"position": position}
                             )
-                            self._stream_buffers[thread_id].append(chunk)
+                            stream_log.append(chunk)
                             session.last_stream_position = position
                             position += 1
                             yield chunk
@@ -388,7 +536,7 @@ class SessionManager:
                             "tool_input": tool_input
                         }
                     )
-                    self._stream_buffers[thread_id].append(chunk)
+                    stream_log.append(chunk)
                     session.last_stream_position = position
                     position += 1
                     yield chunk
@@ -402,7 +550,7 @@ class SessionManager:
                         content=str(tool_output)[:500],  # Truncate long outputs
                         metadata={"position": position, "full_output_length": len(str(tool_output))}
                     )
-                    self._stream_buffers[thread_id].append(chunk)
+                    stream_log.append(chunk)
                     session.last_stream_position = position
                     position += 1
                     yield chunk
@@ -412,16 +560,144 @@ class SessionManager:
             error_chunk = StreamChunk(
                 content_type=StreamContentType.ERROR,
                 content=str(e),
-                metadata={"position": position, "error_type": type(e).__name__}
+                metadata={"position": stream_log.next_position, "error_type": type(e).__name__}
             )
-            self._stream_buffers[thread_id].append(error_chunk)
+            stream_log.append(error_chunk)
             session.status = SessionStatus.DISCONNECTED
             yield error_chunk
 
         finally:
             # Update session
             session.updated_at = datetime.utcnow().isoformat()
-            self._save_sessions()
+            # Release the segment files until the next turn streams
+            stream_log.close()
+            self._save_session(thread_id)
+
+    async def _coalesce_events(
+        self,
+        events,
+        session: Session,
+        stream_log: StreamLog,
+        window_ms: float = STREAM_COALESCE_MS,
+        max_chars: int = STREAM_COALESCE_CHARS
+    ) -> AsyncGenerator[StreamFrame, None]:
+        """
+        Turn graph events into coalesced frames.
+
+        Token deltas of the same type are joined until the type changes, the
+        frame reaches ``max_chars`` or it has been open for ``window_ms``.
+        Tool events flush the open frame and become frames of their own.
+
+        Events are read by one pump task into a bounded queue, and each open
+        frame arms a single ``call_later`` timer that queues a window-end
+        marker, so a stall in the model stream sends the frame on time
+        without a future or timeout per event. A frame still open when the
+        stream raises is sent before the error propagates.
+        """
+        window = window_ms / 1000.0
+        clock = time.monotonic
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_COALESCE_QUEUE)
+        parts: List[str] = []
+        frame_type: Optional[StreamContentType] = None
+        frame_chars = 0
+        frame_no = 0
+        opened_at = 0.0
+        timer: Optional[asyncio.TimerHandle] = None
+
+        def emit(content_type: StreamContentType, content: str, metadata: Dict[str, Any]) -> StreamFrame:
+            metadata["position"] = stream_log.next_position
+            frame = StreamFrame(content_type, content, metadata)
+            stream_log.append(frame)
+            session.last_stream_position = metadata["position"]
+            return frame
+
+        def flush() -> StreamFrame:
+            nonlocal frame_type, frame_chars, frame_no
+            block_type = "thinking" if frame_type is StreamContentType.THINKING else "text"
+            frame = emit(frame_type, "".join(parts), {"block_type": block_type, "deltas": len(parts)})
+            parts.clear()
+            frame_type = None
+            frame_chars = 0
+            frame_no += 1
+            timer.cancel()
+            return frame
+
+        def window_ended(number: int) -> None:
+            try:
+                queue.put_nowait(_WindowEnd(number))
+            except asyncio.QueueFull:
+                pass  # Events are waiting; the elapsed-window check flushes the frame
+
+        async def pump() -> None:
+            try:
+                async for event in events:
+                    await queue.put(event)
+                await queue.put(_STREAM_END)
+            except Exception as e:
+                await queue.put(_StreamError(e))
+            finally:
+                aclose = getattr(events, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        reader = asyncio.ensure_future(pump())
+        try:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    item = await queue.get()
+
+                if isinstance(item, _StreamControl):
+                    if item is _STREAM_END:
+                        break
+                    if isinstance(item, _StreamError):
+                        if parts:
+                            yield flush()
+                        raise item.error
+                    if item.frame_no == frame_no and parts:
+                        yield flush()
+                    continue
+
+                kind = item.get("event", "")
+
+                if kind == "on_chat_model_stream":
+                    for content_type, text in _iter_stream_deltas(item):
+                        if parts and content_type is not frame_type:
+                            yield flush()
+                        if not parts:
+                            frame_type = content_type
+                            opened_at = clock()
+                            timer = loop.call_later(window, window_ended, frame_no)
+                        parts.append(text)
+                        frame_chars += len(text)
+                        if frame_chars >= max_chars or clock() - opened_at >= window:
+                            yield flush()
+
+                elif kind == "on_tool_start":
+                    if parts:
+                        yield flush()
+                    tool_name = item.get("name", "unknown")
+                    yield emit(StreamContentType.TOOL_CALL, f"Calling tool: {tool_name}", {
+                        "tool_name": tool_name,
+                        "tool_input": item.get("data", {}).get("input", {})
+                    })
+
+                elif kind == "on_tool_end":
+                    if parts:
+                        yield flush()
+                    output = str(item.get("data", {}).get("output", ""))
+                    yield emit(StreamContentType.TOOL_RESULT, output[:TOOL_RESULT_PREVIEW_CHARS], {
+                        "full_output_length": len(output)
+                    })
+
+            if parts:
+                yield flush()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            reader.cancel()
 
     def get_thinking_summary(self, thread_id: str) -> Optional[ThinkingBlock]:
         """
@@ -429,7 +705,10 @@ class SessionManager:
 
         Returns aggregated thinking content with token count estimation.
         """
-        buffer = self._stream_buffers.get(thread_id, [])
+        stream_log = self._stream_log(thread_id, create=False)
+        if stream_log is None:
+            return None
+        buffer = stream_log.in_memory()
 
         thinking_chunks = [
             c for c in buffer
@@ -500,14 +779,12 @@ class SessionManager:
                 "error": "Invalid reconnect token"
             }
 
-        # Get buffered chunks since last position
-        buffer = self._stream_buffers.get(thread_id, [])
+        # Get buffered chunks since last position (read by position, not scanned)
         pending_from_position = session.last_stream_position
-
+        stream_log = self._stream_log(thread_id, create=False)
         pending_chunks = [
-            c.to_dict() for c in buffer
-            if c.metadata.get("position", 0) >= pending_from_position
-        ]
+            c.to_dict() for c in stream_log.read_from(pending_from_position)
+        ] if stream_log is not None else []
 
         return {
             "success": True,
@@ -558,21 +835,17 @@ class SessionManager:
         session.status = SessionStatus.ACTIVE
         session.updated_at = datetime.utcnow().isoformat()
 
-        # First, yield any buffered chunks from the last position
-        buffer = self._stream_buffers.get(thread_id, [])
+        # First, yield the chunks missed since from_position
+        stream_log = self._stream_log(thread_id, create=False)
 
-        for chunk in buffer:
-            chunk_position = chunk.metadata.get("position", 0)
-            if chunk_position >= from_position:
-                yield chunk
+        for chunk in stream_log.read_from(from_position) if stream_log is not None else ():
+            yield chunk
 
         # Update the session's stream position
-        if buffer:
-            session.last_stream_position = max(
-                c.metadata.get("position", 0) for c in buffer
-            )
+        if stream_log is not None and stream_log.next_position:
+            session.last_stream_position = stream_log.last_position
 
-        self._save_sessions()
+        self._save_session(thread_id)
 
     def mark_session_reconnectable(self, thread_id: str) -> Dict[str, Any]:
         """
@@ -594,7 +867,7 @@ class SessionManager:
         session.status = SessionStatus.PAUSED
         session.updated_at = datetime.utcnow().isoformat()
 
-        self._save_sessions()
+        self._save_session(thread_id)
 
         return {
             "success": True,
@@ -649,7 +922,7 @@ class SessionManager:
             session.checkpoints.append(checkpoint_id)
             session.current_checkpoint_id = checkpoint_id
             session.updated_at = datetime.utcnow().isoformat()
-            self._save_sessions()
+            self._save_session(thread_id)
 
         print(f"[SessionManager] Created checkpoint: {checkpoint_id} (parent: {parent_checkpoint_id})")
         return checkpoint
@@ -660,16 +933,11 @@ class SessionManager:
         if checkpoint_id in self._checkpoints:
             return self._checkpoints[checkpoint_id]
 
-        # Load from disk
-        checkpoint_file = self.checkpoint_dir / f"{checkpoint_id}.json"
-        if checkpoint_file.exists():
-            with open(checkpoint_file, "r") as f:
-                data = json.load(f)
-                checkpoint = Checkpoint.from_dict(data)
-                self._checkpoints[checkpoint_id] = checkpoint
-                return checkpoint
-
-        return None
+        # Load from disk (state is rebuilt from message deltas on first use)
+        checkpoint = self._checkpoint_store.load(checkpoint_id)
+        if checkpoint:
+            self._checkpoints[checkpoint_id] = checkpoint
+        return checkpoint
 
     def list_checkpoints(
         self,
@@ -725,10 +993,12 @@ class SessionManager:
         session.updated_at = datetime.utcnow().isoformat()
 
         # Clear stream buffer (we're going back in time)
-        self._stream_buffers[thread_id] = []
+        stream_log = self._stream_log(thread_id, create=False)
+        if stream_log is not None:
+            stream_log.clear()
         session.last_stream_position = 0
 
-        self._save_sessions()
+        self._save_session(thread_id)
 
         # Record feedback signal: time travel indicates user dissatisfaction
         try:
@@ -807,7 +1077,7 @@ class SessionManager:
         session.current_checkpoint_id = branch_checkpoint.checkpoint_id
         session.updated_at = datetime.utcnow().isoformat()
 
-        self._save_sessions()
+        self._save_session(thread_id)
 
         # Record feedback signal: branching indicates user exploring alternatives
         try:
@@ -848,10 +1118,12 @@ class SessionManager:
         session.updated_at = datetime.utcnow().isoformat()
 
         # Clear stream buffer
-        self._stream_buffers[thread_id] = []
+        stream_log = self._stream_log(thread_id, create=False)
+        if stream_log is not None:
+            stream_log.clear()
         session.last_stream_position = 0
 
-        self._save_sessions()
+        self._save_session(thread_id)
 
         checkpoint = self.get_checkpoint(checkpoint_id)
 
@@ -891,6 +1163,7 @@ class SessionManager:
         Compare two checkpoints and return their differences.
 
         Useful for understanding what changed between points in time.
+        Compares message hashes only; no message bodies are loaded.
         """
         cp1 = self.get_checkpoint(checkpoint_id_1)
         cp2 = self.get_checkpoint(checkpoint_id_2)
@@ -898,12 +1171,8 @@ class SessionManager:
         if not cp1 or not cp2:
             return {"success": False, "error": "One or both checkpoints not found"}
 
-        messages1 = cp1.state.get("messages", [])
-        messages2 = cp2.state.get("messages", [])
-
-        # Find message differences
-        added_messages = messages2[len(messages1):] if len(messages2) > len(messages1) else []
-        removed_messages = messages1[len(messages2):] if len(messages1) > len(messages2) else []
+        delta = self._checkpoint_store.diff(checkpoint_id_1, checkpoint_id_2) or \
+            {"common_prefix": 0, "added": 0, "removed": 0}
 
         return {
             "success": True,
@@ -920,8 +1189,9 @@ class SessionManager:
                 "branch": cp2.branch_name
             },
             "message_count_diff": cp2.message_count - cp1.message_count,
-            "added_messages_count": len(added_messages),
-            "removed_messages_count": len(removed_messages)
+            "common_messages_count": delta["common_prefix"],
+            "added_messages_count": delta["added"],
+            "removed_messages_count": delta["removed"]
         }
 
     def get_history_tree(self, thread_id: str) -> Dict[str, Any]:
@@ -962,35 +1232,45 @@ class SessionManager:
     # =========================================================================
 
     def _load_sessions(self):
-        """Load sessions from disk."""
-        if self.sessions_file.exists():
-            try:
-                with open(self.sessions_file, "r") as f:
-                    data = json.load(f)
-                    for thread_id, session_data in data.items():
-                        self._sessions[thread_id] = Session.from_dict(session_data)
-                print(f"[SessionManager] Loaded {len(self._sessions)} sessions")
-            except Exception as e:
-                print(f"[SessionManager] Error loading sessions: {e}")
+        """Load sessions from the session store."""
+        try:
+            for thread_id, session_data in self._store.load_all().items():
+                self._sessions[thread_id] = Session.from_dict(session_data)
+            if self._sessions:
+                print(f"[SessionManager] Loaded {len(self._sessions)} sessions ({self._store.backend})")
+        except Exception as e:
+            print(f"[SessionManager] Error loading sessions: {e}")
 
-    def _save_sessions(self):
-        """Save sessions to disk."""
+    def _save_session(self, thread_id: str):
+        """Persist one session (O(1) in the number of sessions for sqlite/files)."""
+        session = self._sessions.get(thread_id)
+        if session is None:
+            return
         try:
-            data = {
-                thread_id: session.to_dict()
-                for thread_id, session in self._sessions.items()
-            }
-            with open(self.sessions_file, "w") as f:
-                json.dump(data, f, indent=2)
+            self._store.save(thread_id, session.to_dict())
         except Exception as e:
-            print(f"[SessionManager] Error saving sessions: {e}")
+            print(f"[SessionManager] Error saving session {thread_id}: {e}")
+
+    def _stream_log(self, thread_id: str, create: bool = True) -> Optional[StreamLog]:
+        """
+        Replay log of a thread, resuming its disk segment after a restart.
+
+        With ``create=False`` (read-only lookups) a thread that has never
+        streamed gets None instead of a new log.
+        """
+        stream_log = self._stream_buffers.get(thread_id)
+        if stream_log is None:
+            spill_path = self.storage_dir / "streams" / quote(thread_id, safe="") if STREAM_LOG_SPILL else None
+            if not create and (spill_path is None or not StreamLog.segment_exists(spill_path)):
+                return None
+            stream_log = StreamLog(STREAM_LOG_CAPACITY, spill_path, decode=StreamChunk.from_dict)
+            self._stream_buffers[thread_id] = stream_log
+        return stream_log
 
     def _save_checkpoint(self, checkpoint: Checkpoint):
-        """Save a checkpoint to disk."""
-        checkpoint_file = self.checkpoint_dir / f"{checkpoint.checkpoint_id}.json"
+        """Save a checkpoint to disk as a message delta over its parent."""
         try:
-            with open(checkpoint_file, "w") as f:
-                json.dump(checkpoint.to_dict(), f, indent=2)
+            self._checkpoint_store.save(checkpoint)
         except Exception as e:
             print(f"[SessionManager] Error saving checkpoint: {e}")
 
@@ -1008,22 +1288,27 @@ class SessionManager:
             # Remove checkpoints
             session = self._sessions[thread_id]
             for cp_id in session.checkpoints:
-                cp_file = self.checkpoint_dir / f"{cp_id}.json"
-                if cp_file.exists():
-                    cp_file.unlink()
+                self._checkpoint_store.delete(cp_id)
                 if cp_id in self._checkpoints:
                     del self._checkpoints[cp_id]
 
             # Remove session
             del self._sessions[thread_id]
+            try:
+                self._store.delete(thread_id)
+            except Exception as e:
+                print(f"[SessionManager] Error deleting session {thread_id}: {e}")
 
-            # Remove stream buffer
-            if thread_id in self._stream_buffers:
-                del self._stream_buffers[thread_id]
+            # Remove stream buffer and its disk segment
+            stream_log = self._stream_log(thread_id, create=False)
+            if stream_log is not None:
+                stream_log.delete()
+            self._stream_buffers.pop(thread_id, None)
 
         if to_remove:
+            # Drop message objects only the removed checkpoints referenced
+            self._checkpoint_store.collect_garbage()
             print(f"[SessionManager] Cleaned up {len(to_remove)} old sessions")
-            self._save_sessions()
 
 
 # =============================================================================
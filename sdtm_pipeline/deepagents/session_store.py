@@ -0,0 +1,298 @@
+"""
+Session Stores for SessionManager
+=================================
+Persistence backends for session metadata. Every backend writes one session
+per update, so save cost no longer grows with the number of sessions held
+by the server, and concurrent workers only ever touch their own rows/files.
+
+Backends (SESSION_STORE_BACKEND):
+    sqlite  - Single SQLite database in WAL mode (default). Readers never
+              block the writer; each save is one row upsert
+    files   - One JSON file per session, replaced atomically on save
+    json    - Legacy single ``sessions.json`` rewritten on every save
+              (kept for compatibility; O(total sessions) per save)
+
+Storage Architecture:
+    .sessions/
+        sessions.db           - sqlite backend (+ -wal/-shm files)
+        sessions/<id>.json    - files backend
+        sessions/.legacy_imported - files backend marker: sessions.json
+                                    was imported
+        sessions.json         - json backend; imported once by the other
+                                backends when their store is empty, and
+                                left in place for the json backend
+
+Usage:
+    from .session_store import create_session_store
+
+    store = create_session_store(Path("./.sessions"))
+    store.save(thread_id, session.to_dict())
+    sessions = store.load_all()
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import quote, unquote
+
+
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "sqlite").lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SESSION_STORE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def _atomic_write_json(path: Path, data: Any, indent: Optional[int] = None) -> None:
+    """Write JSON to a temp file in the same directory, then rename over ``path``."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class SessionStore:
+    """Interface shared by the session persistence backends."""
+
+    backend = "base"
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        """Return every stored session as ``{thread_id: session_dict}``."""
+        raise NotImplementedError
+
+    def save(self, thread_id: str, data: Dict[str, Any]) -> None:
+        """Insert or replace one session."""
+        raise NotImplementedError
+
+    def save_many(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """Insert or replace several sessions."""
+        for thread_id, data in sessions.items():
+            self.save(thread_id, data)
+
+    def delete(self, thread_id: str) -> None:
+        """Remove one session (no-op if absent)."""
+        raise NotImplementedError
+
+    def legacy_imported(self) -> bool:
+        """Whether the legacy ``sessions.json`` has already been imported."""
+        return True
+
+    def mark_legacy_imported(self) -> None:
+        """Record that the legacy ``sessions.json`` was imported."""
+
+    def close(self) -> None:
+        pass
+
+
+class JSONSessionStore(SessionStore):
+    """
+    Legacy backend: all sessions in one ``sessions.json``.
+
+    Every save rewrites the whole file, so it is only suitable for small
+    deployments and a single worker.
+    """
+
+    backend = "json"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self._sessions = json.load(f)
+        return dict(self._sessions)
+
+    def save(self, thread_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sessions[thread_id] = data
+            self._flush()
+
+    def save_many(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._sessions.update(sessions)
+            self._flush()
+
+    def delete(self, thread_id: str) -> None:
+        with self._lock:
+            if self._sessions.pop(thread_id, None) is not None:
+                self._flush()
+
+    def _flush(self) -> None:
+        _atomic_write_json(self.path, self._sessions, indent=2)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions as rows of one SQLite table, in WAL mode.
+
+    Each thread gets its own connection; writers from other threads or
+    processes wait up to SESSION_STORE_BUSY_TIMEOUT_MS for the write lock
+    instead of failing.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                thread_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at TEXT
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+            # WAL keeps committed data safe with NORMAL; only the last
+            # transaction can be lost on power failure
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._connection().execute("SELECT thread_id, data FROM sessions").fetchall()
+        return {thread_id: json.loads(data) for thread_id, data in rows}
+
+    def save(self, thread_id: str, data: Dict[str, Any]) -> None:
+        self.save_many({thread_id: data})
+
+    def save_many(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO sessions (thread_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET data = excluded.data, "
+                "updated_at = excluded.updated_at",
+                [
+                    (thread_id, json.dumps(data), data.get("updated_at"))
+                    for thread_id, data in sessions.items()
+                ],
+            )
+
+    def delete(self, thread_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE thread_id = ?", (thread_id,))
+
+    def legacy_imported(self) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM state WHERE key = 'legacy_imported'"
+        ).fetchone()
+        return row is not None
+
+    def mark_legacy_imported(self) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('legacy_imported', '1')")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class FileSessionStore(SessionStore):
+    """
+    One JSON file per session, written to a temp file and renamed into
+    place, so a reader never sees a partial session and writers to
+    different sessions never touch the same file.
+    """
+
+    backend = "files"
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, thread_id: str) -> Path:
+        return self.directory / f"{quote(thread_id, safe='')}.json"
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        sessions = {}
+        for path in self.directory.glob("*.json"):
+            try:
+                with open(path, "r") as f:
+                    sessions[unquote(path.stem)] = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[SessionStore] Skipping unreadable session file {path.name}: {e}")
+        return sessions
+
+    def save(self, thread_id: str, data: Dict[str, Any]) -> None:
+        _atomic_write_json(self._path(thread_id), data)
+
+    def delete(self, thread_id: str) -> None:
+        try:
+            self._path(thread_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def legacy_imported(self) -> bool:
+        return (self.directory / ".legacy_imported").exists()
+
+    def mark_legacy_imported(self) -> None:
+        (self.directory / ".legacy_imported").touch()
+
+
+# =============================================================================
+# FACTORY
+# =============================================================================
+
+def create_session_store(storage_dir: Path, backend: Optional[str] = None) -> SessionStore:
+    """
+    Open the session store under ``storage_dir``.
+
+    Args:
+        storage_dir: Session storage directory
+        backend: "sqlite", "files" or "json" (default SESSION_STORE_BACKEND)
+
+    A new sqlite/files store is seeded from an existing ``sessions.json``
+    once; the import is recorded in the store, so sessions deleted later
+    are not imported again and the file stays usable by the json backend.
+    """
+    backend = (backend or SESSION_STORE_BACKEND).lower()
+    legacy_file = Path(storage_dir) / "sessions.json"
+
+    if backend == "json":
+        return JSONSessionStore(legacy_file)
+    if backend == "sqlite":
+        store: SessionStore = SQLiteSessionStore(Path(storage_dir) / "sessions.db")
+    elif backend == "files":
+        store = FileSessionStore(Path(storage_dir) / "sessions")
+    else:
+        raise ValueError(f"Unknown session store backend: {backend}")
+
+    if legacy_file.exists() and not store.legacy_imported():
+        try:
+            # A store that already holds sessions is never overwritten
+            if not store.load_all():
+                legacy = JSONSessionStore(legacy_file).load_all()
+                store.save_many(legacy)
+                print(f"[SessionStore] Imported {len(legacy)} sessions from {legacy_file}")
+            store.mark_legacy_imported()
+        except Exception as e:
+            print(f"[SessionStore] Could not import {legacy_file}: {e}")
+
+    return store
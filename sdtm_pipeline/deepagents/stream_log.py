@@ -0,0 +1,272 @@
+"""
+Stream Replay Log
+=================
+Per-thread log of streamed chunks used to replay missed output when a
+client reconnects.
+
+Chunks are addressed by their stream position:
+- The most recent ``capacity`` chunks live in a fixed-size ring buffer, so
+  memory per session is bounded and reading from a position is a slice,
+  not a scan
+- Optionally every chunk is also appended to an on-disk segment; older
+  positions evicted from the ring (or lost with a process restart) are
+  read back from there by seeking, not scanning
+- Segment files are opened on the first append and closed by ``close()``
+  at the end of each stream, so idle threads hold no file descriptors and
+  a log that is only read never creates files
+- A segment reopened after a crash is truncated back to its last complete
+  chunk, so every remaining line is still at the position its index says
+
+Storage Architecture:
+    .sessions/streams/
+        <thread_id>.log       - Append-only JSON lines, one chunk per line
+        <thread_id>.idx       - Byte offset of each line (uint64 LE), so
+                                position N is at idx[N * 8]
+
+Configuration:
+    STREAM_LOG_CAPACITY  - Chunks kept in memory per thread (default 2000)
+    STREAM_LOG_SPILL     - Also write chunks to disk segments (default true)
+
+Usage:
+    log = StreamLog(capacity=2000, spill_path=Path(".sessions/streams/t1"),
+                    decode=StreamChunk.from_dict)
+    position = log.next_position
+    log.append(chunk)
+    missed = log.read_from(last_seen + 1)
+"""
+
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+
+STREAM_LOG_CAPACITY = int(os.getenv("STREAM_LOG_CAPACITY", "2000"))
+STREAM_LOG_SPILL = os.getenv("STREAM_LOG_SPILL", "true").lower() in ("1", "true", "yes")
+
+_OFFSET = struct.Struct("<Q")
+
+
+class StreamLog:
+    """
+    Bounded, position-addressed log of one thread's stream chunks.
+
+    Args:
+        capacity: Chunks held in memory
+        spill_path: Segment path without suffix (``.log``/``.idx`` are
+            added); None keeps the log in memory only
+        decode: Builds a chunk from its ``to_dict()`` form when reading
+            back from disk
+    """
+
+    def __init__(
+        self,
+        capacity: int = STREAM_LOG_CAPACITY,
+        spill_path: Optional[Path] = None,
+        decode: Optional[Callable[[dict], Any]] = None
+    ):
+        self.capacity = max(1, capacity)
+        self._ring: List[Any] = [None] * self.capacity
+        self._decode = decode or (lambda data: data)
+        self._lock = threading.Lock()
+
+        # Positions [start_position, next_position) are in the ring
+        self.start_position = 0
+        self.next_position = 0
+
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._log_file = None
+        self._idx_file = None
+        self._log_size = 0
+        if self.spill_path:
+            self._recover_segment()
+
+    @staticmethod
+    def segment_exists(spill_path: Path) -> bool:
+        """Whether a disk segment was written for ``spill_path``."""
+        spill_path = Path(spill_path)
+        return spill_path.with_name(spill_path.name + ".log").exists()
+
+    # =========================================================================
+    # WRITING
+    # =========================================================================
+
+    def append(self, chunk: Any) -> int:
+        """Add a chunk at ``next_position`` and return that position."""
+        with self._lock:
+            position = self.next_position
+            self._ring[position % self.capacity] = chunk
+            self.next_position += 1
+            if self.next_position - self.start_position > self.capacity:
+                self.start_position = self.next_position - self.capacity
+
+            if self.spill_path is not None:
+                if self._log_file is None:
+                    self._open_segment()
+                # Frames carry their JSON already (see StreamFrame.json)
+                encoded = getattr(chunk, "json", None) or json.dumps(chunk.to_dict(), default=str)
+                line = (encoded + "\n").encode("utf-8")
+                self._log_file.write(line)
+                self._idx_file.write(_OFFSET.pack(self._log_size))
+                self._log_size += len(line)
+            return position
+
+    def extend(self, chunks: List[Any]) -> None:
+        for chunk in chunks:
+            self.append(chunk)
+
+    def flush(self) -> None:
+        """Push buffered segment writes to the OS (log before index)."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._log_file is not None:
+            self._log_file.flush()
+            self._idx_file.flush()
+
+    # =========================================================================
+    # READING
+    # =========================================================================
+
+    @property
+    def last_position(self) -> int:
+        """Position of the newest chunk (-1 if empty)."""
+        return self.next_position - 1
+
+    def __len__(self) -> int:
+        return self.next_position - self.start_position
+
+    def read_from(self, position: int = 0) -> List[Any]:
+        """
+        Every chunk at or after ``position``, oldest first.
+
+        Positions still in the ring are sliced from memory; older ones come
+        from the disk segment when spilling is enabled (and are otherwise
+        gone).
+        """
+        position = max(0, position)
+        with self._lock:
+            start, end = self.start_position, self.next_position
+            in_memory = [self._ring[p % self.capacity] for p in range(max(position, start), end)]
+            if position < start and self.spill_path is not None and self.segment_exists(self.spill_path):
+                self._flush_locked()
+                from_disk = self._read_segment(position, start)
+            else:
+                from_disk = []
+        return from_disk + in_memory
+
+    def in_memory(self) -> List[Any]:
+        """Chunks currently held in the ring, oldest first."""
+        return self.read_from(self.start_position)
+
+    def _read_segment(self, first: int, stop: int) -> List[Any]:
+        log_path, idx_path = self._segment_paths()
+        with open(idx_path, "rb") as idx:
+            idx.seek(first * _OFFSET.size)
+            (offset,) = _OFFSET.unpack(idx.read(_OFFSET.size))
+        chunks = []
+        with open(log_path, "rb") as log:
+            log.seek(offset)
+            for _ in range(stop - first):
+                line = log.readline()
+                if not line:
+                    break
+                try:
+                    chunks.append(self._decode(json.loads(line)))
+                except (ValueError, TypeError, KeyError) as e:
+                    # Skipping would shift every later chunk to the wrong position
+                    print(f"[StreamLog] Unreadable chunk at position {first + len(chunks)}, "
+                          f"replay stopped: {e}")
+                    break
+        return chunks
+
+    # =========================================================================
+    # SEGMENT MANAGEMENT
+    # =========================================================================
+
+    def _segment_paths(self):
+        return self.spill_path.with_name(self.spill_path.name + ".log"), \
+            self.spill_path.with_name(self.spill_path.name + ".idx")
+
+    def _recover_segment(self) -> None:
+        """
+        Resume positions from an existing segment without keeping it open.
+
+        Index entries past the log and a torn or unreadable last chunk (a
+        crash mid-write) are cut off, so line N is at ``idx[N * 8]`` again.
+        """
+        log_path, idx_path = self._segment_paths()
+        if not log_path.exists():
+            if idx_path.exists():
+                idx_path.unlink()
+            return
+
+        log_size = log_path.stat().st_size
+        count = idx_path.stat().st_size // _OFFSET.size if idx_path.exists() else 0
+        good_end = 0
+        with open(log_path, "rb") as log, open(idx_path, "ab+") as idx:
+            while count:
+                idx.seek((count - 1) * _OFFSET.size)
+                (offset,) = _OFFSET.unpack(idx.read(_OFFSET.size))
+                if offset < log_size:
+                    log.seek(offset)
+                    line = log.readline()
+                    if line.endswith(b"\n") and _is_json(line):
+                        good_end = offset + len(line)
+                        break
+                count -= 1
+            idx.truncate(count * _OFFSET.size)
+        if good_end != log_size:
+            os.truncate(log_path, good_end)
+
+        self.start_position = self.next_position = count
+
+    def _open_segment(self) -> None:
+        """Open the segment for appending (first write since construction or ``close``)."""
+        log_path, idx_path = self._segment_paths()
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._log_file = open(log_path, "ab")
+        self._idx_file = open(idx_path, "ab")
+        self._log_size = self._log_file.seek(0, os.SEEK_END)
+
+    def clear(self) -> None:
+        """Drop every chunk and restart positions at 0 (e.g. after time travel)."""
+        with self._lock:
+            self._ring = [None] * self.capacity
+            self.start_position = self.next_position = 0
+            if self._log_file is not None:
+                self._log_file.truncate(0)
+                self._idx_file.truncate(0)
+                self._log_size = 0
+            elif self.spill_path:
+                for path in self._segment_paths():
+                    if path.exists():
+                        os.truncate(path, 0)
+
+    def close(self) -> None:
+        """Flush and release the segment files; the next append reopens them."""
+        with self._lock:
+            if self._log_file is not None:
+                self._flush_locked()
+                self._log_file.close()
+                self._idx_file.close()
+                self._log_file = self._idx_file = None
+
+    def delete(self) -> None:
+        """Close and remove the disk segment."""
+        self.close()
+        if self.spill_path:
+            for path in self._segment_paths():
+                if path.exists():
+                    path.unlink()
+
+
+def _is_json(line: bytes) -> bool:
+    try:
+        json.loads(line)
+    except ValueError:
+        return False
+    return True
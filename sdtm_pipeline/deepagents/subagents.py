@@ -36,6 +36,13 @@ from .async_utils import (
     async_neo4j_load_dataframe,
 )
 
+# Source column patterns shared with the knowledge base
+try:
+    from ..knowledge_base.derivation_rules import find_source_patterns
+    SOURCE_PATTERNS_AVAILABLE = True
+except ImportError:
+    SOURCE_PATTERNS_AVAILABLE = False
+
 
 # =============================================================================
 # EMBEDDED SDTM KNOWLEDGE
@@ -172,7 +179,23 @@ def get_mapping_recommendations(source_columns: List[str], target_domain: str) -
         "dose": "EXDOSE" if domain == "EX" else "CMDOSE" if domain == "CM" else None,
     }
 
+    # Known EDC column names for the domain, resolved for all columns at once
+    matches = find_source_patterns(source_columns) if SOURCE_PATTERNS_AVAILABLE else {}
+
     for col in source_columns:
+        targets = [
+            target.split(".", 1)[1]
+            for target in matches.get(col, {}).get("target_variables", [])
+            if target.startswith(f"{domain}.")
+        ]
+        if targets:
+            recommendations.append({
+                "source": col,
+                "target": targets[0],
+                "confidence": "high" if matches[col]["matched_pattern"].upper() == col.upper() else "medium",
+            })
+            continue
+
         col_lower = col.lower()
         for pattern, target in patterns.items():
             if target and pattern in col_lower:
@@ -1,7 +1,8 @@
 """
 SDTM Knowledge Base
 ===================
-Pinecone vector store setup and management for SDTM knowledge.
+Pinecone vector store setup and management for SDTM knowledge, with an
+optional in-process NumPy index backend.
 
 Includes:
 - Domain specifications (SDTM-IG 3.4)
@@ -12,13 +13,18 @@ Includes:
 """
 
 from .setup_pinecone import PineconeKnowledgeBase, KnowledgeDocument
+from .local_index import LocalVectorIndex, LocalVectorStore, get_knowledge_backend
+from .bm25_index import BM25Index
 from .derivation_rules import (
     DERIVATION_RULES,
     CROSS_DOMAIN_DEPENDENCIES,
     SOURCE_COLUMN_PATTERNS,
     get_derivation_rule,
     get_cross_domain_dependencies,
+    get_variable_dependencies,
+    get_source_patterns_for_target,
     find_source_pattern,
+    find_source_patterns,
     get_all_derivation_rules,
 )
 
@@ -26,12 +32,20 @@ __all__ = [
     # Pinecone setup
     "PineconeKnowledgeBase",
     "KnowledgeDocument",
+    # Local vector index
+    "LocalVectorIndex",
+    "LocalVectorStore",
+    "get_knowledge_backend",
+    "BM25Index",
     # Derivation rules
     "DERIVATION_RULES",
     "CROSS_DOMAIN_DEPENDENCIES",
     "SOURCE_COLUMN_PATTERNS",
     "get_derivation_rule",
     "get_cross_domain_dependencies",
+    "get_variable_dependencies",
+    "get_source_patterns_for_target",
     "find_source_pattern",
+    "find_source_patterns",
     "get_all_derivation_rules",
 ]
@@ -0,0 +1,214 @@
+"""
+Persisted BM25 Index
+====================
+Prebuilt Okapi BM25 keyword index for hybrid (BM25 + semantic) search.
+
+The index is built by ``PineconeKnowledgeBase.upsert_documents`` alongside
+the vector indexes and pickled next to them, so retrievers load ready-made
+postings and IDF tables instead of re-tokenizing the corpus on every
+process start.
+
+Storage Architecture:
+    <KNOWLEDGE_INDEX_DIR>/
+        sdtmig.bm25.pkl   - {format_version, built_at, doc_ids, metadata,
+                             doc_terms, postings, idf, doc_len, avgdl}
+
+Scoring is vectorized: each query term contributes
+``idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))`` to the
+documents in its postings list via one NumPy scatter-add.
+"""
+
+import os
+import pickle
+import re
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BM25_FORMAT_VERSION = 1  # Bump when the tokenizer or pickle layout changes
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[._-][a-z0-9]+)*")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "with", "when", "which",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps SDTM names like ``--stdtc`` or ``ae.aeterm`` intact."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+# =============================================================================
+# BM25 INDEX
+# =============================================================================
+
+class BM25Index:
+    """Okapi BM25 index with precomputed postings and IDF tables."""
+
+    def __init__(self, name: str, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        self.name = name
+        self.k1 = k1
+        self.b = b
+        self.built_at = 0.0
+        self.doc_ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.doc_terms: List[Dict[str, int]] = []
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: Dict[str, float] = {}
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.avgdl = 0.0
+        self._norm: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def upsert(self, records: Sequence[Dict[str, Any]]) -> None:
+        """Add or replace ``{"id", "text", "metadata"}`` records and rebuild tables."""
+        row_of = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+        for rec in records:
+            terms = dict(Counter(tokenize(rec["text"])))
+            row = row_of.get(rec["id"])
+            if row is None:
+                row_of[rec["id"]] = len(self.doc_ids)
+                self.doc_ids.append(rec["id"])
+                self.metadata.append(rec.get("metadata") or {})
+                self.doc_terms.append(terms)
+            else:
+                self.metadata[row] = rec.get("metadata") or {}
+                self.doc_terms[row] = terms
+        self._build()
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Delete documents by id and rebuild tables. Returns the number removed."""
+        drop = set(ids)
+        keep = [row for row, doc_id in enumerate(self.doc_ids) if doc_id not in drop]
+        removed = len(self.doc_ids) - len(keep)
+        if removed:
+            self.doc_ids = [self.doc_ids[row] for row in keep]
+            self.metadata = [self.metadata[row] for row in keep]
+            self.doc_terms = [self.doc_terms[row] for row in keep]
+            self._build()
+        return removed
+
+    def _build(self) -> None:
+        n = len(self.doc_ids)
+        self.doc_len = np.array([sum(t.values()) for t in self.doc_terms], dtype=np.float32)
+        self.avgdl = float(self.doc_len.mean()) if n else 0.0
+
+        rows: Dict[str, List[int]] = {}
+        tfs: Dict[str, List[int]] = {}
+        for row, terms in enumerate(self.doc_terms):
+            for term, tf in terms.items():
+                rows.setdefault(term, []).append(row)
+                tfs.setdefault(term, []).append(tf)
+
+        self.postings = {
+            term: (np.array(rows[term], dtype=np.int32), np.array(tfs[term], dtype=np.float32))
+            for term in rows
+        }
+        self.idf = {
+            term: float(np.log(1.0 + (n - len(r) + 0.5) / (len(r) + 0.5)))
+            for term, r in rows.items()
+        }
+        self.built_at = time.time()
+        self._norm = None
+
+    def _doc_norm(self) -> np.ndarray:
+        if self._norm is None:
+            avgdl = self.avgdl or 1.0
+            self._norm = (self.k1 * (1 - self.b + self.b * self.doc_len / avgdl)).astype(np.float32)
+        return self._norm
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for ``query``."""
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        if not self.doc_ids:
+            return scores
+        norm = self._doc_norm()
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            rows, tf = posting
+            np.add.at(scores, rows, self.idf[term] * tf * (self.k1 + 1) / (tf + norm[rows]))
+        return scores
+
+    def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Top-k documents with a positive BM25 score."""
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if not len(hits):
+            return []
+        k = min(top_k, len(hits))
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {"id": self.doc_ids[row], "score": float(scores[row]), "metadata": self.metadata[row]}
+            for row in top
+        ]
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def save(self, index_dir: Path) -> Path:
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        path = index_dir / f"{self.name}.bm25.pkl"
+        payload = {
+            "format_version": BM25_FORMAT_VERSION,
+            "name": self.name,
+            "k1": self.k1,
+            "b": self.b,
+            "built_at": self.built_at,
+            "doc_ids": self.doc_ids,
+            "metadata": self.metadata,
+            "doc_terms": self.doc_terms,
+            "postings": self.postings,
+            "idf": self.idf,
+            "doc_len": self.doc_len,
+            "avgdl": self.avgdl,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=index_dir, prefix=f".{path.name}.", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, index_dir: Path, name: str) -> Optional["BM25Index"]:
+        """Load a prebuilt index, or None if missing or built by an older format."""
+        path = Path(index_dir) / f"{name}.bm25.pkl"
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("format_version") != BM25_FORMAT_VERSION:
+            return None
+
+        index = cls(name, k1=payload["k1"], b=payload["b"])
+        index.built_at = payload["built_at"]
+        index.doc_ids = payload["doc_ids"]
+        index.metadata = payload["metadata"]
+        index.doc_terms = payload["doc_terms"]
+        index.postings = payload["postings"]
+        index.idf = payload["idf"]
+        index.doc_len = payload["doc_len"]
+        index.avgdl = payload["avgdl"]
+        return index
+
+    @classmethod
+    def load_or_create(cls, index_dir: Path, name: str) -> "BM25Index":
+        return cls.load(index_dir, name) or cls(name)
@@ -8,9 +8,19 @@ Comprehensive derivation rules for SDTM variables including:
 - Derivation formulas and logic
 
 This module provides the knowledge needed for intelligent SDTM mapping.
+
+Lookup indexes are built once at import:
+- One multi-pattern matcher over all SOURCE_COLUMN_PATTERNS, so a column is
+  resolved with a single regex scan plus one substring search instead of a
+  nested loop over every pattern
+- Reverse maps from each target variable to the source patterns that feed
+  it and to the variables it depends on (CROSS_DOMAIN_DEPENDENCIES)
 """
 
-from typing import List, Dict, Any
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Optional
 
 
 # =============================================================================
@@ -1005,6 +1015,69 @@ SOURCE_COLUMN_PATTERNS = {
 }
 
 
+# =============================================================================
+# PRECOMPUTED LOOKUP INDEXES
+# =============================================================================
+
+# Flattened (pattern_name, pattern) pairs in dictionary order; a lower
+# position wins when several patterns match, as in a linear scan.
+_PATTERN_ENTRIES = [
+    (pattern_name, pattern)
+    for pattern_name, pattern_info in SOURCE_COLUMN_PATTERNS.items()
+    for pattern in pattern_info["patterns"]
+]
+_PATTERN_POSITION = {}
+for _pos, (_, _pattern) in enumerate(_PATTERN_ENTRIES):
+    _PATTERN_POSITION.setdefault(_pattern.upper(), _pos)
+
+# Pattern inside column: a zero-width lookahead reports, at every offset of
+# the column, the earliest-listed pattern starting there.
+_PATTERN_MATCHER = re.compile(
+    "(?=(" + "|".join(re.escape(p.upper()) for _, p in _PATTERN_ENTRIES) + "))"
+)
+
+# Column inside pattern: one search over all patterns joined by a separator
+# that cannot occur in a column name; offsets map back to entry positions.
+_PATTERN_HAYSTACK = "\x00".join(p.upper() for _, p in _PATTERN_ENTRIES)
+_PATTERN_OFFSETS = []
+_offset = 0
+for _, _pattern in _PATTERN_ENTRIES:
+    _PATTERN_OFFSETS.append(_offset)
+    _offset += len(_pattern) + 1
+
+# Target variable -> source pattern names that map to it
+TARGET_PATTERN_INDEX: Dict[str, List[str]] = {}
+for _name, _info in SOURCE_COLUMN_PATTERNS.items():
+    for _target in _info["target_variables"]:
+        TARGET_PATTERN_INDEX.setdefault(_target, []).append(_name)
+
+# Dependent variable -> variables it is derived from (reverse of CROSS_DOMAIN_DEPENDENCIES)
+DEPENDS_ON_INDEX: Dict[str, List[str]] = {}
+for _source, _dependents in CROSS_DOMAIN_DEPENDENCIES.items():
+    for _dependent in _dependents:
+        DEPENDS_ON_INDEX.setdefault(_dependent, []).append(_source)
+
+
+@lru_cache(maxsize=4096)
+def _match_position(source_upper: str) -> Optional[int]:
+    """Position in _PATTERN_ENTRIES of the first pattern matching the column."""
+    if not source_upper:
+        return 0 if _PATTERN_ENTRIES else None  # "" is contained in every pattern
+
+    best = None
+    offset = _PATTERN_HAYSTACK.find(source_upper) if "\x00" not in source_upper else -1
+    if offset >= 0:
+        best = bisect_right(_PATTERN_OFFSETS, offset) - 1
+
+    for match in _PATTERN_MATCHER.finditer(source_upper):
+        position = _PATTERN_POSITION[match.group(1)]
+        if best is None or position < best:
+            best = position
+            if best == 0:
+                break
+    return best
+
+
 def get_derivation_rule(domain: str, variable: str) -> Dict[str, Any]:
     """Get derivation rule for a specific variable."""
     domain_rules = DERIVATION_RULES.get(domain, {})
@@ -1016,21 +1089,38 @@ def get_cross_domain_dependencies(variable: str) -> List[str]:
     return CROSS_DOMAIN_DEPENDENCIES.get(variable, [])
 
 
+def get_variable_dependencies(variable: str) -> List[str]:
+    """Get list of variables this variable is derived from (e.g. "AE.AESTDY" -> ["DM.RFSTDTC"])."""
+    return DEPENDS_ON_INDEX.get(variable, [])
+
+
+def get_source_patterns_for_target(variable: str) -> List[Dict[str, Any]]:
+    """Get the source column patterns that map to a target variable (e.g. "DM.SEX")."""
+    return [
+        {"pattern_name": name, **SOURCE_COLUMN_PATTERNS[name]}
+        for name in TARGET_PATTERN_INDEX.get(variable, [])
+    ]
+
+
 def find_source_pattern(source_column: str) -> Dict[str, Any]:
     """Find matching source pattern for a column name."""
-    source_upper = source_column.upper()
-
-    for pattern_name, pattern_info in SOURCE_COLUMN_PATTERNS.items():
-        for pattern in pattern_info["patterns"]:
-            if pattern.upper() in source_upper or source_upper in pattern.upper():
-                return {
-                    "pattern_name": pattern_name,
-                    "matched_pattern": pattern,
-                    "target_variables": pattern_info["target_variables"],
-                    "priority": pattern_info["priority"]
-                }
-
-    return {}
+    position = _match_position(source_column.upper())
+    if position is None:
+        return {}
+
+    pattern_name, pattern = _PATTERN_ENTRIES[position]
+    pattern_info = SOURCE_COLUMN_PATTERNS[pattern_name]
+    return {
+        "pattern_name": pattern_name,
+        "matched_pattern": pattern,
+        "target_variables": pattern_info["target_variables"],
+        "priority": pattern_info["priority"]
+    }
+
+
+def find_source_patterns(source_columns: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Resolve a whole column list in one pass; unmatched columns map to {}."""
+    return {column: find_source_pattern(column) for column in dict.fromkeys(source_columns)}
 
 
 def get_all_derivation_rules() -> Dict[str, Dict]:
@@ -0,0 +1,393 @@
+"""
+Local Vector Index
+==================
+In-process NumPy vector index used as a stand-in for (and read-through
+cache in front of) the Pinecone knowledge base indexes.
+
+The SDTM-IG, controlled terminology, validation/business rule and
+derivation rule corpora are small and static, so they fit comfortably in
+memory as a single normalized float32 matrix per index. Queries are a
+single matrix-vector product (brute force), with an optional IVF
+(inverted file) partitioning for larger corpora.
+
+Storage Architecture:
+    <index_dir>/
+        sdtmig.npy            - (n, dim) float32 matrix of L2-normalized vectors
+        sdtmig.meta.json      - ids, metadata, dimension, metric, version
+        sdtmig.ivf.npz        - Optional IVF centroids + list assignments
+
+Configuration:
+    KNOWLEDGE_BACKEND    - "pinecone" (default), "local", or "both"
+    KNOWLEDGE_INDEX_DIR  - Directory holding the local index files
+
+Usage:
+    from sdtm_pipeline.knowledge_base.local_index import LocalVectorStore
+
+    store = LocalVectorStore("./.knowledge_index")
+    index = store.get_index("sdtmig", create=True)
+    index.upsert([{"id": "DM-STUDYID", "values": [...], "metadata": {...}}])
+    store.save("sdtmig")
+    matches = store.get_index("sdtmig").query(vector, top_k=5)
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_INDEX_DIR = Path(__file__).parent.parent.parent / ".knowledge_index"
+KNOWLEDGE_BACKENDS = ("pinecone", "local", "both")
+IVF_MIN_VECTORS = 4096  # Below this, brute force is always faster
+IVF_DEFAULT_PROBES = 8
+
+
+def get_knowledge_backend() -> str:
+    """Return the configured knowledge backend ("pinecone", "local" or "both")."""
+    backend = os.getenv("KNOWLEDGE_BACKEND", "pinecone").strip().lower()
+    if backend not in KNOWLEDGE_BACKENDS:
+        raise ValueError(
+            f"Invalid KNOWLEDGE_BACKEND '{backend}'. Expected one of {KNOWLEDGE_BACKENDS}"
+        )
+    return backend
+
+
+def get_index_dir() -> Path:
+    """Return the configured directory for local index files."""
+    return Path(os.getenv("KNOWLEDGE_INDEX_DIR", str(DEFAULT_INDEX_DIR)))
+
+
+def _atomic_write_bytes(path: Path, writer) -> None:
+    """Write a file atomically by writing to a temp file and renaming it."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            writer(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+# =============================================================================
+# LOCAL VECTOR INDEX
+# =============================================================================
+
+class LocalVectorIndex:
+    """
+    A single vector index held as an L2-normalized NumPy matrix.
+
+    Accepts and returns the same shapes as the Pinecone client: upserts take
+    ``{"id", "values", "metadata"}`` dicts and queries return
+    ``{"id", "score", "metadata"}`` dicts ordered by cosine similarity.
+    """
+
+    def __init__(self, name: str, dimension: Optional[int] = None, metric: str = "cosine"):
+        if metric != "cosine":
+            raise ValueError(f"LocalVectorIndex only supports cosine metric, got '{metric}'")
+        self.name = name
+        self.dimension = dimension
+        self.metric = metric
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self.version = 0
+        self._id_to_row: Dict[str, int] = {}
+        self._buffer: Optional[np.ndarray] = None  # Writable storage behind ``vectors``, with spare rows
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32, copy=False)
+
+    def upsert(self, vectors: Sequence[Dict[str, Any]]) -> int:
+        """Insert or replace vectors. Returns the number of vectors written."""
+        if not vectors:
+            return 0
+
+        matrix = self._normalize(np.asarray([v["values"] for v in vectors], dtype=np.float32))
+        if self.dimension is None or len(self.ids) == 0:
+            self.dimension = matrix.shape[1]
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension {matrix.shape[1]} does not match index "
+                f"'{self.name}' dimension {self.dimension}"
+            )
+
+        # Last write wins for an id repeated within the batch; then split
+        # into replacements of existing rows and appended rows
+        latest = {vec["id"]: row for row, vec in enumerate(vectors)}
+        replaced, targets, new_rows = [], [], []
+        for doc_id, row in latest.items():
+            existing = self._id_to_row.get(doc_id)
+            if existing is None:
+                new_rows.append(row)
+            else:
+                replaced.append(row)
+                targets.append(existing)
+
+        count = len(self.ids)
+        data = self._writable(count + len(new_rows))
+        if replaced:
+            data[targets] = matrix[replaced]
+            for existing, row in zip(targets, replaced):
+                self.metadata[existing] = dict(vectors[row].get("metadata") or {})
+        if new_rows:
+            data[count:count + len(new_rows)] = matrix[new_rows]
+            for row in new_rows:
+                self._id_to_row[vectors[row]["id"]] = len(self.ids)
+                self.ids.append(vectors[row]["id"])
+                self.metadata.append(dict(vectors[row].get("metadata") or {}))
+
+        self.vectors = data[:len(self.ids)]
+        self._invalidate()
+        return len(vectors)
+
+    def _writable(self, rows: int) -> np.ndarray:
+        """
+        Writable buffer whose first rows are the current vectors, with room
+        for ``rows`` in total.
+
+        Grows geometrically, so appends and in-place replacements do not copy
+        the matrix; it is copied once after a load (read-only memory map) or
+        a delete.
+        """
+        count = len(self.ids)
+        buffer = self._buffer
+        if buffer is None or self.vectors.base is not buffer or len(buffer) < rows \
+                or buffer.shape[1] != self.dimension:
+            buffer = np.empty((max(rows, 2 * count), self.dimension), dtype=np.float32)
+            if count:
+                buffer[:count] = self.vectors
+            self._buffer = buffer
+        return buffer
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Delete vectors by id. Returns the number of vectors removed."""
+        rows = {self._id_to_row[i] for i in ids if i in self._id_to_row}
+        if not rows:
+            return 0
+        keep = [r for r in range(len(self.ids)) if r not in rows]
+        self.vectors = np.asarray(self.vectors)[keep]
+        self.ids = [self.ids[r] for r in keep]
+        self.metadata = [self.metadata[r] for r in keep]
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self._invalidate()
+        return len(rows)
+
+    def _invalidate(self) -> None:
+        self.version += 1
+        self._centroids = None
+        self._assignments = None
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """
+        Partition the index into ``n_lists`` clusters with spherical k-means.
+
+        Queries then only score vectors in the closest ``n_probe`` clusters.
+        Skipped for small indexes, where brute force is both exact and faster.
+        """
+        n = len(self.ids)
+        if n < IVF_MIN_VECTORS:
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        data = np.asarray(self.vectors)
+        centroids = data[rng.choice(n, size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = np.argmax(data @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = data[assignments == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = self._normalize(centroids)
+
+        self._centroids = centroids
+        self._assignments = np.argmax(data @ centroids.T, axis=1).astype(np.int32)
+
+    def query(
+        self,
+        vector: Sequence[float],
+        top_k: int = 5,
+        include_metadata: bool = True,
+        n_probe: int = IVF_DEFAULT_PROBES,
+    ) -> List[Dict[str, Any]]:
+        """Return the ``top_k`` most similar vectors by cosine similarity."""
+        if not self.ids or top_k <= 0:
+            return []
+
+        q = self._normalize(np.asarray(vector, dtype=np.float32))
+        if q.shape[0] != self.dimension:
+            raise ValueError(
+                f"Query dimension {q.shape[0]} does not match index "
+                f"'{self.name}' dimension {self.dimension}"
+            )
+
+        data = self.vectors
+        if self._centroids is not None:
+            probes = np.argsort(-(self._centroids @ q))[:n_probe]
+            candidates = np.flatnonzero(np.isin(self._assignments, probes))
+            scores = data[candidates] @ q
+        else:
+            candidates = None
+            scores = data @ q
+
+        k = min(top_k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = candidates[top] if candidates is not None else top
+
+        return [
+            {
+                "id": self.ids[row],
+                "score": float(scores[pos]),
+                "metadata": self.metadata[row] if include_metadata else {},
+            }
+            for pos, row in zip(top, rows)
+        ]
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def save(self, index_dir: Path) -> None:
+        """Persist the index as ``<name>.npy`` plus ``<name>.meta.json``."""
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        matrix = np.ascontiguousarray(self.vectors, dtype=np.float32)
+
+        _atomic_write_bytes(index_dir / f"{self.name}.npy", lambda f: np.save(f, matrix))
+
+        ivf_file = index_dir / f"{self.name}.ivf.npz"
+        if self._centroids is not None:
+            _atomic_write_bytes(ivf_file, lambda f: np.savez(
+                f, centroids=self._centroids, assignments=self._assignments
+            ))
+        elif ivf_file.exists():
+            ivf_file.unlink()
+
+        # Metadata is written last so readers never see metadata for a
+        # matrix that has not been fully written yet.
+        meta = {
+            "name": self.name,
+            "dimension": self.dimension,
+            "metric": self.metric,
+            "version": self.version,
+            "count": len(self.ids),
+            "updated_at": time.time(),
+            "ids": self.ids,
+            "metadata": self.metadata,
+        }
+        payload = json.dumps(meta, default=str).encode("utf-8")
+        _atomic_write_bytes(index_dir / f"{self.name}.meta.json", lambda f: f.write(payload))
+
+    @classmethod
+    def load(cls, index_dir: Path, name: str, mmap: bool = True) -> "LocalVectorIndex":
+        """Load a persisted index. Vectors are memory-mapped read-only by default."""
+        index_dir = Path(index_dir)
+        with open(index_dir / f"{name}.meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        index = cls(name, dimension=meta.get("dimension"), metric=meta.get("metric", "cosine"))
+        index.ids = list(meta.get("ids", []))
+        index.metadata = list(meta.get("metadata", []))
+        index.version = meta.get("version", 0)
+        index._id_to_row = {doc_id: row for row, doc_id in enumerate(index.ids)}
+        index.vectors = np.load(index_dir / f"{name}.npy", mmap_mode="r" if mmap else None)
+
+        if len(index.vectors) != len(index.ids):
+            raise ValueError(
+                f"Local index '{name}' is inconsistent: {len(index.vectors)} vectors, "
+                f"{len(index.ids)} ids"
+            )
+
+        ivf_file = index_dir / f"{name}.ivf.npz"
+        if ivf_file.exists():
+            with np.load(ivf_file) as ivf:
+                if len(ivf["assignments"]) == len(index.ids):
+                    index._centroids = ivf["centroids"]
+                    index._assignments = ivf["assignments"]
+        return index
+
+
+# =============================================================================
+# LOCAL VECTOR STORE
+# =============================================================================
+
+class LocalVectorStore:
+    """
+    Directory of local vector indexes.
+
+    Indexes are loaded lazily and reloaded when their files change on disk,
+    so a retriever picks up indexes re-populated by another process.
+    """
+
+    def __init__(self, index_dir: Optional[Path] = None):
+        self.index_dir = Path(index_dir) if index_dir else get_index_dir()
+        self._indexes: Dict[str, LocalVectorIndex] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _meta_file(self, name: str) -> Path:
+        return self.index_dir / f"{name}.meta.json"
+
+    def list_indexes(self) -> List[str]:
+        """List index names available in memory or on disk."""
+        names = set(self._indexes)
+        if self.index_dir.exists():
+            names.update(p.name[:-len(".meta.json")] for p in self.index_dir.glob("*.meta.json"))
+        return sorted(names)
+
+    def has_index(self, name: str) -> bool:
+        return name in self._indexes or self._meta_file(name).exists()
+
+    def get_index(
+        self,
+        name: str,
+        create: bool = False,
+        dimension: Optional[int] = None,
+    ) -> Optional[LocalVectorIndex]:
+        """Return an index, loading it from disk if it changed. Optionally create it."""
+        with self._lock:
+            meta_file = self._meta_file(name)
+            if meta_file.exists():
+                mtime = meta_file.stat().st_mtime
+                if name not in self._indexes or self._mtimes.get(name, 0) < mtime:
+                    self._indexes[name] = LocalVectorIndex.load(self.index_dir, name)
+                    self._mtimes[name] = mtime
+            elif create and name not in self._indexes:
+                self._indexes[name] = LocalVectorIndex(name, dimension=dimension)
+            return self._indexes.get(name)
+
+    def save(self, name: str) -> None:
+        """Persist an in-memory index to the store directory."""
+        with self._lock:
+            index = self._indexes[name]
+            index.save(self.index_dir)
+            self._mtimes[name] = self._meta_file(name).stat().st_mtime
+
+    def query(self, name: str, vector: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Query a named index. Returns an empty list if the index does not exist."""
+        index = self.get_index(name)
+        if index is None:
+            return []
+        return index.query(vector, top_k=top_k)
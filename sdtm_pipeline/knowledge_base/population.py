@@ -0,0 +1,341 @@
+"""
+Index Population Pipeline
+=========================
+Batched, pipelined and incremental population of the knowledge base
+indexes used by ``PineconeKnowledgeBase.upsert_documents``.
+
+Pipeline:
+    1. Hash each document (text + metadata + embedding model) and skip
+       documents whose hash matches the manifest from the last run
+    2. Producer thread embeds the remaining documents in large batches
+       (one embeddings request per batch); a batch the API rejects is
+       retried one document at a time so one bad document fails alone
+    3. A bounded queue hands embedded batches to the consumer, which
+       upserts them to Pinecone and/or the local index while the next
+       batch is being embedded
+    4. Both stages share an adaptive rate limiter that backs off on 429s
+       and rate-limit headers instead of sleeping a fixed interval
+
+Storage Architecture:
+    <KNOWLEDGE_INDEX_DIR>/
+        <index>.<backend>.hashes.json  - doc id -> content hash from last run
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# ADAPTIVE RATE LIMITING
+# =============================================================================
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect rate-limit / throttling errors from OpenAI or Pinecone clients."""
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse reset headers such as ``"20"``, ``"250ms"`` or ``"1m3s"`` into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(num) * _DURATION_UNITS[unit] for num, unit in parts)
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared delay that grows on throttling and decays on success.
+
+    ``observe_headers`` inspects ``x-ratelimit-remaining-*`` /
+    ``x-ratelimit-reset-*`` response headers to slow down before the limit
+    is hit.
+    """
+
+    def __init__(self, min_delay: float = 0.0, max_delay: float = 60.0, low_watermark: int = 5):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.low_watermark = low_watermark
+        self.delay = min_delay
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            delay = self.delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.delay = max(self.min_delay, self.delay * 0.5 if self.delay > 0.01 else 0.0)
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        if not headers:
+            return
+        with self._lock:
+            for kind in ("requests", "tokens"):
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                reset = _parse_reset_seconds(headers.get(f"x-ratelimit-reset-{kind}"))
+                if remaining is None or reset is None:
+                    continue
+                try:
+                    remaining = int(remaining)
+                except ValueError:
+                    continue
+                if remaining <= self.low_watermark:
+                    # Spread the remaining budget over the reset window
+                    self.delay = min(self.max_delay, max(self.delay, reset / max(remaining, 1)))
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.throttled += 1
+            backoff = max(self.delay * 2, 1.0)
+            if retry_after:
+                backoff = max(backoff, retry_after)
+            self.delay = min(self.max_delay, backoff)
+
+    def call(self, fn: Callable[[], Any], max_retries: int = 6) -> Any:
+        """Call ``fn`` with pacing, retrying rate-limit errors with backoff."""
+        for attempt in range(max_retries + 1):
+            self.wait()
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == max_retries:
+                    raise
+                headers = getattr(getattr(e, "response", None), "headers", None) or {}
+                retry_after = _parse_reset_seconds(headers.get("retry-after"))
+                self.on_rate_limited(retry_after)
+                logger.warning(f"Rate limited, backing off {self.delay:.1f}s "
+                               f"(attempt {attempt + 1}/{max_retries})")
+                continue
+            self.on_success()
+            return result
+
+
+# =============================================================================
+# CONTENT HASH MANIFEST
+# =============================================================================
+
+def content_hash(text: str, metadata: Mapping[str, Any], model: str = "") -> str:
+    """Hash everything that affects a stored vector record."""
+    payload = json.dumps([model, text, metadata], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ContentHashManifest:
+    """Doc id -> content hash map persisted between population runs."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hashes: Dict[str, str] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.hashes = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable hash manifest {self.path}: {e}")
+
+    def is_unchanged(self, doc_id: str, digest: str) -> bool:
+        return self.hashes.get(doc_id) == digest
+
+    def update(self, hashes: Mapping[str, str]) -> None:
+        self.hashes.update(hashes)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.hashes, f)
+        os.replace(tmp_path, self.path)
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+@dataclass
+class PopulationResult:
+    """Counts and timing for a single index population run."""
+    index_name: str
+    total: int = 0
+    upserted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    failed_ids: List[str] = field(default_factory=list)
+
+    @property
+    def indexed(self) -> int:
+        """Documents present in the index after the run (written + unchanged)."""
+        return self.upserted + self.skipped
+
+
+class PopulationPipeline:
+    """
+    Producer/consumer pipeline: embed batch N+1 while batch N is upserted.
+
+    Args:
+        embed_fn: Embeds a list of texts in one request, returning vectors
+        sinks: Callables receiving Pinecone-style ``{"id", "values", "metadata"}`` lists
+        embed_batch_size: Documents per embeddings request
+        upsert_batch_size: Vectors per upsert request
+        queue_size: Embedded batches buffered ahead of the consumer
+        rate_limiter: Shared limiter (one is created if omitted)
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        sinks: Sequence[Callable[[List[Dict[str, Any]]], Any]],
+        embed_batch_size: int = 256,
+        upsert_batch_size: int = 100,
+        queue_size: int = 4,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+    ):
+        self.embed_fn = embed_fn
+        self.sinks = list(sinks)
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.queue_size = queue_size
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+
+    def _embed(
+        self, index_name: str, batch: List[Dict[str, Any]], failed: List[str]
+    ) -> List[tuple]:
+        """
+        Embed a batch in one request, falling back to one request per
+        document if the batch is rejected. Ids that cannot be embedded are
+        appended to ``failed``.
+
+        Returns:
+            (record, embedding) pairs for the documents that were embedded
+        """
+        try:
+            embeddings = self.rate_limiter.call(lambda: self.embed_fn([r["text"] for r in batch]))
+            return list(zip(batch, embeddings))
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Failed to embed '{batch[0]['id']}' for '{index_name}': {e}")
+                failed.append(batch[0]["id"])
+                return []
+            logger.warning(f"Failed to embed batch of {len(batch)} for '{index_name}' ({e}), "
+                           f"retrying documents individually")
+
+        embedded = []
+        for rec in batch:
+            embedded.extend(self._embed(index_name, [rec], failed))
+        return embedded
+
+    def run(
+        self,
+        index_name: str,
+        records: Sequence[Dict[str, Any]],
+        manifest: Optional[ContentHashManifest] = None,
+        hashes: Optional[Mapping[str, str]] = None,
+        force: bool = False,
+        force_ids: Optional[Set[str]] = None,
+    ) -> PopulationResult:
+        """
+        Embed and upsert ``records`` (``{"id", "text", "metadata"}`` dicts).
+
+        Records whose hash in ``hashes`` matches ``manifest`` are skipped
+        unless ``force`` is set or their id is in ``force_ids``. The manifest is updated (not saved) with
+        the hashes of records that were written successfully.
+        """
+        start = time.perf_counter()
+        result = PopulationResult(index_name=index_name, total=len(records))
+
+        pending = []
+        for rec in records:
+            digest = (hashes or {}).get(rec["id"])
+            if (not force and manifest and digest and rec["id"] not in (force_ids or ())
+                    and manifest.is_unchanged(rec["id"], digest)):
+                result.skipped += 1
+            else:
+                pending.append(rec)
+
+        batches: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        errors: List[BaseException] = []
+        embed_failed: List[str] = []
+
+        def produce():
+            try:
+                for i in range(0, len(pending), self.embed_batch_size):
+                    batch = pending[i:i + self.embed_batch_size]
+                    embedded = self._embed(index_name, batch, embed_failed)
+                    if embedded:
+                        batches.put([
+                            {"id": r["id"], "values": emb, "metadata": r["metadata"]}
+                            for r, emb in embedded
+                        ])
+            except BaseException as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+            finally:
+                batches.put(self._DONE)
+
+        producer = threading.Thread(target=produce, name=f"embed-{index_name}", daemon=True)
+        producer.start()
+
+        written: Dict[str, str] = {}
+        while True:
+            vectors = batches.get()
+            if vectors is self._DONE:
+                break
+            for j in range(0, len(vectors), self.upsert_batch_size):
+                chunk = vectors[j:j + self.upsert_batch_size]
+                try:
+                    for sink in self.sinks:
+                        self.rate_limiter.call(lambda: sink(chunk))
+                except Exception as e:
+                    logger.error(f"Failed to upsert {len(chunk)} vectors to '{index_name}': {e}")
+                    result.failed += len(chunk)
+                    result.failed_ids.extend(v["id"] for v in chunk)
+                    continue
+                result.upserted += len(chunk)
+                if hashes:
+                    written.update({v["id"]: hashes[v["id"]] for v in chunk if v["id"] in hashes})
+
+        producer.join()
+        if errors:
+            raise errors[0]
+        result.failed += len(embed_failed)
+        result.failed_ids.extend(embed_failed)
+
+        if manifest is not None:
+            manifest.update(written)
+
+        result.seconds = time.perf_counter() - start
+        logger.info(
+            f"Populated '{index_name}': {result.upserted} upserted, {result.skipped} unchanged, "
+            f"{result.failed} failed in {result.seconds:.1f}s"
+        )
+        return result
@@ -14,6 +14,11 @@ Indexes created:
 Usage:
     python -m sdtm_pipeline.knowledge_base.setup_pinecone
 
+Set KNOWLEDGE_BACKEND=local to populate the in-process NumPy indexes in
+KNOWLEDGE_INDEX_DIR instead of Pinecone, or KNOWLEDGE_BACKEND=both to
+populate both (see local_index.py). Every population run also writes the
+prebuilt BM25 keyword index used by hybrid search (see bm25_index.py).
+
 API keys are automatically loaded from .env file in the project root.
 """
 
@@ -59,6 +64,19 @@ except ImportError:
     OPENAI_AVAILABLE = False
     logger.warning("OpenAI not installed. Run: pip install openai")
 
+from .local_index import LocalVectorStore, KNOWLEDGE_BACKENDS, get_knowledge_backend, get_index_dir
+from .bm25_index import BM25Index
+from .population import (
+    AdaptiveRateLimiter,
+    ContentHashManifest,
+    PopulationPipeline,
+    PopulationResult,
+    content_hash,
+)
+from ..utils.retrieval_cache import bump_index_version
+
+PINECONE_DELETE_BATCH = 1000  # Max ids per Pinecone delete request
+
 
 @dataclass
 class KnowledgeDocument:
@@ -110,26 +128,53 @@ class PineconeKnowledgeBase:
         }
     }
 
-    def __init__(self, api_key: Optional[str] = None, openai_key: Optional[str] = None):
-        """Initialize with API keys."""
+    def __init__(self, api_key: Optional[str] = None, openai_key: Optional[str] = None,
+                 backend: Optional[str] = None, local_index_dir: Optional[Path] = None):
+        """Initialize with API keys.
+
+        Args:
+            api_key: Pinecone API key (not needed for the "local" backend)
+            openai_key: OpenAI API key used for embeddings
+            backend: "pinecone", "local" or "both" (defaults to KNOWLEDGE_BACKEND)
+            local_index_dir: Directory for local index files (defaults to KNOWLEDGE_INDEX_DIR)
+        """
+        self.backend = backend or get_knowledge_backend()
+        if self.backend not in KNOWLEDGE_BACKENDS:
+            raise ValueError(f"Invalid backend '{self.backend}'. Expected one of {KNOWLEDGE_BACKENDS}")
+        self.use_pinecone = self.backend in ("pinecone", "both")
+        self.use_local = self.backend in ("local", "both")
+
         self.pinecone_key = api_key or os.getenv("PINECONE_API_KEY")
         self.openai_key = openai_key or os.getenv("OPENAI_API_KEY")
 
-        if not self.pinecone_key:
+        if self.use_pinecone and not self.pinecone_key:
             raise ValueError("PINECONE_API_KEY environment variable required")
         if not self.openai_key:
             raise ValueError("OPENAI_API_KEY environment variable required")
 
-        self.pc = Pinecone(api_key=self.pinecone_key) if PINECONE_AVAILABLE else None
+        self.pc = Pinecone(api_key=self.pinecone_key) if PINECONE_AVAILABLE and self.use_pinecone else None
         self.openai = OpenAI(api_key=self.openai_key) if OPENAI_AVAILABLE else None
+        self.local_store = LocalVectorStore(local_index_dir) if self.use_local else None
         self.embedding_model = "text-embedding-3-large"
+        self.embed_batch_size = int(os.getenv("KNOWLEDGE_EMBED_BATCH_SIZE", "256"))
+        self.rate_limiter = AdaptiveRateLimiter()
+        self.population_results: Dict[str, PopulationResult] = {}
+        self.force_refresh = False  # Re-embed documents even if their content hash is unchanged
 
     def create_indexes(self) -> Dict[str, bool]:
-        """Create all required Pinecone indexes."""
+        """Create all required Pinecone indexes (and local indexes when enabled)."""
+        results = {}
+
+        if self.local_store:
+            for index_name, config in self.INDEXES.items():
+                self.local_store.get_index(index_name, create=True, dimension=config["dimension"])
+                results[index_name] = True
+            if not self.use_pinecone:
+                return results
+
         if not self.pc:
             raise RuntimeError("Pinecone client not available")
 
-        results = {}
         existing_indexes = [idx.name for idx in self.pc.list_indexes()]
 
         for index_name, config in self.INDEXES.items():
@@ -169,57 +214,175 @@ class PineconeKnowledgeBase:
         )
         return response.data[0].embedding
 
-    def upsert_documents(self, index_name: str, documents: List[KnowledgeDocument],
-                         batch_size: int = 100) -> int:
-        """Upsert documents to a Pinecone index."""
-        if not self.pc:
-            raise RuntimeError("Pinecone client not available")
-
-        index = self.pc.Index(index_name)
-        total_upserted = 0
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for a batch of texts in a single OpenAI request.
 
-        # Process in batches
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            vectors = []
-
-            for doc in batch:
-                try:
-                    embedding = self.get_embedding(doc.text)
-
-                    # Clean metadata - Pinecone doesn't accept None values
-                    clean_metadata = {}
-                    for k, v in doc.metadata.items():
-                        if v is not None:
-                            # Convert lists to strings if needed
-                            if isinstance(v, list):
-                                clean_metadata[k] = ", ".join(str(item) for item in v)
-                            else:
-                                clean_metadata[k] = v
-
-                    # Add truncated text
-                    clean_metadata["text"] = doc.text[:1000]
-
-                    vectors.append({
-                        "id": doc.id,
-                        "values": embedding,
-                        "metadata": clean_metadata
-                    })
-                except Exception as e:
-                    logger.error(f"Failed to embed document {doc.id}: {e}")
-                    continue
+        Rate-limit headers from the response are fed to the shared rate
+        limiter so the pipeline slows down before it is throttled.
+        """
+        if not self.openai:
+            raise RuntimeError("OpenAI client not available")
 
-            if vectors:
-                index.upsert(vectors=vectors)
-                total_upserted += len(vectors)
-                logger.info(f"Upserted batch {i // batch_size + 1}: {len(vectors)} documents")
+        create = self.openai.embeddings.create
+        raw_api = getattr(self.openai.embeddings, "with_raw_response", None)
+        if raw_api is not None:
+            raw = raw_api.create(model=self.embedding_model, input=texts)
+            self.rate_limiter.observe_headers(raw.headers)
+            response = raw.parse()
+        else:
+            response = create(model=self.embedding_model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    @staticmethod
+    def _clean_metadata(doc: KnowledgeDocument) -> Dict[str, Any]:
+        """Build index metadata for a document (Pinecone rejects None values and nested lists)."""
+        clean_metadata = {}
+        for k, v in doc.metadata.items():
+            if v is not None:
+                # Convert lists to strings if needed
+                if isinstance(v, list):
+                    clean_metadata[k] = ", ".join(str(item) for item in v)
+                else:
+                    clean_metadata[k] = v
+
+        # Add truncated text
+        clean_metadata["text"] = doc.text[:1000]
+        return clean_metadata
 
-            # Rate limiting
-            time.sleep(0.5)
+    def upsert_documents(self, index_name: str, documents: List[KnowledgeDocument],
+                         batch_size: int = 100, force: bool = False,
+                         scope: str = "") -> PopulationResult:
+        """Upsert documents to the configured backend(s) for an index.
+
+        Documents are embedded in large batches on a producer thread while
+        the previous batch is upserted, and documents whose content hash is
+        unchanged since the last run are skipped (pass ``force=True`` to
+        re-embed everything). If the Pinecone index holds fewer vectors
+        than the manifest expects (deleted or recreated since the last run),
+        every document is written again.
+
+        ``documents`` is taken as the complete set of documents whose id
+        starts with ``scope`` (the whole index by default): documents under
+        that prefix which are no longer in the set are deleted from every
+        backend, the keyword index and the hash manifest.
 
-        return total_upserted
+        Returns:
+            PopulationResult: ``upserted`` documents written in this run,
+            ``skipped`` unchanged ones, ``indexed`` both together.
+        """
+        if self.use_pinecone and not self.pc:
+            raise RuntimeError("Pinecone client not available")
 
-    def populate_sdtmig_index(self) -> int:
+        sinks = []
+        index = None
+        local_index = None
+        if self.use_pinecone:
+            index = self.pc.Index(index_name)
+            sinks.append(lambda vectors: index.upsert(vectors=vectors))
+        if self.local_store:
+            local_index = self.local_store.get_index(
+                index_name, create=True, dimension=self.INDEXES.get(index_name, {}).get("dimension")
+            )
+            sinks.append(local_index.upsert)
+
+        records = []
+        hashes = {}
+        for doc in documents:
+            metadata = self._clean_metadata(doc)
+            records.append({"id": doc.id, "text": doc.text, "metadata": metadata})
+            hashes[doc.id] = content_hash(doc.text, metadata, self.embedding_model)
+
+        # Documents missing from the local index are written even if unchanged
+        missing_locally = set()
+        if local_index is not None:
+            missing_locally = {doc_id for doc_id in hashes if doc_id not in local_index._id_to_row}
+
+        index_dir = self.local_store.index_dir if self.local_store else get_index_dir()
+        manifest = ContentHashManifest(index_dir / f"{index_name}.{self.backend}.hashes.json")
+
+        force = force or self.force_refresh
+        if index is not None and not force:
+            expected = sum(1 for doc_id, digest in hashes.items() if manifest.is_unchanged(doc_id, digest))
+            remote = self._remote_vector_count(index)
+            if remote is not None and remote < expected:
+                logger.warning(f"Pinecone index '{index_name}' holds {remote} vectors but {expected} "
+                               f"are recorded as written; re-embedding all documents")
+                force = True
+
+        pipeline = PopulationPipeline(
+            embed_fn=self.get_embeddings,
+            sinks=sinks,
+            embed_batch_size=self.embed_batch_size,
+            upsert_batch_size=batch_size,
+            rate_limiter=self.rate_limiter,
+        )
+        result = pipeline.run(index_name, records, manifest=manifest, hashes=hashes,
+                              force=force, force_ids=missing_locally)
+        self.population_results[index_name] = result
+
+        # Anything recorded under ``scope`` that is not in this run was
+        # deleted or re-keyed at the source
+        bm25 = BM25Index.load_or_create(index_dir, index_name)
+        known = set(manifest.hashes) | set(bm25.doc_ids)
+        if local_index is not None:
+            known.update(local_index.ids)
+        stale = sorted(doc_id for doc_id in known if doc_id.startswith(scope) and doc_id not in hashes)
+        if stale:
+            self._delete_stale(index_name, stale, index, local_index, manifest, bm25)
+
+        if local_index is not None and (result.upserted or stale):
+            local_index.build_ivf()
+            self.local_store.save(index_name)
+            logger.info(f"Saved local index '{index_name}' ({len(local_index)} vectors) "
+                        f"to {self.local_store.index_dir}")
+
+        manifest.save()
+
+        # Keyword index for hybrid search is rebuilt from the full document
+        # set (no embeddings needed), so it is never stale relative to vectors
+        bm25.upsert(records)
+        bm25.save(index_dir)
+
+        # Invalidate cached retriever lookups in every worker
+        if result.upserted or stale:
+            bump_index_version(index_dir, index_name)
+
+        return result
+
+    @staticmethod
+    def _delete_stale(index_name: str, stale: List[str], index, local_index,
+                      manifest: ContentHashManifest, bm25: BM25Index) -> None:
+        """Remove documents that left the source from every store of an index."""
+        deleted = stale
+        if index is not None:
+            try:
+                for start in range(0, len(stale), PINECONE_DELETE_BATCH):
+                    index.delete(ids=stale[start:start + PINECONE_DELETE_BATCH])
+            except Exception as e:
+                # Keep them in the manifest so the next run retries the delete
+                logger.warning(f"Could not delete stale vectors from '{index_name}': {e}")
+                deleted = []
+        if local_index is not None:
+            local_index.delete(stale)
+        for doc_id in deleted:
+            manifest.hashes.pop(doc_id, None)
+        bm25.delete(stale)
+        logger.info(f"Removed {len(stale)} stale documents from '{index_name}'")
+
+    @staticmethod
+    def _remote_vector_count(index) -> Optional[int]:
+        """Total vectors in a Pinecone index, or None if the stats are unavailable."""
+        try:
+            stats = index.describe_index_stats()
+        except Exception as e:
+            logger.warning(f"Could not read index stats: {e}")
+            return None
+        count = getattr(stats, "total_vector_count", None)
+        if count is None and isinstance(stats, dict):
+            count = stats.get("total_vector_count")
+        return count
+
+    def populate_sdtmig_index(self) -> PopulationResult:
         """Populate the SDTM-IG index with domain specifications."""
         documents = []
 
@@ -509,7 +672,7 @@ class PineconeKnowledgeBase:
         logger.info(f"Prepared {len(documents)} SDTM-IG documents")
         return self.upsert_documents("sdtmig", documents)
 
-    def populate_controlled_terminology_index(self) -> int:
+    def populate_controlled_terminology_index(self) -> PopulationResult:
         """Populate the controlled terminology index."""
         documents = []
 
@@ -685,7 +848,7 @@ class PineconeKnowledgeBase:
         logger.info(f"Prepared {len(documents)} controlled terminology documents")
         return self.upsert_documents("sdtmct", documents)
 
-    def populate_validation_rules_index(self) -> int:
+    def populate_validation_rules_index(self) -> PopulationResult:
         """Populate validation rules index with Pinnacle 21 and FDA rules."""
         documents = []
 
@@ -761,7 +924,7 @@ class PineconeKnowledgeBase:
         logger.info(f"Prepared {len(documents)} validation rule documents")
         return self.upsert_documents("validationrules", documents)
 
-    def populate_business_rules_index(self) -> int:
+    def populate_business_rules_index(self) -> PopulationResult:
         """Populate business rules index with transformation rules."""
         documents = []
 
@@ -948,16 +1111,20 @@ class PineconeKnowledgeBase:
         logger.info(f"Prepared {len(documents)} business rule documents")
         return self.upsert_documents("businessrules", documents)
 
-    def populate_derivation_rules_index(self) -> int:
+    def populate_derivation_rules_index(self) -> PopulationResult:
         """Populate derivation rules index with comprehensive variable derivation logic."""
         documents = []
 
         # Import derivation rules
         try:
-            from .derivation_rules import DERIVATION_RULES, CROSS_DOMAIN_DEPENDENCIES, SOURCE_COLUMN_PATTERNS
+            from .derivation_rules import (
+                DERIVATION_RULES, CROSS_DOMAIN_DEPENDENCIES, SOURCE_COLUMN_PATTERNS,
+                get_variable_dependencies, get_source_patterns_for_target,
+            )
         except ImportError:
             from sdtm_pipeline.knowledge_base.derivation_rules import (
-                DERIVATION_RULES, CROSS_DOMAIN_DEPENDENCIES, SOURCE_COLUMN_PATTERNS
+                DERIVATION_RULES, CROSS_DOMAIN_DEPENDENCIES, SOURCE_COLUMN_PATTERNS,
+                get_variable_dependencies, get_source_patterns_for_target,
             )
 
         # Create documents for each variable's derivation rule
@@ -983,6 +1150,21 @@ class PineconeKnowledgeBase:
                         f"{target} <- {', '.join(sources)}" for target, sources in mappings.items()
                     )
 
+                # Upstream variables and typical EDC column names, from the reverse indexes
+                depends_on = get_variable_dependencies(f"{domain}.{var_name}")
+                depends_on_text = ""
+                if depends_on:
+                    depends_on_text = f"Must be derived after: {', '.join(depends_on)}"
+
+                edc_columns = [
+                    column
+                    for info in get_source_patterns_for_target(f"{domain}.{var_name}")
+                    for column in info["patterns"]
+                ]
+                edc_columns_text = ""
+                if edc_columns:
+                    edc_columns_text = f"Common EDC column names: {', '.join(edc_columns)}"
+
                 examples_text = ""
                 if rule.get("examples"):
                     examples_text = "Examples: " + "; ".join(
@@ -1005,8 +1187,12 @@ Source Variables Required: {', '.join(rule.get('source_variables', [])) or 'None
 
 {source_patterns_text}
 
+{edc_columns_text}
+
 {cross_domain_text}
 
+{depends_on_text}
+
 {value_mappings_text}
 
 {examples_text}
@@ -1045,6 +1231,7 @@ The derivation type is {rule.get('derivation_type', 'direct')}, meaning:
                         "derivation_formula": rule.get("derivation_formula", "")[:200],
                         "source_patterns": ", ".join(clean_source_patterns) if clean_source_patterns else "",
                         "cross_domain_sources": ", ".join(clean_cross_domain) if clean_cross_domain else "",
+                        "depends_on": ", ".join(depends_on),
                         "has_value_mappings": "yes" if rule.get("value_mappings") else "no",
                         "type": "derivation_rule"
                     }
@@ -1118,7 +1305,7 @@ all map to the same SDTM target variable(s).
         logger.info(f"Prepared {len(documents)} derivation rule documents")
         return self.upsert_documents("derivationrules", documents)
 
-    def populate_dta_index(self, dta_text: str, dta_id: str = "DTA-001") -> int:
+    def populate_dta_index(self, dta_text: str, dta_id: str = "DTA-001") -> PopulationResult:
         """Populate the DTA index from a Data Transfer Agreement document.
 
         The text is split on markdown headings (## or ###) to produce one
@@ -1130,7 +1317,7 @@ all map to the same SDTM target variable(s).
             dta_id:   Identifier for this agreement (used as a record-ID prefix).
 
         Returns:
-            Number of documents indexed.
+            PopulationResult (``indexed`` sections, ``upserted`` new or changed).
         """
         import re
 
@@ -1192,39 +1379,48 @@ all map to the same SDTM target variable(s).
             ))
 
         logger.info(f"Prepared {len(documents)} DTA clause documents")
-        return self.upsert_documents("dta", documents)
+        return self.upsert_documents("dta", documents, scope=f"{dta_id}-")
 
-    def populate_all_indexes(self) -> Dict[str, int]:
-        """Populate all knowledge base indexes."""
+    def populate_all_indexes(self, force: bool = False) -> Dict[str, PopulationResult]:
+        """Populate all knowledge base indexes.
+
+        Only documents changed since the last run are re-embedded unless
+        ``force`` is set.
+        """
         logger.info("Starting full knowledge base population...")
+        self.force_refresh = force
 
-        # Create indexes first
-        self.create_indexes()
+        try:
+            # Create indexes first
+            self.create_indexes()
 
-        results = {}
+            results = {}
 
-        # Populate each index
-        logger.info("Populating SDTM-IG index...")
-        results["sdtmig"] = self.populate_sdtmig_index()
+            # Populate each index
+            logger.info("Populating SDTM-IG index...")
+            results["sdtmig"] = self.populate_sdtmig_index()
 
-        logger.info("Populating Controlled Terminology index...")
-        results["sdtmct"] = self.populate_controlled_terminology_index()
+            logger.info("Populating Controlled Terminology index...")
+            results["sdtmct"] = self.populate_controlled_terminology_index()
 
-        logger.info("Populating Validation Rules index...")
-        results["validationrules"] = self.populate_validation_rules_index()
+            logger.info("Populating Validation Rules index...")
+            results["validationrules"] = self.populate_validation_rules_index()
 
-        logger.info("Populating Business Rules index...")
-        results["businessrules"] = self.populate_business_rules_index()
+            logger.info("Populating Business Rules index...")
+            results["businessrules"] = self.populate_business_rules_index()
 
-        logger.info("Populating Derivation Rules index...")
-        results["derivationrules"] = self.populate_derivation_rules_index()
+            logger.info("Populating Derivation Rules index...")
+            results["derivationrules"] = self.populate_derivation_rules_index()
+        finally:
+            self.force_refresh = False
 
         # Summary
-        total = sum(results.values())
-        logger.info(f"Knowledge base population complete!")
+        total = sum(run.indexed for run in results.values())
+        logger.info("Knowledge base population complete!")
         logger.info(f"Total documents indexed: {total}")
-        for index_name, count in results.items():
-            logger.info(f"  {index_name}: {count} documents")
+        for index_name, run in results.items():
+            logger.info(f"  {index_name}: {run.indexed} documents ({run.upserted} written, "
+                        f"{run.skipped} unchanged, {run.failed} failed, {run.seconds:.1f}s)")
 
         return results
 
@@ -1235,7 +1431,10 @@ def main():
     print("SDTM Knowledge Base Setup")
     print("=" * 60)
 
-    if not PINECONE_AVAILABLE:
+    backend = get_knowledge_backend()
+    use_pinecone = backend in ("pinecone", "both")
+
+    if use_pinecone and not PINECONE_AVAILABLE:
         print("ERROR: Pinecone package not installed.")
         print("Run: pip install pinecone-client")
         return
@@ -1249,7 +1448,7 @@ def main():
     pinecone_key = os.getenv("PINECONE_API_KEY")
     openai_key = os.getenv("OPENAI_API_KEY")
 
-    if not pinecone_key:
+    if use_pinecone and not pinecone_key:
         print("ERROR: PINECONE_API_KEY not found in .env file")
         print(f"Expected .env location: {ENV_FILE}")
         return
@@ -1261,9 +1460,11 @@ def main():
 
     # Show loaded keys (masked)
     print(f"\nAPI Keys loaded from .env:")
-    print(f"  PINECONE_API_KEY: {pinecone_key[:10]}...{pinecone_key[-4:]}")
+    if pinecone_key:
+        print(f"  PINECONE_API_KEY: {pinecone_key[:10]}...{pinecone_key[-4:]}")
     print(f"  OPENAI_API_KEY: {openai_key[:10]}...{openai_key[-4:]}")
     print(f"  PINECONE_ENVIRONMENT: {os.getenv('PINECONE_ENVIRONMENT', 'us-east-1')}")
+    print(f"  KNOWLEDGE_BACKEND: {backend}")
     print()
 
     try:
@@ -1273,9 +1474,9 @@ def main():
         print("\n" + "=" * 60)
         print("Setup Complete!")
         print("=" * 60)
-        print(f"Total documents indexed: {sum(results.values())}")
-        for index_name, count in results.items():
-            print(f"  {index_name}: {count} documents")
+        print(f"Total documents indexed: {sum(run.indexed for run in results.values())}")
+        for index_name, run in results.items():
+            print(f"  {index_name}: {run.indexed} documents ({run.upserted} written, {run.skipped} unchanged)")
 
     except Exception as e:
         print(f"ERROR: {e}")
@@ -6,10 +6,13 @@ LangGraph-based multi-agent system for SDTM transformation pipeline.
 
 from .knowledge_tools import get_knowledge_retriever, SDTMKnowledgeRetriever
 from .sdtmig_reference import get_sdtmig_reference, SDTMIGReference
+from ..utils.retrieval_cache import RetrievalCache, get_retrieval_cache
 
 __all__ = [
     "get_knowledge_retriever",
     "SDTMKnowledgeRetriever",
     "get_sdtmig_reference",
-    "SDTMIGReference"
+    "SDTMIGReference",
+    "RetrievalCache",
+    "get_retrieval_cache"
 ]
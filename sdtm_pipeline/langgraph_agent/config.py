@@ -70,3 +70,14 @@ def get_pinecone_config():
         ),
         "environment": os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
     }
+
+
+def get_local_index_config():
+    """Get local vector index configuration (in-process Pinecone stand-in)."""
+    return {
+        "backend": os.getenv("KNOWLEDGE_BACKEND", "pinecone").strip().lower(),
+        "index_dir": os.getenv(
+            "KNOWLEDGE_INDEX_DIR",
+            os.path.join(os.path.dirname(__file__), "..", "..", ".knowledge_index")
+        )
+    }
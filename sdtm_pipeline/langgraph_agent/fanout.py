@@ -0,0 +1,176 @@
+"""
+Concurrent Knowledge Fan-Out
+============================
+Queries several knowledge sources (Pinecone/local indexes, web search) at
+once so a lookup costs roughly the latency of the slowest source instead
+of the sum of all of them.
+
+Features:
+- Per-source timeouts: a slow or hung source is dropped, not waited on.
+  Its thread cannot be interrupted, so once abandoned calls hold half the
+  pool, new lookups get a fresh pool and the old one exits as its
+  stragglers finish
+- Early return: stop waiting once enough high-scoring hits have arrived
+- Merged ranking: results from all sources deduplicated and ordered by score
+
+Configuration:
+    KNOWLEDGE_FANOUT_WORKERS  - Thread pool size (default 16)
+    KNOWLEDGE_SOURCE_TIMEOUT  - Default per-source timeout in seconds (default 10)
+
+Usage:
+    from .fanout import fan_out, merge_ranked
+
+    outcome = fan_out({
+        "sdtmig": lambda: retriever.search_pinecone(q, "sdtmig"),
+        "sdtmct": lambda: retriever.search_pinecone(q, "sdtmct"),
+    }, enough=5, min_score=0.5)
+    hits = merge_ranked(outcome.results, top_k=10)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+
+DEFAULT_WORKERS = int(os.getenv("KNOWLEDGE_FANOUT_WORKERS", "16"))
+DEFAULT_SOURCE_TIMEOUT = float(os.getenv("KNOWLEDGE_SOURCE_TIMEOUT", "10"))
+
+ABANDONED_LIMIT = max(1, DEFAULT_WORKERS // 2)  # Timed-out calls tolerated per pool
+
+_executor: Optional[ThreadPoolExecutor] = None
+_abandoned: Set[Future] = set()  # Timed-out calls still running in _executor
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Shared thread pool for knowledge lookups (created lazily).
+
+    Replaced by a fresh pool once ABANDONED_LIMIT timed-out calls are
+    still occupying its threads.
+    """
+    global _executor, _abandoned
+    with _lock:
+        if _executor is not None and len(_abandoned) >= ABANDONED_LIMIT:
+            print(f"[fanout] {len(_abandoned)} timed-out lookups still running, starting a fresh pool")
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS, thread_name_prefix="kb-fanout")
+            _abandoned = set()
+        return _executor
+
+
+def abandon(future: Future) -> None:
+    """Stop waiting for ``future``: cancel it if queued, else count it against the pool."""
+    if future.cancel():
+        return
+    with _lock:
+        abandoned = _abandoned
+        abandoned.add(future)
+
+    def release(done: Future) -> None:
+        with _lock:
+            abandoned.discard(done)
+
+    future.add_done_callback(release)
+
+
+@dataclass
+class FanOutResult:
+    """Results per source plus which sources timed out, failed or were skipped."""
+    results: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def fan_out(
+    sources: Dict[str, Callable[[], List[Dict[str, Any]]]],
+    timeout: Optional[float] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    enough: Optional[int] = None,
+    min_score: float = 0.0,
+) -> FanOutResult:
+    """
+    Run every source callable concurrently.
+
+    Args:
+        sources: Source name -> zero-argument callable returning result dicts
+        timeout: Default per-source timeout in seconds (DEFAULT_SOURCE_TIMEOUT)
+        timeouts: Per-source overrides of ``timeout``
+        enough: Return early once this many hits with ``score >= min_score``
+            have arrived (remaining sources are abandoned, not awaited)
+        min_score: Score threshold for counting towards ``enough``
+
+    Returns:
+        FanOutResult with results of the sources that completed in time
+    """
+    outcome = FanOutResult()
+    if not sources:
+        return outcome
+
+    if timeout is None:
+        timeout = DEFAULT_SOURCE_TIMEOUT
+    start = time.monotonic()
+    executor = get_executor()
+    deadlines = {name: start + (timeouts or {}).get(name, timeout) for name in sources}
+    pending: Dict[Future, str] = {executor.submit(fn): name for name, fn in sources.items()}
+    good_hits = 0
+
+    while pending:
+        now = time.monotonic()
+        for future, name in list(pending.items()):
+            if deadlines[name] <= now and not future.done():
+                outcome.timed_out.append(name)
+                abandon(future)
+                del pending[future]
+        if not pending:
+            break
+
+        next_deadline = min(deadlines[name] for name in pending.values())
+        done, _ = wait(list(pending), timeout=max(0.0, next_deadline - now),
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                results = future.result() or []
+            except Exception as e:
+                outcome.errors[name] = str(e)
+                continue
+            outcome.results[name] = results
+            good_hits += sum(1 for r in results if r.get("score", 0) >= min_score)
+
+        if enough is not None and good_hits >= enough:
+            for future, name in pending.items():
+                abandon(future)
+                outcome.skipped.append(name)
+            break
+
+    outcome.elapsed = time.monotonic() - start
+    return outcome
+
+
+def merge_ranked(
+    results: Dict[str, List[Dict[str, Any]]],
+    top_k: Optional[int] = None,
+    key: str = "id",
+) -> List[Dict[str, Any]]:
+    """
+    Merge per-source result lists into one ranking by descending score.
+
+    Duplicates (by ``key``) keep their best-scoring copy; each hit is tagged
+    with the source it came from under ``"index"`` unless already set.
+    """
+    best: Dict[Any, Dict[str, Any]] = {}
+    for source, hits in results.items():
+        for hit in hits:
+            hit_key = hit.get(key) or id(hit)
+            if hit_key not in best or hit.get("score", 0) > best[hit_key].get("score", 0):
+                best[hit_key] = {"index": source, **hit}
+    merged = sorted(best.values(), key=lambda h: h.get("score", 0), reverse=True)
+    return merged[:top_k] if top_k else merged
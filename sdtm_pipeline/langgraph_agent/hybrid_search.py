@@ -0,0 +1,180 @@
+"""
+Hybrid Search (BM25 + Semantic)
+===============================
+Combines keyword (BM25) and vector retrieval for the SDTM knowledge base.
+
+BM25 postings and IDF tables are prebuilt during index population
+(``knowledge_base/bm25_index.py``) and loaded lazily per index on first
+use, so constructing a retriever no longer tokenizes any corpus.
+
+Result lists are merged with reciprocal-rank fusion (RRF):
+
+    score(d) = sum_i  w_i / (k + rank_i(d))
+
+computed for all candidates at once with a NumPy scatter-add.
+
+Usage:
+    from .hybrid_search import get_hybrid_retriever
+
+    retriever = get_hybrid_retriever()
+    results = retriever.search("AE start date derivation", "sdtmig", top_k=10,
+                               semantic_search_fn=kb.search_pinecone)
+"""
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config import get_local_index_config
+
+
+RRF_K = 60  # Standard RRF damping constant
+CANDIDATE_MULTIPLIER = 3  # Candidates fetched per source relative to top_k
+
+
+@dataclass
+class SearchResult:
+    """A fused hybrid search hit."""
+    id: str
+    score: float
+    source: str  # "bm25", "semantic" or "hybrid"
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Dict[str, Any]]],
+    weights: Optional[Sequence[float]] = None,
+    k: int = RRF_K,
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists (each ``{"id", "metadata", ...}``) with RRF.
+
+    Returns fused hits ordered by score, each with ``sources`` listing the
+    lists (by position) that contributed to it.
+    """
+    weights = list(weights) if weights else [1.0] * len(ranked_lists)
+    slot: Dict[str, int] = {}
+    first_hit: List[Dict[str, Any]] = []
+    positions, contributions, list_ids = [], [], []
+
+    for list_no, (results, weight) in enumerate(zip(ranked_lists, weights)):
+        if not results:
+            continue
+        ids = [r["id"] for r in results]
+        for r in results:
+            if r["id"] not in slot:
+                slot[r["id"]] = len(first_hit)
+                first_hit.append(r)
+        positions.append(np.fromiter((slot[i] for i in ids), dtype=np.int64, count=len(ids)))
+        contributions.append(weight / (k + np.arange(1, len(ids) + 1, dtype=np.float64)))
+        list_ids.append(np.full(len(ids), list_no, dtype=np.int64))
+
+    if not first_hit:
+        return []
+
+    pos = np.concatenate(positions)
+    scores = np.zeros(len(first_hit), dtype=np.float64)
+    np.add.at(scores, pos, np.concatenate(contributions))
+    membership = np.zeros((len(first_hit), len(ranked_lists)), dtype=bool)
+    membership[pos, np.concatenate(list_ids)] = True
+
+    order = np.argsort(-scores, kind="stable")
+    return [
+        {
+            "id": first_hit[i]["id"],
+            "score": float(scores[i]),
+            "metadata": first_hit[i].get("metadata", {}),
+            "sources": np.flatnonzero(membership[i]).tolist(),
+        }
+        for i in order
+    ]
+
+
+class HybridRetriever:
+    """
+    BM25 + semantic retriever over the knowledge base indexes.
+
+    Args:
+        semantic_search_fn: ``(query, index_name, top_k) -> [{"id", "score", "metadata"}]``,
+            used when ``search`` is not given one
+        index_dir: Directory holding the prebuilt ``<index>.bm25.pkl`` artifacts
+        bm25_weight / semantic_weight: RRF weights for each result list
+    """
+
+    def __init__(
+        self,
+        semantic_search_fn: Optional[Callable[..., List[Dict[str, Any]]]] = None,
+        index_dir: Optional[Path] = None,
+        bm25_weight: float = 1.0,
+        semantic_weight: float = 1.0,
+    ):
+        self.semantic_search_fn = semantic_search_fn
+        self.index_dir = Path(index_dir or get_local_index_config()["index_dir"])
+        self.bm25_weight = bm25_weight
+        self.semantic_weight = semantic_weight
+        self._bm25: Dict[str, Any] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _get_bm25(self, index_name: str):
+        """Load (or reload, if rebuilt on disk) the prebuilt BM25 index."""
+        path = self.index_dir / f"{index_name}.bm25.pkl"
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            if self._mtimes.get(index_name) != mtime:
+                from ..knowledge_base.bm25_index import BM25Index
+                self._bm25[index_name] = BM25Index.load(self.index_dir, index_name)
+                self._mtimes[index_name] = mtime
+            return self._bm25.get(index_name)
+
+    def keyword_search(self, query: str, index_name: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        bm25 = self._get_bm25(index_name)
+        return bm25.search(query, top_k=top_k) if bm25 else []
+
+    def search(
+        self,
+        query: str,
+        index_name: str,
+        top_k: int = 10,
+        semantic_search_fn: Optional[Callable[..., List[Dict[str, Any]]]] = None,
+    ) -> List[SearchResult]:
+        n_candidates = top_k * CANDIDATE_MULTIPLIER
+        keyword = self.keyword_search(query, index_name, n_candidates)
+        semantic_search_fn = semantic_search_fn or self.semantic_search_fn
+        semantic = semantic_search_fn(query, index_name, top_k=n_candidates) \
+            if semantic_search_fn else []
+
+        fused = reciprocal_rank_fusion(
+            [keyword, semantic], weights=[self.bm25_weight, self.semantic_weight]
+        )
+        labels = {(0,): "bm25", (1,): "semantic", (0, 1): "hybrid"}
+        return [
+            SearchResult(
+                id=hit["id"],
+                score=hit["score"],
+                source=labels[tuple(hit["sources"])],
+                metadata=hit["metadata"],
+            )
+            for hit in fused[:top_k]
+        ]
+
+
+# Shared instances, one per index directory. They hold only the BM25
+# indexes; callers pass their own semantic_search_fn to search().
+_hybrid_retrievers: Dict[Path, HybridRetriever] = {}
+_hybrid_lock = threading.Lock()
+
+
+def get_hybrid_retriever(index_dir: Optional[Path] = None) -> HybridRetriever:
+    """Get or create the shared hybrid retriever for an index directory."""
+    index_dir = Path(index_dir or get_local_index_config()["index_dir"])
+    with _hybrid_lock:
+        if index_dir not in _hybrid_retrievers:
+            _hybrid_retrievers[index_dir] = HybridRetriever(index_dir=index_dir)
+        return _hybrid_retrievers[index_dir]
@@ -3,11 +3,15 @@ SDTM Knowledge Retrieval Tools
 ==============================
 Tools for searching SDTM guidelines, business rules, and validation rules
 using Tavily (web search) and Pinecone (vector database).
+
+With KNOWLEDGE_BACKEND=local (or "both"), vector queries are served from the
+in-process NumPy indexes in KNOWLEDGE_INDEX_DIR; with "both", Pinecone is
+queried only when the local index is missing or returns no matches.
 """
 
 import os
+from concurrent.futures import TimeoutError as FuturesTimeout, as_completed
 from typing import Dict, Any, List, Optional
-from functools import lru_cache
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -39,7 +43,12 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
-from .config import get_tavily_config, get_pinecone_config
+from .config import get_tavily_config, get_pinecone_config, get_local_index_config
+from ..utils.retrieval_cache import cached_retrieval, get_retrieval_cache, mark_incomplete, read_index_version
+from .fanout import fan_out, merge_ranked, abandon, get_executor, DEFAULT_SOURCE_TIMEOUT
+
+# Seconds to wait for Tavily before racing Firecrawl against it
+WEB_HEDGE_DELAY = float(os.getenv("WEB_SEARCH_HEDGE_DELAY", "3"))
 
 
 class SDTMKnowledgeRetriever:
@@ -57,6 +66,7 @@ class SDTMKnowledgeRetriever:
         self.tavily_client = None
         self.firecrawl_client = None  # Backup for Tavily
         self.openai_client = None
+        self.local_store = None  # In-process vector index (KNOWLEDGE_BACKEND=local/both)
         self.indexes = {}
         self._tavily_disabled = False  # Flag to disable Tavily after rate limit
         self._use_firecrawl = False    # Flag to switch to Firecrawl
@@ -79,15 +89,31 @@ class SDTMKnowledgeRetriever:
                 print(f"  WARNING: OpenAI initialization failed: {e}")
                 self.openai_client = None
 
-        # Initialize Pinecone
-        if PINECONE_AVAILABLE:
+        # Initialize local vector indexes
+        local_config = get_local_index_config()
+        self.backend = local_config["backend"]
+        self._index_dir = local_config["index_dir"]
+        if self.backend in ("local", "both"):
+            try:
+                from ..knowledge_base.local_index import LocalVectorStore
+                self.local_store = LocalVectorStore(local_config["index_dir"])
+                for name in self.local_store.list_indexes():
+                    self.indexes[name] = "local"
+                print(f"  Local vector store initialized with {len(self.indexes)} indexes "
+                      f"({self.local_store.index_dir})")
+            except Exception as e:
+                print(f"  WARNING: Local vector store initialization failed: {e}")
+                self.local_store = None
+
+        # Initialize Pinecone (optional fallback when the local backend is enabled)
+        if PINECONE_AVAILABLE and self.backend != "local":
             try:
                 config = get_pinecone_config()
                 self.pinecone_client = Pinecone(api_key=config["api_key"])
                 # List available indexes
                 indexes = self.pinecone_client.list_indexes()
                 for idx in indexes:
-                    self.indexes[idx.name] = idx
+                    self.indexes.setdefault(idx.name, idx)
                 print(f"  Pinecone initialized with {len(self.indexes)} indexes")
             except Exception as e:
                 print(f"  WARNING: Pinecone initialization failed: {e}")
@@ -128,42 +154,81 @@ class SDTMKnowledgeRetriever:
             print(f"  Embedding error: {e}")
             return []
 
+    @property
+    def has_vector_store(self) -> bool:
+        """True when vector search is available (Pinecone and/or local index)."""
+        return bool(self.pinecone_client or self.local_store)
+
+    @property
+    def index_version(self) -> int:
+        """Knowledge base version stamp; changes whenever an index is re-populated."""
+        return read_index_version(self._index_dir)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the shared retrieval result cache."""
+        return get_retrieval_cache().stats()
+
     def list_pinecone_indexes(self) -> List[str]:
         """List available Pinecone indexes."""
         return list(self.indexes.keys())
 
+    def _search_local(
+        self,
+        query_vector: List[float],
+        index_name: str,
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """Search the in-process vector index, picking up newly populated indexes."""
+        if not self.local_store or not self.local_store.has_index(index_name):
+            return []
+        self.indexes.setdefault(index_name, "local")
+        try:
+            return self.local_store.query(index_name, query_vector, top_k=top_k)
+        except Exception as e:
+            print(f"  Local index search error for {index_name}: {e}")
+            return []
+
     def search_pinecone(
         self,
         query: str,
         index_name: str,
         namespace: str = "",
-        top_k: int = 5
+        top_k: int = 5,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search Pinecone index for relevant documents using OpenAI embeddings.
 
+        When a local vector store is configured the query is served from it;
+        Pinecone is only queried as a fallback (KNOWLEDGE_BACKEND=both).
+
         Args:
             query: Search query
             index_name: Name of the Pinecone index
             namespace: Optional namespace within the index
             top_k: Number of results to return
+            query_vector: Precomputed query embedding (skips the OpenAI call)
 
         Returns:
             List of matching documents with scores
         """
-        if not self.pinecone_client:
+        if not self.has_vector_store:
             return []
 
         try:
-            index = self.pinecone_client.Index(index_name)
-
             # Generate embedding using OpenAI
-            query_vector = self._get_embedding(query)
+            query_vector = query_vector or self._get_embedding(query)
 
             if not query_vector:
                 print(f"  WARNING: Could not generate embedding for query")
                 return []
 
+            if self.local_store:
+                local_results = self._search_local(query_vector, index_name, top_k)
+                if local_results or not self.pinecone_client:
+                    return local_results
+
+            index = self.pinecone_client.Index(index_name)
             results = index.query(
                 vector=query_vector,
                 top_k=top_k,
@@ -183,6 +248,51 @@ class SDTMKnowledgeRetriever:
             print(f"  Pinecone search error for {index_name}: {e}")
             return []
 
+    def _search_many(
+        self,
+        searches: Dict[str, tuple],
+        enough: Optional[int] = None,
+        min_score: float = 0.0,
+        only_available: bool = True
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run several vector searches concurrently.
+
+        Args:
+            searches: Label -> (index_name, query, top_k)
+            enough: Return early once this many hits scoring >= min_score arrived
+            min_score: Score threshold for ``enough``
+            only_available: Drop searches against indexes not listed at startup
+
+        Returns:
+            Label -> results for the searches that completed in time
+        """
+        if only_available:
+            searches = {
+                label: spec for label, spec in searches.items() if spec[0] in self.indexes
+            }
+        if not searches or not self.has_vector_store:
+            return {}
+
+        # Identical query text across indexes needs only one embedding call
+        queries = {query for _, query, _ in searches.values()}
+        shared_vector = self._get_embedding(next(iter(queries))) if len(queries) == 1 else None
+
+        outcome = fan_out(
+            {
+                label: (lambda i=index_name, q=query, k=top_k:
+                        self.search_pinecone(q, i, top_k=k, query_vector=shared_vector))
+                for label, (index_name, query, top_k) in searches.items()
+            },
+            enough=enough,
+            min_score=min_score,
+        )
+        for label in outcome.timed_out:
+            print(f"  Knowledge search timed out for {label}")
+        if outcome.timed_out:
+            mark_incomplete()
+        return outcome.results
+
     def search_web(
         self,
         query: str,
@@ -193,6 +303,8 @@ class SDTMKnowledgeRetriever:
         Search the web for SDTM-related information.
 
         Uses Tavily by default, switches to Firecrawl after first Tavily failure.
+        If Tavily has not answered within WEB_HEDGE_DELAY seconds, Firecrawl
+        is raced against it and the first non-empty result wins.
 
         Args:
             query: Search query
@@ -210,35 +322,89 @@ class SDTMKnowledgeRetriever:
         if self._use_firecrawl and not self._firecrawl_disabled:
             return self._search_firecrawl(query, max_results)
 
-        # Try Tavily first
+        # Try Tavily first, hedging with Firecrawl if it is slow. Tavily runs
+        # without its own Firecrawl fallback so Firecrawl is called at most once
         if self.tavily_client and not self._tavily_disabled:
+            executor = get_executor()
+            tavily_future = executor.submit(self._search_tavily, query, search_depth, max_results, False)
             try:
-                response = self.tavily_client.search(
-                    query=query,
-                    search_depth=search_depth,
-                    max_results=max_results,
-                    include_domains=["cdisc.org", "fda.gov", "ich.org"],
-                    include_answer=True
-                )
-                return response.get("results", [])
-            except Exception as e:
-                error_msg = str(e).lower()
-
-                # On any Tavily error, switch to Firecrawl
-                if "usage limit" in error_msg or "rate limit" in error_msg or "quota" in error_msg:
-                    print(f"  Tavily rate limit exceeded, switching to Firecrawl")
-                else:
-                    print(f"  Tavily error: {e}, switching to Firecrawl")
+                return tavily_future.result(timeout=WEB_HEDGE_DELAY)
+            except FuturesTimeout:
+                pass
+            except Exception:
+                return self._search_firecrawl(query, max_results)
 
-                self._tavily_disabled = True
-                self._use_firecrawl = True
+            if not self.firecrawl_client or self._firecrawl_disabled:
+                try:
+                    return tavily_future.result(timeout=DEFAULT_SOURCE_TIMEOUT)
+                except FuturesTimeout:
+                    print("  Tavily search timed out")
+                    abandon(tavily_future)
+                    mark_incomplete()
+                except Exception:
+                    pass
+                return []
 
-                # Try Firecrawl as fallback
-                return self._search_firecrawl(query, max_results)
+            firecrawl_future = executor.submit(self._search_firecrawl, query, max_results)
+            racing = [tavily_future, firecrawl_future]
+            try:
+                for future in as_completed(racing, timeout=DEFAULT_SOURCE_TIMEOUT):
+                    if future.exception() is not None:
+                        continue
+                    results = future.result()
+                    if results:
+                        return results
+            except FuturesTimeout:
+                print("  Web search timed out")
+                mark_incomplete()
+            finally:
+                for future in racing:
+                    if not future.done():
+                        abandon(future)
+            return []
 
         # Fall back to Firecrawl if Tavily not available
         return self._search_firecrawl(query, max_results)
 
+    def _search_tavily(
+        self,
+        query: str,
+        search_depth: str = "basic",
+        max_results: int = 5,
+        fallback: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Search using Tavily, switching to Firecrawl on the first failure.
+
+        With ``fallback=False`` the error is re-raised after Tavily is
+        disabled, for callers already running Firecrawl themselves.
+        """
+        try:
+            response = self.tavily_client.search(
+                query=query,
+                search_depth=search_depth,
+                max_results=max_results,
+                include_domains=["cdisc.org", "fda.gov", "ich.org"],
+                include_answer=True
+            )
+            return response.get("results", [])
+        except Exception as e:
+            error_msg = str(e).lower()
+
+            # On any Tavily error, switch to Firecrawl
+            if "usage limit" in error_msg or "rate limit" in error_msg or "quota" in error_msg:
+                print("  Tavily rate limit exceeded, switching to Firecrawl")
+            else:
+                print(f"  Tavily error: {e}, switching to Firecrawl")
+
+            self._tavily_disabled = True
+            self._use_firecrawl = True
+            if not fallback:
+                raise
+
+            # Try Firecrawl as fallback
+            return self._search_firecrawl(query, max_results)
+
     def _search_firecrawl(
         self,
         query: str,
@@ -313,7 +479,7 @@ class SDTMKnowledgeRetriever:
 
             return []
 
-    @lru_cache(maxsize=100)
+    @cached_retrieval
     def get_sdtm_variable_definition(
         self,
         domain: str,
@@ -329,18 +495,15 @@ class SDTMKnowledgeRetriever:
         Returns:
             Variable definition including type, controlled terminology, rules
         """
-        # First try Pinecone with actual index names
-        if self.pinecone_client:
-            # Try sdtmig index first (SDTM Implementation Guide)
+        # First try Pinecone with actual index names (sdtmig preferred)
+        if self.has_vector_store:
+            query = f"SDTM {domain} domain {variable} variable definition"
+            found = self._search_many({
+                index_name: (index_name, query, 3) for index_name in ["sdtmig", "sdtmmetadata"]
+            })
             for index_name in ["sdtmig", "sdtmmetadata"]:
-                if index_name in self.indexes:
-                    results = self.search_pinecone(
-                        query=f"SDTM {domain} domain {variable} variable definition",
-                        index_name=index_name,
-                        top_k=3
-                    )
-                    if results:
-                        return results[0].get("metadata", {})
+                if found.get(index_name):
+                    return found[index_name][0].get("metadata", {})
 
         # Fall back to web search
         if self.tavily_client:
@@ -357,7 +520,7 @@ class SDTMKnowledgeRetriever:
 
         return None
 
-    @lru_cache(maxsize=50)
+    @cached_retrieval
     def get_domain_specification(self, domain: str) -> Optional[Dict[str, Any]]:
         """
         Get full domain specification from SDTM IG.
@@ -368,20 +531,18 @@ class SDTMKnowledgeRetriever:
         Returns:
             Domain specification including required/expected variables
         """
-        # Try Pinecone first with actual index names
-        if self.pinecone_client:
+        # Try Pinecone first with actual index names (sdtmig preferred)
+        if self.has_vector_store:
+            query = f"SDTM {domain} domain specification required variables expected variables"
+            found = self._search_many({
+                index_name: (index_name, query, 5) for index_name in ["sdtmig", "sdtmmetadata"]
+            })
             for index_name in ["sdtmig", "sdtmmetadata"]:
-                if index_name in self.indexes:
-                    results = self.search_pinecone(
-                        query=f"SDTM {domain} domain specification required variables expected variables",
-                        index_name=index_name,
-                        top_k=5
-                    )
-                    if results:
-                        return {
-                            "domain": domain,
-                            "results": results
-                        }
+                if found.get(index_name):
+                    return {
+                        "domain": domain,
+                        "results": found[index_name]
+                    }
 
         # Fall back to web search
         if self.tavily_client:
@@ -399,7 +560,7 @@ class SDTMKnowledgeRetriever:
 
         return None
 
-    @lru_cache(maxsize=100)
+    @cached_retrieval
     def get_controlled_terminology(
         self,
         codelist: str
@@ -414,7 +575,7 @@ class SDTMKnowledgeRetriever:
             List of valid controlled terminology values
         """
         # Try Pinecone with actual index names
-        if self.pinecone_client:
+        if self.has_vector_store:
             # sdtmct is the controlled terminology index
             if "sdtmct" in self.indexes:
                 results = self.search_pinecone(
@@ -443,7 +604,7 @@ class SDTMKnowledgeRetriever:
 
         return None
 
-    @lru_cache(maxsize=50)
+    @cached_retrieval
     def get_business_rules(
         self,
         domain: str,
@@ -462,20 +623,17 @@ class SDTMKnowledgeRetriever:
         rules = []
 
         # Try Pinecone with actual index names
-        if self.pinecone_client:
-            # businessrules and validationrules are the actual indexes
+        if self.has_vector_store:
+            # businessrules and validationrules are the actual indexes (queried concurrently)
+            query = f"SDTM {domain} domain validation business rules"
+            if rule_type != "all":
+                query = f"{rule_type} {query}"
+
+            found = self._search_many({
+                index_name: (index_name, query, 10) for index_name in ["businessrules", "validationrules"]
+            })
             for index_name in ["businessrules", "validationrules"]:
-                if index_name in self.indexes:
-                    query = f"SDTM {domain} domain validation business rules"
-                    if rule_type != "all":
-                        query = f"{rule_type} {query}"
-
-                    results = self.search_pinecone(
-                        query=query,
-                        index_name=index_name,
-                        top_k=10
-                    )
-                    rules.extend([r.get("metadata", {}) for r in results])
+                rules.extend([r.get("metadata", {}) for r in found.get(index_name, [])])
 
         # Supplement with web search
         if self.tavily_client and len(rules) < 5:
@@ -511,21 +669,18 @@ class SDTMKnowledgeRetriever:
             Mapping guidance including transformation rules
         """
         # Try Pinecone with actual index names
-        if self.pinecone_client:
-            # sdtmig and sdtmmetadata contain mapping guidance
+        if self.has_vector_store:
+            # sdtmig and sdtmmetadata contain mapping guidance (sdtmig preferred)
+            query = f"SDTM {target_domain} {target_variable} derivation rule transformation"
+            if source_column:
+                query = f"map source {source_column} to {query}"
+
+            found = self._search_many({
+                index_name: (index_name, query, 3) for index_name in ["sdtmig", "sdtmmetadata"]
+            })
             for index_name in ["sdtmig", "sdtmmetadata"]:
-                if index_name in self.indexes:
-                    query = f"SDTM {target_domain} {target_variable} derivation rule transformation"
-                    if source_column:
-                        query = f"map source {source_column} to {query}"
-
-                    results = self.search_pinecone(
-                        query=query,
-                        index_name=index_name,
-                        top_k=3
-                    )
-                    if results:
-                        return results[0].get("metadata", {})
+                if found.get(index_name):
+                    return found[index_name][0].get("metadata", {})
 
         # Fall back to web search for standard mappings
         if self.tavily_client:
@@ -564,17 +719,22 @@ class SDTMKnowledgeRetriever:
             "source": "pinecone"
         }
 
-        if not self.pinecone_client or not self.openai_client:
+        if not self.has_vector_store or not self.openai_client:
             spec["source"] = "default"
             return spec
 
+        # Query SDTM IG, business rules and CT indexes concurrently
+        found = self._search_many({
+            "sdtmig": ("sdtmig",
+                       f"SDTM {domain} domain variables required expected permissible specification", 10),
+            "businessrules": ("businessrules",
+                              f"SDTM {domain} domain derivation transformation calculation rule", 10),
+            "sdtmct": ("sdtmct", f"SDTM {domain} controlled terminology codelist", 10),
+        })
+
         # Get domain specification from SDTM IG
         if "sdtmig" in self.indexes:
-            results = self.search_pinecone(
-                query=f"SDTM {domain} domain variables required expected permissible specification",
-                index_name="sdtmig",
-                top_k=10
-            )
+            results = found.get("sdtmig", [])
             for r in results:
                 meta = r.get("metadata", {})
                 if meta:
@@ -589,11 +749,7 @@ class SDTMKnowledgeRetriever:
 
         # Get derivation rules from business rules
         if "businessrules" in self.indexes:
-            results = self.search_pinecone(
-                query=f"SDTM {domain} domain derivation transformation calculation rule",
-                index_name="businessrules",
-                top_k=10
-            )
+            results = found.get("businessrules", [])
             for r in results:
                 meta = r.get("metadata", {})
                 if meta:
@@ -606,11 +762,7 @@ class SDTMKnowledgeRetriever:
 
         # Get controlled terminology
         if "sdtmct" in self.indexes:
-            results = self.search_pinecone(
-                query=f"SDTM {domain} controlled terminology codelist",
-                index_name="sdtmct",
-                top_k=10
-            )
+            results = found.get("sdtmct", [])
             for r in results:
                 meta = r.get("metadata", {})
                 codelist = meta.get("codelist", meta.get("name", ""))
@@ -641,17 +793,20 @@ class SDTMKnowledgeRetriever:
         """
         rules = []
 
-        if not self.pinecone_client or not self.openai_client:
+        if not self.has_vector_store or not self.openai_client:
             return rules
 
+        # Query both rule indexes concurrently
+        found = self._search_many({
+            "validationrules": ("validationrules",
+                                f"SDTM {domain} domain validation rule check conformance", 20),
+            "businessrules": ("businessrules",
+                              f"SDTM {domain} domain FDA Pinnacle 21 conformance rule", 20),
+        })
+
         # Get from validationrules index
         if "validationrules" in self.indexes:
-            query = f"SDTM {domain} domain validation rule check conformance"
-            results = self.search_pinecone(
-                query=query,
-                index_name="validationrules",
-                top_k=20
-            )
+            results = found.get("validationrules", [])
             for r in results:
                 meta = r.get("metadata", {})
                 if meta:
@@ -667,12 +822,7 @@ class SDTMKnowledgeRetriever:
 
         # Get from businessrules index
         if "businessrules" in self.indexes:
-            query = f"SDTM {domain} domain FDA Pinnacle 21 conformance rule"
-            results = self.search_pinecone(
-                query=query,
-                index_name="businessrules",
-                top_k=20
-            )
+            results = found.get("businessrules", [])
             for r in results:
                 meta = r.get("metadata", {})
                 if meta:
@@ -714,17 +864,21 @@ class SDTMKnowledgeRetriever:
             "source": "pinecone"
         }
 
-        if not self.pinecone_client or not self.openai_client:
+        if not self.has_vector_store or not self.openai_client:
             guidance["source"] = "default"
             return guidance
 
+        # Query SDTM IG and business rules concurrently
+        found = self._search_many({
+            "sdtmig": ("sdtmig", f"SDTM {domain} domain required expected permissible variables", 15),
+            "businessrules": ("businessrules",
+                              f"SDTM {domain} transformation derivation algorithm from {source_data_description}",
+                              10),
+        })
+
         # Get required/expected variables from SDTM IG
         if "sdtmig" in self.indexes:
-            results = self.search_pinecone(
-                query=f"SDTM {domain} domain required expected permissible variables",
-                index_name="sdtmig",
-                top_k=15
-            )
+            results = found.get("sdtmig", [])
             for r in results:
                 meta = r.get("metadata", {})
                 core = meta.get("core", "").upper()
@@ -741,12 +895,7 @@ class SDTMKnowledgeRetriever:
 
         # Get transformation guidance from business rules
         if "businessrules" in self.indexes:
-            query = f"SDTM {domain} transformation derivation algorithm from {source_data_description}"
-            results = self.search_pinecone(
-                query=query,
-                index_name="businessrules",
-                top_k=10
-            )
+            results = found.get("businessrules", [])
             for r in results:
                 meta = r.get("metadata", {})
                 if meta:
@@ -816,17 +965,14 @@ class SDTMKnowledgeRetriever:
             List of DTA requirement dicts with clause_id, section_title,
             requirement_type, and content.
         """
-        # Two-pronged search: domain-specific + general requirements
-        domain_results = self.search_pinecone(
-            query=f"Data Transfer Agreement {domain} domain requirements specifications quality",
-            index_name="dta",
-            top_k=15,
-        )
-        general_results = self.search_pinecone(
-            query=f"Data Transfer Agreement general data quality completeness format requirements",
-            index_name="dta",
-            top_k=10,
-        )
+        # Two-pronged search, run concurrently: domain-specific + general requirements
+        # (the dta index may be created after startup by a DTA upload)
+        found = self._search_many({
+            "domain": ("dta", f"Data Transfer Agreement {domain} domain requirements specifications quality", 15),
+            "general": ("dta", "Data Transfer Agreement general data quality completeness format requirements", 10),
+        }, only_available=False)
+        domain_results = found.get("domain", [])
+        general_results = found.get("general", [])
 
         # Merge and deduplicate by ID
         seen_ids: set = set()
@@ -873,40 +1019,74 @@ class SDTMKnowledgeRetriever:
         """
         all_results = {}
 
-        if not self.pinecone_client or not self.openai_client:
+        if not self.has_vector_store or not self.openai_client:
             return all_results
 
+        # One embedding, all indexes queried concurrently
+        found = self._search_many({
+            index_name: (index_name, query, top_k_per_index) for index_name in self.indexes
+        })
         for index_name in self.indexes:
-            results = self.search_pinecone(
-                query=query,
-                index_name=index_name,
-                top_k=top_k_per_index
-            )
-            if results:
-                all_results[index_name] = results
+            if found.get(index_name):
+                all_results[index_name] = found[index_name]
 
         return all_results
 
+    def search_knowledge(
+        self,
+        query: str,
+        index_names: Optional[List[str]] = None,
+        top_k: int = 10,
+        enough: Optional[int] = None,
+        min_score: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """
+        Search several indexes concurrently and return one merged ranking.
+
+        Args:
+            query: Search query
+            index_names: Indexes to search (defaults to all available)
+            top_k: Number of merged results to return
+            enough: Stop waiting for slower indexes once this many results
+                scoring at least ``min_score`` have arrived
+            min_score: Score threshold used with ``enough``
+
+        Returns:
+            Results from all indexes ordered by score, each tagged with ``index``
+        """
+        names = index_names or list(self.indexes)
+        found = self._search_many(
+            {name: (name, query, top_k) for name in names},
+            enough=enough,
+            min_score=min_score
+        )
+        return merge_ranked(found, top_k=top_k)
+
 
 # Import hybrid search components
 try:
     from .hybrid_search import (
         HybridRetriever,
-        HistoricalMappingRetriever,
         get_hybrid_retriever,
-        get_historical_mapping_retriever,
         SearchResult
     )
     HYBRID_SEARCH_AVAILABLE = True
 except ImportError:
     HYBRID_SEARCH_AVAILABLE = False
 
+try:
+    from .hybrid_search import HistoricalMappingRetriever, get_historical_mapping_retriever
+    HISTORICAL_SEARCH_AVAILABLE = True
+except ImportError:
+    HISTORICAL_SEARCH_AVAILABLE = False
+
 
 class SDTMKnowledgeRetrieverExtended(SDTMKnowledgeRetriever):
     """
     Extended knowledge retriever with hybrid search capabilities.
 
-    Adds BM25 + Semantic hybrid search for improved retrieval accuracy.
+    Adds BM25 + Semantic hybrid search for improved retrieval accuracy,
+    fused with reciprocal-rank fusion.
     """
 
     def __init__(self):
@@ -916,14 +1096,22 @@ class SDTMKnowledgeRetrieverExtended(SDTMKnowledgeRetriever):
         self._init_hybrid_search()
 
     def _init_hybrid_search(self):
-        """Initialize hybrid search components."""
+        """Initialize hybrid search components.
+
+        BM25 indexes are prebuilt by the population step and loaded lazily
+        on first search, so this does not tokenize any corpus.
+        """
         if HYBRID_SEARCH_AVAILABLE:
             try:
-                self.hybrid_retriever = get_hybrid_retriever()
-                self.historical_retriever = get_historical_mapping_retriever()
+                self.hybrid_retriever = get_hybrid_retriever(index_dir=self._index_dir)
                 print("  Hybrid search (BM25 + Semantic) enabled")
             except Exception as e:
                 print(f"  WARNING: Hybrid search initialization failed: {e}")
+        if HISTORICAL_SEARCH_AVAILABLE:
+            try:
+                self.historical_retriever = get_historical_mapping_retriever()
+            except Exception as e:
+                print(f"  WARNING: Historical mapping search initialization failed: {e}")
 
     def hybrid_search(
         self,
@@ -947,7 +1135,9 @@ class SDTMKnowledgeRetrieverExtended(SDTMKnowledgeRetriever):
             return self.search_pinecone(query, index_name, top_k=top_k)
 
         try:
-            results = self.hybrid_retriever.search(query, index_name, top_k)
+            results = self.hybrid_retriever.search(
+                query, index_name, top_k, semantic_search_fn=self.search_pinecone
+            )
             return [
                 {
                     "id": r.id,
@@ -317,7 +317,7 @@ def convert_domain(domain: str) -> str:
             from sdtm_pipeline.langgraph_agent.knowledge_tools import get_knowledge_retriever
             retriever = get_knowledge_retriever()
 
-            if retriever and retriever.pinecone_client:
+            if retriever and retriever.has_vector_store:
                 # Fetch domain specification
                 domain_spec = retriever.get_domain_specification(domain)
                 guidance = retriever.get_sdtm_generation_guidance(domain, "EDC clinical trial data")
@@ -2311,8 +2311,38 @@ def upload_sdtm_to_s3(
         return f"Error uploading to S3: {str(e)}\n\n{traceback.format_exc()}"
 
 
+def _export_sdtm_for_neo4j_import(domains_to_load: List[str]) -> str:
+    """Write neo4j-admin bulk import files for the given domains."""
+    from etl_neo4j.bulk_export import Neo4jBulkExporter
+
+    output_dir = os.getenv("NEO4J_IMPORT_DIR", "./neo4j_import")
+    frames = {dom: _sdtm_data[dom] for dom in domains_to_load if dom in _sdtm_data}
+    manifest = Neo4jBulkExporter(output_dir, _study_id).export(
+        frames, database=os.getenv("NEO4J_DATABASE", "neo4j")
+    )
+
+    output = "## Neo4j Bulk Import Files Ready\n\n"
+    output += f"**Study ID:** {_study_id}\n"
+    output += f"**Output Directory:** {output_dir}\n"
+    output += f"**Total Nodes:** {manifest['totals']['nodes']}\n"
+    output += f"**Total Relationships:** {manifest['totals']['relationships']}\n\n"
+
+    output += "| File | Rows |\n"
+    output += "|------|------|\n"
+    for entry in manifest["files"]:
+        output += f"| {entry['path']} | {entry['rows']} |\n"
+
+    if manifest["relrec_unresolved"]:
+        output += f"\n⚠ {manifest['relrec_unresolved']} RELREC rows did not match a record.\n"
+
+    output += "\n### Import Command\n\n"
+    output += "Stop the target database, then run:\n\n"
+    output += f"```\n{manifest['import_command']}\n```\n"
+    return output
+
+
 @tool
-def load_sdtm_to_neo4j(domain: str = "") -> str:
+def load_sdtm_to_neo4j(domain: str = "", mode: str = "") -> str:
     """
     Load converted SDTM data to Neo4j graph database.
 
@@ -2321,121 +2351,98 @@ def load_sdtm_to_neo4j(domain: str = "") -> str:
 
     Args:
         domain: Specific domain to load (empty string loads all converted domains)
+        mode: "transactional" MERGEs every record into a running database;
+            "incremental" sends only records inserted, changed or deleted
+            since the last load; "bulk" writes neo4j-admin import CSVs for an
+            offline initial load of a whole study (default: NEO4J_LOAD_MODE
+            or "transactional")
     """
     if not _sdtm_data:
         return "No SDTM data to load. Please use convert_domain first."
 
+    mode = (mode or os.getenv("NEO4J_LOAD_MODE", "transactional")).lower()
+    if mode not in ("transactional", "incremental", "bulk"):
+        return f"Error: unknown mode '{mode}'. Use 'transactional', 'incremental' or 'bulk'."
+
     try:
-        from neo4j import GraphDatabase
+        if mode == "bulk":
+            domains_to_load = [domain.upper()] if domain else list(_sdtm_data.keys())
+            return _export_sdtm_for_neo4j_import(domains_to_load)
+
+        from etl_neo4j.neo4j_loader import Neo4jConfig, Neo4jLoader
+        from etl_neo4j.sdtm_sync import SDTMGraphSync
 
         # Get Neo4j connection details from environment
         neo4j_uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         neo4j_user = os.getenv("NEO4J_USER", "neo4j")
         neo4j_password = os.getenv("NEO4J_PASSWORD", "")
+        batch_size = int(os.getenv("NEO4J_BATCH_SIZE", "5000"))
 
         if not neo4j_password:
             return "Error: NEO4J_PASSWORD environment variable not set. Please configure Neo4j credentials."
 
-        driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        loader = Neo4jLoader(Neo4jConfig(
+            uri=neo4j_uri,
+            user=neo4j_user,
+            password=neo4j_password,
+            database=os.getenv("NEO4J_DATABASE", "neo4j"),
+        ))
 
         # Determine which domains to load
         domains_to_load = [domain.upper()] if domain else list(_sdtm_data.keys())
 
         loaded_stats = []
+        load_errors = []
         total_nodes = 0
         total_relationships = 0
+        total_missing = 0
+
+        sync = SDTMGraphSync(loader, _study_id, batch_size=batch_size)
+        incremental = mode == "incremental"
 
-        with driver.session() as session:
+        try:
+            sync.prepare()
             for dom in domains_to_load:
                 if dom not in _sdtm_data:
                     continue
 
-                df = _sdtm_data[dom]
-
-                # Create domain constraint (if not exists)
-                try:
-                    session.run(f"""
-                        CREATE CONSTRAINT IF NOT EXISTS
-                        FOR (n:{dom}) REQUIRE n.record_id IS UNIQUE
-                    """)
-                except:
-                    pass  # Constraint may already exist
-
-                # Create Study node
-                session.run("""
-                    MERGE (s:Study {study_id: $study_id})
-                    SET s.updated_at = datetime()
-                """, study_id=_study_id)
-
-                # Create Domain node
-                session.run("""
-                    MERGE (d:Domain {name: $domain, study_id: $study_id})
-                    SET d.record_count = $count, d.updated_at = datetime()
-                    WITH d
-                    MATCH (s:Study {study_id: $study_id})
-                    MERGE (s)-[:HAS_DOMAIN]->(d)
-                """, domain=dom, study_id=_study_id, count=len(df))
-
-                nodes_created = 0
-                rels_created = 0
-
-                # Create Subject nodes and domain records
-                for idx, row in df.iterrows():
-                    record_data = row.to_dict()
-                    # Clean NaN values
-                    record_data = {k: (None if pd.isna(v) else v) for k, v in record_data.items()}
-
-                    usubjid = record_data.get('USUBJID', f'{_study_id}-{idx}')
-                    record_id = f"{dom}_{usubjid}_{idx}"
-
-                    # Create Subject node
-                    session.run("""
-                        MERGE (sub:Subject {usubjid: $usubjid, study_id: $study_id})
-                        SET sub.updated_at = datetime()
-                    """, usubjid=usubjid, study_id=_study_id)
-
-                    # Create domain record node with all data
-                    # Dynamically set properties from the record
-                    props_str = ", ".join([f"n.{k} = ${k}" for k in record_data.keys() if k])
-
-                    session.run(f"""
-                        MERGE (n:{dom} {{record_id: $record_id}})
-                        SET {props_str}, n.updated_at = datetime()
-                        WITH n
-                        MATCH (sub:Subject {{usubjid: $usubjid, study_id: $study_id}})
-                        MERGE (sub)-[:HAS_{dom}]->(n)
-                        WITH n
-                        MATCH (d:Domain {{name: $domain, study_id: $study_id}})
-                        MERGE (n)-[:BELONGS_TO]->(d)
-                    """, record_id=record_id, usubjid=usubjid, study_id=_study_id,
-                        domain=dom, **record_data)
-
-                    nodes_created += 1
-                    rels_created += 2  # Subject->Record, Record->Domain
+                result = sync.sync_domain(dom, _sdtm_data[dom], incremental=incremental)
+                load_errors.extend(f"{dom}: {e}" for e in result.errors)
 
+                nodes_loaded = result.inserted + result.updated
                 loaded_stats.append({
                     "domain": dom,
-                    "nodes": nodes_created,
-                    "relationships": rels_created
+                    "nodes": nodes_loaded,
+                    "unchanged": result.unchanged,
+                    "deleted": result.deleted,
+                    "relationships": result.relationships_created,
+                    "batches": result.batches,
+                    "seconds": result.duration_seconds,
                 })
-                total_nodes += nodes_created
-                total_relationships += rels_created
-
-        driver.close()
+                total_nodes += nodes_loaded
+                total_relationships += result.relationships_created
+                total_missing += result.missing_endpoints
+        finally:
+            loader.close()
 
         # Format output
         output = f"## Neo4j Load Complete\n\n"
         output += f"**Study ID:** {_study_id}\n"
         output += f"**Neo4j URI:** {neo4j_uri}\n"
-        output += f"**Total Nodes Created:** {total_nodes}\n"
-        output += f"**Total Relationships:** {total_relationships}\n\n"
+        output += f"**Mode:** {mode}\n"
+        output += f"**Total Nodes Written:** {total_nodes}\n"
+        output += f"**Total Relationships Created:** {total_relationships}\n"
+        if total_missing:
+            output += f"**Relationship Rows Skipped (missing endpoint):** {total_missing}\n"
+        output += "\n"
 
         output += "### Loaded Domains\n\n"
-        output += "| Domain | Nodes | Relationships |\n"
-        output += "|--------|-------|---------------|\n"
+        output += "| Domain | Nodes Written | Unchanged | Deleted | Relationships | Batches | Seconds |\n"
+        output += "|--------|---------------|-----------|---------|---------------|---------|---------|\n"
 
         for stat in loaded_stats:
-            output += f"| {stat['domain']} | {stat['nodes']} | {stat['relationships']} |\n"
+            output += (f"| {stat['domain']} | {stat['nodes']} | {stat['unchanged']} | {stat['deleted']} "
+                       f"| {stat['relationships']} | {stat['batches']} | {stat['seconds']} |\n")
 
         output += f"\n### Graph Structure\n\n"
         output += "```\n"
@@ -2448,7 +2455,12 @@ def load_sdtm_to_neo4j(domain: str = "") -> str:
         output += f"                          |--[:HAS_{{domain}}]-->(Record)\n"
         output += "```\n"
 
-        output += f"\n✓ All SDTM data successfully loaded to Neo4j!\n"
+        if load_errors:
+            output += "\n### Errors\n\n"
+            for error in load_errors[:20]:
+                output += f"- {error}\n"
+        else:
+            output += "\n✓ All SDTM data successfully loaded to Neo4j!\n"
 
         return output
 
@@ -2553,7 +2565,7 @@ def search_dta_document(query: str) -> str:
         from sdtm_pipeline.langgraph_agent.knowledge_tools import get_knowledge_retriever
 
         retriever = get_knowledge_retriever()
-        if not retriever or not retriever.pinecone_client:
+        if not retriever or not retriever.has_vector_store:
             return ("DTA search requires Pinecone. Ensure PINECONE_API_KEY and "
                     "OPENAI_API_KEY are configured and a DTA document has been indexed.")
 
@@ -2608,7 +2620,7 @@ def validate_against_dta(domain: str) -> str:
         from sdtm_pipeline.langgraph_agent.knowledge_tools import get_knowledge_retriever
 
         retriever = get_knowledge_retriever()
-        if not retriever or not retriever.pinecone_client:
+        if not retriever or not retriever.has_vector_store:
             return ("DTA validation requires Pinecone. Ensure PINECONE_API_KEY and "
                     "OPENAI_API_KEY are configured and a DTA document has been indexed.")
 
@@ -2784,12 +2796,12 @@ def upload_dta_to_knowledge_base(file_path: str) -> str:
         kb = PineconeKnowledgeBase()
         # Ensure the DTA index exists
         kb.create_indexes()
-        count = kb.populate_dta_index(dta_text=content, dta_id=dta_id)
+        run = kb.populate_dta_index(dta_text=content, dta_id=dta_id)
 
         return (f"## DTA Document Indexed\n\n"
                 f"**File:** {os.path.basename(resolved)}\n"
                 f"**DTA ID:** {dta_id}\n"
-                f"**Clauses indexed:** {count}\n\n"
+                f"**Clauses indexed:** {run.indexed} ({run.upserted} new or changed)\n\n"
                 f"You can now use:\n"
                 f"- `search_dta_document(query)` to search DTA clauses\n"
                 f"- `validate_against_dta(domain)` to check domain compliance against DTA\n")
@@ -740,10 +740,21 @@ class BaseDomainTransformer(ABC):
         records = []
         mapping_dict = {m.sdtm_variable: m for m in self._discovered_mapping.mappings}
 
+        # Controlled terminology columns are transformed once per column
+        ct_columns = {}
+        for sdtm_var, mapping in mapping_dict.items():
+            if (mapping.value_transform == "controlled_terminology"
+                    and mapping.source_column in source_df.columns):
+                transformer = self.intelligent_mapper.get_value_transformer(
+                    sdtm_var, mapping.ct_codelist
+                )
+                if transformer:
+                    ct_columns[sdtm_var] = transformer(source_df[mapping.source_column]).tolist()
+
         # Track sequences per subject
         subject_seq = {}
 
-        for idx, row in source_df.iterrows():
+        for pos, (idx, row) in enumerate(source_df.iterrows()):
             # Generate USUBJID
             usubjid = self._generate_usubjid(row)
 
@@ -771,12 +782,8 @@ class BaseDomainTransformer(ABC):
                         # Apply transformation
                         if mapping.value_transform == "date":
                             val = self._convert_date_to_iso(val)
-                        elif mapping.value_transform == "controlled_terminology":
-                            transformer = self.intelligent_mapper.get_value_transformer(
-                                sdtm_var, mapping.ct_codelist
-                            )
-                            if transformer:
-                                val = transformer(val)
+                        elif sdtm_var in ct_columns:
+                            val = ct_columns[sdtm_var][pos]
                         elif mapping.value_transform == "numeric":
                             try:
                                 val = float(val) if '.' in str(val) else int(val)
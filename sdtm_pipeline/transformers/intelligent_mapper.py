@@ -242,6 +242,68 @@ class IntelligentMapper:
         "ETHNIC": ["HISPANIC OR LATINO", "NOT HISPANIC OR LATINO", "NOT REPORTED", "UNKNOWN"],
     }
 
+    # Local fallback value transformations (source value -> CT value)
+    CT_VALUE_TRANSFORMS = {
+        "AEREL": {
+            "POSSIBLE": "POSSIBLY RELATED",
+            "PROBABLE": "PROBABLY RELATED",
+            "UNLIKELY": "UNLIKELY RELATED",
+            "UNRELATED": "NOT RELATED",
+            "NONE": "NOT RELATED",
+            "DEFINITELY": "DEFINITELY RELATED",
+            "CERTAIN": "DEFINITELY RELATED",
+            "1": "NOT RELATED",
+            "2": "UNLIKELY RELATED",
+            "3": "POSSIBLY RELATED",
+            "4": "PROBABLY RELATED",
+            "5": "DEFINITELY RELATED",
+        },
+        "AEOUT": {
+            "RECOVERED": "RECOVERED/RESOLVED",
+            "RESOLVED": "RECOVERED/RESOLVED",
+            "RECOVERING": "RECOVERING/RESOLVING",
+            "RESOLVING": "RECOVERING/RESOLVING",
+            "NOT RECOVERED": "NOT RECOVERED/NOT RESOLVED",
+            "NOT RESOLVED": "NOT RECOVERED/NOT RESOLVED",
+            "CONTINUING": "NOT RECOVERED/NOT RESOLVED",
+            "ONGOING": "NOT RECOVERED/NOT RESOLVED",
+            "PATIENT DIED": "FATAL",
+            "DEATH": "FATAL",
+            "DIED": "FATAL",
+        },
+        "AESEV": {
+            "1": "MILD",
+            "2": "MODERATE",
+            "3": "SEVERE",
+            "MI": "MILD",
+            "MO": "MODERATE",
+            "SE": "SEVERE",
+            "LIFE THREATENING": "SEVERE",
+        },
+        "SEX": {
+            "MALE": "M",
+            "FEMALE": "F",
+            "UNKNOWN": "U",
+        },
+        "NY": {
+            "YES": "Y",
+            "NO": "N",
+            "TRUE": "Y",
+            "FALSE": "N",
+            "1": "Y",
+            "0": "N",
+        },
+        "ACN": {
+            "NONE": "DOSE NOT CHANGED",
+            "NO CHANGE": "DOSE NOT CHANGED",
+            "DISCONTINUED": "DRUG WITHDRAWN",
+            "WITHDRAWN": "DRUG WITHDRAWN",
+            "INTERRUPTED": "DRUG INTERRUPTED",
+            "REDUCED": "DOSE REDUCED",
+            "INCREASED": "DOSE INCREASED",
+        }
+    }
+
     def __init__(self, pinecone_retriever=None, use_web_reference: bool = True):
         """
         Initialize intelligent mapper with multiple knowledge sources.
@@ -597,83 +659,32 @@ class IntelligentMapper:
         """
         Get a function to transform values to CDISC Controlled Terminology.
 
-        Uses SDTM-IG 3.4 web reference for authoritative CT values.
+        Uses SDTM-IG 3.4 web reference for authoritative CT values. The
+        function accepts a single value or a whole column (``pd.Series``);
+        a column is transformed once per distinct value.
         """
         var_upper = sdtm_var.upper()
 
         # Try to use web reference for CT transformation
         if self.web_reference and ct_codelist:
             def web_transformer(value):
+                if isinstance(value, pd.Series):
+                    return self.web_reference.transform_to_ct_series(value, ct_codelist)
                 if pd.isna(value):
                     return ""
                 return self.web_reference.transform_to_ct(str(value), ct_codelist)
             return web_transformer
 
         # Fallback to local controlled terminology transformations
-        ct_transforms = {
-            "AEREL": {
-                "POSSIBLE": "POSSIBLY RELATED",
-                "PROBABLE": "PROBABLY RELATED",
-                "UNLIKELY": "UNLIKELY RELATED",
-                "UNRELATED": "NOT RELATED",
-                "NONE": "NOT RELATED",
-                "DEFINITELY": "DEFINITELY RELATED",
-                "CERTAIN": "DEFINITELY RELATED",
-                "1": "NOT RELATED",
-                "2": "UNLIKELY RELATED",
-                "3": "POSSIBLY RELATED",
-                "4": "PROBABLY RELATED",
-                "5": "DEFINITELY RELATED",
-            },
-            "AEOUT": {
-                "RECOVERED": "RECOVERED/RESOLVED",
-                "RESOLVED": "RECOVERED/RESOLVED",
-                "RECOVERING": "RECOVERING/RESOLVING",
-                "RESOLVING": "RECOVERING/RESOLVING",
-                "NOT RECOVERED": "NOT RECOVERED/NOT RESOLVED",
-                "NOT RESOLVED": "NOT RECOVERED/NOT RESOLVED",
-                "CONTINUING": "NOT RECOVERED/NOT RESOLVED",
-                "ONGOING": "NOT RECOVERED/NOT RESOLVED",
-                "PATIENT DIED": "FATAL",
-                "DEATH": "FATAL",
-                "DIED": "FATAL",
-            },
-            "AESEV": {
-                "1": "MILD",
-                "2": "MODERATE",
-                "3": "SEVERE",
-                "MI": "MILD",
-                "MO": "MODERATE",
-                "SE": "SEVERE",
-                "LIFE THREATENING": "SEVERE",
-            },
-            "SEX": {
-                "MALE": "M",
-                "FEMALE": "F",
-                "UNKNOWN": "U",
-            },
-            "NY": {
-                "YES": "Y",
-                "NO": "N",
-                "TRUE": "Y",
-                "FALSE": "N",
-                "1": "Y",
-                "0": "N",
-            },
-            "ACN": {
-                "NONE": "DOSE NOT CHANGED",
-                "NO CHANGE": "DOSE NOT CHANGED",
-                "DISCONTINUED": "DRUG WITHDRAWN",
-                "WITHDRAWN": "DRUG WITHDRAWN",
-                "INTERRUPTED": "DRUG INTERRUPTED",
-                "REDUCED": "DOSE REDUCED",
-                "INCREASED": "DOSE INCREASED",
-            }
-        }
-
-        if var_upper in ct_transforms:
-            transform_map = ct_transforms[var_upper]
+        if var_upper in self.CT_VALUE_TRANSFORMS:
+            transform_map = self.CT_VALUE_TRANSFORMS[var_upper]
             def transformer(value):
+                if isinstance(value, pd.Series):
+                    missing = value.isna()
+                    mapping = {v: transformer(v) for v in pd.unique(value[~missing])}
+                    result = value.map(mapping)
+                    result[missing] = ""
+                    return result.astype(object)
                 if pd.isna(value):
                     return ""
                 str_val = str(value).upper().strip()
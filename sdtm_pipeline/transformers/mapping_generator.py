@@ -38,6 +38,13 @@ except ImportError:
     SDTMIG_AVAILABLE = False
     SDTMIGReference = None
 
+# Import source column patterns for rule-based fallback mappings
+try:
+    from ..knowledge_base.derivation_rules import find_source_patterns
+    SOURCE_PATTERNS_AVAILABLE = True
+except ImportError:
+    SOURCE_PATTERNS_AVAILABLE = False
+
 
 class MappingSpecificationGenerator:
     """
@@ -602,6 +609,27 @@ Return ONLY valid JSON with comprehensive mappings."""
                             comments=f"Domain-specific mapping for {target_domain}"
                         ))
 
+        # Remaining columns: known EDC column name patterns, resolved in one pass
+        if SOURCE_PATTERNS_AVAILABLE:
+            mapped_columns = {m.source_column for m in mappings}
+            mapped_targets = {m.target_variable for m in mappings}
+            domain_prefix = f"{target_domain}."
+            unmapped = [col for col in source_columns if col not in mapped_columns]
+            for source_col, match in find_source_patterns(unmapped).items():
+                targets = [
+                    target[len(domain_prefix):]
+                    for target in match.get("target_variables", [])
+                    if target.startswith(domain_prefix)
+                    and target[len(domain_prefix):] not in mapped_targets
+                ]
+                if targets:
+                    mapped_targets.add(targets[0])
+                    mappings.append(ColumnMapping(
+                        source_column=source_col,
+                        target_variable=targets[0],
+                        comments=f"Source column pattern {match['pattern_name']}"
+                    ))
+
         # Add derived variables
         mappings.append(ColumnMapping(
             source_column="",
@@ -9,19 +9,44 @@ Key Sources:
 - CDISC SDTMIG: https://www.cdisc.org/standards/foundational/sdtmig
 - CDISC CT: https://www.cdisc.org/standards/terminology
 - Pinnacle 21: https://www.pinnacle21.com/downloads
+
+Storage Architecture:
+    Web-fetched domain specs and codelists are persisted so they survive
+    restarts and are shared by every worker process:
+
+    <cache_dir>/                      (default /tmp/sdtm_cache)
+        v1/
+            domain_spec_XX.json       - {format_version, key, created_at,
+            ct_CODELIST.json             expires_at, value}
+
+    Entries are written atomically (temp file + rename) and expire after
+    SDTM_WEB_CACHE_TTL seconds (default 7 days). Bumping
+    WEB_CACHE_FORMAT_VERSION orphans all previously cached entries.
+
+    Each process keeps a memory tier in front of the disk cache; its
+    entries (and CT lookup indexes built from web-fetched codelists)
+    expire together with the disk entry they came from.
 """
 
 import os
 import re
 import json
 import logging
+import tempfile
+import time
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import hashlib
 
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+WEB_CACHE_FORMAT_VERSION = 1
+DEFAULT_WEB_CACHE_TTL = int(os.getenv("SDTM_WEB_CACHE_TTL", str(7 * 24 * 3600)))
+CT_PARTIAL_MEMO_SIZE = int(os.getenv("SDTM_CT_PARTIAL_MEMO_SIZE", "4096"))
+
 
 @dataclass
 class SDTMVariable:
@@ -56,6 +81,50 @@ class ControlledTerminology:
     terms: List[Dict[str, str]] = field(default_factory=list)  # code, decode, definition
 
 
+class CTIndex:
+    """
+    Precomputed lookup tables for one codelist.
+
+    - ``exact``: code and upper-cased decode -> code
+    - partial matching is pre-screened with one compiled alternation of all
+      codes (code inside value) and a joined code string (value inside
+      code); only values passing the screen are resolved in term order.
+      Results are memoized per value since source columns repeat heavily;
+      the memo keeps at most CT_PARTIAL_MEMO_SIZE values, oldest evicted
+      first, so free-text columns cannot grow it without bound.
+    """
+
+    def __init__(self, ct: Dict):
+        self.extensible = bool(ct.get("extensible"))
+        self.codes: List[str] = [t["code"] for t in ct.get("terms", [])]
+        self.exact: Dict[str, str] = {}
+        for term in reversed(ct.get("terms", [])):
+            # Reversed so the first matching term wins, as in a linear scan
+            self.exact[term.get("decode", "").upper()] = term["code"]
+            self.exact[term["code"]] = term["code"]
+        self.exact.pop("", None)
+        self._code_re = re.compile(
+            "|".join(re.escape(c) for c in sorted(self.codes, key=len, reverse=True))
+        ) if self.codes else None
+        self._haystack = "\x00".join(self.codes)
+        self._partial: Dict[str, Optional[str]] = {}
+
+    def partial_match(self, value_upper: str) -> Optional[str]:
+        """First code (in term order) contained in, or containing, the value."""
+        if value_upper in self._partial:
+            return self._partial[value_upper]
+        match = None
+        if self.codes and (value_upper in self._haystack or self._code_re.search(value_upper)):
+            for code in self.codes:
+                if value_upper in code or code in value_upper:
+                    match = code
+                    break
+        if len(self._partial) >= CT_PARTIAL_MEMO_SIZE:
+            del self._partial[next(iter(self._partial))]
+        self._partial[value_upper] = match
+        return match
+
+
 class SDTMWebReference:
     """
     Fetches and caches SDTM specifications from web sources.
@@ -608,10 +677,79 @@ class SDTMWebReference:
         }
     }
 
-    def __init__(self, cache_dir: str = None):
-        """Initialize with optional cache directory."""
+    # Common source-value synonyms by codelist (value -> CT code)
+    CT_TRANSFORMS = {
+        "REL": {
+            "POSSIBLE": "POSSIBLY RELATED",
+            "PROBABLE": "PROBABLY RELATED",
+            "UNLIKELY": "UNLIKELY RELATED",
+            "UNRELATED": "NOT RELATED",
+            "NONE": "NOT RELATED",
+            "DEFINITELY": "DEFINITELY RELATED",
+            "CERTAIN": "DEFINITELY RELATED",
+            "1": "NOT RELATED",
+            "2": "UNLIKELY RELATED",
+            "3": "POSSIBLY RELATED",
+            "4": "PROBABLY RELATED",
+            "5": "DEFINITELY RELATED",
+        },
+        "OUT": {
+            "RECOVERED": "RECOVERED/RESOLVED",
+            "RESOLVED": "RECOVERED/RESOLVED",
+            "RECOVERING": "RECOVERING/RESOLVING",
+            "RESOLVING": "RECOVERING/RESOLVING",
+            "NOT RECOVERED": "NOT RECOVERED/NOT RESOLVED",
+            "NOT RESOLVED": "NOT RECOVERED/NOT RESOLVED",
+            "CONTINUING": "NOT RECOVERED/NOT RESOLVED",
+            "ONGOING": "NOT RECOVERED/NOT RESOLVED",
+            "PATIENT DIED": "FATAL",
+            "DEATH": "FATAL",
+            "DIED": "FATAL",
+        },
+        "AESEV": {
+            "1": "MILD",
+            "2": "MODERATE",
+            "3": "SEVERE",
+            "MI": "MILD",
+            "MO": "MODERATE",
+            "SE": "SEVERE",
+            "LIFE THREATENING": "SEVERE",
+        },
+        "SEX": {
+            "MALE": "M",
+            "FEMALE": "F",
+            "UNKNOWN": "U",
+            "1": "M",
+            "2": "F",
+        },
+        "NY": {
+            "YES": "Y",
+            "NO": "N",
+            "TRUE": "Y",
+            "FALSE": "N",
+            "1": "Y",
+            "0": "N",
+        },
+        "ACN": {
+            "NONE": "DOSE NOT CHANGED",
+            "NO CHANGE": "DOSE NOT CHANGED",
+            "DISCONTINUED": "DRUG WITHDRAWN",
+            "WITHDRAWN": "DRUG WITHDRAWN",
+            "INTERRUPTED": "DRUG INTERRUPTED",
+            "REDUCED": "DOSE REDUCED",
+            "INCREASED": "DOSE INCREASED",
+        }
+    }
+
+    def __init__(self, cache_dir: str = None, cache_ttl: int = DEFAULT_WEB_CACHE_TTL):
+        """Initialize with optional cache directory and web cache TTL (seconds)."""
         self.cache_dir = cache_dir or "/tmp/sdtm_cache"
-        self._cache = {}
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[str, Tuple[float, Dict]] = {}  # key -> (expires_at, value)
+        self._disk_cache_dir = os.path.join(self.cache_dir, f"v{WEB_CACHE_FORMAT_VERSION}")
+        self._ct_index: Dict[str, CTIndex] = {}
+        self._ct_index_expires: Dict[str, float] = {}  # web-fetched codelists only
+        self._reset_ct_index()
         self._web_fetch_available = True
         self._tavily_available = False
 
@@ -636,20 +774,14 @@ class SDTMWebReference:
         """
         domain = domain.upper()
 
-        # Check cache first
-        cache_key = f"domain_spec_{domain}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-
         # Get from local reference
         spec = self.SDTMIG_34_DOMAINS.get(domain)
 
         if not spec:
-            # Try to fetch from web
-            spec = self._fetch_domain_spec_from_web(domain)
-
-        if spec:
-            self._cache[cache_key] = spec
+            # Try memory and persistent cache, then web
+            spec = self._get_web_cached(
+                f"domain_spec_{domain}", lambda: self._fetch_domain_spec_from_web(domain)
+            )
 
         return spec
 
@@ -671,10 +803,8 @@ class SDTMWebReference:
         if ct:
             return ct
 
-        # Try to fetch from web
-        ct = self._fetch_ct_from_web(codelist)
-
-        return ct
+        # Try persistent cache, then web
+        return self._get_web_cached(f"ct_{codelist}", lambda: self._fetch_ct_from_web(codelist))
 
     def get_variable_definition(self, domain: str, variable: str) -> Optional[Dict]:
         """
@@ -851,28 +981,54 @@ class SDTMWebReference:
         Returns:
             Tuple of (is_valid, standardized_value, error_message)
         """
-        ct = self.get_controlled_terminology(codelist)
-        if not ct:
+        index = self._get_ct_index(codelist)
+        if index is None:
             return True, value, None  # Can't validate, assume OK
 
         value_upper = str(value).upper().strip()
 
         # Check for exact match
-        for term in ct.get("terms", []):
-            if term["code"] == value_upper or term.get("decode", "").upper() == value_upper:
-                return True, term["code"], None
+        code = index.exact.get(value_upper)
+        if code is not None:
+            return True, code, None
 
         # Check for partial match
-        for term in ct.get("terms", []):
-            if value_upper in term["code"] or term["code"] in value_upper:
-                return True, term["code"], f"Standardized from '{value}' to '{term['code']}'"
+        code = index.partial_match(value_upper)
+        if code is not None:
+            return True, code, f"Standardized from '{value}' to '{code}'"
 
         # Not found - check if extensible
-        if ct.get("extensible"):
+        if index.extensible:
             return True, value_upper, f"Value '{value}' not in standard CT but codelist is extensible"
 
-        valid_values = [t["code"] for t in ct.get("terms", [])]
-        return False, value, f"Invalid value '{value}' for {codelist}. Valid values: {', '.join(valid_values)}"
+        return False, value, f"Invalid value '{value}' for {codelist}. Valid values: {', '.join(index.codes)}"
+
+    def _get_ct_index(self, codelist: str) -> Optional[CTIndex]:
+        """Get the lookup index for a codelist, building it for web-fetched CT."""
+        codelist = codelist.upper()
+        index = self._ct_index.get(codelist)
+        expires_at = self._ct_index_expires.get(codelist)
+        if index is None or (expires_at is not None and expires_at <= time.time()):
+            ct = self.get_controlled_terminology(codelist)
+            if not ct:
+                self._ct_index.pop(codelist, None)
+                self._ct_index_expires.pop(codelist, None)
+                return None
+            index = CTIndex(ct)
+            self._ct_index[codelist] = index
+            # Web-fetched codelists are rebuilt once their cache entry expires
+            cached = self._cache.get(f"ct_{codelist}")
+            if cached is not None:
+                self._ct_index_expires[codelist] = cached[0]
+        return index
+
+    def _reset_ct_index(self) -> None:
+        """Drop indexes built from web-fetched codelists, keeping the local CT ones."""
+        self._ct_index = {
+            codelist: CTIndex(ct)
+            for codelist, ct in self.CONTROLLED_TERMINOLOGY.items()
+        }
+        self._ct_index_expires = {}
 
     def transform_to_ct(self, value: str, codelist: str) -> str:
         """
@@ -885,76 +1041,116 @@ class SDTMWebReference:
 
         value_upper = str(value).upper().strip()
 
-        # Common transformations by codelist
-        transforms = {
-            "REL": {
-                "POSSIBLE": "POSSIBLY RELATED",
-                "PROBABLE": "PROBABLY RELATED",
-                "UNLIKELY": "UNLIKELY RELATED",
-                "UNRELATED": "NOT RELATED",
-                "NONE": "NOT RELATED",
-                "DEFINITELY": "DEFINITELY RELATED",
-                "CERTAIN": "DEFINITELY RELATED",
-                "1": "NOT RELATED",
-                "2": "UNLIKELY RELATED",
-                "3": "POSSIBLY RELATED",
-                "4": "PROBABLY RELATED",
-                "5": "DEFINITELY RELATED",
-            },
-            "OUT": {
-                "RECOVERED": "RECOVERED/RESOLVED",
-                "RESOLVED": "RECOVERED/RESOLVED",
-                "RECOVERING": "RECOVERING/RESOLVING",
-                "RESOLVING": "RECOVERING/RESOLVING",
-                "NOT RECOVERED": "NOT RECOVERED/NOT RESOLVED",
-                "NOT RESOLVED": "NOT RECOVERED/NOT RESOLVED",
-                "CONTINUING": "NOT RECOVERED/NOT RESOLVED",
-                "ONGOING": "NOT RECOVERED/NOT RESOLVED",
-                "PATIENT DIED": "FATAL",
-                "DEATH": "FATAL",
-                "DIED": "FATAL",
-            },
-            "AESEV": {
-                "1": "MILD",
-                "2": "MODERATE",
-                "3": "SEVERE",
-                "MI": "MILD",
-                "MO": "MODERATE",
-                "SE": "SEVERE",
-                "LIFE THREATENING": "SEVERE",
-            },
-            "SEX": {
-                "MALE": "M",
-                "FEMALE": "F",
-                "UNKNOWN": "U",
-                "1": "M",
-                "2": "F",
-            },
-            "NY": {
-                "YES": "Y",
-                "NO": "N",
-                "TRUE": "Y",
-                "FALSE": "N",
-                "1": "Y",
-                "0": "N",
-            },
-            "ACN": {
-                "NONE": "DOSE NOT CHANGED",
-                "NO CHANGE": "DOSE NOT CHANGED",
-                "DISCONTINUED": "DRUG WITHDRAWN",
-                "WITHDRAWN": "DRUG WITHDRAWN",
-                "INTERRUPTED": "DRUG INTERRUPTED",
-                "REDUCED": "DOSE REDUCED",
-                "INCREASED": "DOSE INCREASED",
-            }
-        }
-
-        codelist_upper = codelist.upper()
-        if codelist_upper in transforms:
-            return transforms[codelist_upper].get(value_upper, value_upper)
+        synonyms = self.CT_TRANSFORMS.get(codelist.upper())
+        if synonyms:
+            return synonyms.get(value_upper, value_upper)
 
         return value_upper
 
+    def transform_to_ct_series(self, values: pd.Series, codelist: str) -> pd.Series:
+        """
+        Vectorized ``transform_to_ct`` for a whole column.
+
+        Each distinct value is transformed once and the results broadcast
+        back onto the Series; missing values become "".
+        """
+        missing = values.isna()
+        uniques = pd.unique(values[~missing])
+        mapping = {v: self.transform_to_ct(str(v), codelist) for v in uniques}
+        result = values.map(mapping)
+        result[missing] = ""
+        return result.astype(object)
+
+    # =========================================================================
+    # PERSISTENT WEB CACHE
+    # =========================================================================
+
+    def _get_web_cached(self, cache_key: str, fetch) -> Optional[Dict]:
+        """Memory cache -> disk cache -> ``fetch()``; fetched values are persisted.
+
+        A memory entry expires with the disk entry it was read from, or
+        ``cache_ttl`` seconds after it was fetched.
+        """
+        now = time.time()
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            if cached[0] > now:
+                return cached[1]
+            del self._cache[cache_key]
+
+        value, expires_at = self._read_disk_cache(cache_key)
+        if value is None:
+            value = fetch()
+            expires_at = now + self.cache_ttl
+            if value:
+                self._write_disk_cache(cache_key, value)
+
+        if value:
+            self._cache[cache_key] = (expires_at, value)
+        return value
+
+    def _disk_cache_path(self, cache_key: str) -> str:
+        safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", cache_key)
+        return os.path.join(self._disk_cache_dir, f"{safe_key}.json")
+
+    def _read_disk_cache(self, cache_key: str) -> Tuple[Optional[Dict], float]:
+        """Return ``(value, expires_at)``; value is None if missing, expired or unreadable."""
+        path = self._disk_cache_path(cache_key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None, 0.0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable web cache entry {path}: {e}")
+            return None, 0.0
+
+        if entry.get("format_version") != WEB_CACHE_FORMAT_VERSION or entry.get("key") != cache_key:
+            return None, 0.0
+        expires_at = entry.get("expires_at", 0)
+        if expires_at <= time.time():
+            return None, 0.0
+        return entry.get("value"), expires_at
+
+    def _write_disk_cache(self, cache_key: str, value: Dict) -> None:
+        """Atomically persist an entry so concurrent readers never see partial JSON."""
+        now = time.time()
+        entry = {
+            "format_version": WEB_CACHE_FORMAT_VERSION,
+            "key": cache_key,
+            "created_at": now,
+            "expires_at": now + self.cache_ttl,
+            "value": value,
+        }
+        try:
+            os.makedirs(self._disk_cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._disk_cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entry, f, default=str)
+                os.replace(tmp_path, self._disk_cache_path(cache_key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not persist web cache entry '{cache_key}': {e}")
+
+    def clear_web_cache(self) -> int:
+        """Remove all memory and persisted web cache entries. Returns the number of files removed."""
+        self._cache.clear()
+        self._reset_ct_index()
+        removed = 0
+        if not os.path.isdir(self._disk_cache_dir):
+            return 0
+        for name in os.listdir(self._disk_cache_dir):
+            if name.endswith(".json"):
+                try:
+                    os.unlink(os.path.join(self._disk_cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
     def _fetch_domain_spec_from_web(self, domain: str) -> Optional[Dict]:
         """Fetch domain specification from web sources."""
         if not self._tavily_available:
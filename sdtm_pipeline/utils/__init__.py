@@ -0,0 +1,24 @@
+"""
+SDTM Pipeline Shared Utilities
+==============================
+Helpers used by more than one layer (knowledge base population and the
+agent retrievers) that must not pull either layer in when imported.
+"""
+
+from .retrieval_cache import (
+    RetrievalCache,
+    bump_index_version,
+    cached_retrieval,
+    get_retrieval_cache,
+    mark_incomplete,
+    read_index_version,
+)
+
+__all__ = [
+    "RetrievalCache",
+    "bump_index_version",
+    "cached_retrieval",
+    "get_retrieval_cache",
+    "mark_incomplete",
+    "read_index_version",
+]
@@ -0,0 +1,275 @@
+"""
+Retrieval Result Cache
+======================
+TTL + size-bounded cache for SDTMKnowledgeRetriever lookups.
+
+Replaces ``functools.lru_cache`` on retriever methods, which keyed on
+``self`` (pinning retriever instances), never expired, could not be
+invalidated when the knowledge base was re-populated, and was private to
+one process.
+
+Cache keys are ``(method, args, index_version)``. The index version is the
+modification stamp of ``<KNOWLEDGE_INDEX_DIR>/VERSION``, which
+``PineconeKnowledgeBase.upsert_documents`` bumps after every population
+run, so re-populating an index invalidates every cached lookup at once.
+
+Storage Architecture:
+    Memory tier   - OrderedDict LRU, per process, TTL + max entries
+    Disk tier     - Optional, shared by all workers on the host:
+        <RETRIEVAL_CACHE_DIR>/<sha256(key)>.json  - {"expires_at", "value"}
+
+Configuration:
+    RETRIEVAL_CACHE_TTL   - Seconds before an entry expires (default 3600)
+    RETRIEVAL_CACHE_SIZE  - Max in-memory entries (default 512)
+    RETRIEVAL_CACHE_DIR   - Enables the shared on-disk tier when set
+
+Usage:
+    from sdtm_pipeline.utils.retrieval_cache import cached_retrieval
+
+    class SDTMKnowledgeRetriever:
+        @cached_retrieval
+        def get_domain_specification(self, domain): ...
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_TTL_SECONDS = float(os.getenv("RETRIEVAL_CACHE_TTL", "3600"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_SIZE", "512"))
+INDEX_VERSION_FILE = "VERSION"
+
+_MISSING = object()
+
+
+# =============================================================================
+# INDEX VERSION STAMP
+# =============================================================================
+
+def read_index_version(index_dir: Optional[Path]) -> int:
+    """Return the knowledge base version stamp (0 if never populated)."""
+    if not index_dir:
+        return 0
+    try:
+        return os.stat(Path(index_dir) / INDEX_VERSION_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def bump_index_version(index_dir: Path, index_name: str = "") -> None:
+    """Mark the knowledge base as changed, invalidating cached retrievals."""
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    stamp = index_dir / INDEX_VERSION_FILE
+    previous = read_index_version(index_dir)
+    with open(stamp, "w", encoding="utf-8") as f:
+        json.dump({"updated_at": time.time(), "index": index_name}, f)
+    # Guarantee a new stamp even on filesystems with coarse mtime resolution
+    now = time.time_ns()
+    if now <= previous:
+        now = previous + 1
+    os.utime(stamp, ns=(now, now))
+
+
+# =============================================================================
+# RETRIEVAL CACHE
+# =============================================================================
+
+class RetrievalCache:
+    """
+    Two-tier result cache with TTL and LRU size eviction.
+
+    Only JSON-serializable values are written to the disk tier; anything
+    else stays in memory.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_dir: Optional[Path] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(method: str, args: tuple, kwargs: Dict[str, Any], index_version: int) -> str:
+        """Build a stable cache key for a retriever call."""
+        payload = json.dumps(
+            [method, list(args), sorted(kwargs.items()), index_version],
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or the module-level ``_MISSING`` sentinel."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.disk_hits += 1
+        if value is not _MISSING:
+            self._memory_set(key, value, now + self.ttl_seconds)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_set(key, value, expires_at)
+        self._disk_set(key, value, expires_at)
+
+    def _memory_set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> Any:
+        if not self.disk_dir:
+            return _MISSING
+        path = self.disk_dir / f"{key}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING
+        if entry.get("expires_at", 0) <= now:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return _MISSING
+        return entry.get("value")
+
+    def _disk_set(self, key: str, value: Any, expires_at: float) -> None:
+        if not self.disk_dir:
+            return
+        try:
+            payload = json.dumps({"expires_at": expires_at, "value": value})
+        except (TypeError, ValueError):
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.disk_dir / f"{key}.json")
+        except OSError as e:
+            print(f"  WARNING: Retrieval cache disk write failed: {e}")
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers."""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for path in self.disk_dir.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "disk_tier": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+# Singleton instance shared by all retrievers in the process
+_retrieval_cache: Optional[RetrievalCache] = None
+
+# Per-thread flag raised when a lookup returns partial results
+_call_state = threading.local()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get or create the process-wide retrieval cache."""
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        _retrieval_cache = RetrievalCache(disk_dir=os.getenv("RETRIEVAL_CACHE_DIR") or None)
+    return _retrieval_cache
+
+
+def mark_incomplete() -> None:
+    """
+    Flag the current lookup as partial (e.g. a source timed out).
+
+    The enclosing ``@cached_retrieval`` calls on this thread return the
+    result but do not cache it, so the next call queries every source again.
+    """
+    _call_state.incomplete = True
+
+
+def cached_retrieval(method: Callable) -> Callable:
+    """
+    Cache a retriever method's result by (method, args, index version).
+
+    The owning object must expose ``index_version``. Empty results and
+    results flagged with ``mark_incomplete()`` are not cached, so a
+    transient Pinecone or web failure is retried next call.
+    """
+    name = method.__qualname__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = get_retrieval_cache()
+        key = cache.make_key(name, args, kwargs, self.index_version)
+        value = cache.get(key)
+        if value is not _MISSING:
+            return value
+        outer_incomplete = getattr(_call_state, "incomplete", False)
+        _call_state.incomplete = False
+        try:
+            value = method(self, *args, **kwargs)
+            incomplete = _call_state.incomplete
+        finally:
+            _call_state.incomplete = outer_incomplete or _call_state.incomplete
+        if value and not incomplete:
+            cache.set(key, value)
+        return value
+
+    return wrapper
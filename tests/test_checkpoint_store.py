@@ -0,0 +1,56 @@
+"""
+Test Delta Checkpoint Storage
+=============================
+Checks that checkpoints store each message once, rebuild their state from
+parent deltas, diff on hashes, and still read full-state legacy files.
+
+Run with: python -m pytest tests/test_checkpoint_store.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents.session_manager import SessionManager
+
+
+def _messages(n):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(n)]
+
+
+def test_checkpoints_are_deltas_over_parent(tmp_path):
+    sm = SessionManager(storage_dir=tmp_path, store_backend="json")
+    sm.create_session("t1")
+    cps = [sm.create_checkpoint("t1", {"messages": _messages(n), "domain": "DM"}) for n in (2, 4, 6)]
+
+    record = json.loads((tmp_path / "checkpoints" / f"{cps[2].checkpoint_id}.json").read_text())
+    assert record["keep"] == 4 and len(record["append"]) == 2
+    assert len(list((tmp_path / "checkpoints" / "objects").glob("*/*.json"))) == 6
+
+    branch = sm.create_branch("t1", "alt", from_checkpoint_id=cps[0].checkpoint_id)
+    branch_record = json.loads((tmp_path / "checkpoints" / f"{branch['branch_checkpoint_id']}.json").read_text())
+    assert branch_record["base"] == cps[0].checkpoint_id and branch_record["append"] == []
+
+    reloaded = SessionManager(storage_dir=tmp_path, store_backend="json")
+    cp = reloaded.get_checkpoint(cps[2].checkpoint_id)
+    assert "state" not in cp.__dict__  # Not rebuilt until used
+    assert cp.state == {"messages": _messages(6), "domain": "DM"}
+
+    diff = reloaded.get_checkpoint_diff(cps[0].checkpoint_id, cps[2].checkpoint_id)
+    assert (diff["common_messages_count"], diff["added_messages_count"], diff["removed_messages_count"]) == (2, 4, 0)
+
+
+def test_legacy_full_state_checkpoint_is_readable(tmp_path):
+    (tmp_path / "checkpoints").mkdir(parents=True)
+    legacy = {
+        "checkpoint_id": "cp_legacy", "parent_checkpoint_id": None, "thread_id": "t0",
+        "timestamp": "2025-01-01T00:00:00", "state": {"messages": _messages(3)},
+        "message_count": 3, "description": "old", "branch_name": "main",
+    }
+    (tmp_path / "checkpoints" / "cp_legacy.json").write_text(json.dumps(legacy))
+
+    sm = SessionManager(storage_dir=tmp_path, store_backend="json")
+    assert sm.get_checkpoint("cp_legacy").to_dict() == legacy
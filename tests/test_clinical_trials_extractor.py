@@ -0,0 +1,130 @@
+"""
+Test Streaming Trial Extractor
+==============================
+Serves paginated ClinicalTrials.gov-style pages from a local fixture
+server and checks that TrialExtractor streams every record once, resumes
+from its checkpoint after an interrupted run, writes Parquet parts, and
+that the compiled therapeutic area matcher agrees with the keyword loop.
+
+Run with: python -m pytest tests/test_clinical_trials_extractor.py
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from clinical_trials_extractor import (
+    THERAPEUTIC_AREAS, TherapeuticAreaMatcher, TrialExtractor,
+)
+
+CONDITIONS = [
+    ["Breast Cancer"], ["Heart Failure", "Hypertension"], ["Chronic Pain"], ["COVID-19"],
+    ["Neuropathic Pain"], ["Type 2 Diabetes", "Metabolic Syndrome"], ["Healthy"], [],
+    ["Rare Disease in Children"], ["Skin Rash", None], ["Periodontal Disease"],
+]
+
+
+def _study(i):
+    return {"protocolSection": {
+        "identificationModule": {"nctId": f"NCT{i:08d}"},
+        "conditionsModule": {"conditions": CONDITIONS[i % len(CONDITIONS)]},
+        "statusModule": {"startDateStruct": {"date": f"2025-{1 + i % 12:02d}-15" if i % 9 else "2025"}},
+    }}
+
+
+def _serve(pages, page_size):
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            requests_seen.append(query.get("pageToken", [None])[0])
+            page = int(query.get("pageToken", ["0"])[0])
+            body = {"totalCount": pages * page_size,
+                    "studies": [_study(page * page_size + j) for j in range(page_size)]}
+            if page + 1 < pages:
+                body["nextPageToken"] = str(page + 1)
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/api/v2/studies", requests_seen
+
+
+def _naive_area(conditions):
+    if not conditions:
+        return "Unknown"
+    text = " ".join(c.lower() if c else "" for c in conditions)
+    for area, keywords in THERAPEUTIC_AREAS.items():
+        if any(keyword in text for keyword in keywords):
+            return area
+    return "Other"
+
+
+def test_matcher_agrees_with_keyword_loop():
+    matcher = TherapeuticAreaMatcher()
+    samples = CONDITIONS + [[k] for keywords in THERAPEUTIC_AREAS.values() for k in keywords]
+    samples += [["neuropathic pain in pregnant women"], ["oral mucositis after surgery"],
+                ["postoperative brain tumour"], ["eye strain"], ["immune thrombocytopenia"]]
+    for conditions in samples:
+        assert matcher.categorize(conditions) == _naive_area(conditions), conditions
+
+
+def test_streams_resumes_and_writes_parquet():
+    server, url, seen = _serve(pages=5, page_size=40)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            params = {"filter.advanced": "AREA[StartDate]RANGE[2025-01-01,2025-12-31]"}
+
+            def extractor(out, fmt="jsonl"):
+                return TrialExtractor(Path(tmp) / out, params, fmt=fmt, page_size=40,
+                                      queue_size=2, request_interval=0, api_base=url)
+
+            partial = extractor("run").run(max_pages=2)
+            assert (partial.pages, partial.records, partial.complete) == (2, 80, False)
+            # A page written after the last checkpoint is discarded on resume
+            with open(Path(tmp) / "run" / "trials.jsonl", "a") as f:
+                f.write(json.dumps({"nct_id": "partial"}) + "\n")
+
+            seen.clear()
+            result = extractor("run").run()
+            assert seen == ["2", "3", "4"]
+            assert (result.pages, result.records, result.complete) == (5, 200, True)
+            assert result.resumed_from_page == 2
+            lines = (Path(tmp) / "run" / "trials.jsonl").read_text().splitlines()
+            ids = [json.loads(line)["nct_id"] for line in lines]
+            assert ids == [f"NCT{i:08d}" for i in range(200)]
+
+            # Same summary as one uninterrupted run
+            full = extractor("full").run()
+            assert full.summary_by_month == result.summary_by_month
+            assert sum(sum(a.values()) for a in full.summary_by_month.values()) == \
+                sum(1 for i in range(200) if i % 9)
+            assert list(full.summary_by_month)[0] == "January"
+
+            # A finished run is not fetched again
+            seen.clear()
+            assert extractor("run").run().records == 200 and seen == []
+
+            import pyarrow.dataset as ds
+            parquet = extractor("pq", fmt="parquet").run()
+            table = ds.dataset(Path(tmp) / "pq" / "parts", format="parquet").to_table()
+            assert table.num_rows == parquet.records == 200
+            assert sorted(table.column("nct_id").to_pylist()) == ids
+    finally:
+        server.shutdown()
@@ -0,0 +1,68 @@
+"""
+Test Controlled Terminology Transforms
+======================================
+Checks that column-wise CT transforms (``transform_to_ct_series`` and the
+Series path of ``IntelligentMapper.get_value_transformer``) give the same
+values as transforming each value on its own, and that the CT partial-match
+memo stays bounded.
+
+Run with: python -m pytest tests/test_ct_transform.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.transformers import sdtm_web_reference
+from sdtm_pipeline.transformers.intelligent_mapper import IntelligentMapper
+from sdtm_pipeline.transformers.sdtm_web_reference import CTIndex, SDTMWebReference
+
+
+COLUMN = pd.Series(
+    ["possible", "Probable", " unlikely ", "1", "4", np.nan, "certain", "", None, "possible", 3],
+    index=[5, 5, 7, 8, 9, 10, 11, 12, 13, 14, 15],
+)
+
+
+def _per_value(transformer, values):
+    return [transformer(v) for v in values]
+
+
+def test_series_matches_per_value_transform(tmp_path):
+    reference = SDTMWebReference(cache_dir=str(tmp_path))
+    for codelist in ["REL", "rel", "SEX", "NOSUCHLIST"]:
+        expected = [
+            "" if pd.isna(v) else reference.transform_to_ct(str(v), codelist) for v in COLUMN
+        ]
+        result = reference.transform_to_ct_series(COLUMN, codelist)
+        assert result.tolist() == expected
+        assert result.index.equals(COLUMN.index)
+
+
+def test_mapper_transformer_accepts_a_column(tmp_path):
+    mapper = IntelligentMapper(use_web_reference=False)
+    mapper.web_reference = SDTMWebReference(cache_dir=str(tmp_path))
+    web = mapper.get_value_transformer("AEREL", "REL")
+    assert web(COLUMN).tolist() == _per_value(web, COLUMN)
+
+    # Local fallback transforms without the web reference
+    mapper.web_reference = None
+    local = mapper.get_value_transformer("AEREL")
+    assert local(COLUMN).tolist() == _per_value(local, COLUMN)
+    assert local(COLUMN.iloc[:0]).tolist() == []
+
+
+def test_partial_match_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(sdtm_web_reference, "CT_PARTIAL_MEMO_SIZE", 3)
+    index = CTIndex({"terms": [{"code": "MILD", "decode": "Mild"}, {"code": "SEVERE", "decode": "Severe"}]})
+
+    for value in ["VERY MILD", "MOSTLY SEVERE", "X", "Y", "Z"]:
+        index.partial_match(value)
+    assert len(index._partial) == 3
+    assert "VERY MILD" not in index._partial
+    assert index.partial_match("VERY MILD") == "MILD"
@@ -0,0 +1,126 @@
+"""
+Test Derivation Rule Lookups
+============================
+Checks the precompiled source column matcher against the original nested
+loop over SOURCE_COLUMN_PATTERNS, the batch column resolver and its
+callers (fallback mapping specs, the mapping recommendations tool), the
+reverse target/dependency indexes, and that derivation rule documents
+carry what those indexes return.
+
+Run with: python -m pytest tests/test_derivation_rules.py
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.knowledge_base.derivation_rules import (
+    CROSS_DOMAIN_DEPENDENCIES,
+    DERIVATION_RULES,
+    SOURCE_COLUMN_PATTERNS,
+    find_source_pattern,
+    find_source_patterns,
+    get_source_patterns_for_target,
+    get_variable_dependencies,
+)
+
+
+def _linear_scan(source_column):
+    """The original first-match-in-dictionary-order lookup."""
+    source_upper = source_column.upper()
+    for pattern_name, pattern_info in SOURCE_COLUMN_PATTERNS.items():
+        for pattern in pattern_info["patterns"]:
+            if pattern.upper() in source_upper or source_upper in pattern.upper():
+                return {
+                    "pattern_name": pattern_name,
+                    "matched_pattern": pattern,
+                    "target_variables": pattern_info["target_variables"],
+                    "priority": pattern_info["priority"]
+                }
+    return {}
+
+
+def test_find_source_pattern_matches_the_linear_scan():
+    patterns = [p for info in SOURCE_COLUMN_PATTERNS.values() for p in info["patterns"]]
+    rng = random.Random(7)
+    columns = ["", "x", "zzz_unknown", "ae_start", "Subject", "PATNO", "visit_date_raw"]
+    for _ in range(2000):
+        pattern = rng.choice(patterns)
+        start = rng.randrange(len(pattern))
+        columns.append(rng.choice([
+            pattern,
+            pattern.lower(),
+            f"raw_{pattern}_v2",
+            pattern[start:start + rng.randint(1, 4)],
+            "".join(rng.choice("ABCDEGIMNOSTX_") for _ in range(rng.randint(1, 8))),
+        ]))
+
+    for column in columns:
+        assert find_source_pattern(column) == _linear_scan(column), column
+
+
+def test_find_source_patterns_resolves_a_column_list():
+    columns = ["PATNO", "gender", "PATNO", "zzz_unknown", "visit_date_raw"]
+    resolved = find_source_patterns(columns)
+    assert list(resolved) == ["PATNO", "gender", "zzz_unknown", "visit_date_raw"]
+    assert resolved == {column: find_source_pattern(column) for column in columns}
+    assert resolved["gender"]["target_variables"] == ["DM.SEX"]
+
+
+def test_fallback_mappings_use_source_column_patterns():
+    from sdtm_pipeline.transformers.mapping_generator import MappingSpecificationGenerator
+
+    generator = MappingSpecificationGenerator.__new__(MappingSpecificationGenerator)
+    mappings = generator._generate_fallback_mappings(["PT", "PATNO", "BIRTH_DATE", "RACIAL", "zzz"], "DM")
+    by_column = {m.source_column: m.target_variable for m in mappings if m.source_column}
+
+    # PATNO also means SUBJID, which PT already maps to
+    assert by_column == {"PT": "SUBJID", "BIRTH_DATE": "BRTHDTC", "RACIAL": "RACE"}
+
+
+def test_mapping_recommendations_tool_uses_source_column_patterns():
+    from sdtm_pipeline.deepagents.subagents import get_mapping_recommendations
+
+    result = get_mapping_recommendations.invoke({
+        "source_columns": ["PATNO", "date_of_birth", "age_years", "zzz"], "target_domain": "DM",
+    })
+    assert [(r["source"], r["target"], r["confidence"]) for r in result["recommendations"]] == [
+        ("PATNO", "SUBJID", "high"),
+        ("date_of_birth", "BRTHDTC", "high"),
+        ("age_years", "AGE", "medium"),
+    ]
+
+
+def test_reverse_indexes():
+    for source, dependents in CROSS_DOMAIN_DEPENDENCIES.items():
+        for dependent in dependents:
+            assert source in get_variable_dependencies(dependent)
+    assert get_variable_dependencies("XX.NOSUCH") == []
+
+    sex = get_source_patterns_for_target("DM.SEX")
+    assert sex and all("DM.SEX" in info["target_variables"] for info in sex)
+    assert "GENDER" in [p for info in sex for p in info["patterns"]]
+    assert get_source_patterns_for_target("XX.NOSUCH") == []
+
+
+def test_derivation_documents_include_dependencies_and_edc_columns(tmp_path):
+    from sdtm_pipeline.knowledge_base.local_index import LocalVectorStore
+    from sdtm_pipeline.knowledge_base.setup_pinecone import PineconeKnowledgeBase
+
+    kb = PineconeKnowledgeBase(openai_key="test", backend="local", local_index_dir=tmp_path)
+    kb.get_embeddings = lambda texts: [[float(len(t)), 1.0, 0.5] for t in texts]
+    kb.populate_derivation_rules_index()
+    index = LocalVectorStore(tmp_path).get_index("derivationrules")
+    metadata = {meta.get("variable") and f"{meta['domain']}.{meta['variable']}": meta
+                for meta in index.metadata}
+
+    for domain, variables in DERIVATION_RULES.items():
+        for name in variables:
+            target = f"{domain}.{name}"
+            assert metadata[target]["depends_on"] == ", ".join(get_variable_dependencies(target))
+
+    assert "Common EDC column names: " in metadata["DM.SEX"]["text"]
+    assert "GENDER" in metadata["DM.SEX"]["text"]
@@ -0,0 +1,87 @@
+"""
+Test Feedback Event Log
+=======================
+Checks that EventLog splits events into day segments, reads newest first
+across segments (including the legacy events.jsonl), seeks ``since``
+queries through the sparse index (skipping a legacy log older than
+``since``) and keeps its count across reopen.
+
+Run with: python -m pytest tests/test_event_log.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents import event_log
+from sdtm_pipeline.deepagents.event_log import EventLog, read_lines_reverse
+
+
+def test_reverse_reader_handles_block_boundaries():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lines.jsonl"
+        path.write_text("".join(f"line-{i}\n" for i in range(500)))
+        lines = [line.decode() for line in read_lines_reverse(path, block_size=7)]
+        assert lines == [f"line-{i}" for i in reversed(range(500))]
+
+
+def test_segments_since_and_count():
+    event_log.INDEX_INTERVAL, saved_interval = 4, event_log.INDEX_INTERVAL
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy = Path(tmp) / "events.jsonl"
+            legacy.write_text(json.dumps({"timestamp": "2026-01-01T09:00:00", "n": -1}) + "\n")
+
+            log = EventLog(Path(tmp) / "events", legacy_file=legacy)
+            for day in (2, 3):
+                for i in range(10):
+                    ts = f"2026-01-0{day}T10:00:{i:02d}Z"
+                    log.append({"timestamp": ts, "n": day * 100 + i}, ts)
+
+            assert sorted(p.name for p in (Path(tmp) / "events").glob("*.jsonl")) == \
+                ["2026-01-02.jsonl", "2026-01-03.jsonl"]
+
+            newest = [r["n"] for r in log.iter_reverse()]
+            assert newest[:3] == [309, 308, 307]
+            assert newest[-1] == -1 and len(newest) == 21
+
+            since = [r["n"] for r in log.iter_since("2026-01-03T10:00:05")]
+            assert since == [305, 306, 307, 308, 309]
+            assert log.count() == 21
+
+            log.flush()
+            # Another writer appends without updating meta.json
+            with open(Path(tmp) / "events" / "2026-01-03.jsonl", "a") as f:
+                f.write(json.dumps({"timestamp": "2026-01-03T11:00:00Z", "n": 310}) + "\n")
+            assert EventLog(Path(tmp) / "events", legacy_file=legacy).count() == 22
+    finally:
+        event_log.INDEX_INTERVAL = saved_interval
+
+
+def test_since_reads_skip_a_legacy_log_older_than_since(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "events.jsonl"
+        legacy.write_text("".join(
+            json.dumps({"timestamp": f"2025-12-31T10:00:{i:02d}", "n": i}) + "\n" for i in range(50)
+        ))
+        log = EventLog(Path(tmp) / "events", legacy_file=legacy)
+        log.append({"timestamp": "2026-01-02T10:00:00Z", "n": 100}, "2026-01-02T10:00:00Z")
+
+        parsed = []
+
+        def counting_loads(line):
+            parsed.append(line)
+            return json.loads(line)
+
+        monkeypatch.setattr(event_log, "json", SimpleNamespace(loads=counting_loads, dumps=json.dumps))
+        assert [r["n"] for r in log.iter_since("2026-01-01T00:00:00")] == [100]
+        # Only the legacy log's last line is parsed, not the whole file
+        assert sum("2025-12-31" in str(line) for line in parsed) == 1
+
+        # A since inside the legacy log still reads it
+        assert [r["n"] for r in log.iter_since("2025-12-31T10:00:48")] == [48, 49, 100]
@@ -0,0 +1,130 @@
+"""
+Test Feedback Aggregates
+========================
+Checks that the counters LearningStore maintains on record_event give the
+same analytics as a full recompute, survive a restart with unsaved events,
+can be rebuilt from the log, and add up when several processes save.
+
+Run with: python -m pytest tests/test_feedback_aggregates.py
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents import feedback_analytics, learning_store
+from sdtm_pipeline.deepagents.feedback import (
+    FeedbackEvent, FeedbackSignal, SIGNAL_SENTIMENT,
+)
+from sdtm_pipeline.deepagents.feedback_aggregates import (
+    FeedbackAggregates, aggregate_events, merge_days,
+)
+from sdtm_pipeline.deepagents.learning_store import LearningStore
+
+
+SIGNALS = [
+    FeedbackSignal.THUMBS_UP, FeedbackSignal.THUMBS_DOWN, FeedbackSignal.RESPONSE_COPIED,
+    FeedbackSignal.PIPELINE_COMPLETED, FeedbackSignal.PIPELINE_FAILED, FeedbackSignal.HITL_APPROVED,
+]
+
+
+def _events(n):
+    start = datetime.utcnow() - timedelta(days=3)
+    for i in range(n):
+        signal = SIGNALS[i % len(SIGNALS)]
+        yield FeedbackEvent(
+            event_id=f"e{i}",
+            thread_id=f"t{i % 7}",
+            signal=signal,
+            sentiment=SIGNAL_SENTIMENT[signal],
+            timestamp=(start + timedelta(hours=i)).isoformat() + "Z",
+            user_query=f"convert {['DM', 'AE', 'VS'][i % 3]} domain",
+            domain=["DM", "AE", "VS"][i % 3],
+            tool_chain=["load_data", "convert_domain"][: 1 + i % 2],
+            validation_score=0.5 + (i % 5) / 10 if i % 4 == 0 else None,
+        )
+
+
+def test_aggregates_match_full_recompute():
+    saved = learning_store._learning_store
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            store = learning_store._learning_store = LearningStore(Path(tmp))
+            for event in _events(60):
+                store.record_event(event)
+
+            fast = feedback_analytics.compute_analytics(days=30)
+            full = feedback_analytics.recompute_analytics(days=30)
+            assert fast.total_feedback_events == full.total_feedback_events == 60
+            assert fast.total_interactions == full.total_interactions
+            assert abs(fast.positive_rate - full.positive_rate) < 1e-9
+            assert abs(fast.avg_validation_score - full.avg_validation_score) < 1e-9
+            assert fast.domain_metrics.keys() == full.domain_metrics.keys()
+            for domain, values in full.domain_metrics.items():
+                assert fast.domain_metrics[domain] == pytest.approx(values)
+            assert fast.tool_success_rates == full.tool_success_rates
+            assert fast.daily_metrics == full.daily_metrics
+
+            # Restart before the last events were saved: the log tail is applied
+            reopened = LearningStore(Path(tmp))
+            assert reopened.aggregates.applied == 60
+            assert reopened.compute_metrics()["signal_counts"] == store.compute_metrics()["signal_counts"]
+
+            # Backfill from the raw log
+            reopened.aggregates.rebuild([])
+            assert reopened.compute_metrics()["total_feedback_events"] == 0
+            assert reopened.rebuild_aggregates() == 60
+            assert reopened.compute_metrics()["total_interactions"] == fast.total_interactions
+            store.wait_for_extraction()
+        finally:
+            learning_store._learning_store = saved
+
+
+def test_saves_from_two_processes_add_up():
+    events = list(_events(40))
+    with tempfile.TemporaryDirectory() as tmp:
+        # Two writers sharing one storage directory, each with its own view
+        first = FeedbackAggregates(Path(tmp))
+        second = FeedbackAggregates(Path(tmp))
+        for event in events[:25]:
+            first.apply(event, save=False)
+        for event in events[25:]:
+            second.apply(event, save=False)
+        # Interleaved saves, the second writer also repeats an interaction
+        first.save()
+        second.apply(events[0], save=False)
+        second.save()
+        first.close()
+        second.close()
+
+        stored = FeedbackAggregates(Path(tmp))
+        expected = merge_days(aggregate_events(events + [events[0]]))
+        assert stored.applied == 41
+        assert stored.totals() == expected
+        stored.close()
+
+
+def test_daily_buckets_do_not_share_state_with_later_events():
+    events = list(_events(12))
+    with tempfile.TemporaryDirectory() as tmp:
+        aggregates = FeedbackAggregates(Path(tmp))
+        for event in events[:6]:
+            aggregates.apply(event, save=False)
+        before = aggregates.daily()
+        snapshot = [dict(bucket, signals=dict(bucket["signals"]),
+                         domains={k: dict(v) for k, v in bucket["domains"].items()})
+                    for bucket in before]
+
+        # Later events must not show up in (or resize) the returned buckets
+        for event in events[6:]:
+            aggregates.apply(event, save=False)
+        for bucket, copy in zip(before, snapshot):
+            assert bucket["signals"] == copy["signals"]
+            assert bucket["domains"] == copy["domains"]
+        aggregates.close()
@@ -0,0 +1,67 @@
+"""
+Test LangGraph Proxy Streaming
+==============================
+Runs a fake LangGraph server that emits server-sent events with a delay
+between them and checks that the file_server proxy delivers the first
+event before the upstream finishes, and streams request bodies upstream.
+
+Run with: python -m pytest tests/test_file_server_proxy.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import file_server
+
+
+async def _sse(request):
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    await response.write(b"event: metadata\ndata: {}\n\n")
+    await asyncio.sleep(0.5)
+    await response.write(b"event: end\ndata: null\n\n")
+    return response
+
+
+async def _echo(request):
+    body = await request.read()
+    return web.json_response({"size": len(body), "auth": request.headers.get("x-api-key")})
+
+
+async def _run():
+    upstream_app = web.Application(client_max_size=16 * 1024 * 1024)
+    upstream_app.router.add_get("/threads/t1/runs/stream", _sse)
+    upstream_app.router.add_post("/echo", _echo)
+
+    async with TestServer(upstream_app) as upstream:
+        file_server.LANGGRAPH_API_URL = str(upstream.make_url(""))
+        async with TestClient(TestServer(file_server.create_app())) as client:
+            started = time.perf_counter()
+            resp = await client.get("/api/langgraph/threads/t1/runs/stream")
+            assert resp.headers["Content-Type"].startswith("text/event-stream")
+            first = await resp.content.readany()
+            first_at = time.perf_counter() - started
+            rest = await resp.read()
+            assert first.startswith(b"event: metadata")
+            assert b"event: end" in first + rest
+            assert first_at < 0.4  # Before the upstream's second event
+
+            payload = b"x" * (3 * 1024 * 1024)
+            resp = await client.post("/api/langgraph/echo", data=payload, headers={"x-api-key": "k"})
+            assert await resp.json() == {"size": len(payload), "auth": "k"}
+
+
+def test_proxy_streams_events_and_bodies():
+    saved = file_server.LANGGRAPH_API_URL
+    try:
+        asyncio.run(_run())
+    finally:
+        file_server.LANGGRAPH_API_URL = saved
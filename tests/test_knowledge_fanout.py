@@ -0,0 +1,208 @@
+"""
+Test Knowledge Fan-Out
+======================
+Tests for concurrent knowledge lookups: per-source timeouts, early return,
+pool replacement when timed-out calls pile up, no caching of partial
+results, and Tavily/Firecrawl hedging in ``search_web``.
+
+Run with: python -m pytest tests/test_knowledge_fanout.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.langgraph_agent import fanout, knowledge_tools
+from sdtm_pipeline.langgraph_agent.fanout import fan_out, get_executor
+from sdtm_pipeline.langgraph_agent.knowledge_tools import SDTMKnowledgeRetriever
+from sdtm_pipeline.utils import retrieval_cache
+from sdtm_pipeline.utils.retrieval_cache import RetrievalCache
+
+
+@pytest.fixture
+def release():
+    """Event that unblocks every hung source when the test ends."""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(retrieval_cache, "_retrieval_cache", RetrievalCache())
+
+
+def _hang(release, results=None):
+    def source():
+        release.wait(5)
+        return results or []
+    return source
+
+
+def _retriever():
+    """Retriever with no clients configured, bypassing API key lookups."""
+    retriever = SDTMKnowledgeRetriever.__new__(SDTMKnowledgeRetriever)
+    retriever.pinecone_client = None
+    retriever.tavily_client = None
+    retriever.firecrawl_client = None
+    retriever.openai_client = None
+    retriever.local_store = None
+    retriever.indexes = {}
+    retriever._index_dir = None
+    retriever._tavily_disabled = False
+    retriever._use_firecrawl = False
+    retriever._firecrawl_disabled = False
+    retriever._web_search_disabled = False
+    return retriever
+
+
+class _WebClient:
+    def __init__(self, delay=0.0, results=None, error=None):
+        self.delay = delay
+        self.results = results or []
+        self.error = error
+        self.calls = 0
+
+    def search(self, query, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return {"results": self.results}
+
+
+# =============================================================================
+# FAN-OUT
+# =============================================================================
+
+def test_sources_run_concurrently():
+    def slow(value):
+        def source():
+            time.sleep(0.2)
+            return [{"id": value, "score": 1.0}]
+        return source
+
+    outcome = fan_out({name: slow(name) for name in "abcd"}, timeout=2)
+    assert set(outcome.results) == set("abcd")
+    assert outcome.elapsed < 0.6
+
+
+def test_hung_source_times_out_without_blocking_the_rest(release):
+    outcome = fan_out({
+        "fast": lambda: [{"id": "x", "score": 0.9}],
+        "hung": _hang(release),
+    }, timeout=0.2)
+    assert outcome.results == {"fast": [{"id": "x", "score": 0.9}]}
+    assert outcome.timed_out == ["hung"]
+    assert outcome.elapsed < 1
+
+
+def test_enough_hits_returns_early(release):
+    outcome = fan_out({
+        "fast": lambda: [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.8}],
+        "slow": _hang(release),
+    }, timeout=5, enough=2, min_score=0.5)
+    assert outcome.skipped == ["slow"]
+    assert not outcome.timed_out
+    assert outcome.elapsed < 1
+
+
+def test_pool_is_replaced_once_timed_out_calls_fill_it(release, monkeypatch):
+    monkeypatch.setattr(fanout, "_executor", None)
+    monkeypatch.setattr(fanout, "ABANDONED_LIMIT", 2)
+    first = get_executor()
+
+    outcome = fan_out({f"hung{i}": _hang(release) for i in range(2)}, timeout=0.1)
+    assert len(outcome.timed_out) == 2
+
+    second = get_executor()
+    assert second is not first
+    assert fan_out({"ok": lambda: [{"id": "y"}]}, timeout=1).results == {"ok": [{"id": "y"}]}
+    second.shutdown(wait=False)
+
+
+# =============================================================================
+# PARTIAL RESULTS
+# =============================================================================
+
+def test_results_with_a_timed_out_source_are_not_cached(release, monkeypatch):
+    monkeypatch.setattr(fanout, "DEFAULT_SOURCE_TIMEOUT", 0.2)
+    retriever = _retriever()
+    retriever.local_store = object()
+    retriever.indexes = {"sdtmig": "local", "sdtmmetadata": "local"}
+    calls = []
+
+    def search_pinecone(query, index_name, top_k=5, query_vector=None):
+        calls.append(index_name)
+        if index_name == "sdtmig" and len(calls) <= 2:
+            release.wait(5)
+            return []
+        return [{"id": index_name, "score": 0.9, "metadata": {"index": index_name}}]
+
+    retriever.search_pinecone = search_pinecone
+
+    partial = retriever.get_sdtm_variable_definition("DM", "AGE")
+    assert partial == {"index": "sdtmmetadata"}
+
+    complete = retriever.get_sdtm_variable_definition("DM", "AGE")
+    assert complete == {"index": "sdtmig"}
+    assert len(calls) == 4
+
+    # The complete answer is cached
+    assert retriever.get_sdtm_variable_definition("DM", "AGE") == {"index": "sdtmig"}
+    assert len(calls) == 4
+
+
+# =============================================================================
+# WEB SEARCH HEDGING
+# =============================================================================
+
+def test_fast_tavily_answer_skips_firecrawl(monkeypatch):
+    monkeypatch.setattr(knowledge_tools, "WEB_HEDGE_DELAY", 0.5)
+    retriever = _retriever()
+    retriever.tavily_client = _WebClient(results=[{"url": "tavily"}])
+    retriever.firecrawl_client = _WebClient(results=[{"url": "firecrawl"}])
+
+    assert retriever.search_web("AE domain") == [{"url": "tavily"}]
+    assert retriever.firecrawl_client.calls == 0
+
+
+def test_slow_tavily_is_hedged_with_firecrawl(monkeypatch):
+    monkeypatch.setattr(knowledge_tools, "WEB_HEDGE_DELAY", 0.05)
+    retriever = _retriever()
+    retriever.tavily_client = _WebClient(delay=1, results=[{"url": "tavily"}])
+    retriever.firecrawl_client = _WebClient(results=[{"url": "firecrawl"}])
+
+    started = time.monotonic()
+    results = retriever.search_web("AE domain")
+    assert [r["url"] for r in results] == ["firecrawl"]
+    assert time.monotonic() - started < 0.5
+
+
+def test_tavily_failure_during_hedge_calls_firecrawl_once(monkeypatch):
+    monkeypatch.setattr(knowledge_tools, "WEB_HEDGE_DELAY", 0.05)
+    retriever = _retriever()
+    retriever.tavily_client = _WebClient(delay=0.2, error="rate limit")
+    retriever.firecrawl_client = _WebClient(delay=0.4, results=[{"url": "firecrawl"}])
+
+    results = retriever.search_web("AE domain")
+    assert [r["url"] for r in results] == ["firecrawl"]
+    assert retriever.firecrawl_client.calls == 1
+    assert retriever._tavily_disabled
+
+
+def test_tavily_failure_before_hedge_falls_back_once(monkeypatch):
+    monkeypatch.setattr(knowledge_tools, "WEB_HEDGE_DELAY", 0.5)
+    retriever = _retriever()
+    retriever.tavily_client = _WebClient(error="quota exceeded")
+    retriever.firecrawl_client = _WebClient(results=[{"url": "firecrawl"}])
+
+    results = retriever.search_web("AE domain")
+    assert [r["url"] for r in results] == ["firecrawl"]
+    assert retriever.firecrawl_client.calls == 1
@@ -0,0 +1,321 @@
+"""
+Test Local Vector Index
+=======================
+Offline tests for the in-process NumPy vector index that stands in for
+Pinecone (KNOWLEDGE_BACKEND=local).
+
+Run with: python -m pytest tests/test_local_index.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.knowledge_base.local_index import LocalVectorIndex, LocalVectorStore
+
+
+def _vectors(n: int, dim: int = 16, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    return [
+        {"id": f"doc-{i}", "values": rng.normal(size=dim).tolist(), "metadata": {"n": i}}
+        for i in range(n)
+    ]
+
+
+def test_query_returns_exact_match_first():
+    index = LocalVectorIndex("sdtmig")
+    docs = _vectors(50)
+    index.upsert(docs)
+
+    matches = index.query(docs[17]["values"], top_k=3)
+
+    assert [m["id"] for m in matches][0] == "doc-17"
+    assert abs(matches[0]["score"] - 1.0) < 1e-5
+    assert matches[0]["metadata"] == {"n": 17}
+    assert matches[0]["score"] >= matches[1]["score"] >= matches[2]["score"]
+
+
+def test_upsert_replaces_existing_ids_and_delete():
+    index = LocalVectorIndex("sdtmct")
+    docs = _vectors(5)
+    index.upsert(docs)
+    index.upsert([{"id": "doc-2", "values": docs[4]["values"], "metadata": {"n": 99}}])
+
+    assert len(index) == 5
+    top_ids = {m["id"] for m in index.query(docs[4]["values"], top_k=2)}
+    assert top_ids == {"doc-2", "doc-4"}
+
+    assert index.delete(["doc-2", "missing"]) == 1
+    assert len(index) == 4
+    assert index.query(docs[4]["values"], top_k=1)[0]["id"] == "doc-4"
+
+
+def test_repeated_id_in_one_batch_keeps_the_last_copy():
+    index = LocalVectorIndex("sdtmct")
+    docs = _vectors(3)
+    index.upsert([
+        {"id": "a", "values": docs[0]["values"], "metadata": {"copy": 1}},
+        {"id": "b", "values": docs[1]["values"], "metadata": {}},
+        {"id": "a", "values": docs[2]["values"], "metadata": {"copy": 2}},
+    ])
+    assert index.ids == ["a", "b"]
+    assert index.metadata[0] == {"copy": 2}
+    assert index.query(docs[2]["values"], top_k=1)[0]["id"] == "a"
+
+    # Replacing an existing id twice in one batch also keeps the last copy
+    index.upsert([
+        {"id": "b", "values": docs[0]["values"], "metadata": {"copy": 1}},
+        {"id": "b", "values": docs[2]["values"], "metadata": {"copy": 2}},
+    ])
+    assert len(index) == 2 and index.metadata[1] == {"copy": 2}
+    assert np.allclose(index.vectors[1], index.vectors[0])
+
+
+def test_upserts_write_into_one_growing_buffer(tmp_path):
+    store = LocalVectorStore(tmp_path)
+    index = store.get_index("sdtmig", create=True)
+    docs = _vectors(40)
+    index.upsert(docs[:20])
+    store.save("sdtmig")
+
+    # A loaded (read-only, memory-mapped) index is copied once, then updated in place
+    index = LocalVectorStore(tmp_path).get_index("sdtmig")
+    index.upsert([{"id": "doc-3", "values": docs[30]["values"], "metadata": {}}])
+    buffer = index.vectors.base
+    index.upsert(docs[20:25])
+    index.upsert([{"id": "doc-0", "values": docs[31]["values"], "metadata": {}}])
+    assert index.vectors.base is buffer
+    assert len(index) == 25
+    assert index.query(docs[31]["values"], top_k=1)[0]["id"] == "doc-0"
+    assert index.query(docs[22]["values"], top_k=1)[0]["id"] == "doc-22"
+
+
+def test_store_persists_and_reloads(tmp_path):
+    store = LocalVectorStore(tmp_path)
+    docs = _vectors(20)
+    store.get_index("validationrules", create=True).upsert(docs)
+    store.save("validationrules")
+
+    assert (tmp_path / "validationrules.npy").exists()
+    assert (tmp_path / "validationrules.meta.json").exists()
+
+    reloaded = LocalVectorStore(tmp_path)
+    assert reloaded.list_indexes() == ["validationrules"]
+    assert reloaded.query("validationrules", docs[3]["values"], top_k=1)[0]["id"] == "doc-3"
+    assert reloaded.query("missing", docs[3]["values"]) == []
+
+
+def test_ivf_matches_brute_force_top_hit():
+    index = LocalVectorIndex("derivationrules")
+    docs = _vectors(5000, dim=8)
+    index.upsert(docs)
+    index.build_ivf(n_lists=16)
+
+    for i in (0, 1234, 4999):
+        assert index.query(docs[i]["values"], top_k=1, n_probe=4)[0]["id"] == f"doc-{i}"
+
+
+def test_retriever_serves_from_local_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("KNOWLEDGE_BACKEND", "local")
+    monkeypatch.setenv("KNOWLEDGE_INDEX_DIR", str(tmp_path))
+
+    docs = _vectors(10)
+    store = LocalVectorStore(tmp_path)
+    store.get_index("sdtmig", create=True).upsert(docs)
+    store.save("sdtmig")
+
+    from sdtm_pipeline.langgraph_agent.knowledge_tools import SDTMKnowledgeRetriever
+
+    retriever = SDTMKnowledgeRetriever()
+    retriever._get_embedding = lambda text, model=None: docs[6]["values"]
+
+    assert retriever.pinecone_client is None
+    assert retriever.has_vector_store
+    assert "sdtmig" in retriever.list_pinecone_indexes()
+    assert retriever.search_pinecone("DM domain", "sdtmig", top_k=2)[0]["id"] == "doc-6"
+
+
+def test_population_is_incremental_and_retries_rate_limits(tmp_path):
+    from sdtm_pipeline.knowledge_base.setup_pinecone import PineconeKnowledgeBase, KnowledgeDocument
+
+    kb = PineconeKnowledgeBase(openai_key="test", backend="local", local_index_dir=tmp_path)
+    calls = {"embed": 0, "throttled": False}
+
+    def fake_embeddings(texts):
+        calls["embed"] += 1
+        if not calls["throttled"]:
+            calls["throttled"] = True
+            raise RuntimeError("Error code: 429 - rate limit exceeded")
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+    kb.get_embeddings = fake_embeddings
+    kb.rate_limiter.max_delay = 0.01
+    docs = [KnowledgeDocument(id=f"rule-{i}", text="x" * (i + 1), metadata={"i": i}) for i in range(5)]
+
+    assert kb.upsert_documents("validationrules", docs).upserted == 5
+    assert calls["embed"] == 2
+    assert kb.rate_limiter.throttled == 1
+
+    # Unchanged documents are skipped; only the edited one is re-embedded
+    docs[2] = KnowledgeDocument(id="rule-2", text="changed", metadata={"i": 2})
+    run = kb.upsert_documents("validationrules", docs)
+    assert (run.upserted, run.skipped, run.indexed) == (1, 4, 5)
+
+    reloaded = LocalVectorStore(tmp_path).get_index("validationrules")
+    assert len(reloaded) == 5
+    assert reloaded.metadata[2]["text"] == "changed"
+
+
+def test_bad_document_fails_alone_not_its_batch(tmp_path):
+    from sdtm_pipeline.knowledge_base.setup_pinecone import PineconeKnowledgeBase, KnowledgeDocument
+
+    kb = PineconeKnowledgeBase(openai_key="test", backend="local", local_index_dir=tmp_path)
+    requests = []
+
+    def fake_embeddings(texts):
+        requests.append(len(texts))
+        if "bad" in texts:
+            raise ValueError("Invalid input: text too long")
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+    kb.get_embeddings = fake_embeddings
+    docs = [KnowledgeDocument(id=f"rule-{i}", text="x" * (i + 1), metadata={"i": i}) for i in range(4)]
+    docs.append(KnowledgeDocument(id="rule-bad", text="bad", metadata={}))
+
+    run = kb.upsert_documents("validationrules", docs)
+    assert (run.upserted, run.failed, run.failed_ids) == (4, 1, ["rule-bad"])
+    assert requests == [5, 1, 1, 1, 1, 1]
+
+    # The failed document is retried next run, the others are unchanged
+    run = kb.upsert_documents("validationrules", docs)
+    assert (run.upserted, run.skipped, run.failed) == (0, 4, 1)
+
+
+def test_recreated_pinecone_index_is_repopulated(tmp_path, monkeypatch):
+    from sdtm_pipeline.knowledge_base.setup_pinecone import PineconeKnowledgeBase, KnowledgeDocument
+
+    class FakeIndex:
+        def __init__(self):
+            self.vectors = {}
+
+        def upsert(self, vectors):
+            self.vectors.update((v["id"], v) for v in vectors)
+
+        def delete(self, ids):
+            for doc_id in ids:
+                self.vectors.pop(doc_id, None)
+
+        def describe_index_stats(self):
+            return {"total_vector_count": len(self.vectors)}
+
+    indexes = {"validationrules": FakeIndex()}
+
+    class FakePinecone:
+        def Index(self, name):
+            return indexes[name]
+
+    kb = PineconeKnowledgeBase(api_key="test", openai_key="test", backend="pinecone")
+    kb.pc = FakePinecone()
+    kb.get_embeddings = lambda texts: [[float(len(t)), 1.0, 0.5] for t in texts]
+    docs = [KnowledgeDocument(id=f"rule-{i}", text="x" * (i + 1), metadata={"i": i}) for i in range(3)]
+
+    import sdtm_pipeline.knowledge_base.setup_pinecone as setup_pinecone
+    monkeypatch.setattr(setup_pinecone, "get_index_dir", lambda: tmp_path)
+
+    assert kb.upsert_documents("validationrules", docs).upserted == 3
+    assert kb.upsert_documents("validationrules", docs).skipped == 3
+
+    # Index deleted and recreated: the manifest is stale, everything is rewritten
+    indexes["validationrules"] = FakeIndex()
+    run = kb.upsert_documents("validationrules", docs)
+    assert (run.upserted, run.skipped) == (3, 0)
+    assert len(indexes["validationrules"].vectors) == 3
+
+    # Documents dropped from the source are deleted from Pinecone too
+    kb.upsert_documents("validationrules", docs[:1])
+    assert list(indexes["validationrules"].vectors) == ["rule-0"]
+
+
+def test_bm25_index_roundtrip_and_hybrid_fusion(tmp_path):
+    from sdtm_pipeline.knowledge_base.bm25_index import BM25Index
+    from sdtm_pipeline.langgraph_agent.hybrid_search import HybridRetriever
+
+    records = [
+        {"id": "AE-AESTDTC", "text": "AESTDTC start date of adverse event ISO 8601", "metadata": {"v": "AESTDTC"}},
+        {"id": "DM-SEX", "text": "SEX sex of subject controlled terminology", "metadata": {"v": "SEX"}},
+        {"id": "VS-VSORRES", "text": "VSORRES vital signs result in original units", "metadata": {"v": "VSORRES"}},
+    ]
+    bm25 = BM25Index("sdtmig")
+    bm25.upsert(records)
+    bm25.save(tmp_path)
+
+    loaded = BM25Index.load(tmp_path, "sdtmig")
+    assert loaded.search("adverse event start date", top_k=1)[0]["id"] == "AE-AESTDTC"
+
+    semantic = lambda query, index_name, top_k=10: [
+        {"id": "DM-SEX", "score": 0.9, "metadata": {}},
+        {"id": "AE-AESTDTC", "score": 0.8, "metadata": {}},
+    ]
+    results = HybridRetriever(semantic, index_dir=tmp_path).search("adverse event start date", "sdtmig", top_k=2)
+
+    assert [r.id for r in results] == ["AE-AESTDTC", "DM-SEX"]
+    assert results[0].source == "hybrid"
+    assert results[1].source == "semantic"
+
+
+def test_shared_hybrid_retriever_uses_each_callers_semantic_search(tmp_path):
+    from sdtm_pipeline.langgraph_agent.hybrid_search import get_hybrid_retriever
+
+    first = lambda query, index_name, top_k=10: [{"id": "from-first", "score": 0.9, "metadata": {}}]
+    second = lambda query, index_name, top_k=10: [{"id": "from-second", "score": 0.9, "metadata": {}}]
+
+    retriever = get_hybrid_retriever(index_dir=tmp_path)
+    assert get_hybrid_retriever(index_dir=tmp_path) is retriever
+    assert [r.id for r in retriever.search("q", "sdtmig", semantic_search_fn=first)] == ["from-first"]
+    assert [r.id for r in retriever.search("q", "sdtmig", semantic_search_fn=second)] == ["from-second"]
+
+
+def test_documents_removed_from_the_source_are_deleted_everywhere(tmp_path):
+    import json
+    from sdtm_pipeline.knowledge_base.bm25_index import BM25Index
+    from sdtm_pipeline.knowledge_base.setup_pinecone import PineconeKnowledgeBase, KnowledgeDocument
+
+    kb = PineconeKnowledgeBase(openai_key="test", backend="local", local_index_dir=tmp_path)
+    kb.get_embeddings = lambda texts: [[float(len(t)), 1.0, 0.5] for t in texts]
+    docs = [KnowledgeDocument(id=f"rule-{i}", text=f"rule number {i}", metadata={}) for i in range(3)]
+    kb.upsert_documents("validationrules", docs)
+
+    run = kb.upsert_documents("validationrules", docs[:2])
+    assert (run.upserted, run.skipped) == (0, 2)
+    assert BM25Index.load(tmp_path, "validationrules").doc_ids == ["rule-0", "rule-1"]
+    assert LocalVectorStore(tmp_path).get_index("validationrules").ids == ["rule-0", "rule-1"]
+    manifest = json.loads((tmp_path / "validationrules.local.hashes.json").read_text())
+    assert sorted(manifest) == ["rule-0", "rule-1"]
+
+    # A scoped run only replaces documents under its own prefix
+    kb.upsert_documents("dta", [KnowledgeDocument(id="A-S001", text="alpha", metadata={}),
+                                KnowledgeDocument(id="A-S002", text="alpha two", metadata={})], scope="A-")
+    kb.upsert_documents("dta", [KnowledgeDocument(id="B-S001", text="beta", metadata={})], scope="B-")
+    kb.upsert_documents("dta", [KnowledgeDocument(id="A-S001", text="alpha", metadata={})], scope="A-")
+    assert BM25Index.load(tmp_path, "dta").doc_ids == ["A-S001", "B-S001"]
+    assert sorted(LocalVectorStore(tmp_path).get_index("dta").ids) == ["A-S001", "B-S001"]
+
+
+def test_failed_full_population_does_not_leave_force_refresh_set(tmp_path):
+    from sdtm_pipeline.knowledge_base.setup_pinecone import PineconeKnowledgeBase
+
+    kb = PineconeKnowledgeBase(openai_key="test", backend="local", local_index_dir=tmp_path)
+
+    def fail():
+        raise RuntimeError("embeddings unavailable")
+
+    kb.populate_sdtmig_index = fail
+    try:
+        kb.populate_all_indexes(force=True)
+    except RuntimeError:
+        pass
+    assert kb.force_refresh is False
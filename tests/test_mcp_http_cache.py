@@ -0,0 +1,121 @@
+"""
+Test Healthcare API Response Cache
+==================================
+Runs a local stub API and checks that concurrent identical ``_http_get``
+calls share one upstream request, repeats are served from the cache until
+the TTL expires, errors are not cached, and the disk tier survives a new
+process-level cache; and that the pooled session lives exactly as long as
+the server lifespan, while calls on other loops leave no session behind.
+
+Run with: python -m pytest tests/test_mcp_http_cache.py
+"""
+
+import asyncio
+import gc
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from sdtm_pipeline.deepagents import mcp_tools
+from sdtm_pipeline.deepagents.mcp_tools import HTTPResponseCache, _http_get
+
+
+async def _run(disk_dir):
+    hits = {"study": 0, "missing": 0}
+
+    async def study(request):
+        hits["study"] += 1
+        await asyncio.sleep(0.1)
+        return web.json_response({"nct_id": request.match_info["nct"], "q": request.query.get("q")})
+
+    async def missing(request):
+        hits["missing"] += 1
+        return web.Response(status=404, text="not found")
+
+    app = web.Application()
+    app.router.add_get("/studies/{nct}", study)
+    app.router.add_get("/missing", missing)
+
+    async with TestServer(app) as server:
+        url = str(server.make_url("/studies/NCT01"))
+
+        results = await asyncio.gather(*[_http_get(url, params={"q": "x"}) for _ in range(8)])
+        assert all(r == {"nct_id": "NCT01", "q": "x"} for r in results)
+        assert hits["study"] == 1
+        assert mcp_tools.get_http_response_cache().coalesced == 7
+
+        # Cache hit, then a different query string is a different entry
+        await _http_get(url, params={"q": "x"})
+        assert hits["study"] == 1
+        await _http_get(url, params={"q": "y"})
+        assert hits["study"] == 2
+
+        # Errors are returned but not cached
+        for _ in range(2):
+            assert "error" in await _http_get(str(server.make_url("/missing")))
+        assert hits["missing"] == 2
+
+        # Expired entries are fetched again
+        cache = mcp_tools.get_http_response_cache()
+        cache.ttl_seconds = 0.05
+        await _http_get(url, params={"q": "z"})
+        time.sleep(0.1)
+        await _http_get(url, params={"q": "z"})
+        assert hits["study"] == 4
+
+        # A fresh cache over the same directory reads the disk tier
+        cache.ttl_seconds = 60
+        await _http_get(url, params={"q": "disk"})
+        mcp_tools._response_cache = HTTPResponseCache(disk_dir=disk_dir)
+        assert await _http_get(url, params={"q": "disk"}) == {"nct_id": "NCT01", "q": "disk"}
+        assert hits["study"] == 5
+        assert mcp_tools._response_cache.disk_hits == 1
+
+
+
+async def _run_in_lifespan(disk_dir):
+    from sdtm_pipeline.deepagents.server_lifespan import shared_clients_lifespan
+
+    async with shared_clients_lifespan():
+        session = mcp_tools.get_http_session()
+        assert session is not None and not session.closed
+        await _run(disk_dir)
+        assert mcp_tools.get_http_session() is session  # One pool for the whole lifespan
+    assert session.closed and mcp_tools.get_http_session() is None
+
+
+def test_http_get_coalesces_and_caches():
+    saved = mcp_tools._response_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            mcp_tools._response_cache = HTTPResponseCache(disk_dir=Path(tmp))
+            asyncio.run(_run_in_lifespan(Path(tmp)))
+        finally:
+            mcp_tools._response_cache = saved
+
+
+def test_calls_outside_the_server_loop_leave_no_session():
+    import aiohttp
+
+    async def ping(request):
+        return web.json_response({"ok": True})
+
+    async def call():
+        app = web.Application()
+        app.router.add_get("/ping", ping)
+        async with TestServer(app) as server:
+            assert mcp_tools.get_http_session() is None
+            return await _http_get(str(server.make_url("/ping")), cache=False)
+
+    for _ in range(5):
+        assert asyncio.run(call()) == {"ok": True}
+    gc.collect()
+    sessions = [o for o in gc.get_objects() if isinstance(o, aiohttp.ClientSession) and not o.closed]
+    assert sessions == [] and mcp_tools._http_session is None and mcp_tools._in_flight == {}
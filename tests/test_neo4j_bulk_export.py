@@ -0,0 +1,86 @@
+"""
+Test Neo4j Bulk Import Export
+=============================
+Checks the neo4j-admin CSV files and manifest written by
+Neo4jBulkExporter, without a live database.
+
+Run with: python -m pytest tests/test_neo4j_bulk_export.py
+"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl_neo4j.bulk_export import Neo4jBulkExporter
+
+
+def _read(path: Path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def _study():
+    ae = pd.DataFrame({
+        "USUBJID": ["S-001", "S-001", "S-002"],
+        "AESEQ": [1, 2, 1],
+        "AETERM": ["HEADACHE", None, "NAUSEA"],
+    })
+    cm = pd.DataFrame({
+        "USUBJID": ["S-001"],
+        "CMSEQ": [7],
+        "CMTRT": ["ASPIRIN"],
+    })
+    relrec = pd.DataFrame({
+        "STUDYID": ["ST1"] * 3,
+        "RDOMAIN": ["AE", "CM", "AE"],
+        "USUBJID": ["S-001", "S-001", "S-002"],
+        "IDVAR": ["AESEQ", "CMSEQ", "AESEQ"],
+        "IDVARVAL": ["1", "7", "9"],
+        "RELTYPE": [None, None, None],
+        "RELID": ["R1", "R1", "R2"],
+    })
+    return {"AE": ae, "CM": cm, "RELREC": relrec}
+
+
+def test_node_and_relationship_files(tmp_path):
+    manifest = Neo4jBulkExporter(tmp_path, study_id="ST1", chunk_size=2).export(_study())
+
+    ae = _read(tmp_path / "nodes" / "AE.csv")
+    assert ae[0] == ["record_id:ID(Record)", "USUBJID", "AESEQ:long", "AETERM", "study_id", ":LABEL"]
+    assert ae[1] == ["AE_S-001_0", "S-001", "1", "HEADACHE", "ST1", "AE"]
+    assert ae[2][3] == ""  # Missing values are written as empty (null) fields
+    assert len(ae) == 4  # Header + 3 rows across two chunks
+
+    subjects = _read(tmp_path / "nodes" / "Subject.csv")
+    assert subjects[0] == ["usubjid:ID(Subject)", "study_id", ":LABEL"]
+    assert sorted(row[0] for row in subjects[1:]) == ["S-001", "S-002"]
+
+    has_ae = _read(tmp_path / "relationships" / "HAS_AE.csv")
+    assert has_ae[0] == [":START_ID(Subject)", ":END_ID(Record)", ":TYPE"]
+    assert has_ae[3] == ["S-002", "AE_S-002_2", "HAS_AE"]
+
+    assert _read(tmp_path / "relationships" / "HAS_DOMAIN.csv")[1] == ["ST1", "AE", "HAS_DOMAIN"]
+    assert len(_read(tmp_path / "relationships" / "BELONGS_TO.csv")) == 1 + 3 + 1 + 3
+
+    relrec = _read(tmp_path / "relationships" / "RELREC.csv")
+    assert relrec[1:] == [["AE_S-001_0", "CM_S-001_0", "RELREC", "", "R1"]]
+    assert manifest["relrec_unresolved"] == 1
+
+
+def test_manifest_lists_every_file(tmp_path):
+    manifest = Neo4jBulkExporter(tmp_path, study_id="ST1").export(_study())
+
+    on_disk = json.loads((tmp_path / "manifest.json").read_text())
+    assert on_disk["files"] == manifest["files"]
+    for entry in manifest["files"]:
+        assert len(_read(tmp_path / entry["path"])) == entry["rows"] + 1
+        assert f"{entry['path']}" in manifest["import_command"]
+
+    assert manifest["totals"]["nodes"] == 1 + 3 + 2 + 3 + 1 + 3  # Study, Domains, Subjects, AE, CM, RELREC
+    assert manifest["import_command"].startswith("neo4j-admin database import full")
@@ -0,0 +1,66 @@
+"""
+Test Shared Neo4j Driver Registry
+=================================
+Checks that get_async_neo4j_driver shares one driver per (uri, user) on a
+loop, replaces it when the password changes, and that run_sync and the
+server lifespan close the drivers they leave behind. No server is needed:
+drivers connect lazily and the health check is disabled.
+
+Run with: python -m pytest tests/test_neo4j_driver_registry.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents import async_utils
+from sdtm_pipeline.deepagents.async_utils import get_async_neo4j_driver, run_sync
+
+URI = "bolt://localhost:7687"
+
+
+def _no_health_check(monkeypatch):
+    monkeypatch.setattr(async_utils, "NEO4J_HEALTH_CHECK_INTERVAL", float("inf"))
+
+
+def test_drivers_shared_per_loop_and_closed_on_shutdown(monkeypatch):
+    _no_health_check(monkeypatch)
+    from sdtm_pipeline.deepagents.server_lifespan import shared_clients_lifespan
+
+    async def scenario():
+        async with shared_clients_lifespan():
+            first = await get_async_neo4j_driver(URI, "neo4j", "pw")
+            assert await get_async_neo4j_driver(URI, "neo4j", "pw") is first
+            other_user = await get_async_neo4j_driver(URI, "reader", "pw")
+            assert other_user is not first
+
+            rotated = await get_async_neo4j_driver(URI, "neo4j", "new-pw")
+            assert rotated is not first and first._closed
+            drivers = [rotated, other_user]
+            assert len(async_utils._neo4j_drivers[asyncio.get_running_loop()]) == 2
+        return drivers
+
+    drivers = asyncio.run(scenario())
+    assert all(d._closed for d in drivers)
+    assert len(async_utils._neo4j_drivers) == 0
+
+
+def test_run_sync_closes_drivers_of_its_loop(monkeypatch):
+    _no_health_check(monkeypatch)
+
+    async def use_driver():
+        return await get_async_neo4j_driver(URI, "neo4j", "pw")
+
+    drivers = [run_sync(use_driver()) for _ in range(3)]
+    assert all(d._closed for d in drivers)
+    assert len(async_utils._neo4j_drivers) == 0
+
+    # Called from inside a running loop: runs on a worker thread's loop
+    async def nested():
+        return run_sync(use_driver())
+
+    assert asyncio.run(nested())._closed
+    assert len(async_utils._neo4j_drivers) == 0
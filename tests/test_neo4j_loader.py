@@ -0,0 +1,155 @@
+"""
+Test Neo4j Parallel Loader
+==========================
+Checks the adaptive batch size controller, the key-range partitioning
+used by the parallel Neo4j writers and key schema setup, without a live
+database.
+
+Run with: python -m pytest tests/test_neo4j_loader.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl_neo4j.neo4j_loader import AdaptiveBatchSizer, Neo4jConfig, Neo4jLoader
+
+
+# =============================================================================
+# ADAPTIVE BATCH SIZER
+# =============================================================================
+
+def test_fast_commits_grow_the_batch_up_to_max_size():
+    sizer = AdaptiveBatchSizer(initial_size=1000, max_size=3000, target_seconds=1.0)
+    sizer.record(1000, 0.1)
+    assert sizer.next_size() == 1500
+    sizer.record(1500, 0.1)
+    assert sizer.next_size() == 2250
+    sizer.record(2250, 0.1)
+    assert sizer.next_size() == 3000
+
+    # Commits near the target keep the size
+    sizer.record(3000, 0.7)
+    assert sizer.next_size() == 3000
+
+
+def test_slow_commits_and_transient_errors_halve_down_to_min_size():
+    sizer = AdaptiveBatchSizer(initial_size=1000, min_size=300, target_seconds=1.0)
+    sizer.record(1000, 2.0)
+    assert sizer.next_size() == 500
+    sizer.on_transient_error()
+    assert sizer.next_size() == 300
+    sizer.on_transient_error()
+    sizer.record(300, 5.0)
+    assert sizer.next_size() == 300
+
+
+def test_tail_batches_do_not_change_the_size():
+    sizer = AdaptiveBatchSizer(initial_size=1000, target_seconds=1.0)
+    sizer.record(10, 0.001)
+    sizer.record(999, 10.0)
+    assert sizer.next_size() == 1000
+
+
+def test_large_records_cap_the_batch_by_payload_bytes():
+    sizer = AdaptiveBatchSizer(initial_size=1000, min_size=10, max_batch_bytes=10_000)
+    records = [{"id": i, "text": "x" * 180} for i in range(500)]
+    sizer.fit_to_records(records)
+
+    assert 40 <= sizer.max_size <= 50
+    assert sizer.next_size() == sizer.max_size
+    sizer.record(sizer.next_size(), 0.01)
+    assert sizer.next_size() == sizer.max_size
+
+    # The cap never goes below min_size
+    tiny = AdaptiveBatchSizer(initial_size=1000, min_size=100, max_batch_bytes=1_000)
+    tiny.fit_to_records(records)
+    assert tiny.next_size() == 100
+
+    # No records leaves the bounds alone
+    untouched = AdaptiveBatchSizer(initial_size=1000)
+    untouched.fit_to_records([])
+    assert (untouched.next_size(), untouched.max_size) == (1000, 50000)
+
+
+# =============================================================================
+# KEY-RANGE PARTITIONING
+# =============================================================================
+
+def _keys(partition):
+    return [row["id"] for row in partition]
+
+
+def test_partitions_cover_every_row_in_key_order():
+    rows = [{"id": f"S-{i:03d}"} for i in reversed(range(10))]
+    partitions = Neo4jLoader._partition_by_key(rows, lambda r: r["id"], 3)
+
+    assert [len(p) for p in partitions] == [3, 3, 4]
+    assert sum((_keys(p) for p in partitions), []) == sorted(r["id"] for r in rows)
+
+
+def test_equal_keys_never_span_partitions():
+    rows = [{"id": key, "n": n} for n, key in enumerate("AAAAABBCCCCCCD")]
+    partitions = Neo4jLoader._partition_by_key(rows, lambda r: r["id"], 4)
+
+    seen = set()
+    for partition in partitions:
+        keys = set(_keys(partition))
+        assert not keys & seen
+        seen |= keys
+    assert sum(len(p) for p in partitions) == len(rows)
+
+
+def test_partition_count_is_bounded_by_rows_and_distinct_keys():
+    rows = [{"id": "same"} for _ in range(6)]
+    assert Neo4jLoader._partition_by_key(rows, lambda r: r["id"], 4) == [rows]
+
+    two = [{"id": "a"}, {"id": "b"}]
+    assert len(Neo4jLoader._partition_by_key(two, lambda r: r["id"], 8)) == 2
+    assert Neo4jLoader._partition_by_key(two, lambda r: r["id"], 0) == [two]
+    assert Neo4jLoader._partition_by_key([], lambda r: r["id"], 4) == []
+
+
+def test_composite_keys_partition_by_the_whole_key():
+    rows = [{"usubjid": f"S-{i % 3}", "study_id": "ST1"} for i in range(9)]
+    partitions = Neo4jLoader._partition_by_key(
+        rows, lambda r: (r["usubjid"], r["study_id"]), 3
+    )
+    assert [sorted({r["usubjid"] for r in p}) for p in partitions] == [["S-0"], ["S-1"], ["S-2"]]
+
+
+# =============================================================================
+# KEY SCHEMA
+# =============================================================================
+
+class _SchemaLoader(Neo4jLoader):
+    """Loader with schema calls stubbed out; index creation fails until allowed."""
+
+    def __init__(self):
+        super().__init__(Neo4jConfig())
+        self.index_ok = False
+        self.index_calls = 0
+
+    def execute_cypher(self, query, parameters=None):
+        return True, []
+
+    def create_constraint(self, label, property_name, constraint_type="unique"):
+        return True
+
+    def create_index(self, label, properties, index_type="range"):
+        self.index_calls += 1
+        return self.index_ok
+
+
+def test_failed_composite_key_index_is_reported_and_retried():
+    loader = _SchemaLoader()
+    assert loader.ensure_key_schema("Subject", ["usubjid", "study_id"]) is False
+    assert loader.setup_schema([{"label": "Subject", "indexes": [{"properties": ["usubjid"]}]}])["errors"]
+
+    loader.index_ok = True
+    assert loader.ensure_key_schema("Subject", ["usubjid", "study_id"]) is True
+    calls = loader.index_calls
+    assert loader.ensure_key_schema("Subject", ["usubjid", "study_id"]) is True
+    assert loader.index_calls == calls
@@ -0,0 +1,136 @@
+"""
+Test Incremental Neo4j Sync
+===========================
+Checks that SDTMGraphSync only sends inserted, changed and deleted records
+on repeat loads. Uses an in-memory stand-in for Neo4jLoader.
+
+Run with: python -m pytest tests/test_neo4j_sync.py
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl_neo4j.neo4j_loader import LoadResult
+from etl_neo4j.sdtm_sync import SDTMGraphSync
+
+
+class InMemoryLoader:
+    """Keeps record nodes in a dict, keyed like the real loader."""
+
+    def __init__(self):
+        self.config = SimpleNamespace(uri="bolt://test", database="neo4j")
+        self.nodes = {}
+        self.merged = []
+        self.deleted = []
+
+    def create_index(self, *args, **kwargs):
+        return True
+
+    def create_constraint(self, *args, **kwargs):
+        return True
+
+    def execute_cypher(self, query, parameters=None):
+        if "count(n)" in query:
+            study_id = (parameters or {}).get("study_id")
+            return True, [{"count": sum(1 for n in self.nodes.values() if n.get("study_id") == study_id)}]
+        return True, []
+
+    def merge_nodes(self, label, records, **kwargs):
+        return LoadResult(success=True, nodes_created=len(records))
+
+    def parallel_merge_nodes(self, label, records, **kwargs):
+        self.merged.append([r["record_id"] for r in records])
+        for r in records:
+            self.nodes[r["record_id"]] = r
+        return LoadResult(success=True, nodes_created=len(records))
+
+    def parallel_create_relationships(self, relationship_type, relationships, **kwargs):
+        return LoadResult(success=True, relationships_created=len(relationships))
+
+    def delete_nodes(self, label, ids, **kwargs):
+        self.deleted.append(list(ids))
+        for node_id in ids:
+            self.nodes.pop(node_id, None)
+        return LoadResult(success=True, nodes_deleted=len(ids))
+
+
+def _ae():
+    return pd.DataFrame({
+        "USUBJID": ["S-1", "S-1", "S-2"],
+        "AESEQ": [1, 2, 1],
+        "AETERM": ["HEADACHE", "NAUSEA", None],
+    })
+
+
+def test_repeat_load_sends_only_changes(tmp_path):
+    loader = InMemoryLoader()
+    sync = SDTMGraphSync(loader, "ST1", manifest_dir=str(tmp_path))
+
+    first = sync.sync_domain("AE", _ae(), incremental=True)
+    assert (first.inserted, first.updated, first.deleted) == (3, 0, 0)
+
+    again = sync.sync_domain("AE", _ae(), incremental=True)
+    assert (again.inserted, again.updated, again.unchanged) == (0, 0, 3)
+    assert loader.merged[-1] == ["AE_S-1_0", "AE_S-1_1", "AE_S-2_2"]  # Nothing new was merged
+
+    corrected = _ae().drop(index=1)
+    corrected.loc[2, "AETERM"] = "RASH"
+    third = sync.sync_domain("AE", corrected, incremental=True)
+
+    assert (third.inserted, third.updated, third.deleted, third.unchanged) == (0, 1, 1, 1)
+    assert loader.merged[-1] == ["AE_S-2_2"]
+    assert loader.deleted == [["AE_S-1_1"]]
+    assert loader.nodes["AE_S-2_2"]["AETERM"] == "RASH"
+
+
+def test_manifest_is_distrusted_when_database_differs(tmp_path):
+    loader = InMemoryLoader()
+    sync = SDTMGraphSync(loader, "ST1", manifest_dir=str(tmp_path))
+    sync.sync_domain("AE", _ae(), incremental=True)
+
+    loader.nodes.clear()  # Database rebuilt behind the manifest's back
+    result = sync.sync_domain("AE", _ae(), incremental=True)
+
+    assert result.inserted == 3
+    assert len(loader.nodes) == 3
+
+
+def test_manifests_are_per_study(tmp_path):
+    loader = InMemoryLoader()
+    st1 = SDTMGraphSync(loader, "ST1", manifest_dir=str(tmp_path))
+    st2 = SDTMGraphSync(loader, "ST2", manifest_dir=str(tmp_path))
+    st1.sync_domain("AE", _ae(), incremental=True)
+    other = _ae().assign(USUBJID=["T-1", "T-2", "T-3"])
+    st2.sync_domain("AE", other, incremental=True)
+    assert len(loader.nodes) == 6
+
+    # A second study's nodes do not make the first study's manifest look stale
+    again = st1.sync_domain("AE", _ae().drop(index=0), incremental=True)
+    assert (again.inserted, again.updated, again.deleted, again.unchanged) == (0, 0, 1, 2)
+    assert loader.deleted == [["AE_S-1_0"]]
+    assert st2.sync_domain("AE", other, incremental=True).unchanged == 3
+
+
+def test_relationship_prepass_drops_duplicates_and_orders_by_source():
+    from etl_neo4j.neo4j_loader import Neo4jConfig, Neo4jLoader
+
+    loader = Neo4jLoader(Neo4jConfig())
+    result = LoadResult(success=True)
+    rows = loader._prepare_relationships(
+        [
+            {"from_id": {"usubjid": "S-2", "study_id": "ST1"}, "to_id": "AE_S-2_2"},
+            {"from_id": {"study_id": "ST1", "usubjid": "S-1"}, "to_id": "AE_S-1_0", "properties": {"n": 1}},
+            {"from_id": {"usubjid": "S-1", "study_id": "ST1"}, "to_id": "AE_S-1_0", "properties": {"n": 2}},
+        ],
+        "Subject", "AE", ["usubjid", "study_id"], "record_id", result, ensure_schema=False,
+    )
+
+    assert result.relationships_deduplicated == 1
+    assert [r["to_id"] for r in rows] == ["AE_S-1_0", "AE_S-2_2"]
+    assert rows[0]["properties"] == {"n": 2}  # Last duplicate wins, like repeated SET r += ...
@@ -0,0 +1,77 @@
+"""
+Test Incremental Pattern Extraction
+===================================
+Checks that LearningStore.extract_patterns only processes events after its
+watermark, reinforces a pattern once per contributing bundle, resumes
+after a restart and runs in the background once enough events arrive.
+
+Run with: python -m pytest tests/test_pattern_extraction.py
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents import learning_store
+from sdtm_pipeline.deepagents.feedback import FeedbackEvent, FeedbackSignal, SIGNAL_SENTIMENT
+from sdtm_pipeline.deepagents.learning_store import LearningStore
+
+START = datetime(2026, 3, 1, 9, 0, 0)
+
+
+def _event(i, thread_id, query, signal=FeedbackSignal.THUMBS_UP):
+    return FeedbackEvent(
+        event_id=f"e{i}",
+        thread_id=thread_id,
+        signal=signal,
+        sentiment=SIGNAL_SENTIMENT[signal],
+        timestamp=(START + timedelta(minutes=i)).isoformat() + "Z",
+        user_query=query,
+        domain="DM",
+        tool_chain=["load_data", "convert_domain"],
+    )
+
+
+def _patterns(store):
+    return {p.user_query_example: p for p in store._load_all_patterns()}
+
+
+def test_incremental_extraction_and_watermark():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LearningStore(Path(tmp))
+        store.record_event(_event(0, "t1", "Convert DM domain"))
+        store.record_event(_event(1, "t1", "Convert DM domain", FeedbackSignal.RESPONSE_COPIED))
+
+        merged = store.extract_patterns()
+        assert len(merged) == 1 and merged[0].times_reinforced == 1
+
+        # Nothing new: no re-reinforcement of the same bundle
+        store.extract_patterns()
+        assert store._load_all_patterns()[0].times_reinforced == 1
+
+        # More feedback on the same bundle only updates its score
+        store.record_event(_event(2, "t1", "Convert DM domain", FeedbackSignal.PIPELINE_COMPLETED))
+        store.extract_patterns()
+        assert store._load_all_patterns()[0].times_reinforced == 1
+
+        # A restarted store resumes after the watermark; a new bundle with
+        # the same tool chain reinforces the existing pattern
+        reopened = LearningStore(Path(tmp))
+        reopened.record_event(_event(3, "t2", "Convert DM domain now"))
+        merged = reopened.extract_patterns()
+        assert len(merged) == 1 and merged[0].times_reinforced == 2
+
+
+def test_extraction_runs_in_background():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LearningStore(Path(tmp))
+        for i in range(learning_store.PATTERN_REFRESH_INTERVAL):
+            store.record_event(_event(i, f"t{i}", f"Convert DM domain {i}"))
+        assert store._extraction_thread is not None
+        store.wait_for_extraction(timeout=10)
+        assert store._events_since_extraction == 0
+        assert store._load_all_patterns()
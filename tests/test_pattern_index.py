@@ -0,0 +1,88 @@
+"""
+Test Pattern Relevance Index
+============================
+Checks that PatternIndex returns the same top-k as scoring every pattern,
+that keyword/tool overlap with the query lifts a pattern, and that the
+LearningStore drops its index when patterns change.
+
+Run with: python -m pytest tests/test_pattern_index.py
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents.feedback import InteractionPattern
+from sdtm_pipeline.deepagents.learning_store import LearningStore, QUERY_TYPE_KEYWORDS
+from sdtm_pipeline.deepagents.pattern_index import PatternIndex
+
+DOMAINS = ["DM", "AE", "VS", "LB", None]
+TOOLS = ["load_data", "convert_domain", "validate_domain", "generate_mapping_spec", "export_neo4j"]
+
+
+def _patterns(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        InteractionPattern(
+            pattern_id=f"p{i}",
+            source="positive_feedback",
+            query_type=rng.choice(list(QUERY_TYPE_KEYWORDS)),
+            domain=rng.choice(DOMAINS),
+            user_query_example=f"task {i} about {rng.choice(['lab', 'vitals', 'adverse', 'spec'])}",
+            effective_tool_chain=rng.sample(TOOLS, 2),
+            effective_prompt_context="",
+            feedback_score=round(rng.uniform(0.6, 1.0), 3),
+            times_reinforced=rng.randint(1, 12),
+            last_reinforced="",
+            created_at="",
+        )
+        for i in range(n)
+    ]
+
+
+def _full_scan(store, patterns, query_type, domain, top_k):
+    """Reference ranking: every domain/general pattern scored (the pre-index algorithm)."""
+    candidates = [p for p in patterns if domain and p.domain == domain]
+    candidates += [p for p in patterns if p.domain is None]
+    candidates = candidates or list(patterns)
+    scored = [(p, store._compute_relevance(p, query_type, domain)) for p in candidates]
+    scored.sort(key=lambda x: x[1] * x[0].feedback_score, reverse=True)
+    return [p.pattern_id for p, _ in scored[:top_k]]
+
+
+def test_index_matches_full_scan_and_keywords_boost():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LearningStore(Path(tmp))
+        patterns = _patterns(3000)
+        ordered = [p for p in patterns if p.domain] + [p for p in patterns if p.domain is None]
+        index = PatternIndex(ordered, store._compute_relevance, keyword_weight=0.0)
+
+        for query_type in QUERY_TYPE_KEYWORDS:
+            for domain in DOMAINS + ["EX"]:
+                got = [p.pattern_id for p in index.search("q", query_type, domain, top_k=5)]
+                assert got == _full_scan(store, ordered, query_type, domain, 5)
+
+        # Otherwise equal patterns: the one sharing a tool with the query wins
+        a, b = _patterns(2, seed=1)
+        for p in (a, b):
+            p.domain, p.query_type, p.feedback_score, p.times_reinforced = "DM", "export", 0.9, 3
+        a.effective_tool_chain, b.effective_tool_chain = ["load_data"], ["export_neo4j"]
+        boosted = PatternIndex([a, b], store._compute_relevance)
+        assert boosted.search("rerun export_neo4j", "export", "DM", top_k=1) == [b]
+        assert boosted.search("rerun it", "export", "DM", top_k=1) == [a]
+
+
+def test_store_rebuilds_index_when_patterns_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LearningStore(Path(tmp))
+        store._patterns_cache = store._organize_by_domain(_patterns(50))
+        assert store.get_relevant_patterns("Convert DM domain", domain="DM")
+        assert store._pattern_index is not None
+
+        store._save_patterns_cache()
+        store._load_patterns_cache()
+        assert store._pattern_index is None
@@ -95,7 +95,7 @@ def test_feature_1_reasoning_stream():
     print(f"  - Thinking chunk dict: {thinking_dict}")
 
     # Simulate stream buffer
-    sm._stream_buffers["test_reasoning_001"] = [thinking_chunk, text_chunk, tool_chunk]
+    sm._stream_log("test_reasoning_001").extend([thinking_chunk, text_chunk, tool_chunk])
     session.last_stream_position = 2
 
     # Get thinking summary
@@ -142,7 +142,7 @@ def test_feature_2_reconnection():
         for i in range(5)
     ]
 
-    sm._stream_buffers["test_reconnect_001"] = chunks
+    sm._stream_log("test_reconnect_001").extend(chunks)
     session.last_stream_position = 4
 
     print(f"✓ Simulated 5 chunks in stream buffer")
@@ -0,0 +1,99 @@
+"""
+Test Retrieval Result Cache
+===========================
+Tests for the TTL/size-bounded cache that replaced ``lru_cache`` on
+SDTMKnowledgeRetriever lookups.
+
+Run with: python -m pytest tests/test_retrieval_cache.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.utils import retrieval_cache
+from sdtm_pipeline.utils.retrieval_cache import (
+    RetrievalCache,
+    bump_index_version,
+    cached_retrieval,
+    mark_incomplete,
+    read_index_version,
+)
+
+
+class _FakeRetriever:
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        self.calls = 0
+
+    @property
+    def index_version(self):
+        return read_index_version(self.index_dir)
+
+    @cached_retrieval
+    def get_domain_specification(self, domain):
+        self.calls += 1
+        return {"domain": domain, "call": self.calls}
+
+    @cached_retrieval
+    def get_partial(self, domain):
+        self.calls += 1
+        if self.calls == 1:
+            mark_incomplete()
+        return {"domain": domain, "call": self.calls}
+
+    @cached_retrieval
+    def get_summary(self, domain):
+        return {"spec": self.get_partial(domain)}
+
+
+def test_ttl_and_size_eviction():
+    cache = RetrievalCache(ttl_seconds=0.05, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    assert cache.get("a") is retrieval_cache._MISSING
+    assert cache.get("c") == "C"
+    time.sleep(0.06)
+    assert cache.get("c") is retrieval_cache._MISSING
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    RetrievalCache(disk_dir=tmp_path).set("spec", {"domain": "DM"})
+
+    other = RetrievalCache(disk_dir=tmp_path)
+    assert other.get("spec") == {"domain": "DM"}
+    assert other.stats()["disk_hits"] == 1
+
+
+def test_index_version_bump_invalidates(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval_cache, "_retrieval_cache", RetrievalCache())
+    retriever = _FakeRetriever(tmp_path)
+
+    assert retriever.get_domain_specification("DM")["call"] == 1
+    assert retriever.get_domain_specification("DM")["call"] == 1
+    assert retriever.get_domain_specification("AE")["call"] == 2
+
+    bump_index_version(tmp_path, "sdtmig")
+    assert retriever.get_domain_specification("DM")["call"] == 3
+
+
+def test_incomplete_results_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(retrieval_cache, "_retrieval_cache", RetrievalCache())
+    retriever = _FakeRetriever(tmp_path)
+
+    # The partial inner result is not cached, and neither is the outer call built from it
+    assert retriever.get_summary("DM")["spec"]["call"] == 1
+    assert retriever.get_summary("DM")["spec"]["call"] == 2
+    assert retriever.get_summary("DM")["spec"]["call"] == 2
+
+    # The flag does not leak into unrelated calls afterwards
+    assert retriever.get_domain_specification("AE")["call"] == 3
+    assert retriever.get_domain_specification("AE")["call"] == 3
@@ -0,0 +1,56 @@
+"""
+Test Session Stores
+===================
+Round-trips sessions through each SessionManager storage backend and
+checks the one-time import of a legacy sessions.json.
+
+Run with: python -m pytest tests/test_session_store.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents.session_store import create_session_store
+
+
+def test_backends_save_update_and_delete(tmp_path):
+    for backend in ["json", "sqlite", "files"]:
+        (tmp_path / backend).mkdir()
+        store = create_session_store(tmp_path / backend, backend)
+
+        store.save("t/1", {"thread_id": "t/1", "status": "active"})
+        store.save("t2", {"thread_id": "t2", "status": "active"})
+        store.save("t/1", {"thread_id": "t/1", "status": "paused"})
+        store.delete("t2")
+        store.delete("missing")
+
+        reopened = create_session_store(tmp_path / backend, backend)
+        assert reopened.load_all() == {"t/1": {"thread_id": "t/1", "status": "paused"}}, backend
+
+
+def test_legacy_sessions_json_is_imported(tmp_path):
+    legacy = {"old": {"thread_id": "old", "status": "completed"}}
+    (tmp_path / "sessions.json").write_text(json.dumps(legacy))
+
+    store = create_session_store(tmp_path, "sqlite")
+    assert store.load_all() == legacy
+
+    store.save("new", {"thread_id": "new", "status": "active"})
+    assert set(create_session_store(tmp_path, "sqlite").load_all()) == {"old", "new"}
+
+    # The legacy file is imported only once, even after the store empties,
+    # and stays in place for the json backend
+    store.delete("old")
+    store.delete("new")
+    assert create_session_store(tmp_path, "sqlite").load_all() == {}
+    assert create_session_store(tmp_path, "json").load_all() == legacy
+
+    (tmp_path / "files").mkdir()
+    (tmp_path / "files" / "sessions.json").write_text(json.dumps(legacy))
+    files = create_session_store(tmp_path / "files", "files")
+    files.delete("old")
+    assert create_session_store(tmp_path / "files", "files").load_all() == {}
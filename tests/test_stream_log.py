@@ -0,0 +1,194 @@
+"""
+Test Stream Replay Log
+======================
+Checks that StreamLog keeps a bounded ring in memory, replays evicted
+positions from its disk segment, resumes after a restart (cutting off a
+torn last chunk), that SessionManager lookups do not create logs, and that
+coalesced frames are sent when their window ends even if the stream stalls,
+and that an open frame is sent before a stream error propagates.
+
+Run with: python -m pytest tests/test_stream_log.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.deepagents.session_manager import StreamChunk, StreamContentType
+from sdtm_pipeline.deepagents.stream_log import StreamLog
+
+
+def _chunk(i):
+    return StreamChunk(content_type=StreamContentType.TEXT, content=f"part {i}", metadata={"position": i})
+
+
+def test_ring_is_bounded_and_read_by_position():
+    log = StreamLog(capacity=4)
+    log.extend([_chunk(i) for i in range(10)])
+
+    assert len(log) == 4
+    assert [c.content for c in log.read_from(7)] == ["part 7", "part 8", "part 9"]
+    assert [c.content for c in log.read_from(0)] == ["part 6", "part 7", "part 8", "part 9"]
+
+
+def test_spilled_chunks_survive_eviction_and_restart(tmp_path):
+    log = StreamLog(capacity=3, spill_path=tmp_path / "t1", decode=StreamChunk.from_dict)
+    log.extend([_chunk(i) for i in range(8)])
+
+    replay = log.read_from(2)
+    assert [c.metadata["position"] for c in replay] == list(range(2, 8))
+    assert replay[0].content_type == StreamContentType.TEXT
+    log.close()
+
+    reopened = StreamLog(capacity=3, spill_path=tmp_path / "t1", decode=StreamChunk.from_dict)
+    assert reopened.next_position == 8
+    assert reopened.append(_chunk(8)) == 8
+    assert [c.content for c in reopened.read_from(6)] == ["part 6", "part 7", "part 8"]
+
+    reopened.clear()
+    assert reopened.read_from(0) == [] and reopened.next_position == 0
+
+
+def test_torn_tail_is_truncated_and_positions_hold(tmp_path):
+    log = StreamLog(capacity=2, spill_path=tmp_path / "t1", decode=StreamChunk.from_dict)
+    log.extend([_chunk(i) for i in range(5)])
+    log.close()
+    assert log._log_file is None  # Closed segments hold no descriptors
+
+    # Crash mid-write: index entry for position 5 written, its line torn
+    log_path, idx_path = tmp_path / "t1.log", tmp_path / "t1.idx"
+    size = log_path.stat().st_size
+    with open(log_path, "ab") as f:
+        f.write(b'{"content_type": "text", "conte')
+    with open(idx_path, "ab") as f:
+        f.write(size.to_bytes(8, "little"))
+
+    reopened = StreamLog(capacity=2, spill_path=tmp_path / "t1", decode=StreamChunk.from_dict)
+    assert reopened.next_position == 5 and log_path.stat().st_size == size
+    assert reopened.append(_chunk(5)) == 5
+    reopened.append(_chunk(6))
+    replay = reopened.read_from(0)
+    assert [c.metadata["position"] for c in replay] == list(range(7))
+    reopened.close()
+
+
+def test_lookups_for_unknown_threads_create_nothing(tmp_path):
+    import asyncio
+    from sdtm_pipeline.deepagents.session_manager import SessionManager
+
+    sm = SessionManager(storage_dir=tmp_path, store_backend="json")
+    for i in range(20):
+        assert sm.get_thinking_summary(f"unknown-{i}") is None
+    session = sm.create_session("idle")
+    state = sm.get_reconnection_state(session.thread_id)
+    assert state["success"] and state["pending_chunks"] == []
+
+    async def replay():
+        return [c async for c in sm.reconnect_stream(None, session.thread_id)]
+
+    assert asyncio.run(replay()) == []
+    assert sm._stream_buffers == {}
+    assert not (tmp_path / "streams").exists() or not list((tmp_path / "streams").iterdir())
+
+
+def test_coalesced_stream_merges_deltas_into_frames(tmp_path):
+    import asyncio
+    from types import SimpleNamespace
+    from sdtm_pipeline.deepagents.session_manager import SessionManager, StreamFrame
+
+    def delta(block_type, text):
+        block = {"type": block_type, block_type: text}
+        return {"event": "on_chat_model_stream", "data": {"chunk": SimpleNamespace(content=[block])}}
+
+    events = [delta("thinking", "a"), delta("thinking", "b"), delta("text", "c"),
+              {"event": "on_tool_end", "data": {"output": "x" * 600}}, delta("text", "d")]
+
+    class Graph:
+        async def astream_events(self, input_message, config=None, version="v2"):
+            for event in events:
+                yield event
+
+    async def collect(sm):
+        return [f async for f in sm.stream_with_reasoning(Graph(), "t1", {}, coalesce=True)]
+
+    sm = SessionManager(storage_dir=tmp_path, store_backend="json")
+    frames = asyncio.run(collect(sm))
+
+    assert all(isinstance(f, StreamFrame) for f in frames)
+    assert [(f.content_type, f.content) for f in frames[:3]] == [
+        (StreamContentType.THINKING, "ab"), (StreamContentType.TEXT, "c"),
+        (StreamContentType.TOOL_RESULT, "x" * 500),
+    ]
+    assert frames[0].metadata["deltas"] == 2 and frames[2].metadata["full_output_length"] == 600
+    assert [f.metadata["position"] for f in frames] == [0, 1, 2, 3]
+    # The finished stream released its segment files
+    assert sm._stream_buffers["t1"]._log_file is None
+
+
+def test_coalesced_frame_is_sent_when_the_stream_stalls(tmp_path):
+    import asyncio
+    import time
+    from types import SimpleNamespace
+    from sdtm_pipeline.deepagents.session_manager import SessionManager
+
+    def delta(text):
+        block = {"type": "text", "text": text}
+        return {"event": "on_chat_model_stream", "data": {"chunk": SimpleNamespace(content=[block])}}
+
+    class Graph:
+        async def astream_events(self, input_message, config=None, version="v2"):
+            yield delta("a")
+            yield delta("b")
+            await asyncio.sleep(0.5)  # Model stalls mid-answer
+            yield delta("c")
+
+    async def collect(sm):
+        started = time.monotonic()
+        frames = []
+        async for frame in sm._coalesce_events(
+            Graph().astream_events(None), sm.create_session("t1"),
+            sm._stream_log("t1"), window_ms=50,
+        ):
+            frames.append((frame.content, time.monotonic() - started))
+        return frames
+
+    sm = SessionManager(storage_dir=tmp_path, store_backend="json")
+    frames = asyncio.run(collect(sm))
+
+    assert [content for content, _ in frames] == ["ab", "c"]
+    # "ab" left when its window closed, not when "c" arrived after the stall
+    assert frames[0][1] < 0.3
+    assert frames[1][1] >= 0.5
+
+
+def test_open_frame_is_sent_before_a_stream_error(tmp_path):
+    import asyncio
+    from types import SimpleNamespace
+    from sdtm_pipeline.deepagents.session_manager import SessionManager
+
+    def delta(text):
+        block = {"type": "thinking", "thinking": text}
+        return {"event": "on_chat_model_stream", "data": {"chunk": SimpleNamespace(content=[block])}}
+
+    class Graph:
+        async def astream_events(self, input_message, config=None, version="v2"):
+            yield delta("partial ")
+            yield delta("reasoning")
+            raise RuntimeError("model disconnected")
+
+    async def collect(sm):
+        frames = []
+        try:
+            async for frame in sm._coalesce_events(
+                Graph().astream_events(None), sm.create_session("t1"),
+                sm._stream_log("t1"), window_ms=10_000,
+            ):
+                frames.append(frame.content)
+        except RuntimeError as e:
+            frames.append(str(e))
+        return frames
+
+    sm = SessionManager(storage_dir=tmp_path, store_backend="json")
+    assert asyncio.run(collect(sm)) == ["partial reasoning", "model disconnected"]
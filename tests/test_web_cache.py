@@ -0,0 +1,77 @@
+"""
+Test SDTM Web Reference Cache
+=============================
+Checks the memory -> disk -> web tiering of ``SDTMWebReference`` web lookups,
+expiry of both tiers, and that ``clear_web_cache`` also drops CT indexes
+built from web-fetched codelists.
+
+Run with: python -m pytest tests/test_web_cache.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sdtm_pipeline.transformers.sdtm_web_reference import SDTMWebReference
+
+
+class _Fetcher:
+    """Stand-in for a web fetch that returns a new version on every call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return {
+            "codelist": "ZZTEST",
+            "extensible": False,
+            "terms": [{"code": f"V{self.calls}", "decode": f"Version {self.calls}"}],
+        }
+
+
+def _reference(tmp_path, ttl=3600):
+    reference = SDTMWebReference(cache_dir=str(tmp_path), cache_ttl=ttl)
+    fetcher = _Fetcher()
+    reference._fetch_ct_from_web = fetcher
+    return reference, fetcher
+
+
+def test_lookups_go_memory_then_disk_then_web(tmp_path):
+    reference, fetcher = _reference(tmp_path)
+    assert reference.get_controlled_terminology("ZZTEST")["terms"][0]["code"] == "V1"
+    assert reference.get_controlled_terminology("ZZTEST")["terms"][0]["code"] == "V1"
+    assert fetcher.calls == 1
+
+    # A new process reads the persisted entry instead of fetching
+    other, other_fetcher = _reference(tmp_path)
+    assert other.get_controlled_terminology("ZZTEST")["terms"][0]["code"] == "V1"
+    assert other_fetcher.calls == 0
+
+
+def test_memory_tier_expires_with_the_ttl(tmp_path, monkeypatch):
+    reference, fetcher = _reference(tmp_path, ttl=60)
+    assert reference.validate_ct_value("v1", "ZZTEST") == (True, "V1", None)
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert reference.get_controlled_terminology("ZZTEST")["terms"][0]["code"] == "V2"
+    assert fetcher.calls == 2
+
+    # The CT index built from the expired codelist is rebuilt too
+    assert reference.validate_ct_value("v2", "ZZTEST") == (True, "V2", None)
+
+
+def test_clear_web_cache_drops_memory_disk_and_ct_indexes(tmp_path):
+    reference, fetcher = _reference(tmp_path)
+    assert reference.validate_ct_value("v1", "ZZTEST")[0]
+
+    assert reference.clear_web_cache() == 1
+    assert reference.validate_ct_value("v2", "ZZTEST") == (True, "V2", None)
+    assert fetcher.calls == 2
+
+    # Local codelists are still indexed after a clear
+    assert reference.validate_ct_value("m", "SEX")[0]